@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from appointment.scheduling import reconcile_appointments
+
+
+class Command(BaseCommand):
+    help = "Create the missing appointment of every accepted consultation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Appointments inserted per INSERT statement")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many appointments are missing")
+
+    def handle(self, *args, **options):
+        count = reconcile_appointments(options['batch_size'], options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{count} accepted consultations have no appointment.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Created {count} missing appointments."))
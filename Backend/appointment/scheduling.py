@@ -0,0 +1,57 @@
+"""
+Appointment rows for accepted consultations.
+
+Every accepted consultation has one Appointment. ConsultationAcceptView
+creates it in the same transaction that accepts the consultation, parsing
+the consultation's scheduled_date / scheduled_time text once. Consultations
+accepted any other way, e.g. through the admin site, are picked up by
+`reconcile_appointments`, which backs the `reconcile_appointments`
+management command. Listing appointments never writes.
+"""
+
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_time
+
+from consultation.models import Consultation
+from .models import Appointment
+
+
+def appointment_schedule(consultation):
+    """Typed scheduled_date / scheduled_time for the fields the consultation has set."""
+    schedule = {}
+    if consultation.scheduled_date:
+        schedule["scheduled_date"] = parse_date(consultation.scheduled_date)
+    if consultation.scheduled_time:
+        schedule["scheduled_time"] = parse_time(consultation.scheduled_time)
+    return schedule
+
+
+def missing_appointments():
+    """Accepted consultations without an appointment (one LEFT JOIN ... IS NULL)."""
+    return Consultation.objects.filter(
+        status=Consultation.STATUS_ACCEPTED,
+        appointments__isnull=True,
+    ).order_by("id")
+
+
+def reconcile_appointments(batch_size=500, dry_run=False):
+    """
+    Create the appointment of every accepted consultation that lacks one.
+    Returns the number of consultations that were (or, with dry_run, would be) fixed.
+    """
+    with transaction.atomic():
+        consultations = list(missing_appointments().only("id", "scheduled_date", "scheduled_time"))
+        if not dry_run:
+            Appointment.objects.bulk_create(
+                [
+                    Appointment(
+                        consultation=consultation,
+                        status=Appointment.STATUS_CONFIRMED,
+                        payment_status=Appointment.PAYMENT_PENDING,
+                        **appointment_schedule(consultation),
+                    )
+                    for consultation in consultations
+                ],
+                batch_size=batch_size,
+            )
+    return len(consultations)
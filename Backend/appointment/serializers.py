@@ -33,6 +33,10 @@ class AppointmentSerializer(serializers.ModelSerializer):
 		request = self.context.get("request")
 		if not request or not request.user.is_authenticated:
 			return False
+
+		# Annotated by AppointmentListCreateView to avoid a query per row
+		if hasattr(obj, "rated_by_user"):
+			return obj.rated_by_user
 		
 		from review.models import Review
 		exists = Review.objects.filter(
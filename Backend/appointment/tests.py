@@ -1,3 +1,122 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from consultation.models import Consultation
+from .models import Appointment
+from .scheduling import reconcile_appointments
+
+
+class AppointmentTestCase(TestCase):
+    """A client and a lawyer with no consultations yet."""
+
+    def setUp(self):
+        self.client_user = User.objects.create(email='client@example.com', name='Client')
+        self.lawyer = User.objects.create(email='lawyer@example.com', name='Lawyer', is_lawyer=True)
+        self.api = APIClient()
+
+    def consultation(self, **fields):
+        return Consultation.objects.create(client=self.client_user, lawyer=self.lawyer, title='Advice', **fields)
+
+
+class ConsultationAcceptTests(AppointmentTestCase):
+
+    def accept(self, consultation, user=None):
+        self.api.force_authenticate(user or self.lawyer)
+        return self.api.post(f'/api/consultations/{consultation.id}/accept/', {}, format='json')
+
+    def test_accept_creates_a_confirmed_appointment(self):
+        consultation = self.consultation(scheduled_date='2026-11-02', scheduled_time='14:30:00')
+
+        self.assertEqual(self.accept(consultation).status_code, 200)
+
+        appointment = Appointment.objects.get(consultation=consultation)
+        self.assertEqual(
+            (appointment.status, appointment.payment_status, appointment.scheduled_date, appointment.scheduled_time),
+            (Appointment.STATUS_CONFIRMED, Appointment.PAYMENT_PENDING,
+             datetime.date(2026, 11, 2), datetime.time(14, 30)),
+        )
+
+    def test_requested_day_and_time_become_the_schedule(self):
+        consultation = self.consultation(requested_day='Monday', requested_time='2:00 PM')
+
+        self.accept(consultation)
+
+        appointment = Appointment.objects.get(consultation=consultation)
+        self.assertEqual(appointment.scheduled_date.weekday(), 0)
+        self.assertEqual(appointment.scheduled_time, datetime.time(14, 0))
+
+    def test_accepting_again_keeps_one_appointment(self):
+        consultation = self.consultation(scheduled_date='2026-11-02')
+        self.accept(consultation)
+        Consultation.objects.filter(id=consultation.id).update(scheduled_date='2026-11-09')
+
+        self.accept(consultation)
+
+        appointment = Appointment.objects.get(consultation=consultation)
+        self.assertEqual(appointment.scheduled_date, datetime.date(2026, 11, 9))
+
+    def test_only_the_lawyer_may_accept(self):
+        consultation = self.consultation()
+
+        self.assertEqual(self.accept(consultation, self.client_user).status_code, 403)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_listing_never_creates_appointments(self):
+        self.consultation(status=Consultation.STATUS_ACCEPTED)
+        self.api.force_authenticate(self.client_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get('/api/appointments/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Appointment.objects.exists())
+        self.assertFalse([query for query in queries if not query['sql'].startswith('SELECT')])
+
+
+class ReconcileAppointmentsTests(AppointmentTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.missing = [
+            self.consultation(status=Consultation.STATUS_ACCEPTED, scheduled_date='2026-11-02', scheduled_time='09:15'),
+            self.consultation(status=Consultation.STATUS_ACCEPTED),
+        ]
+        covered = self.consultation(status=Consultation.STATUS_ACCEPTED)
+        Appointment.objects.create(consultation=covered, status=Appointment.STATUS_CONFIRMED)
+        self.consultation(status=Consultation.STATUS_REQUESTED)
+
+    def test_creates_the_missing_appointments_in_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reconcile_appointments(), 2)
+
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('INSERT')]), 1)
+        self.assertEqual(Appointment.objects.count(), 3)
+        first = Appointment.objects.get(consultation=self.missing[0])
+        self.assertEqual(
+            (first.status, first.payment_status, first.scheduled_date, first.scheduled_time),
+            (Appointment.STATUS_CONFIRMED, Appointment.PAYMENT_PENDING,
+             datetime.date(2026, 11, 2), datetime.time(9, 15)),
+        )
+        self.assertIsNone(Appointment.objects.get(consultation=self.missing[1]).scheduled_date)
+
+        self.assertEqual(reconcile_appointments(), 0)
+
+    def test_dry_run_only_counts(self):
+        self.assertEqual(reconcile_appointments(dry_run=True), 2)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('reconcile_appointments', '--dry-run', stdout=out)
+        self.assertIn('2 accepted consultations have no appointment.', out.getvalue())
 
-# Create your tests here.
+        call_command('reconcile_appointments', stdout=out)
+        self.assertIn('Created 2 missing appointments.', out.getvalue())
+        self.assertEqual(Appointment.objects.count(), 3)
@@ -2,11 +2,12 @@ from rest_framework.views import APIView
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.utils.dateparse import parse_date, parse_time
+from django.db.models import Exists, OuterRef
 
 from .models import Appointment
 from .serializers import AppointmentSerializer
 from consultation.models import Consultation
+from review.models import Review
 from notification.utils import send_notification
 
 
@@ -15,6 +16,9 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
     List all appointments or create a new one.
     GET /api/appointments/
     POST /api/appointments/
+
+    Read-only: appointments are created when a consultation is accepted
+    (see appointment/scheduling.py).
     """
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
@@ -23,47 +27,23 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
         user = self.request.user
         if not user.is_authenticated:
             return Appointment.objects.none()
-        queryset = Appointment.objects.all()
+        queryset = Appointment.objects.select_related(
+            "consultation__client",
+            "consultation__lawyer__lawyer_kyc",
+            "consultation__case",
+        ).prefetch_related(
+            "consultation__appointments",
+        ).annotate(
+            rated_by_user=Exists(Review.objects.filter(client=user, appointment_id=OuterRef("pk"))),
+        )
 
         if user.is_superuser or user.is_staff:
             return queryset
 
         if user.is_lawyer:
-            appointments = queryset.filter(consultation__lawyer=user)
-            accepted_consultations = Consultation.objects.filter(
-                lawyer=user,
-                status=Consultation.STATUS_ACCEPTED,
-            )
-            for consultation in accepted_consultations:
-                defaults = {
-                    "scheduled_date": parse_date(consultation.scheduled_date) if consultation.scheduled_date else None,
-                    "scheduled_time": parse_time(consultation.scheduled_time) if consultation.scheduled_time else None,
-                    "payment_status": Appointment.PAYMENT_PENDING,
-                }
-
-                Appointment.objects.get_or_create(
-                    consultation=consultation,
-                    defaults=defaults,
-                )
-            return appointments
-
-        appointments = queryset.filter(consultation__client=user)
-        accepted_consultations = Consultation.objects.filter(
-            client=user,
-            status=Consultation.STATUS_ACCEPTED,
-        )
-        for consultation in accepted_consultations:
-            defaults = {
-                "scheduled_date": parse_date(consultation.scheduled_date) if consultation.scheduled_date else None,
-                "scheduled_time": parse_time(consultation.scheduled_time) if consultation.scheduled_time else None,
-                "payment_status": Appointment.PAYMENT_PENDING,
-            }
-
-            Appointment.objects.get_or_create(
-                consultation=consultation,
-                defaults=defaults,
-            )
-        return appointments
+            return queryset.filter(consultation__lawyer=user)
+
+        return queryset.filter(consultation__client=user)
 
 
 class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
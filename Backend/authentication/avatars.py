@@ -0,0 +1,169 @@
+"""
+Profile image thumbnails and stored avatar URLs.
+
+When a user's profile_image changes, the save stores just the 'original'
+URL and `schedule_profile_images` queues a job that renders square WebP
+thumbnails at AVATAR_SIZES, saves them next to the original and writes
+every URL to User.profile_image_urls:
+
+    {'original': '...', '64': '...', '128': '...', '256': '...'}
+
+Serializers call `profile_image_url`, which reads that column, so rendering
+a list of users never touches the storage SDK. A size that is not stored
+yet (job still queued, image could not be decoded) falls back to
+'original'; a user whose column was never filled falls back to
+profile_image.url. The `generate_profile_thumbnails` command fills the
+column for existing users.
+
+settings.AVATAR_PROCESSING_MODE selects the behaviour:
+- 'async' : render in a pool of AVATAR_WORKERS threads after the transaction commits
+- 'sync'  : render inline after commit (tests, single-process dev)
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from meronaya.versions import LAWYER_DIRECTORY, PROFILES, bump_version, lawyer_profile
+from .models import User
+
+
+logger = logging.getLogger(__name__)
+
+AVATAR_SIZES = (64, 128, 256)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AVATAR_WORKERS,
+                    thread_name_prefix='avatars',
+                )
+    return _executor
+
+
+def render_thumbnails(image_file, sizes=AVATAR_SIZES):
+    """{size: WebP bytes} of centre-cropped square thumbnails."""
+    with Image.open(image_file) as image:
+        # Let JPEG decode at reduced scale when the original is much larger
+        image.draft('RGB', (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+        thumbnails = {}
+        for size in sorted(sizes, reverse=True):
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, 'WEBP', quality=85, method=4)
+            thumbnails[size] = buffer.getvalue()
+        return thumbnails
+
+
+def _thumbnail_name(image_name, size):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'profile_images/thumbs/{stem}_{size}.webp'
+
+
+def _save_urls(user, urls):
+    User.objects.filter(pk=user.pk).update(profile_image_urls=urls)
+    user.profile_image_urls = urls
+    # update() sends no post_save, so invalidate the cached profiles here
+    bump_version(PROFILES)
+    if user.is_lawyer:
+        bump_version(LAWYER_DIRECTORY)
+        bump_version(lawyer_profile(user.pk))
+
+
+def store_original_url(user):
+    """
+    Store only the URL of the user's profile image (None when there is no
+    image). Called while saving the user, whose post_save already bumps the
+    profile versions.
+    """
+    image = user.profile_image
+    urls = {'original': image.storage.url(image.name)} if image else None
+    User.objects.filter(pk=user.pk).update(profile_image_urls=urls)
+    user.profile_image_urls = urls
+    return urls
+
+
+def store_profile_images(user):
+    """
+    Render and save thumbnails of the user's profile image, then store the
+    resolved URLs on the row (None when there is no image).
+    """
+    image = user.profile_image
+    if not image:
+        urls = None
+    else:
+        storage = image.storage
+        urls = {'original': storage.url(image.name)}
+        try:
+            with image.open('rb') as source:
+                thumbnails = render_thumbnails(source)
+            for size, content in thumbnails.items():
+                name = storage.save(_thumbnail_name(image.name, size), ContentFile(content))
+                urls[str(size)] = storage.url(name)
+        except Exception:
+            logger.exception("Failed to render profile thumbnails for user %s", user.pk)
+
+    _save_urls(user, urls)
+    return urls
+
+
+def process_profile_image(user_id, image_name):
+    """Render thumbnails for the user, unless their image changed again since."""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or (user.profile_image.name or '') != image_name:
+        # A later save queued its own job
+        return None
+    return store_profile_images(user)
+
+
+def _run_job(user_id, image_name):
+    try:
+        close_old_connections()
+        process_profile_image(user_id, image_name)
+    except Exception:
+        # A failed job must never kill the worker.
+        logger.exception("Profile image job for user %s crashed", user_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_profile_images(user):
+    """Render the user's thumbnails once the surrounding transaction commits."""
+    image_name = user.profile_image.name or ''
+    if settings.AVATAR_PROCESSING_MODE == 'sync':
+        transaction.on_commit(lambda: process_profile_image(user.pk, image_name))
+    else:
+        transaction.on_commit(lambda: _pool().submit(_run_job, user.pk, image_name))
+
+
+def profile_image_url(user, request=None, size=128):
+    """The URL of the user's avatar at `size`, absolute when a request is given."""
+    if not user:
+        return None
+    urls = user.profile_image_urls
+    if urls:
+        url = urls.get(str(size)) or urls['original']
+    elif user.profile_image:
+        url = user.profile_image.url
+    else:
+        return None
+    if request:
+        return request.build_absolute_uri(url)
+    return url
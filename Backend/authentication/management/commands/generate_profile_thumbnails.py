@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from authentication.avatars import store_profile_images
+from authentication.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Render avatar thumbnails and store resolved profile image URLs for "
+        "users whose profile_image_urls column is empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Regenerate for every user with a profile image")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+        if not options['all']:
+            users = users.filter(profile_image_urls__isnull=True)
+
+        count = 0
+        for user in users.order_by('id').iterator():
+            store_profile_images(user)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Stored profile images for {count} users."))
@@ -0,0 +1,76 @@
+"""
+Channels authentication middleware shared by every WebSocket consumer.
+
+The JWT access token is read from the `token` query parameter once per
+connection and the resolved user is placed on scope['user']. The fields
+consumers read are cached for a short TTL so reconnect storms after a deploy
+do not turn into one SELECT per socket; the cache entry is dropped whenever
+the user is saved or deleted (see authentication.signals). The password hash
+and other fields never reach the cache; they are deferred on the returned
+user and loaded from the database if something reads them.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+
+
+# Everything consumers read from a connection's user
+_CACHED_FIELDS = ('id', 'name', 'email', 'role', 'is_active')
+
+
+def _user_cache_key(user_id):
+    return f"ws_auth:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """Return the active user with this id, served from cache when possible."""
+    key = _user_cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.filter(id=user_id, is_active=True).values(*_CACHED_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, settings.WS_AUTH_CACHE_TTL)
+    # from_db expects the values in model field order
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(User.objects.db, field_names, [values[name] for name in field_names])
+
+
+def invalidate_cached_user(user_id):
+    """Drop a cached user row so the next connection reloads it."""
+    cache.delete(_user_cache_key(user_id))
+
+
+@database_sync_to_async
+def get_user_for_token(token):
+    """Validate a JWT access token and return its user, or AnonymousUser."""
+    if not token:
+        return AnonymousUser()
+
+    try:
+        access_token = AccessToken(token)
+        user_id = access_token[settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')]
+    except (TokenError, KeyError):
+        return AnonymousUser()
+
+    return get_cached_user(user_id) or AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populate scope['user'] from the `token` query parameter."""
+
+    async def __call__(self, scope, receive, send):
+        query_string = scope.get('query_string', b'').decode()
+        token = parse_qs(query_string).get('token', [None])[0]
+
+        scope = dict(scope, user=await get_user_for_token(token))
+        return await super().__call__(scope, receive, send)
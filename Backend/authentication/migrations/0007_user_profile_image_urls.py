@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_image_urls',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.utils.translation import gettext_lazy as _
 
 from .managers import CustomUserManager
@@ -21,6 +23,8 @@ class User(AbstractUser):
     name = models.CharField(max_length=255, blank=True, null=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     profile_image = models.ImageField(upload_to='profile_images/', storage=profile_image_storage, blank=True, null=True)
+    # Resolved URLs of the image and its thumbnails (see authentication/avatars.py)
+    profile_image_urls = models.JSONField(blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
     city = models.CharField(max_length=100, blank=True, null=True)
     district = models.CharField(max_length=100, blank=True, null=True)
@@ -72,6 +76,12 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
+        # Trigram indexes over UPPER(...) match the SQL Django emits for
+        # icontains, so directory name/city searches avoid sequential scans
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='user_name_trgm_idx'),
+            GinIndex(OpClass(Upper('city'), name='gin_trgm_ops'), name='user_city_trgm_idx'),
+        ]
 
 # creating a model for OTP to handle email verification and password reset processes. 
 class OTP(models.Model):
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from meronaya.versions import LAWYER_DIRECTORY, PROFILES, bump_version, lawyer_profile
+from .avatars import schedule_profile_images, store_original_url
+from .middleware import invalidate_cached_user
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_ws_user_cache(sender, instance, **kwargs):
+    """Keep the WebSocket user cache in step with the User table."""
+    invalidate_cached_user(instance.id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def bump_profile_versions(sender, instance, update_fields=None, **kwargs):
+    """Invalidate responses that render user profiles (ETags, cached directory responses)."""
+    # Logins save last_login only, which no profile response shows
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_version(PROFILES)
+    if instance.is_lawyer:
+        bump_version(LAWYER_DIRECTORY)
+        bump_version(lawyer_profile(instance.id))
+
+
+@receiver(post_init, sender=User)
+def remember_profile_image(sender, instance, **kwargs):
+    """Record the loaded image name so a save can tell whether it changed."""
+    # Read from __dict__ so deferred-field loads never trigger a query
+    if 'profile_image' in instance.__dict__:
+        instance._profile_image_name = _image_name(instance.__dict__['profile_image'])
+
+
+def _image_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_save, sender=User)
+def refresh_profile_images(sender, instance, **kwargs):
+    """Store the new image's URL and queue its thumbnails once per new profile image."""
+    if not hasattr(instance, '_profile_image_name'):
+        return
+    name = _image_name(instance.profile_image)
+    if name != instance._profile_image_name:
+        store_original_url(instance)
+        if name:
+            schedule_profile_images(instance)
+        instance._profile_image_name = name
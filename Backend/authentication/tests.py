@@ -1,3 +1,150 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from .avatars import AVATAR_SIZES, profile_image_url, render_thumbnails
+from .middleware import _user_cache_key, get_cached_user
+from .models import User
+
+
+def image_upload(name='avatar.png', size=(400, 300)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class CachedUserTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='sita@example.com', name='Sita', password='secret-pass')
+
+    def test_caches_only_the_fields_consumers_read(self):
+        user = get_cached_user(self.user.id)
+
+        self.assertEqual(
+            cache.get(_user_cache_key(self.user.id)),
+            {'id': self.user.id, 'name': 'Sita', 'email': 'sita@example.com', 'role': 'Client', 'is_active': True},
+        )
+        self.assertEqual(
+            (user.pk, user.name, user.email, user.role, user.is_active),
+            (self.user.id, 'Sita', 'sita@example.com', 'Client', True),
+        )
+        self.assertTrue(user.is_authenticated)
+
+    def test_served_from_cache_with_other_fields_deferred(self):
+        get_cached_user(self.user.id)
+
+        with self.assertNumQueries(0):
+            user = get_cached_user(self.user.id)
+            self.assertEqual(user.name, 'Sita')
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('secret-pass'))
+
+    def test_saving_the_user_drops_the_entry(self):
+        get_cached_user(self.user.id)
+        self.user.name = 'Renamed'
+        self.user.save()
+
+        self.assertEqual(get_cached_user(self.user.id).name, 'Renamed')
+
+    def test_inactive_users_are_not_returned(self):
+        User.objects.filter(id=self.user.id).update(is_active=False)
+
+        self.assertIsNone(get_cached_user(self.user.id))
+
+
+class RenderThumbnailsTests(SimpleTestCase):
+
+    def test_renders_square_webp_at_every_size(self):
+        thumbnails = render_thumbnails(image_upload())
+
+        self.assertEqual(set(thumbnails), set(AVATAR_SIZES))
+        for size, content in thumbnails.items():
+            with Image.open(io.BytesIO(content)) as image:
+                self.assertEqual((image.format, image.size), ('WEBP', (size, size)))
+
+    def test_keeps_transparency(self):
+        buffer = io.BytesIO()
+        Image.new('RGBA', (100, 100), (0, 0, 0, 0)).save(buffer, 'PNG')
+
+        with Image.open(io.BytesIO(render_thumbnails(buffer, sizes=(64,))[64])) as image:
+            self.assertIn('A', image.getbands())
+
+
+@override_settings(AVATAR_PROCESSING_MODE='sync')
+class ProfileImageTests(TestCase):
+    """Profile images go to a temporary FileSystemStorage, removed after each test."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='avatars-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        storage = FileSystemStorage(location=media_root, base_url='/media/')
+        storage_patch = mock.patch.object(User._meta.get_field('profile_image'), 'storage', storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+        self.user = User.objects.create(email='hari@example.com', name='Hari')
+
+    def upload(self, upload):
+        self.user.profile_image = upload
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.user.refresh_from_db()
+
+    def test_upload_stores_thumbnail_urls(self):
+        self.upload(image_upload())
+
+        urls = self.user.profile_image_urls
+        self.assertEqual(set(urls), {'original', '64', '128', '256'})
+        self.assertEqual(urls['original'], self.user.profile_image.url)
+        self.assertTrue(urls['64'].startswith('/media/profile_images/thumbs/avatar'))
+        self.assertEqual(profile_image_url(self.user, size=256), urls['256'])
+
+    def test_thumbnails_render_after_commit(self):
+        self.user.profile_image = image_upload()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_image_urls, {'original': self.user.profile_image.url})
+
+        for callback in callbacks:
+            callback()
+        self.user.refresh_from_db()
+        self.assertEqual(set(self.user.profile_image_urls), {'original', '64', '128', '256'})
+
+    def test_undecodable_image_falls_back_to_original(self):
+        with self.assertLogs('authentication.avatars', 'ERROR'):
+            self.upload(SimpleUploadedFile('broken.png', b'not an image', content_type='image/png'))
+
+        self.assertEqual(set(self.user.profile_image_urls), {'original'})
+        self.assertEqual(profile_image_url(self.user, size=64), self.user.profile_image.url)
+
+    def test_user_without_stored_urls_falls_back_to_the_image(self):
+        self.upload(image_upload())
+        User.objects.filter(pk=self.user.pk).update(profile_image_urls=None)
+        self.user.refresh_from_db()
+
+        self.assertEqual(profile_image_url(self.user), self.user.profile_image.url)
+        request = RequestFactory().get('/')
+        self.assertEqual(
+            profile_image_url(self.user, request),
+            f'http://testserver{self.user.profile_image.url}',
+        )
+
+    def test_no_image(self):
+        self.assertIsNone(profile_image_url(self.user))
+        self.assertIsNone(profile_image_url(None))
+
+    def test_removing_the_image_clears_the_urls(self):
+        self.upload(image_upload())
+        self.upload(None)
+
+        self.assertIsNone(self.user.profile_image_urls)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CaseConfig(AppConfig):
     name = 'case'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,170 @@
+"""
+Streaming download proxy for case documents stored on Cloudinary.
+
+Files are relayed to the client chunk by chunk instead of being buffered in
+worker memory. Range and conditional request headers are passed through, so
+browsers can resume downloads and revalidate with ETags. Upstream requests
+share a pooled keep-alive session, and the Cloudinary delivery type that
+worked for a document is remembered on CaseDocument.delivery_type, so later
+downloads go straight to the right URL instead of probing.
+"""
+
+import threading
+
+import cloudinary
+import cloudinary.utils
+import requests
+from django.conf import settings
+from django.http import HttpResponse
+from requests.adapters import HTTPAdapter
+
+from meronaya.streaming import stream_response
+
+
+# Delivery types probed in order when the working one is not yet known
+DELIVERY_TYPES = ['upload', 'authenticated', 'private']
+
+# Last resort: the URL produced by the storage backend itself
+DIRECT_DELIVERY = 'direct'
+
+# Client request headers forwarded to Cloudinary (WSGI META key -> header name)
+FORWARDED_REQUEST_HEADERS = {
+    'HTTP_RANGE': 'Range',
+    'HTTP_IF_RANGE': 'If-Range',
+    'HTTP_IF_NONE_MATCH': 'If-None-Match',
+    'HTTP_IF_MODIFIED_SINCE': 'If-Modified-Since',
+}
+
+# Upstream response headers relayed to the client
+RELAYED_RESPONSE_HEADERS = [
+    'Content-Length',
+    'Content-Range',
+    'Content-Encoding',
+    'Accept-Ranges',
+    'ETag',
+    'Last-Modified',
+]
+
+# Upstream statuses that mean "this URL is the right one"
+TERMINAL_STATUSES = {200, 206, 304, 416}
+
+CHUNK_SIZE = 64 * 1024
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (5, 30)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared keep-alive session used for Cloudinary downloads."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.DOCUMENT_PROXY_POOL_SIZE,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _configure_cloudinary():
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_STORAGE.get('CLOUD_NAME', settings.CLOUDINARY_CLOUD_NAME),
+        api_key=settings.CLOUDINARY_STORAGE.get('API_KEY', settings.CLOUDINARY_API_KEY),
+        api_secret=settings.CLOUDINARY_STORAGE.get('API_SECRET', settings.CLOUDINARY_API_SECRET),
+        secure=True
+    )
+
+
+def _delivery_url(document, delivery_type):
+    if delivery_type == DIRECT_DELIVERY:
+        return document.file.url
+
+    # Cloudinary raw resources need explicit resource_type='raw'
+    url, _ = cloudinary.utils.cloudinary_url(
+        document.file.name,
+        resource_type="raw",
+        sign_url=True,
+        type=delivery_type
+    )
+    return url
+
+
+def _candidate_types(document):
+    """Known-good delivery type first, then the remaining ones in probe order."""
+    candidates = DELIVERY_TYPES + [DIRECT_DELIVERY]
+    if document.delivery_type in candidates:
+        candidates.remove(document.delivery_type)
+        candidates.insert(0, document.delivery_type)
+    return candidates
+
+
+def open_upstream(document, request):
+    """
+    Open a streaming upstream response for the document.
+
+    Returns (response, url). The response is the first terminal one; when no
+    delivery type works, the last failed response is returned so the caller
+    can report it. The caller owns the response and must close it.
+    """
+    _configure_cloudinary()
+    session = get_session()
+
+    headers = {
+        header: request.META[meta_key]
+        for meta_key, header in FORWARDED_REQUEST_HEADERS.items()
+        if meta_key in request.META
+    }
+
+    resp = url = None
+    for delivery_type in _candidate_types(document):
+        if resp is not None:
+            resp.close()
+
+        url = _delivery_url(document, delivery_type)
+        resp = session.get(url, headers=headers, timeout=TIMEOUT, stream=True)
+
+        if resp.status_code in TERMINAL_STATUSES:
+            if document.delivery_type != delivery_type:
+                # Remember what worked so the next download skips the probing
+                type(document).objects.filter(pk=document.pk).update(delivery_type=delivery_type)
+                document.delivery_type = delivery_type
+            break
+
+    return resp, url
+
+
+def _iter_upstream(resp):
+    try:
+        yield from resp.raw.stream(CHUNK_SIZE, decode_content=False)
+    finally:
+        resp.close()
+
+
+def build_download_response(request, resp, file_name):
+    """Relay an upstream response to the client without buffering the body."""
+    if resp.status_code in (304, 416):
+        response = HttpResponse(status=resp.status_code)
+        resp.close()
+    else:
+        response = stream_response(
+            request,
+            _iter_upstream(resp),
+            status=resp.status_code,
+            content_type=resp.headers.get('Content-Type', 'application/octet-stream'),
+        )
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+
+    for header in RELAYED_RESPONSE_HEADERS:
+        if header in resp.headers:
+            response[header] = resp.headers[header]
+
+    return response
@@ -0,0 +1,183 @@
+"""
+Public case feed for lawyers.
+
+The feed lists open cases (status public or proposals_received) newest
+first with keyset pagination. Pages of the shared part, cases with
+lawyer_selection='public', are identical for every lawyer. They are cached
+under a feed version that is bumped after any commit touching a case in
+the feed, so a change invalidates every cached page at once. Cases a lawyer
+was invited to directly are looked up per lawyer and never cached.
+
+Every entry into, exit from or change within the feed is also written to
+CaseFeedEvent (see case/signals.py). A lawyer who already holds the feed
+polls with ?since=<event id> and receives only the cases that changed and
+the ids that left.
+
+Event ids are handed out at insert, not at commit, so a transaction can
+commit event N after N+1 is already visible. Positions therefore only
+advance through gaps in the ids once the event after the gap is older than
+CASE_FEED_SETTLE_SECONDS; until then the gap is treated as an open
+transaction and the events behind it are delivered on a later poll.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from meronaya.versions import bump_version, get_version
+from meronaya.pagination import fetch_page
+from .models import Case, CaseDocument, CaseFeedEvent
+from .serializers import PublicCaseSerializer
+
+
+FEED_STATUSES = ('public', 'proposals_received')
+
+# Most events read by one ?since= poll; clients repeat while has_more is true
+FEED_CHANGES_LIMIT = 500
+
+_FEED_VERSION = 'case_feed'
+
+
+def in_feed(status):
+    return status in FEED_STATUSES
+
+
+def record_feed_event(case_id, event):
+    """Log a feed change and invalidate the cached pages once it commits."""
+    CaseFeedEvent.objects.create(case_id=case_id, event=event)
+    bump_version(_FEED_VERSION)
+
+
+def _settle_cutoff():
+    return timezone.now() - timedelta(seconds=settings.CASE_FEED_SETTLE_SECONDS)
+
+
+def _settled(position, events, cutoff):
+    """
+    Leading run of `events` (rows ordered by id, with 'id' and 'created_at')
+    that can be delivered after `position` without skipping an id that may
+    still commit.
+    """
+    settled = []
+    for event in events:
+        if event['id'] != position + 1 and event['created_at'] >= cutoff:
+            break
+        settled.append(event)
+        position = event['id']
+    return settled
+
+
+def feed_position():
+    """Position a client starts polling from after loading the feed."""
+    cutoff = _settle_cutoff()
+    recent = list(
+        CaseFeedEvent.objects.filter(created_at__gte=cutoff).order_by('id').values('id', 'created_at')
+    )
+    position = (
+        CaseFeedEvent.objects.filter(created_at__lt=cutoff).order_by('-id').values_list('id', flat=True).first()
+    )
+    if position is None:
+        if not recent:
+            return 0
+        position = recent[0]['id'] - 1
+    recent = [event for event in recent if event['id'] > position]
+    settled = _settled(position, recent, cutoff)
+    return settled[-1]['id'] if settled else position
+
+
+def _with_feed_relations(queryset):
+    documents_total = (
+        CaseDocument.objects.filter(case=OuterRef('pk'))
+        .order_by()
+        .values('case')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return queryset.select_related('client').annotate(
+        documents_total=Coalesce(Subquery(documents_total), 0),
+    )
+
+
+def _visible_to(user):
+    return Q(status__in=FEED_STATUSES) & (
+        Q(lawyer_selection='public') |
+        Q(id__in=user.cases_preferred.values('id'))
+    )
+
+
+def public_feed_page(cursor, limit):
+    """
+    One page of the shared public feed as {'results', 'next_cursor'}.
+    Raises ValueError when the cursor is malformed.
+    """
+    key = f"case_feed:{get_version(_FEED_VERSION)}:{limit}:{cursor or ''}"
+    page = cache.get(key)
+    if page is None:
+        rows, next_cursor = fetch_page(
+            _with_feed_relations(Case.objects.filter(lawyer_selection='public', status__in=FEED_STATUSES)),
+            cursor,
+            limit,
+        )
+        page = {
+            'results': PublicCaseSerializer(rows, many=True).data,
+            'next_cursor': next_cursor,
+        }
+        cache.set(key, page, settings.CASE_FEED_CACHE_TTL)
+    return page
+
+
+def invited_cases(user):
+    """Open cases the lawyer was invited to directly, outside the public feed."""
+    cases = (
+        Case.objects.filter(preferred_lawyers=user, status__in=FEED_STATUSES)
+        .exclude(lawyer_selection='public')
+        .order_by('-created_at', '-id')
+    )
+    return PublicCaseSerializer(_with_feed_relations(cases), many=True).data
+
+
+def feed_changes(user, since, limit=FEED_CHANGES_LIMIT):
+    """
+    Cases visible to the lawyer that changed after event `since`, and ids of
+    cases that left their feed. `reset` is true when the events after
+    `since` have been pruned and the client must reload the whole feed.
+    """
+    oldest = CaseFeedEvent.objects.order_by('id').values_list('id', flat=True).first()
+    if oldest is not None and since < oldest - 1:
+        return {'reset': True, 'upserted': [], 'removed': [], 'since': since, 'has_more': False}
+
+    events = list(
+        CaseFeedEvent.objects.filter(id__gt=since)
+        .order_by('id')
+        .values('id', 'case_id', 'event', 'created_at')[:limit + 1]
+    )
+    has_more = len(events) > limit
+    settled = _settled(since, events[:limit], _settle_cutoff())
+    if len(settled) < len(events[:limit]):
+        # Stopped at an open gap; the rest is read again on the next poll
+        has_more = False
+    events = settled
+
+    # Only the latest event per case matters
+    latest = {}
+    for event in events:
+        latest[event['case_id']] = event['event']
+    changed_ids = [case_id for case_id, event in latest.items() if event != CaseFeedEvent.EVENT_REMOVED]
+
+    upserted = list(
+        _with_feed_relations(Case.objects.filter(_visible_to(user), id__in=changed_ids))
+        .order_by('-created_at', '-id')
+    )
+    visible_ids = {case.id for case in upserted}
+
+    return {
+        'reset': False,
+        'upserted': PublicCaseSerializer(upserted, many=True).data,
+        'removed': sorted(case_id for case_id in latest if case_id not in visible_ids),
+        'since': events[-1]['id'] if events else since,
+        'has_more': has_more,
+    }
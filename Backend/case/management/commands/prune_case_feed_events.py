@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from case.models import CaseFeedEvent
+
+
+class Command(BaseCommand):
+    help = "Delete public case feed events older than CASE_FEED_EVENT_RETENTION_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CASE_FEED_EVENT_RETENTION_DAYS,
+                            help="Keep events newer than this many days")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        latest_id = CaseFeedEvent.objects.order_by('-id').values_list('id', flat=True).first()
+        # The newest event is always kept so stale ?since= positions are detected
+        deleted, _ = CaseFeedEvent.objects.filter(created_at__lt=cutoff).exclude(id=latest_id).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} case feed events."))
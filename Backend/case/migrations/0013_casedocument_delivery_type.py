@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case', '0012_alter_casedocument_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casedocument',
+            name='delivery_type',
+            field=models.CharField(blank=True, default='', help_text='Cloudinary delivery type that served this file last time (upload/authenticated/private/direct)', max_length=20),
+        ),
+    ]
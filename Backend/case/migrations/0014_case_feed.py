@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 02:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case', '0013_casedocument_delivery_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseFeedEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case_id', models.IntegerField(help_text='Case the event refers to')),
+                ('event', models.CharField(choices=[('added', 'Added'), ('updated', 'Updated'), ('removed', 'Removed')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Case Feed Event',
+                'verbose_name_plural': 'Case Feed Events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['lawyer_selection', 'status', '-created_at'], name='case_public_feed_idx'),
+        ),
+    ]
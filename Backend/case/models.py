@@ -177,6 +177,7 @@ class Case(models.Model):
             models.Index(fields=['lawyer', '-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['case_category']),
+            models.Index(fields=['lawyer_selection', 'status', '-created_at'], name='case_public_feed_idx'),
         ]
     
     def __str__(self):
@@ -294,6 +295,12 @@ class CaseDocument(models.Model):
     file_size = models.IntegerField(
         help_text="File size in bytes"
     )
+    delivery_type = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        help_text="Cloudinary delivery type that served this file last time (upload/authenticated/private/direct)"
+    )
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -353,3 +360,33 @@ class CaseTimeline(models.Model):
     
     def __str__(self):
         return f"{self.title} - {self.case.case_title}"
+
+
+class CaseFeedEvent(models.Model):
+    """
+    Append-only log of changes to the public case feed.
+    Written whenever a case enters, leaves or changes while in an open
+    status, so lawyers can fetch only what changed since their last poll.
+    """
+    EVENT_ADDED = 'added'
+    EVENT_UPDATED = 'updated'
+    EVENT_REMOVED = 'removed'
+
+    EVENT_CHOICES = [
+        (EVENT_ADDED, 'Added'),
+        (EVENT_UPDATED, 'Updated'),
+        (EVENT_REMOVED, 'Removed'),
+    ]
+
+    # Plain id rather than a foreign key so removals of deleted cases survive
+    case_id = models.IntegerField(help_text="Case the event refers to")
+    event = models.CharField(max_length=10, choices=EVENT_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Case Feed Event')
+        verbose_name_plural = _('Case Feed Events')
+
+    def __str__(self):
+        return f"Case {self.case_id} {self.event}"
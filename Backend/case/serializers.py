@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Case, CaseDocument, CaseTimeline, CaseAppointment
+from authentication.avatars import profile_image_url
 from authentication.models import User
+from meronaya.fieldsets import SparseFieldsetMixin
 
 
 class CaseDocumentSerializer(serializers.ModelSerializer):
@@ -19,20 +21,11 @@ class CaseDocumentSerializer(serializers.ModelSerializer):
 
     # FILE VALIDATION (size + type)
     def validate_file(self, value):
-        # max 5MB
-        max_size = 5 * 1024 * 1024
-
-        if value.size > max_size:
-            raise serializers.ValidationError("File must be under 5MB")
-
-        allowed_extensions = ['pdf', 'jpg', 'png', 'docx']
-        ext = value.name.split('.')[-1].lower()
-
-        if ext not in allowed_extensions:
-            raise serializers.ValidationError(
-                "Allowed file types: pdf, jpg, png, docx"
-            )
+        from .uploads import document_file_error
 
+        error = document_file_error(value)
+        if error:
+            raise serializers.ValidationError(error)
         return value
 
     def get_uploaded_by_name(self, obj):
@@ -96,20 +89,10 @@ class CaseAppointmentSerializer(serializers.ModelSerializer):
         return attrs
 
     def get_client_profile_image(self, obj):
-        if obj.client and obj.client.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.client.profile_image.url)
-            return obj.client.profile_image.url
-        return None
+        return profile_image_url(obj.client, self.context.get('request'))
 
     def get_lawyer_profile_image(self, obj):
-        if obj.lawyer and obj.lawyer.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.lawyer.profile_image.url)
-            return obj.lawyer.profile_image.url
-        return None
+        return profile_image_url(obj.lawyer, self.context.get('request'))
 
 
 class CaseSerializer(serializers.ModelSerializer):
@@ -171,8 +154,13 @@ class CaseSerializer(serializers.ModelSerializer):
         return instance
 
 
-class CaseListSerializer(serializers.ModelSerializer):
-    """Simplified serializer for listing cases"""
+class CaseListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Simplified serializer for listing cases.
+    Supports ?fields= / ?expand= (see meronaya.fieldsets). The list view
+    annotates documents_total and rated_by_user and prefetches the nested
+    collections, so serializing a page costs a fixed number of queries.
+    """
     client_id = serializers.IntegerField(source='client.id', read_only=True)
     lawyer_id = serializers.IntegerField(source='lawyer.id', read_only=True, allow_null=True)
     client_name = serializers.CharField(source='client.name', read_only=True)
@@ -200,12 +188,17 @@ class CaseListSerializer(serializers.ModelSerializer):
             'case_number', 'court_name', 'opposing_party', 'next_hearing_date', 'is_rated',
             'created_at', 'updated_at', 'accepted_at', 'appointments'
         ]
+        # Nested collections left out of sparse responses unless expanded
+        expandable_fields = ['documents', 'timeline', 'appointments']
 
     def get_is_rated(self, obj):
         request = self.context.get('request')
-        if not request or not request.user.is_authenticated or not obj.lawyer:
+        if not request or not request.user.is_authenticated or not obj.lawyer_id:
             return False
-        
+
+        if hasattr(obj, 'rated_by_user'):
+            return obj.rated_by_user
+
         from review.models import Review
         return Review.objects.filter(
             client=request.user,
@@ -213,23 +206,15 @@ class CaseListSerializer(serializers.ModelSerializer):
         ).exists()
     
     def get_document_count(self, obj):
+        if hasattr(obj, 'documents_total'):
+            return obj.documents_total
         return obj.documents.count()
     
     def get_client_profile_image(self, obj):
-        if obj.client and obj.client.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.client.profile_image.url)
-            return obj.client.profile_image.url
-        return None
+        return profile_image_url(obj.client, self.context.get('request'))
 
     def get_lawyer_profile_image(self, obj):
-        if obj.lawyer and obj.lawyer.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.lawyer.profile_image.url)
-            return obj.lawyer.profile_image.url
-        return None
+        return profile_image_url(obj.lawyer, self.context.get('request'))
 
 
 class PublicCaseSerializer(serializers.ModelSerializer):
@@ -247,4 +232,6 @@ class PublicCaseSerializer(serializers.ModelSerializer):
         ]
     
     def get_document_count(self, obj):
+        if hasattr(obj, 'documents_total'):
+            return obj.documents_total
         return obj.documents.count()
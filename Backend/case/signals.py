@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .feed import FEED_STATUSES, in_feed, record_feed_event
+from .models import Case, CaseDocument, CaseFeedEvent
+
+
+@receiver(post_init, sender=Case)
+def remember_feed_status(sender, instance, **kwargs):
+    """Record the loaded status so a save can tell whether the case entered or left the feed."""
+    # Read from __dict__ so deferred-field loads never trigger a query
+    instance._feed_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Case)
+def log_case_feed_change(sender, instance, created, **kwargs):
+    was_in_feed = not created and in_feed(instance._feed_status)
+    now_in_feed = in_feed(instance.status)
+
+    if now_in_feed:
+        event = CaseFeedEvent.EVENT_UPDATED if was_in_feed else CaseFeedEvent.EVENT_ADDED
+        record_feed_event(instance.pk, event)
+    elif was_in_feed:
+        record_feed_event(instance.pk, CaseFeedEvent.EVENT_REMOVED)
+
+    instance._feed_status = instance.status
+
+
+@receiver(post_delete, sender=Case)
+def log_case_feed_removal(sender, instance, **kwargs):
+    if in_feed(instance._feed_status):
+        record_feed_event(instance.pk, CaseFeedEvent.EVENT_REMOVED)
+
+
+@receiver([post_save, post_delete], sender=CaseDocument)
+def log_case_document_change(sender, instance, **kwargs):
+    """Document counts are part of the feed, so uploads and removals update it."""
+    if kwargs.get('created') is False:
+        return
+    if Case.objects.filter(pk=instance.case_id, status__in=FEED_STATUSES).exists():
+        record_feed_event(instance.case_id, CaseFeedEvent.EVENT_UPDATED)
@@ -1,3 +1,555 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from requests.structures import CaseInsensitiveDict
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from .feed import feed_changes, feed_position, public_feed_page
+from .models import Case, CaseAppointment, CaseDocument, CaseFeedEvent, CaseTimeline
+from .uploads import MAX_DOCUMENT_SIZE, document_file_error
+
+
+def upload(name, size=16):
+    return SimpleUploadedFile(name, b'x' * size)
+
+
+class DocumentFileErrorTests(SimpleTestCase):
+
+    def test_accepts_every_type_the_document_pickers_offer(self):
+        for name in ('a.pdf', 'a.doc', 'a.docx', 'a.jpg', 'a.jpeg', 'a.png', 'A.JPEG'):
+            self.assertIsNone(document_file_error(upload(name)), name)
+
+    def test_rejects_other_types(self):
+        self.assertEqual(
+            document_file_error(upload('a.exe')),
+            "Allowed file types: pdf, jpg, jpeg, png, doc, docx",
+        )
+
+    def test_rejects_files_over_the_size_limit(self):
+        self.assertEqual(document_file_error(upload('a.pdf', MAX_DOCUMENT_SIZE + 1)), "File must be under 5MB")
+
+
+class CaseTestCase(TestCase):
+    """A client, their lawyer, an outsider and an accepted case between the first two."""
+
+    def setUp(self):
+        self.client_user = User.objects.create(email='client@example.com', name='Client')
+        self.lawyer = User.objects.create(email='lawyer@example.com', name='Lawyer', is_lawyer=True)
+        self.outsider = User.objects.create(email='outsider@example.com', name='Outsider')
+        self.case = Case.objects.create(
+            client=self.client_user, lawyer=self.lawyer, case_title='Case', case_category='Civil Law',
+            case_description='-', status='accepted',
+        )
+        self.api = APIClient()
+
+
+class CaseListQueryTests(CaseTestCase):
+    """The case list costs the same number of queries for 2 cases as for 20."""
+
+    def add_cases(self, count):
+        for i in range(count):
+            case = Case.objects.create(
+                client=self.client_user, lawyer=self.lawyer, case_title=f'Case {i}', case_category='Civil Law',
+                case_description='-', status='accepted',
+            )
+            CaseDocument.objects.create(
+                case=case, uploaded_by=self.lawyer, file=f'case_documents/{i}.pdf', file_name=f'{i}.pdf',
+                file_type='pdf', file_size=16,
+            )
+            CaseTimeline.objects.create(
+                case=case, event_type='note', title='Note', description='-', created_by=self.client_user,
+            )
+            CaseAppointment.objects.create(
+                case=case, client=self.client_user, lawyer=self.lawyer, title='Meeting',
+                preferred_day='Sunday', preferred_time='10:00',
+            )
+
+    def list_cases(self, params):
+        self.api.force_authenticate(self.client_user)
+        response = self.api.get('/api/cases/', params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assert_constant_queries(self, params):
+        self.add_cases(1)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(len(self.list_cases(params).data), 2)
+
+        self.add_cases(18)
+        with self.assertNumQueries(len(few)):
+            self.assertEqual(len(self.list_cases(params).data), 20)
+        return len(few)
+
+    def test_full_representation(self):
+        full = self.assert_constant_queries({})
+        response = self.list_cases({})
+        self.assertEqual(len(response.data[0]['documents']), 1)
+        self.assertEqual(len(response.data[0]['timeline']), 1)
+        self.assertEqual(len(response.data[0]['appointments']), 1)
+        # The case list itself plus one prefetch per nested collection
+        self.assertEqual(full, 4)
+
+    def test_sparse_fields_skip_the_prefetches(self):
+        self.assertEqual(self.assert_constant_queries({'fields': 'id,status,document_count,is_rated'}), 1)
+        response = self.list_cases({'fields': 'id,status,document_count,is_rated'})
+        self.assertEqual(set(response.data[0]), {'id', 'status', 'document_count', 'is_rated'})
+        self.assertEqual(response.data[0]['document_count'], 1)
+
+    def test_expanded_collection_adds_one_prefetch(self):
+        self.assertEqual(self.assert_constant_queries({'fields': 'id', 'expand': 'documents'}), 2)
+
+
+class CaseDetailETagTests(CaseTestCase):
+    """GET /api/cases/<pk>/ answers a repeated request with 304 until something it renders changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.first = User.objects.create(email='first@example.com', name='First', is_lawyer=True)
+        self.second = User.objects.create(email='second@example.com', name='Second', is_lawyer=True)
+        self.case.preferred_lawyers.add(self.first)
+        self.api.force_authenticate(self.client_user)
+        self.etag = self.get()['ETag']
+
+    def get(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.api.get(f'/api/cases/{self.case.id}/', **headers)
+
+    def assert_changed(self):
+        response = self.get(self.etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], self.etag)
+
+    def test_repeat_request_is_not_modified(self):
+        response = self.get(self.etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_swapping_a_preferred_lawyer_changes_the_etag(self):
+        self.case.preferred_lawyers.remove(self.first)
+        self.case.preferred_lawyers.add(self.second)
+
+        self.assert_changed()
+
+    def test_case_edit_changes_the_etag(self):
+        self.case.case_title = 'Renamed'
+        self.case.save()
+
+        self.assert_changed()
+
+    def test_new_document_changes_the_etag(self):
+        CaseDocument.objects.create(
+            case=self.case, uploaded_by=self.client_user, file='case_documents/a.pdf', file_name='a.pdf',
+            file_type='pdf', file_size=16,
+        )
+
+        self.assert_changed()
+
+    def test_etag_is_per_user(self):
+        self.api.force_authenticate(self.lawyer)
+
+        self.assertEqual(self.get(self.etag).status_code, 200)
+
+
+class FakeUpstream:
+    """Stands in for a streamed requests response from Cloudinary."""
+
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.text = body.decode()
+        self.closed = False
+        self.raw = mock.Mock()
+        self.raw.stream.side_effect = lambda size, decode_content: iter([body[:2], body[2:]])
+
+    def close(self):
+        self.closed = True
+
+
+@override_settings(CLOUDINARY_STORAGE={'CLOUD_NAME': 'demo', 'API_KEY': 'key', 'API_SECRET': 'secret'})
+class DocumentDownloadTests(CaseTestCase):
+    """The download proxy against a fake Cloudinary session."""
+
+    def setUp(self):
+        super().setUp()
+        self.document = CaseDocument.objects.create(
+            case=self.case, uploaded_by=self.client_user, file='case_documents/brief.pdf', file_name='brief.pdf',
+            file_type='pdf', file_size=4,
+        )
+        # Status Cloudinary answers per delivery type; anything else is a 404
+        self.statuses = {'upload': 200}
+        self.upstream_headers = {'Content-Type': 'application/pdf', 'Content-Length': '4', 'ETag': '"v1"'}
+        self.session = mock.Mock()
+        self.session.get.side_effect = self.upstream
+        patcher = mock.patch('case.downloads.get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api.force_authenticate(self.client_user)
+
+    def upstream(self, url, headers, timeout, stream):
+        for delivery_type, status_code in self.statuses.items():
+            if f'/raw/{delivery_type}/' in url:
+                return FakeUpstream(status_code, b'%PDF', self.upstream_headers)
+        return FakeUpstream(404, b'Not found')
+
+    def download(self, **headers):
+        return self.api.get(f'/api/cases/documents/{self.document.id}/download/', **headers)
+
+    def requested_types(self):
+        return [call.args[0].split('/raw/')[1].split('/')[0] for call in self.session.get.call_args_list]
+
+    def test_streams_the_file_as_an_attachment(self):
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="brief.pdf"')
+        self.assertEqual((response['Content-Type'], response['ETag']), ('application/pdf', '"v1"'))
+
+    def test_range_request_is_passed_through(self):
+        self.statuses = {'upload': 206}
+        self.upstream_headers['Content-Range'] = 'bytes 0-3/10'
+
+        response = self.download(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"v1"')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 0-3/10')
+        self.assertEqual(self.session.get.call_args.kwargs['headers'], {'Range': 'bytes=0-3', 'If-Range': '"v1"'})
+
+    def test_not_modified_is_passed_through(self):
+        self.statuses = {'upload': 304}
+
+        response = self.download(HTTP_IF_NONE_MATCH='"v1"')
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], '"v1"')
+        self.assertEqual(self.session.get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+
+    def test_working_delivery_type_is_remembered(self):
+        self.statuses = {'authenticated': 200}
+
+        self.assertEqual(self.download().status_code, 200)
+        self.assertEqual(self.requested_types(), ['upload', 'authenticated'])
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.delivery_type, 'authenticated')
+
+        self.session.get.reset_mock()
+        self.assertEqual(self.download().status_code, 200)
+        self.assertEqual(self.requested_types(), ['authenticated'])
+
+    def test_no_working_delivery_type_is_a_bad_gateway(self):
+        self.statuses = {}
+
+        response = self.download()
+
+        self.assertEqual(response.status_code, 502)
+        # upload, authenticated, private, then the storage's own URL
+        self.assertEqual(self.session.get.call_count, 4)
+        self.assertEqual(self.session.get.call_args.args[0], self.document.file.url)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.delivery_type, '')
+
+    def test_only_case_parties_may_download(self):
+        self.api.force_authenticate(self.outsider)
+
+        self.assertEqual(self.download().status_code, 403)
+        self.session.get.assert_not_called()
+
+
+class LocalMediaTestCase(CaseTestCase):
+    """Stores media in a temporary MEDIA_ROOT, removed after each test."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp(prefix='case-media-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = self.settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+
+class CaseUploadDocumentsTests(LocalMediaTestCase):
+
+    def post_documents(self, user, *files):
+        self.api.force_authenticate(user)
+        return self.api.post(
+            f'/api/cases/{self.case.id}/upload_documents/', {'documents': list(files)}, format='multipart',
+        )
+
+    def test_stores_accepted_files_and_reports_rejected_ones(self):
+        response = self.post_documents(
+            self.client_user, upload('brief.doc'), upload('photo.jpeg'), upload('tool.exe'),
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([d['file_name'] for d in response.data['documents']], ['brief.doc', 'photo.jpeg'])
+        self.assertEqual(
+            [(r['file_name'], r['uploaded']) for r in response.data['results']],
+            [('brief.doc', True), ('photo.jpeg', True), ('tool.exe', False)],
+        )
+        for document in CaseDocument.objects.filter(case=self.case):
+            self.assertTrue(document.file.storage.exists(document.file.name))
+        self.assertEqual(CaseTimeline.objects.filter(case=self.case, event_type='document_uploaded').count(), 2)
+
+    def test_nothing_stored_is_a_bad_request(self):
+        response = self.post_documents(self.lawyer, upload('tool.exe'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CaseDocument.objects.exists())
+
+    def test_only_the_case_parties_may_upload(self):
+        response = self.post_documents(self.outsider, upload('brief.pdf'))
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(CaseDocument.objects.exists())
+
+
+class DirectUploadTests(LocalMediaTestCase):
+    """Sign, upload to the local storage stand-in, then confirm."""
+
+    def sign(self, user, file_name='brief.pdf', file_size=16):
+        self.api.force_authenticate(user)
+        return self.api.post(
+            f'/api/cases/{self.case.id}/upload_documents/sign/',
+            {'file_name': file_name, 'file_size': file_size}, format='json',
+        )
+
+    def upload(self, signed, file):
+        # The storage endpoint takes no credentials, only the signed fields
+        self.api.force_authenticate(None)
+        return self.api.post(signed['upload_url'], {**signed['fields'], 'file': file}, format='multipart')
+
+    def confirm(self, user, *tickets):
+        self.api.force_authenticate(user)
+        return self.api.post(
+            f'/api/cases/{self.case.id}/upload_documents/confirm/', {'tickets': list(tickets)}, format='json',
+        )
+
+    def test_signed_upload_is_recorded_on_confirm(self):
+        signed = self.sign(self.client_user).data
+        self.assertEqual(signed['fields']['allowed_formats'], 'doc,docx,jpeg,jpg,pdf,png')
+        self.assertEqual(self.upload(signed, upload('brief.pdf')).status_code, 200)
+
+        response = self.confirm(self.client_user, signed['ticket'])
+
+        self.assertEqual(response.status_code, 201)
+        document = CaseDocument.objects.get(case=self.case)
+        self.assertEqual((document.file_name, document.file_size), ('brief.pdf', 16))
+        self.assertEqual(document.file.name, signed['fields']['public_id'])
+
+        again = self.confirm(self.client_user, signed['ticket'])
+        self.assertEqual(again.status_code, 400)
+        self.assertEqual(again.data['results'][0]['error'], "Upload was already confirmed.")
+
+    def test_declared_type_and_size_are_checked_on_sign(self):
+        self.assertEqual(self.sign(self.client_user, 'tool.exe').status_code, 400)
+        self.assertEqual(self.sign(self.client_user, file_size=MAX_DOCUMENT_SIZE + 1).status_code, 400)
+
+    def test_storage_refuses_other_formats(self):
+        signed = self.sign(self.client_user).data
+
+        response = self.upload(signed, upload('tool.exe'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.confirm(self.client_user, signed['ticket']).status_code, 400)
+
+    def test_allowed_formats_are_covered_by_the_signature(self):
+        signed = self.sign(self.client_user).data
+        signed['fields']['allowed_formats'] += ',exe'
+
+        self.assertEqual(self.upload(signed, upload('tool.exe')).status_code, 401)
+
+    def test_oversized_upload_is_deleted_on_confirm(self):
+        signed = self.sign(self.client_user).data
+        self.upload(signed, upload('brief.pdf', MAX_DOCUMENT_SIZE + 1))
+
+        response = self.confirm(self.client_user, signed['ticket'])
+
+        self.assertEqual(response.data['results'][0]['error'], "File must be under 5MB")
+        storage = CaseDocument._meta.get_field('file').storage
+        self.assertFalse(storage.exists(signed['fields']['public_id']))
+
+    def test_ticket_is_bound_to_the_user_and_case(self):
+        signed = self.sign(self.client_user).data
+        self.upload(signed, upload('brief.pdf'))
+
+        response = self.confirm(self.lawyer, signed['ticket'])
+
+        self.assertEqual(response.data['results'][0]['error'], "Upload ticket was issued for something else.")
+        self.assertFalse(CaseDocument.objects.exists())
+
+    def test_confirm_before_upload(self):
+        signed = self.sign(self.client_user).data
+
+        response = self.confirm(self.client_user, signed['ticket'])
+
+        self.assertEqual(response.data['results'][0]['error'], "File has not been uploaded.")
+
+
+class PublicFeedTests(CaseTestCase):
+    """Feed events written by the case signals, ?since= polling and cached feed pages."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.api.force_authenticate(self.lawyer)
+
+    def open_case(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Case.objects.create(**{
+                'client': self.client_user, 'case_title': 'Open', 'case_category': 'Civil Law',
+                'case_description': '-', **fields,
+            })
+
+    def save(self, case):
+        with self.captureOnCommitCallbacks(execute=True):
+            case.save()
+
+    def poll(self, since):
+        response = self.api.get('/api/cases/public_cases/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_signals_log_added_updated_and_removed(self):
+        case = self.open_case()
+        case.case_title = 'Edited'
+        self.save(case)
+        case.status = 'accepted'
+        self.save(case)
+        self.save(case)
+
+        self.assertEqual(
+            list(CaseFeedEvent.objects.filter(case_id=case.id).values_list('event', flat=True)),
+            [CaseFeedEvent.EVENT_ADDED, CaseFeedEvent.EVENT_UPDATED, CaseFeedEvent.EVENT_REMOVED],
+        )
+
+    def test_document_upload_and_case_delete_are_logged(self):
+        case = self.open_case()
+        CaseDocument.objects.create(
+            case=case, uploaded_by=self.client_user, file='case_documents/a.pdf', file_name='a.pdf',
+            file_type='pdf', file_size=16,
+        )
+        case_id = case.id
+        case.delete()
+
+        # The cascade deletes the document first, which logs one more update
+        self.assertEqual(
+            list(CaseFeedEvent.objects.filter(case_id=case_id).values_list('event', flat=True)),
+            [CaseFeedEvent.EVENT_ADDED] + [CaseFeedEvent.EVENT_UPDATED] * 2 + [CaseFeedEvent.EVENT_REMOVED],
+        )
+
+    def test_poll_returns_added_updated_and_removed_cases(self):
+        leaving = self.open_case(case_title='Leaving')
+        since = self.api.get('/api/cases/public_cases/').data['since']
+
+        added = self.open_case(case_title='Added')
+        leaving.case_title = 'Still open'
+        self.save(leaving)
+        data = self.poll(since)
+        self.assertFalse(data['reset'])
+        self.assertEqual({item['id'] for item in data['upserted']}, {added.id, leaving.id})
+        self.assertEqual(data['removed'], [])
+
+        leaving.status = 'cancelled'
+        self.save(leaving)
+        data = self.poll(data['since'])
+        self.assertEqual(data['upserted'], [])
+        self.assertEqual(data['removed'], [leaving.id])
+
+        self.assertEqual(self.poll(data['since'])['upserted'], [])
+
+    def test_cases_for_other_lawyers_leave_the_poll(self):
+        since = feed_position()
+        other = User.objects.create(email='other@example.com', name='Other', is_lawyer=True)
+        case = self.open_case(lawyer_selection='specific')
+        case.preferred_lawyers.add(other)
+
+        data = self.poll(since)
+        self.assertEqual(data['upserted'], [])
+        self.assertEqual(data['removed'], [case.id])
+
+    def test_poll_waits_on_an_id_that_may_still_commit(self):
+        case = self.open_case()
+        since = feed_position()
+        # Event since + 2 committed while since + 1 is still in an open transaction
+        CaseFeedEvent.objects.create(id=since + 2, case_id=case.id, event=CaseFeedEvent.EVENT_UPDATED)
+
+        self.assertEqual(feed_position(), since)
+        data = self.poll(since)
+        self.assertEqual((data['upserted'], data['since'], data['has_more']), ([], since, False))
+
+        CaseFeedEvent.objects.create(id=since + 1, case_id=case.id, event=CaseFeedEvent.EVENT_UPDATED)
+        data = self.poll(since)
+        self.assertEqual([item['id'] for item in data['upserted']], [case.id])
+        self.assertEqual(data['since'], since + 2)
+        self.assertEqual(feed_position(), since + 2)
+
+    def test_gap_older_than_the_settle_window_is_skipped(self):
+        case = self.open_case()
+        since = feed_position()
+        CaseFeedEvent.objects.create(id=since + 2, case_id=case.id, event=CaseFeedEvent.EVENT_UPDATED)
+        CaseFeedEvent.objects.filter(id=since + 2).update(
+            created_at=timezone.now() - timedelta(seconds=settings.CASE_FEED_SETTLE_SECONDS + 1),
+        )
+
+        self.assertEqual(feed_changes(self.lawyer, since)['since'], since + 2)
+        self.assertEqual(feed_position(), since + 2)
+
+    def test_poll_after_pruned_events_resets(self):
+        self.open_case()
+        since = feed_position()
+        self.open_case()
+        self.open_case()
+        CaseFeedEvent.objects.update(created_at=timezone.now() - timedelta(days=30))
+
+        call_command('prune_case_feed_events', days=7, stdout=StringIO())
+
+        self.assertEqual(list(CaseFeedEvent.objects.values_list('id', flat=True)), [since + 2])
+        self.assertTrue(self.poll(since)['reset'])
+        self.assertFalse(self.poll(since + 1)['reset'])
+
+    def test_prune_keeps_recent_events(self):
+        self.open_case()
+        self.open_case()
+        CaseFeedEvent.objects.filter(id=feed_position() - 1).update(created_at=timezone.now() - timedelta(days=30))
+
+        call_command('prune_case_feed_events', days=7, stdout=StringIO())
+
+        self.assertEqual(CaseFeedEvent.objects.count(), 1)
+
+    def test_feed_change_invalidates_cached_pages(self):
+        first = self.open_case(case_title='First')
+        self.assertEqual([item['id'] for item in public_feed_page(None, 50)['results']], [first.id])
+
+        # A write that bypasses the signals leaves the cached page in place
+        Case.objects.filter(id=first.id).update(case_title='Quiet')
+        self.assertEqual(public_feed_page(None, 50)['results'][0]['case_title'], 'First')
+
+        second = self.open_case(case_title='Second')
+        self.assertEqual(
+            [item['id'] for item in public_feed_page(None, 50)['results']], [second.id, first.id],
+        )
+        self.assertEqual(public_feed_page(None, 50)['results'][1]['case_title'], 'Quiet')
+
+    def test_first_page_lists_invited_cases(self):
+        invited = self.open_case(lawyer_selection='specific')
+        invited.preferred_lawyers.add(self.lawyer)
+        public = self.open_case()
+
+        data = self.api.get('/api/cases/public_cases/').data
+        self.assertEqual([item['id'] for item in data['invited']], [invited.id])
+        self.assertEqual([item['id'] for item in data['results']], [public.id])
+        self.assertEqual(data['since'], feed_position())
@@ -0,0 +1,176 @@
+"""
+Concurrent upload stage for case documents.
+
+`store_documents` validates every file and sends the valid ones to storage
+in parallel. It uses a process-wide pool of CASE_UPLOAD_WORKERS threads, so
+concurrent requests share the same bound. It then records the stored files
+with one bulk_create for CaseDocument and one for CaseTimeline. It returns
+one result per file, in request order:
+
+    {'file_name': ..., 'uploaded': True, 'document': <CaseDocument>}
+    {'file_name': ..., 'uploaded': False, 'error': '...'}
+
+Files go to whatever storage CaseDocument.file uses. MEDIA_STORAGE=local
+swaps in the filesystem for tests.
+
+Files the browser uploaded straight to storage skip the pool:
+`confirm_documents` checks their tickets and reuses the same bulk insert.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from meronaya.direct_uploads import UploadTarget, confirm_upload
+from .feed import in_feed, record_feed_event
+from .models import CaseDocument, CaseFeedEvent, CaseTimeline
+
+
+logger = logging.getLogger(__name__)
+
+# Max 5MB
+MAX_DOCUMENT_SIZE = 5 * 1024 * 1024
+# Matches the accept list of the document pickers in the frontend
+ALLOWED_DOCUMENT_EXTENSIONS = ['pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx']
+
+CASE_DOCUMENT_UPLOAD = UploadTarget(
+    name='case_document',
+    model=CaseDocument,
+    field_name='file',
+    extensions=frozenset(ALLOWED_DOCUMENT_EXTENSIONS),
+    max_size=MAX_DOCUMENT_SIZE,
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CASE_UPLOAD_WORKERS,
+                    thread_name_prefix='case-upload',
+                )
+    return _executor
+
+
+def file_extension(name):
+    return name.split('.')[-1].lower()
+
+
+def document_file_error(file):
+    """Why the file cannot be a case document, or None when it is acceptable."""
+    if file.size > MAX_DOCUMENT_SIZE:
+        return "File must be under 5MB"
+    if file_extension(file.name) not in ALLOWED_DOCUMENT_EXTENSIONS:
+        return f"Allowed file types: {', '.join(ALLOWED_DOCUMENT_EXTENSIONS)}"
+    return None
+
+
+def _store(file):
+    """Save one file to the document storage; returns the stored name."""
+    field = CaseDocument._meta.get_field('file')
+    name = field.generate_filename(None, file.name)
+    return field.storage.save(name, file, max_length=field.max_length)
+
+
+def _new_document(case, user, name, file_name, size):
+    return CaseDocument(
+        case=case,
+        uploaded_by=user,
+        file=name,
+        file_name=file_name,
+        file_type=file_extension(file_name),
+        file_size=size,
+    )
+
+
+def record_documents(case, user, documents, uploader_label):
+    """
+    Insert stored documents and their timeline events with one bulk_create
+    each. The stored files are deleted again if the rows cannot be written.
+    """
+    events = [
+        CaseTimeline(
+            case=case,
+            event_type='document_uploaded',
+            title='Document Uploaded',
+            description=f'{uploader_label} uploaded: {document.file_name}',
+            created_by=user,
+        )
+        for document in documents
+    ]
+    try:
+        with transaction.atomic():
+            CaseDocument.objects.bulk_create(documents)
+            CaseTimeline.objects.bulk_create(events)
+            # bulk_create sends no post_save; document counts are part of the feed
+            if in_feed(case.status):
+                record_feed_event(case.id, CaseFeedEvent.EVENT_UPDATED)
+    except Exception:
+        # Leave no orphaned files behind when the rows could not be written
+        for document in documents:
+            document.file.storage.delete(document.file.name)
+        raise
+
+
+def store_documents(case, user, files, uploader_label):
+    """
+    Upload `files` to `case` on behalf of `user`. `uploader_label` starts
+    each timeline description, e.g. "Client (Sita)".
+    """
+    results = [{'file_name': file.name} for file in files]
+
+    pending = []
+    for result, file in zip(results, files):
+        error = document_file_error(file)
+        if error:
+            result.update(uploaded=False, error=error)
+        else:
+            pending.append((result, file, _pool().submit(_store, file)))
+
+    documents = []
+    for result, file, future in pending:
+        try:
+            stored_name = future.result()
+        except Exception:
+            logger.exception("Failed to store document %r for case %s", file.name, case.id)
+            result.update(uploaded=False, error="Upload to storage failed")
+            continue
+
+        document = _new_document(case, user, stored_name, file.name, file.size)
+        result.update(uploaded=True, document=document)
+        documents.append(document)
+
+    if documents:
+        record_documents(case, user, documents, uploader_label)
+    return results
+
+
+def confirm_documents(request, case, tickets, uploader_label):
+    """
+    Record documents the client uploaded directly to storage (see
+    meronaya/direct_uploads.py), one result per ticket like store_documents.
+    """
+    results, documents = [], []
+    for ticket in tickets:
+        try:
+            upload = confirm_upload(request, CASE_DOCUMENT_UPLOAD, ticket, scope=f'case:{case.id}')
+        except ValidationError as e:
+            results.append({'file_name': None, 'uploaded': False, 'error': str(e.detail['ticket'])})
+            continue
+
+        document = _new_document(case, request.user, upload['name'], upload['file_name'], upload['size'])
+        results.append({'file_name': upload['file_name'], 'uploaded': True, 'document': document})
+        documents.append(document)
+
+    if documents:
+        record_documents(case, request.user, documents, uploader_label)
+    return results
@@ -5,6 +5,8 @@ from .views import (
     CaseDetailView,
     PublicCasesView,
     CaseUploadDocumentsView,
+    CaseDocumentUploadSignView,
+    CaseDocumentUploadConfirmView,
     CaseActionView,
     CaseDocumentDownloadView,
     # Case Appointment views
@@ -25,5 +27,7 @@ urlpatterns = [
     path('public_cases/', PublicCasesView.as_view(), name='case-public-cases'),
     path('<int:pk>/', CaseDetailView.as_view(), name='case-detail'),
     path('<int:pk>/upload_documents/', CaseUploadDocumentsView.as_view(), name='case-upload-documents'),
+    path('<int:pk>/upload_documents/sign/', CaseDocumentUploadSignView.as_view(), name='case-upload-documents-sign'),
+    path('<int:pk>/upload_documents/confirm/', CaseDocumentUploadConfirmView.as_view(), name='case-upload-documents-confirm'),
     path('<int:pk>/<str:action>/', CaseActionView.as_view(), name='case-actions'),
 ]
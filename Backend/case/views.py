@@ -5,16 +5,25 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_time
 from authentication.models import User
-from notification.utils import send_notification, notify_admins
+from meronaya.conditional import ConditionalGetMixin
+from meronaya.direct_uploads import declared_file, issue_upload
+from meronaya.fieldsets import selected_fields
+from meronaya.versions import PROFILES, get_version
+from meronaya.pagination import parse_page_size
+from review.models import Review
+from notification.utils import send_notification, send_bulk_notification, notify_admins
 
 from .models import Case, CaseDocument, CaseTimeline, CaseAppointment
+from .downloads import TERMINAL_STATUSES, build_download_response, open_upstream
+from .feed import feed_changes, feed_position, invited_cases, public_feed_page
+from .uploads import CASE_DOCUMENT_UPLOAD, confirm_documents, document_file_error, store_documents
 from .serializers import (
     CaseSerializer,
     CaseListSerializer,
-    PublicCaseSerializer,
     CaseDocumentSerializer,
     CaseAppointmentSerializer,
 )
@@ -70,8 +79,46 @@ class CaseListCreateView(generics.ListCreateAPIView):
         if urgency_filter:
             queryset = queryset.filter(urgency_level=urgency_filter)
 
+        if self.request.method == 'GET':
+            queryset = self._with_list_relations(queryset)
+
         return queryset
 
+    def _with_list_relations(self, queryset):
+        """Annotate and prefetch everything CaseListSerializer reads for the selected fields."""
+        selected = selected_fields(self.request, CaseListSerializer)
+
+        def wanted(name):
+            return selected is None or name in selected
+
+        if wanted('document_count'):
+            documents_total = (
+                CaseDocument.objects.filter(case=models.OuterRef('pk'))
+                .order_by()
+                .values('case')
+                .annotate(total=models.Count('id'))
+                .values('total')
+            )
+            queryset = queryset.annotate(
+                documents_total=Coalesce(models.Subquery(documents_total), 0),
+            )
+        if wanted('is_rated'):
+            queryset = queryset.annotate(
+                rated_by_user=models.Exists(
+                    Review.objects.filter(client=self.request.user, case=models.OuterRef('pk'))
+                ),
+            )
+
+        prefetches = [
+            prefetch for name, prefetch in (
+                ('documents', models.Prefetch('documents', queryset=CaseDocument.objects.select_related('uploaded_by'))),
+                ('timeline', models.Prefetch('timeline', queryset=CaseTimeline.objects.select_related('created_by'))),
+                ('appointments', models.Prefetch('appointments', queryset=CaseAppointment.objects.select_related('client', 'lawyer'))),
+            )
+            if wanted(name)
+        ]
+        return queryset.prefetch_related(*prefetches)
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return CaseListSerializer
@@ -102,6 +149,15 @@ class CaseListCreateView(generics.ListCreateAPIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+        files = request.FILES.getlist('documents')
+        for file in files:
+            error = document_file_error(file)
+            if error:
+                return Response(
+                    {'error': f'{file.name}: {error}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         case = serializer.save()
@@ -119,48 +175,26 @@ class CaseListCreateView(generics.ListCreateAPIView):
             created_by=request.user
         )
 
-        # Handle file uploads
-        files = request.FILES.getlist('documents')
-        for file in files:
-            document_data = {
-                "file": file,
-                "file_name": file.name,
-                "file_type": file.name.split('.')[-1].lower(),
-                "file_size": file.size,
-                "uploaded_by": request.user.id
-            }
-            doc_serializer = CaseDocumentSerializer(data=document_data)
-            doc_serializer.is_valid(raise_exception=True)
-            doc_serializer.save(case=case)
-
-            CaseTimeline.objects.create(
-                case=case,
-                event_type='document_uploaded',
-                title='Document Uploaded',
-                description=f'Client ({request.user.name}) uploaded: {file.name}',
-                created_by=request.user
-            )
+        # Upload the documents concurrently; storage failures are reported per file
+        results = store_documents(case, request.user, files, f'Client ({request.user.name})') if files else None
 
         # Notify preferred lawyers about the new case
         if preferred_ids:
-            for lawyer in valid_lawyers:
-                send_notification(
-                    user=lawyer,
-                    title='New Case Available',
-                    message=f'{request.user.name} posted a new case: "{case.case_title}"',
-                    notif_type='case',
-                    link='/lawyercaserequest'
-                )
+            send_bulk_notification(
+                valid_lawyers,
+                title='New Case Available',
+                message=f'{request.user.name} posted a new case: "{case.case_title}"',
+                notif_type='case',
+                link='/lawyercaserequest'
+            )
         else:
-            all_lawyers = User.objects.filter(role='Lawyer')
-            for lawyer in all_lawyers:
-                send_notification(
-                    user=lawyer,
-                    title='New Public Case Available',
-                    message=f'{request.user.name} posted a new public case: "{case.case_title}"',
-                    notif_type='case',
-                    link='/lawyerfindcases'
-                )
+            send_bulk_notification(
+                User.objects.filter(role='Lawyer'),
+                title='New Public Case Available',
+                message=f'{request.user.name} posted a new public case: "{case.case_title}"',
+                notif_type='case',
+                link='/lawyerfindcases'
+            )
 
         notify_admins(
             title='New Case Created',
@@ -170,13 +204,37 @@ class CaseListCreateView(generics.ListCreateAPIView):
             exclude_user_ids=[request.user.id],
         )
 
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        data = serializer.data
+        if results is not None:
+            data['document_results'] = _upload_results_data(results)
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
-class CaseDetailView(generics.RetrieveUpdateDestroyAPIView):
+def _upload_results_data(results):
+    """Per-file upload results with each stored document serialized."""
+    return [
+        {**result, 'document': CaseDocumentSerializer(result['document']).data}
+        if result['uploaded'] else result
+        for result in results
+    ]
+
+
+def _related_stats(model, field):
+    """COUNT(*) and MAX(field) of the case's rows in `model`, as two subqueries."""
+    rows = model.objects.filter(case=models.OuterRef('pk')).order_by().values('case')
+    return (
+        models.Subquery(rows.annotate(n=models.Count('id')).values('n')),
+        models.Subquery(rows.annotate(latest=models.Max(field)).values('latest')),
+    )
+
+
+class CaseDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a specific case.
     GET/PUT/PATCH/DELETE /api/cases/<pk>/
+
+    GET answers If-None-Match with 304 when nothing the serializer renders
+    has changed (see get_etag_parts).
     """
     permission_classes = [IsAuthenticated]
     serializer_class = CaseSerializer
@@ -202,11 +260,53 @@ class CaseDetailView(generics.RetrieveUpdateDestroyAPIView):
             ).select_related('client', 'lawyer').distinct()
         return Case.objects.none()
 
+    def get_etag_parts(self, request, *args, **kwargs):
+        documents, documents_at = _related_stats(CaseDocument, 'uploaded_at')
+        timeline, timeline_at = _related_stats(CaseTimeline, 'created_at')
+        appointments, appointments_at = _related_stats(CaseAppointment, 'updated_at')
+        preferred = (
+            Case.preferred_lawyers.through.objects.filter(case_id=models.OuterRef('pk'))
+            .order_by().values('case_id')
+        )
+        row = (
+            self.get_queryset()
+            .filter(pk=kwargs['pk'])
+            .annotate(
+                documents_n=documents, documents_at=documents_at,
+                timeline_n=timeline, timeline_at=timeline_at,
+                appointments_n=appointments, appointments_at=appointments_at,
+                # Every lawyer added gets a new, higher link id, and the id sum
+                # catches a removal and an addition that reuse the same link id
+                preferred_n=models.Subquery(preferred.annotate(n=models.Count('id')).values('n')),
+                preferred_last=models.Subquery(preferred.annotate(last=models.Max('id')).values('last')),
+                preferred_ids=models.Subquery(preferred.annotate(ids=models.Sum('user_id')).values('ids')),
+                rated=models.Exists(Review.objects.filter(client=request.user, case=models.OuterRef('pk'))),
+            )
+            .values_list(
+                'updated_at', 'documents_n', 'documents_at', 'timeline_n', 'timeline_at',
+                'appointments_n', 'appointments_at', 'preferred_n', 'preferred_last', 'preferred_ids', 'rated',
+            )
+            .first()
+        )
+        if row is None:
+            # Let the normal path produce the 404
+            return None
+        # Names of the client, lawyer and timeline authors are rendered too
+        return [*row, get_version(PROFILES)]
+
 
 class PublicCasesView(APIView):
     """
-    Get all public cases available for lawyers.
-    GET /api/cases/public_cases/
+    Get public cases available for lawyers, newest first.
+    GET /api/cases/public_cases/?cursor=<token>&limit=50
+    GET /api/cases/public_cases/?since=<event id>
+
+    Without `since`, returns one page of the shared public feed plus, on the
+    first page, the open cases the lawyer was invited to directly. `since`
+    in the response is the feed position to poll from afterwards.
+
+    With `since`, returns only the cases that changed after that position
+    (`upserted`) and the ids of cases that left the feed (`removed`).
     """
     permission_classes = [IsAuthenticated]
 
@@ -217,60 +317,68 @@ class PublicCasesView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        cases = Case.objects.filter(
-            models.Q(status__in=['public', 'proposals_received'], lawyer_selection='public') |
-            models.Q(status__in=['public', 'proposals_received'], preferred_lawyers=request.user)
-        ).select_related('client').distinct().order_by('-created_at')
+        since = request.query_params.get('since')
+        if since is not None:
+            if not since.isdigit():
+                return Response(
+                    {'error': 'since must be a feed position returned by this endpoint'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response(feed_changes(request.user, int(since)))
+
+        cursor = request.query_params.get('cursor')
+        # Read before the page so no change can fall between the two
+        position = feed_position()
+        try:
+            page = public_feed_page(cursor, parse_page_size(request.query_params.get('limit')))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        serializer = PublicCaseSerializer(cases, many=True)
-        return Response(serializer.data)
+        return Response({
+            'invited': [] if cursor else invited_cases(request.user),
+            'results': page['results'],
+            'next_cursor': page['next_cursor'],
+            'since': position,
+        })
 
 
 class CaseUploadDocumentsView(APIView):
     """
     Upload additional documents to a case.
     POST/PATCH /api/cases/<pk>/upload_documents/
+
+    Files are sent to storage concurrently (see case/uploads.py). Returns the
+    stored documents plus one result per file, so partial failures are visible.
     """
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
-    def _handle_upload(self, request, pk):
+    def _get_case(self, request, pk):
+        """The case, or an error Response when the user may not upload to it."""
         case = get_object_or_404(Case, pk=pk)
 
         if case.client != request.user and case.lawyer != request.user:
-            return Response(
+            return None, Response(
                 {'error': 'You can only upload documents to your own cases or cases assigned to you'},
                 status=status.HTTP_403_FORBIDDEN
             )
+        return case, None
 
-        files = request.FILES.getlist('documents')
-        if not files:
+    def _uploader_label(self, request, case):
+        uploader_role = "Client" if case.client == request.user else "Lawyer"
+        return f'{uploader_role} ({request.user.name})'
+
+    def _respond(self, request, case, results):
+        documents = [result['document'] for result in results if result['uploaded']]
+        if not documents:
             return Response(
-                {'error': 'No files provided'},
+                {'error': 'No documents were uploaded', 'results': _upload_results_data(results)},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        documents = []
-        for file in files:
-            doc = CaseDocument.objects.create(
-                case=case,
-                uploaded_by=request.user,
-                file=file,
-                file_name=file.name,
-                file_type=file.name.split('.')[-1].lower(),
-                file_size=file.size
-            )
-            documents.append(doc)
-
-            uploader_role = "Client" if case.client == request.user else "Lawyer"
-            CaseTimeline.objects.create(
-                case=case,
-                event_type='document_uploaded',
-                title=f'Document Uploaded',
-                description=f'{uploader_role} ({request.user.name}) uploaded: {file.name}',
-                created_by=request.user
-            )
-
         # Notify the other party
         notify_user = case.lawyer if case.client == request.user else case.client
         if notify_user:
@@ -283,12 +391,75 @@ class CaseUploadDocumentsView(APIView):
             )
 
         serializer = CaseDocumentSerializer(documents, many=True)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            {'documents': serializer.data, 'results': _upload_results_data(results)},
+            status=status.HTTP_201_CREATED
+        )
+
+    def _handle_upload(self, request, pk):
+        case, error = self._get_case(request, pk)
+        if error:
+            return error
+
+        files = request.FILES.getlist('documents')
+        if not files:
+            return Response(
+                {'error': 'No files provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = store_documents(case, request.user, files, self._uploader_label(request, case))
+        return self._respond(request, case, results)
+
     def post(self, request, pk):
         return self._handle_upload(request, pk)
 
 
+class CaseDocumentUploadSignView(CaseUploadDocumentsView):
+    """
+    Issue a direct-to-storage upload for one case document.
+    POST /api/cases/<pk>/upload_documents/sign/
+    Body: {file_name, file_size}
+
+    The browser POSTs the file with `fields` to `upload_url`, then confirms
+    the returned `ticket` (see meronaya/direct_uploads.py).
+    """
+    parser_classes = [JSONParser]
+
+    def post(self, request, pk):
+        case, error = self._get_case(request, pk)
+        if error:
+            return error
+
+        file_name, file_size = declared_file(request.data)
+        upload = issue_upload(request, CASE_DOCUMENT_UPLOAD, file_name, file_size, scope=f'case:{case.id}')
+        return Response(upload, status=status.HTTP_200_OK)
+
+
+class CaseDocumentUploadConfirmView(CaseUploadDocumentsView):
+    """
+    Record case documents uploaded directly to storage.
+    POST /api/cases/<pk>/upload_documents/confirm/
+    Body: {tickets: [...]}
+
+    Responds like upload_documents: the documents plus one result per ticket.
+    """
+    parser_classes = [JSONParser]
+
+    def post(self, request, pk):
+        case, error = self._get_case(request, pk)
+        if error:
+            return error
+
+        tickets = request.data.get('tickets')
+        if not isinstance(tickets, list) or not tickets:
+            return Response(
+                {'error': 'tickets must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
+        results = confirm_documents(request, case, tickets, self._uploader_label(request, case))
+        return self._respond(request, case, results)
 
 
 class CaseActionView(APIView):
@@ -647,26 +818,13 @@ class CaseDocumentDownloadView(APIView):
     Proxy endpoint to download a case document.
     GET /api/cases/documents/<pk>/download/
     
-    Fetches the file from Cloudinary server-side and returns it with
+    Streams the file from Cloudinary server-side and returns it with
     Content-Disposition: attachment header so the browser downloads it.
+    Range / If-None-Match headers are passed through to Cloudinary.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        import requests as http_requests
-        from django.http import HttpResponse
-        import cloudinary
-        import cloudinary.utils
-        from django.conf import settings
-
-        # Ensure Cloudinary is configured for the SDK
-        cloudinary.config(
-            cloud_name=settings.CLOUDINARY_STORAGE.get('CLOUD_NAME', settings.CLOUDINARY_CLOUD_NAME),
-            api_key=settings.CLOUDINARY_STORAGE.get('API_KEY', settings.CLOUDINARY_API_KEY),
-            api_secret=settings.CLOUDINARY_STORAGE.get('API_SECRET', settings.CLOUDINARY_API_SECRET),
-            secure=True
-        )
-
         try:
             doc = CaseDocument.objects.select_related('case').get(pk=pk)
         except CaseDocument.DoesNotExist:
@@ -677,68 +835,28 @@ class CaseDocumentDownloadView(APIView):
 
         # Only case participants can download
         case = doc.case
-        if case.client != request.user and case.lawyer != request.user and not request.user.is_superuser:
+        if case.client_id != request.user.id and case.lawyer_id != request.user.id and not request.user.is_superuser:
             return Response(
                 {'error': 'You do not have permission to download this document'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
         try:
-            public_id = doc.file.name
-            # Try to fetch using signed URL
-            # Cloudinary raw resources often need explicit resource_type='raw'
-            file_url, options = cloudinary.utils.cloudinary_url(
-                public_id,
-                resource_type="raw",
-                sign_url=True,
-                type="upload"
-            )
+            resp, file_url = open_upstream(doc, request)
 
-            # Debug print (will appear in console)
-            print(f"DEBUG: Fetching from Cloudinary: {file_url}")
-
-            resp = http_requests.get(file_url, timeout=30, stream=True)
-            
-            # If still fails, try 'authenticated' and 'private' types
-            if resp.status_code != 200:
-                for try_type in ["authenticated", "private"]:
-                    file_url, _ = cloudinary.utils.cloudinary_url(
-                        public_id,
-                        resource_type="raw",
-                        sign_url=True,
-                        type=try_type
-                    )
-                    resp = http_requests.get(file_url, timeout=30, stream=True)
-                    if resp.status_code == 200:
-                        break
-
-            # Absolute fallback: try the direct URL stored in the model
-            if resp.status_code != 200:
-                 resp = http_requests.get(doc.file.url, timeout=30, stream=True)
-
-            if resp.status_code != 200:
+            if resp.status_code not in TERMINAL_STATUSES:
                 error_body = resp.text[:100]
+                resp.close()
                 return Response(
                     {'error': f'Cloudinary returned status {resp.status_code}: {error_body}. URL tried: {file_url}'},
                     status=status.HTTP_502_BAD_GATEWAY
                 )
 
             file_name = doc.file_name or f'document_{pk}'
-            content_type = resp.headers.get('Content-Type', 'application/octet-stream')
-            
-            # Forcing content into a response
-            response = HttpResponse(resp.content, content_type=content_type)
-            response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-            return response
+            return build_download_response(request, resp, file_name)
 
         except Exception as e:
             return Response(
                 {'error': f'Download failed: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-
-        except Exception as e:
-            return Response(
-                {'error': f'Download failed: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
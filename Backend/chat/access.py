@@ -0,0 +1,34 @@
+"""
+Cached chat authorization for user pairs.
+
+Two users may chat once they share at least one non-pending case. The answer
+is cached per pair for a short TTL and dropped whenever a case between them
+is saved or deleted (see chat.signals), so WebSocket reconnects skip the
+Case existence query.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .history import get_shared_cases
+
+
+def _access_cache_key(user_a_id, user_b_id):
+    return f"ws_auth:chat_pair:{min(user_a_id, user_b_id)}:{max(user_a_id, user_b_id)}"
+
+
+def can_chat(user, other_user):
+    """Return True if the two users share at least one non-pending case."""
+    key = _access_cache_key(user.id, other_user.id)
+    allowed = cache.get(key)
+    if allowed is None:
+        allowed = get_shared_cases(user, other_user).exists()
+        cache.set(key, allowed, settings.WS_AUTH_CACHE_TTL)
+    return allowed
+
+
+def invalidate_chat_access(user_a_id, user_b_id):
+    """Drop the cached authorization for a user pair."""
+    if user_a_id is None or user_b_id is None:
+        return
+    cache.delete(_access_cache_key(user_a_id, user_b_id))
@@ -1,13 +1,26 @@
+import asyncio
 import json
-import jwt
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from case.models import Case
 from .models import Message, Conversation
 from .serializers import MessageSerializer
-from .presence import mark_user_online, mark_user_offline, broadcast_presence_update
+from authentication.middleware import get_cached_user
+from .access import can_chat
+from meronaya.pagination import parse_page_size
+from .history import fetch_page, get_pair_messages
+from .summary import record_message
+from .presence import (
+    mark_user_online,
+    mark_user_offline,
+    refresh_user_presence,
+    broadcast_presence_update,
+)
 from notification.utils import send_notification
 
 
@@ -17,18 +30,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
     Group name: chat_user_<min_id>_<max_id>
 
     Features:
-    - Authenticate user via JWT token from query params
+    - User is authenticated by JWTAuthMiddleware (JWT token in query params)
     - Verify users share at least one accepted case
-    - Send conversation history on connection
+    - Send the latest page of history on connection (or, with ?after=<cursor>,
+      only the messages missed since that cursor)
+    - Page backward through history with the `load_before` action
     - Broadcast new messages in real-time
+    - Track presence in the shared store, refreshed by a periodic heartbeat
     """
 
     async def connect(self):
         """Handle WebSocket connection"""
-        self.user = await self.get_user_from_token()
+        self.user = self.scope.get('user')
         self.other_user_id = self.scope['url_route']['kwargs']['user_id']
 
-        if self.user is None:
+        if self.user is None or not self.user.is_authenticated:
             await self.close()
             return
 
@@ -51,18 +67,26 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # Accept the connection
         await self.accept()
 
-        # Mark user as online
+        # Mark user as online and keep the presence entry alive while connected
         await self._mark_user_online()
+        self.heartbeat_task = asyncio.ensure_future(self._presence_heartbeat())
 
-        # Send conversation history
-        messages = await self.get_conversation_history()
+        # Send the latest page of history, or a catch-up page after a reconnect
+        query_params = parse_qs(self.scope.get('query_string', b'').decode())
+        page = await self.get_conversation_history(
+            after=query_params.get('after', [None])[0],
+            limit=query_params.get('limit', [None])[0],
+        )
         await self.send(text_data=json.dumps({
             'type': 'initial_messages',
-            'messages': messages
+            **page
         }))
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
+        if hasattr(self, 'heartbeat_task'):
+            self.heartbeat_task.cancel()
+
         if hasattr(self, 'group_name'):
             if hasattr(self, 'user') and self.user:
                 await self._mark_user_offline()
@@ -79,6 +103,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
         except json.JSONDecodeError:
             return
 
+        if data.get('action') == 'load_before':
+            page = await self.get_conversation_history(
+                before=data.get('before'),
+                limit=data.get('limit'),
+            )
+            await self.send(text_data=json.dumps({
+                'type': 'older_messages',
+                **page
+            }))
+            return
+
         message_content = data.get('message', '').strip()
 
         if not message_content:
@@ -112,6 +147,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'message': event['message']
         }))
 
+    async def chat_message_update(self, event):
+        """Handle a processed voice message (see chat/media.py)."""
+        await self.send(text_data=json.dumps({
+            'type': 'message_updated',
+            'message': event['message']
+        }))
+
     async def presence_update(self, event):
         """Handle presence update broadcast from group."""
         await self.send(text_data=json.dumps({
@@ -119,43 +161,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'online_users': event['online_users']
         }))
 
-    # ── Database helper methods ──────────────────────────────────────────────────
-
-    @database_sync_to_async
-    def get_user_from_token(self):
-        """Decode JWT token from query parameters."""
-        try:
-            query_string = self.scope['query_string'].decode()
-            token = None
-
-            if 'token=' in query_string:
-                token = query_string.split('token=')[1].split('&')[0]
-
-            if not token:
-                return None
+    async def _presence_heartbeat(self):
+        """Periodically refresh this connection's presence TTL."""
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_SECONDS)
+            await self._refresh_user_presence()
 
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            from authentication.models import User
-            user = User.objects.get(id=payload['user_id'])
-            return user
-        except Exception as e:
-            print(f"Token decode error: {e}")
-            return None
+    # ── Database helper methods ──────────────────────────────────────────────────
 
     @database_sync_to_async
     def get_other_user_and_validate(self):
         """Validate that users share at least one non-pending case."""
         try:
-            from authentication.models import User
-            other_user = User.objects.get(id=self.other_user_id)
-
-            # Check for at least one non-pending case between them
-            cases_exist = Case.objects.filter(
-                Q(client=self.user, lawyer=other_user) |
-                Q(lawyer=self.user, client=other_user)
-            ).exclude(status='pending').exists()
+            other_user = get_cached_user(self.other_user_id)
+            if other_user is None or other_user.id == self.user.id:
+                return None
 
-            if not cases_exist:
+            if not can_chat(self.user, other_user):
                 print(f"No active cases between user {self.user.id} and user {self.other_user_id}")
                 return None
 
@@ -165,25 +187,22 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return None
 
     @database_sync_to_async
-    def get_conversation_history(self):
-        """Get all messages between the two users across all shared cases."""
+    def get_conversation_history(self, before=None, after=None, limit=None):
+        """Get one cursor-paginated page of messages between the two users."""
         try:
-            cases = Case.objects.filter(
-                Q(client=self.user, lawyer=self.other_user) |
-                Q(lawyer=self.user, client=self.other_user)
-            ).exclude(status='pending')
-
-            conversations = Conversation.objects.filter(case__in=cases)
-
-            all_messages = Message.objects.filter(
-                conversation__in=conversations
-            ).order_by('timestamp')
-
-            serializer = MessageSerializer(all_messages, many=True)
-            return serializer.data
+            page = fetch_page(
+                get_pair_messages(self.user, self.other_user),
+                before=before,
+                after=after,
+                limit=parse_page_size(limit),
+            )
+            page['messages'] = MessageSerializer(page['messages'], many=True).data
+            return page
+        except ValueError:
+            return {'messages': [], 'error': 'Invalid cursor'}
         except Exception as e:
             print(f"Error fetching conversation history: {e}")
-            return []
+            return {'messages': []}
 
     @database_sync_to_async
     def save_message(self, content):
@@ -198,13 +217,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
             if not case:
                 return None
 
-            conversation, _ = Conversation.objects.get_or_create(case=case)
+            with transaction.atomic():
+                conversation, _ = Conversation.objects.get_or_create(case=case)
 
-            message = Message.objects.create(
-                conversation=conversation,
-                sender=self.user,
-                content=content
-            )
+                message = Message.objects.create(
+                    conversation=conversation,
+                    sender=self.user,
+                    content=content
+                )
+                record_message(message, self.other_user)
 
             # Send notification
             recipient = self.other_user
@@ -244,6 +265,19 @@ class ChatConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             print(f"Error marking user online: {e}")
 
+    @database_sync_to_async
+    def _refresh_user_presence(self):
+        """Extend the presence TTL for this connection"""
+        try:
+            refresh_user_presence(
+                self.user.id,
+                self.user.name or self.user.email,
+                self.group_name,
+                self.channel_name
+            )
+        except Exception as e:
+            print(f"Error refreshing user presence: {e}")
+
     @database_sync_to_async
     def _mark_user_offline(self):
         """Mark user as offline"""
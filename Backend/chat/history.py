@@ -0,0 +1,76 @@
+"""
+Cursor (keyset) pagination for chat history.
+
+Messages between a user pair are ordered by (timestamp, id). A cursor is an
+opaque token encoding one message's position (see meronaya/pagination.py),
+so clients can page backward with `before` or catch up after a disconnect
+with `after` without the server ever counting or offsetting through the
+whole thread.
+"""
+
+from django.db.models import Q
+
+from case.models import Case
+from meronaya.pagination import DEFAULT_PAGE_SIZE, beyond_cursor, encode_cursor
+from .models import Message
+
+
+def get_shared_cases(user, other_user):
+    """Return the non-pending cases shared between two users."""
+    return Case.objects.filter(
+        Q(client=user, lawyer=other_user) |
+        Q(lawyer=user, client=other_user)
+    ).exclude(status='pending')
+
+
+def get_pair_messages(user, other_user, cases=None):
+    """Return all messages between two users across their shared cases."""
+    if cases is None:
+        cases = get_shared_cases(user, other_user)
+
+    return Message.objects.filter(
+        conversation__case__in=cases
+    ).select_related('sender')
+
+
+def fetch_page(queryset, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of messages using keyset pagination on (timestamp, id).
+
+    - No cursor     : the latest `limit` messages
+    - before=cursor : up to `limit` messages older than the cursor
+    - after=cursor  : up to `limit` messages newer than the cursor
+
+    Messages in the returned page are always in ascending (timestamp, id)
+    order. Returns a dict with the message list and the cursors needed to
+    request the neighbouring pages.
+
+    Raises ValueError when a cursor is malformed.
+    """
+    if after:
+        page = list(
+            queryset.filter(beyond_cursor(after, Message, 'timestamp', newer=True))
+            .order_by('timestamp', 'id')[:limit + 1]
+        )
+        has_more = len(page) > limit
+        page = page[:limit]
+        # Everything up to the cursor precedes the page
+        has_more_before = queryset.exclude(beyond_cursor(after, Message, 'timestamp', newer=True)).exists()
+        has_more_after = has_more
+    else:
+        if before:
+            queryset = queryset.filter(beyond_cursor(before, Message, 'timestamp'))
+        page = list(queryset.order_by('-timestamp', '-id')[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        page.reverse()
+        has_more_before = has_more
+        has_more_after = bool(before)
+
+    return {
+        'messages': page,
+        'has_more_before': has_more_before,
+        'has_more_after': has_more_after,
+        'before_cursor': encode_cursor(page[0], 'timestamp') if page else before,
+        'after_cursor': encode_cursor(page[-1], 'timestamp') if page else after,
+    }
@@ -0,0 +1,58 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the chat presence store: simulate N concurrent "
+        "connections connecting and then disconnecting, with a group lookup "
+        "per event exactly like broadcast_presence_update does."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=50000,
+                            help="Number of simultaneous connections to simulate")
+        parser.add_argument('--tabs', type=int, default=2,
+                            help="Connections (browser tabs) per user")
+        parser.add_argument('--store', default='chat.presence.InMemoryPresenceStore',
+                            help="Dotted path of the presence store class to benchmark")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        store = import_string(options['store'])()
+        store.clear()
+        rng = random.Random(options['seed'])
+
+        # Each user chats with one partner; a pair shares a single group
+        connections = []
+        user_count = max(2, options['connections'] // options['tabs'])
+        for index in range(options['connections']):
+            user_id = index % user_count
+            partner_id = user_id ^ 1
+            group_name = f"chat_user_{min(user_id, partner_id)}_{max(user_id, partner_id)}"
+            connections.append((user_id, f"user-{user_id}", group_name, f"channel-{index}"))
+        rng.shuffle(connections)
+
+        started = time.perf_counter()
+        for user_id, username, group_name, channel_name in connections:
+            store.add(user_id, username, group_name, channel_name)
+            store.online_users(group_name)
+        connect_seconds = time.perf_counter() - started
+
+        rng.shuffle(connections)
+
+        started = time.perf_counter()
+        for user_id, _, group_name, channel_name in connections:
+            store.remove(user_id, channel_name)
+            store.online_users(group_name)
+        disconnect_seconds = time.perf_counter() - started
+
+        total = len(connections)
+        for label, seconds in (('connect', connect_seconds), ('disconnect', disconnect_seconds)):
+            self.stdout.write(
+                f"{label:<10} {total} events in {seconds:.3f}s "
+                f"({total / seconds:,.0f} events/s, {seconds / total * 1e6:.1f} µs/event)"
+            )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from chat.media import process_voice_message, unprocessed_voice_messages
+
+
+class Command(BaseCommand):
+    help = (
+        "Transcode voice messages whose background job never ran (e.g. lost "
+        "on restart) and store their duration and waveform previews."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--include-failed', action='store_true',
+                            help="Also retry messages whose processing failed")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Process at most this many messages")
+
+    def handle(self, *args, **options):
+        ids = unprocessed_voice_messages(options['include_failed']).order_by('id').values_list('id', flat=True)
+        if options['limit']:
+            ids = ids[:options['limit']]
+
+        processed = failed = 0
+        for message_id in list(ids):
+            if process_voice_message(message_id):
+                processed += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} voice messages, {failed} failed."))
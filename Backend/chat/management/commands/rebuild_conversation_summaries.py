@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from chat.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ConversationSummary inbox table from existing messages."
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} conversation summaries."))
@@ -0,0 +1,214 @@
+"""
+Background processing of voice messages.
+
+Browsers upload voice notes as recorded, usually webm, and clients had to
+download the whole file to show its length and waveform. Once a voice
+message commits, `schedule_voice_processing` hands it to a process-wide
+pool of VOICE_WORKERS threads. Each job:
+
+1. transcodes the audio to mono Opus in an Ogg container at
+   VOICE_OPUS_BITRATE with ffmpeg (FFMPEG_BINARY),
+2. decodes the result to 8 kHz PCM and measures the duration and a waveform
+   of at most VOICE_WAVEFORM_BARS peak levels (0-100),
+3. points Message.audio at the Opus file, stores the previews on the
+   message and pushes the updated message to the chat group.
+
+Until then the message plays from the original upload with audio_status
+'pending'. A failed job marks it 'failed' and keeps the original. The
+original file is kept either way, since clients may still hold its URL.
+The `process_voice_messages` command picks up messages whose job never ran,
+e.g. after a restart dropped the queue.
+
+settings.VOICE_PROCESSING_MODE selects the behaviour:
+- 'async' : run jobs in the worker pool after the transaction commits
+- 'sync'  : run them inline after commit (tests, single-process dev)
+"""
+
+import logging
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ConversationSummary, Message
+from .serializers import MessageSerializer
+
+
+logger = logging.getLogger(__name__)
+
+# Sample rate the waveform and duration are measured at
+_SAMPLE_RATE = 8000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.VOICE_WORKERS,
+                    thread_name_prefix='voice-media',
+                )
+    return _executor
+
+
+def _ffmpeg(*args):
+    """Run ffmpeg and return its stdout; raises on failure or timeout."""
+    return subprocess.run(
+        [settings.FFMPEG_BINARY, '-nostdin', '-hide_banner', '-v', 'error', *args],
+        capture_output=True,
+        check=True,
+        timeout=settings.VOICE_PROCESSING_TIMEOUT,
+    ).stdout
+
+
+def transcode(source_path, target_path):
+    """Write the audio of source_path to target_path as mono Ogg Opus."""
+    _ffmpeg(
+        '-y', '-i', source_path,
+        '-vn', '-ac', '1',
+        '-c:a', 'libopus', '-b:a', settings.VOICE_OPUS_BITRATE, '-application', 'voip',
+        '-f', 'ogg', target_path,
+    )
+
+
+def decode_samples(path):
+    """Mono 16-bit samples of the audio at _SAMPLE_RATE."""
+    samples = array('h')
+    samples.frombytes(_ffmpeg('-i', path, '-ac', '1', '-ar', str(_SAMPLE_RATE), '-f', 's16le', '-'))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples
+
+
+def waveform(samples, bars):
+    """Peak level of each of at most `bars` equal slices, scaled to 0-100."""
+    if not samples:
+        return []
+    size = math.ceil(len(samples) / bars)
+    peaks = [
+        max(max(chunk), -min(chunk))
+        for chunk in (samples[start:start + size] for start in range(0, len(samples), size))
+    ]
+    loudest = max(peaks) or 1
+    return [round(100 * peak / loudest) for peak in peaks]
+
+
+def _pending_filter():
+    return Q(message_type='voice') & ~Q(audio='') & Q(audio__isnull=False)
+
+
+def unprocessed_voice_messages(include_failed=False):
+    """Voice messages whose processing never finished (or failed, if asked)."""
+    statuses = Q(audio_status=Message.AUDIO_PENDING) | Q(audio_status__isnull=True)
+    if include_failed:
+        statuses |= Q(audio_status=Message.AUDIO_FAILED)
+    return Message.objects.filter(_pending_filter(), statuses)
+
+
+def _broadcast(message):
+    """Push the processed message to the pair's chat group; best effort."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    case = message.conversation.case
+    low, high = sorted((case.client_id, case.lawyer_id))
+    try:
+        async_to_sync(channel_layer.group_send)(
+            f'chat_user_{low}_{high}',
+            {
+                'type': 'chat_message_update',
+                'message': MessageSerializer(message).data,
+            }
+        )
+    except Exception:
+        logger.exception("Failed to push processed voice message %s", message.id)
+
+
+def process_voice_message(message_id):
+    """
+    Transcode one voice message and store its previews.
+    Returns True when the message was updated, False otherwise.
+    """
+    message = (
+        Message.objects.filter(_pending_filter(), id=message_id)
+        .exclude(audio_status=Message.AUDIO_READY)
+        .first()
+    )
+    if message is None:
+        return False
+
+    original = message.audio.name
+    storage = message.audio.storage
+    field = message.audio.field
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='voice-') as workdir:
+            source = os.path.join(workdir, 'source')
+            target = os.path.join(workdir, 'voice.ogg')
+            with message.audio.open('rb') as audio, open(source, 'wb') as out:
+                shutil.copyfileobj(audio, out)
+
+            transcode(source, target)
+            samples = decode_samples(target)
+
+            stem = os.path.splitext(os.path.basename(original))[0]
+            with open(target, 'rb') as opus:
+                name = storage.save(
+                    field.generate_filename(message, f'{stem}.ogg'), File(opus), max_length=field.max_length,
+                )
+    except Exception:
+        logger.exception("Failed to process voice message %s", message_id)
+        Message.objects.filter(id=message_id).update(audio_status=Message.AUDIO_FAILED)
+        return False
+
+    # Only if the message still holds the file that was transcoded
+    updated = Message.objects.filter(id=message_id, audio=original).update(
+        audio=name,
+        audio_status=Message.AUDIO_READY,
+        audio_duration=round(len(samples) / _SAMPLE_RATE, 2),
+        audio_waveform=waveform(samples, settings.VOICE_WAVEFORM_BARS),
+    )
+    if not updated:
+        storage.delete(name)
+        return False
+    # The inbox shows the last message's audio; move its validator on
+    ConversationSummary.objects.filter(last_message_id=message_id).update(updated_at=timezone.now())
+
+    _broadcast(Message.objects.select_related('sender', 'conversation__case').get(id=message_id))
+    return True
+
+
+def _run_job(message_id):
+    try:
+        close_old_connections()
+        process_voice_message(message_id)
+    except Exception:
+        # A failed job must never kill the worker.
+        logger.exception("Voice processing job for message %s crashed", message_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_voice_processing(message_id):
+    """Process the voice message once the surrounding transaction commits."""
+    if settings.VOICE_PROCESSING_MODE == 'sync':
+        transaction.on_commit(lambda: process_voice_message(message_id))
+    else:
+        transaction.on_commit(lambda: _pool().submit(_run_job, message_id))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 23:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_message_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_type', models.CharField(choices=[('text', 'Text Message'), ('voice', 'Voice Message')], default='text', help_text='Type of the most recent message', max_length=10)),
+                ('last_message_preview', models.CharField(blank=True, default='', help_text='Truncated content of the most recent message', max_length=255)),
+                ('last_message_at', models.DateTimeField(blank=True, help_text='Timestamp of the most recent message', null=True)),
+                ('unread_for_low', models.PositiveIntegerField(default=0, help_text='Messages from user_high not yet read by user_low')),
+                ('unread_for_high', models.PositiveIntegerField(default=0, help_text='Messages from user_low not yet read by user_high')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_message', models.ForeignKey(blank=True, help_text='Most recent message exchanged between the pair', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message')),
+                ('last_message_sender', models.ForeignKey(blank=True, help_text='Sender of the most recent message', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_high', models.ForeignKey(help_text='Participant with the larger user id', on_delete=django.db.models.deletion.CASCADE, related_name='conversation_summaries_high', to=settings.AUTH_USER_MODEL)),
+                ('user_low', models.ForeignKey(help_text='Participant with the smaller user id', on_delete=django.db.models.deletion.CASCADE, related_name='conversation_summaries_low', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-last_message_at'],
+                'indexes': [models.Index(fields=['user_low', '-last_message_at'], name='chat_conver_user_lo_3145e9_idx'), models.Index(fields=['user_high', '-last_message_at'], name='chat_conver_user_hi_880d56_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user_low', 'user_high'), name='unique_conversation_summary_pair')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_conversationsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='audio_duration',
+            field=models.FloatField(blank=True, help_text='Voice message length in seconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='audio_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], help_text='Transcoding state of the voice message audio (see chat/media.py)', max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='audio_waveform',
+            field=models.JSONField(blank=True, help_text='Downsampled peak levels (0-100) for the voice message preview', null=True),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+PREVIEW_LENGTH = 255
+
+
+def backfill_conversation_summaries(apps, schema_editor):
+    """Build inbox rows for conversations that existed before the summary table."""
+    Conversation = apps.get_model('chat', 'Conversation')
+    ConversationSummary = apps.get_model('chat', 'ConversationSummary')
+    Message = apps.get_model('chat', 'Message')
+    if not Message.objects.exists():
+        return
+
+    pairs = {}
+    conversations = Conversation.objects.exclude(
+        case__status='pending'
+    ).exclude(case__lawyer__isnull=True).values_list('id', 'case__client_id', 'case__lawyer_id')
+    for conversation_id, client_id, lawyer_id in conversations:
+        key = (min(client_id, lawyer_id), max(client_id, lawyer_id))
+        pairs.setdefault(key, []).append(conversation_id)
+
+    summaries = []
+    for (user_low_id, user_high_id), conversation_ids in pairs.items():
+        pair_messages = Message.objects.filter(conversation_id__in=conversation_ids)
+        last_message = pair_messages.order_by('-timestamp', '-id').first()
+        if last_message is None:
+            continue
+
+        preview = '' if last_message.message_type == 'voice' else (last_message.content or '')
+        if len(preview) > PREVIEW_LENGTH:
+            preview = preview[:PREVIEW_LENGTH - 3] + '...'
+        unread = pair_messages.filter(is_read=False).aggregate(
+            for_low=Count('id', filter=Q(sender_id=user_high_id)),
+            for_high=Count('id', filter=Q(sender_id=user_low_id)),
+        )
+        summaries.append(ConversationSummary(
+            user_low_id=user_low_id,
+            user_high_id=user_high_id,
+            unread_for_low=unread['for_low'],
+            unread_for_high=unread['for_high'],
+            last_message_id=last_message.id,
+            last_message_sender_id=last_message.sender_id,
+            last_message_type=last_message.message_type,
+            last_message_preview=preview,
+            last_message_at=last_message.timestamp,
+        ))
+
+    ConversationSummary.objects.all().delete()
+    ConversationSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_message_audio_preview'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_conversation_summaries, migrations.RunPython.noop),
+    ]
@@ -36,6 +36,15 @@ class Message(models.Model):
         ('text', 'Text Message'),
         ('voice', 'Voice Message'),
     ]
+
+    AUDIO_PENDING = 'pending'
+    AUDIO_READY = 'ready'
+    AUDIO_FAILED = 'failed'
+    AUDIO_STATUS_CHOICES = [
+        (AUDIO_PENDING, 'Pending'),
+        (AUDIO_READY, 'Ready'),
+        (AUDIO_FAILED, 'Failed'),
+    ]
     
     conversation = models.ForeignKey(
         Conversation, 
@@ -66,6 +75,23 @@ class Message(models.Model):
         null=True,
         help_text="Audio file for voice messages"
     )
+    audio_status = models.CharField(
+        max_length=10,
+        choices=AUDIO_STATUS_CHOICES,
+        blank=True,
+        null=True,
+        help_text="Transcoding state of the voice message audio (see chat/media.py)"
+    )
+    audio_duration = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="Voice message length in seconds"
+    )
+    audio_waveform = models.JSONField(
+        blank=True,
+        null=True,
+        help_text="Downsampled peak levels (0-100) for the voice message preview"
+    )
     timestamp = models.DateTimeField(
         auto_now_add=True
     )
@@ -76,6 +102,92 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Keyset pagination of history walks (timestamp, id) per conversation
+            models.Index(fields=['conversation', 'timestamp', 'id']),
+        ]
     
     def __str__(self):
         return f"Message by {self.sender} in Case #{self.conversation.case.id}"
+
+
+class ConversationSummary(models.Model):
+    """
+    Denormalized inbox row for one user pair.
+    Kept in sync whenever a message is sent or messages are marked as read,
+    so the conversation list is served from a single indexed query.
+
+    The pair is stored ordered: user_low always has the smaller id.
+    """
+    user_low = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='conversation_summaries_low',
+        help_text="Participant with the smaller user id"
+    )
+    user_high = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='conversation_summaries_high',
+        help_text="Participant with the larger user id"
+    )
+    last_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        help_text="Most recent message exchanged between the pair"
+    )
+    last_message_sender = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        help_text="Sender of the most recent message"
+    )
+    last_message_type = models.CharField(
+        max_length=10,
+        choices=Message.MESSAGE_TYPE_CHOICES,
+        default='text',
+        help_text="Type of the most recent message"
+    )
+    last_message_preview = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="Truncated content of the most recent message"
+    )
+    last_message_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Timestamp of the most recent message"
+    )
+    unread_for_low = models.PositiveIntegerField(
+        default=0,
+        help_text="Messages from user_high not yet read by user_low"
+    )
+    unread_for_high = models.PositiveIntegerField(
+        default=0,
+        help_text="Messages from user_low not yet read by user_high"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-last_message_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='unique_conversation_summary_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['user_low', '-last_message_at']),
+            models.Index(fields=['user_high', '-last_message_at']),
+        ]
+
+    def __str__(self):
+        return f"Conversation summary for users #{self.user_low_id} and #{self.user_high_id}"
+
+    @staticmethod
+    def pair_key(user_a_id, user_b_id):
+        """Return the (user_low_id, user_high_id) ordering for a pair."""
+        return min(user_a_id, user_b_id), max(user_a_id, user_b_id)
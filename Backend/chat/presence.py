@@ -1,63 +1,249 @@
 """
 User presence tracking for chat.
 Tracks which users are currently online/offline per user-pair group.
+
+Presence lives in a pluggable store selected by settings.PRESENCE_STORE:
+- RedisPresenceStore     : shared across every Daphne worker (production)
+- InMemoryPresenceStore  : single-process stand-in for development and tests
+
+Each connection (browser tab) is registered with a TTL and kept alive by
+periodic heartbeats from its consumer. If a worker dies without running
+disconnect(), its connections simply expire instead of staying online forever.
 """
 
+import threading
+import time
+from collections import OrderedDict
+
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class InMemoryPresenceStore:
+    """
+    Process-local presence store with the same TTL semantics as the Redis store.
+    Only correct when running a single worker; used for development and tests.
+
+    Every operation is O(1) (lookups are O(users in the group), which is at
+    most two for a user-pair chat): reverse indexes map each group to its
+    users' connection counts, and connections are kept in expiry order so
+    stale entries are purged from the front without scanning.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or settings.PRESENCE_TTL_SECONDS
+        self._lock = threading.Lock()
+        # { channel_name: (user_id, group_name, expires_at) }, oldest expiry first
+        self.connections = OrderedDict()
+        # { group_name: { user_id: open connection count } }
+        self.group_users = {}
+        # { user_id: open connection count }
+        self.user_connections = {}
+        # { user_id: username }
+        self.usernames = {}
+
+    def _unlink(self, channel_name):
+        user_id, group_name, _ = self.connections.pop(channel_name)
+
+        group = self.group_users[group_name]
+        group[user_id] -= 1
+        if not group[user_id]:
+            del group[user_id]
+            if not group:
+                del self.group_users[group_name]
+
+        self.user_connections[user_id] -= 1
+        if not self.user_connections[user_id]:
+            del self.user_connections[user_id]
+            del self.usernames[user_id]
+
+    def _purge_expired(self, now):
+        while self.connections:
+            channel_name, (_, _, expires_at) = next(iter(self.connections.items()))
+            if expires_at > now:
+                break
+            self._unlink(channel_name)
+
+    def add(self, user_id, username, group_name, channel_name):
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+
+            if channel_name in self.connections:
+                # Heartbeat for a known connection: re-link at the back
+                self._unlink(channel_name)
+
+            self.connections[channel_name] = (user_id, group_name, now + self.ttl)
+            group = self.group_users.setdefault(group_name, {})
+            group[user_id] = group.get(user_id, 0) + 1
+            self.user_connections[user_id] = self.user_connections.get(user_id, 0) + 1
+            self.usernames[user_id] = username
+
+    def remove(self, user_id, channel_name):
+        with self._lock:
+            if channel_name in self.connections:
+                self._unlink(channel_name)
+
+    def is_online(self, user_id):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return user_id in self.user_connections
+
+    def online_users(self, group_name):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return {
+                user_id: self.usernames[user_id]
+                for user_id in self.group_users.get(group_name, {})
+            }
+
+    def clear(self):
+        with self._lock:
+            self.connections.clear()
+            self.group_users.clear()
+            self.user_connections.clear()
+            self.usernames.clear()
+
+
+class RedisPresenceStore:
+    """
+    Presence store shared by all workers through Redis.
+
+    Keys (all expire with the connection TTL):
+    - presence:conn:<channel>  hash of user_id / username / group
+    - presence:group:<group>   sorted set of channels scored by expiry time
+    - presence:user:<user_id>  sorted set of channels scored by expiry time
+    """
+
+    key_prefix = 'presence'
+
+    def __init__(self, url=None, ttl=None):
+        import redis
+
+        self.ttl = ttl or settings.PRESENCE_TTL_SECONDS
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL, decode_responses=True)
+
+    def _conn_key(self, channel_name):
+        return f"{self.key_prefix}:conn:{channel_name}"
 
-# In-memory store of online users
-# Structure: {
-#   user_id: {
-#     'username': str,
-#     'channels': { channel_name: group_name }
-#   }
-# }
-ONLINE_USERS = {}
+    def _group_key(self, group_name):
+        return f"{self.key_prefix}:group:{group_name}"
+
+    def _user_key(self, user_id):
+        return f"{self.key_prefix}:user:{user_id}"
+
+    def add(self, user_id, username, group_name, channel_name):
+        expires_at = time.time() + self.ttl
+        conn_key = self._conn_key(channel_name)
+        group_key = self._group_key(group_name)
+        user_key = self._user_key(user_id)
+
+        pipe = self.client.pipeline()
+        pipe.hset(conn_key, mapping={
+            'user_id': user_id,
+            'username': username,
+            'group': group_name,
+        })
+        pipe.expire(conn_key, self.ttl)
+        pipe.zadd(group_key, {channel_name: expires_at})
+        pipe.expire(group_key, self.ttl)
+        pipe.zadd(user_key, {channel_name: expires_at})
+        pipe.expire(user_key, self.ttl)
+        pipe.execute()
+
+    def remove(self, user_id, channel_name):
+        conn_key = self._conn_key(channel_name)
+        group_name = self.client.hget(conn_key, 'group')
+
+        pipe = self.client.pipeline()
+        pipe.delete(conn_key)
+        pipe.zrem(self._user_key(user_id), channel_name)
+        if group_name:
+            pipe.zrem(self._group_key(group_name), channel_name)
+        pipe.execute()
+
+    def is_online(self, user_id):
+        user_key = self._user_key(user_id)
+
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(user_key, '-inf', time.time())
+        pipe.zcard(user_key)
+        _, count = pipe.execute()
+        return count > 0
+
+    def online_users(self, group_name):
+        group_key = self._group_key(group_name)
+
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(group_key, '-inf', time.time())
+        pipe.zrange(group_key, 0, -1)
+        _, channel_names = pipe.execute()
+
+        if not channel_names:
+            return {}
+
+        pipe = self.client.pipeline()
+        for channel_name in channel_names:
+            pipe.hmget(self._conn_key(channel_name), 'user_id', 'username')
+
+        users = {}
+        for user_id, username in pipe.execute():
+            if user_id is not None:
+                users[int(user_id)] = username
+        return users
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.key_prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_presence_store():
+    """Return the configured presence store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.PRESENCE_STORE)()
+    return _store
 
 
 def mark_user_online(user_id, username, group_name, channel_name):
     """Mark a user as online in a specific group with a specific channel"""
-    if user_id not in ONLINE_USERS:
-        ONLINE_USERS[user_id] = {
-            'username': username,
-            'channels': {}
-        }
-    
-    # Track which group this specific connection (tab) is in
-    ONLINE_USERS[user_id]['channels'][channel_name] = group_name
+    get_presence_store().add(user_id, username, group_name, channel_name)
+
+
+def refresh_user_presence(user_id, username, group_name, channel_name):
+    """Heartbeat: extend the TTL of a connection that is still open"""
+    get_presence_store().add(user_id, username, group_name, channel_name)
 
 
 def mark_user_offline(user_id, channel_name):
     """Mark a specific connection as offline. Truly offline if no channels left."""
-    if user_id in ONLINE_USERS:
-        # Remove the specific channel connection
-        if channel_name in ONLINE_USERS[user_id]['channels']:
-            del ONLINE_USERS[user_id]['channels'][channel_name]
-        
-        # If no more active connections, remove the user from online store
-        if not ONLINE_USERS[user_id]['channels']:
-            del ONLINE_USERS[user_id]
+    get_presence_store().remove(user_id, channel_name)
 
 
 def is_user_online(user_id):
     """Check if a user is online (has at least one active connection)"""
-    return user_id in ONLINE_USERS
+    return get_presence_store().is_online(user_id)
 
 
 def get_online_users_for_group(group_name):
     """Get list of online users who are currently looking at a specific group"""
-    online_users = []
-    for user_id, info in ONLINE_USERS.items():
-        # Check if the user has any connection in this specific group
-        is_in_group = any(g == group_name for g in info['channels'].values())
-        if is_in_group:
-            online_users.append({
-                'user_id': user_id,
-                'username': info['username'],
-                'is_online': True
-            })
-    return online_users
+    return [
+        {
+            'user_id': user_id,
+            'username': username,
+            'is_online': True
+        }
+        for user_id, username in get_presence_store().online_users(group_name).items()
+    ]
 
 
 def broadcast_presence_update(group_name):
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.conf import settings
 from .models import Message, Conversation
+from authentication.avatars import profile_image_url
 from authentication.models import User
 
 
@@ -14,13 +15,8 @@ class UserMinimalSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'name', 'email', 'role', 'profile_image']
 
     def get_profile_image(self, obj):
-        """Get full URL for profile image"""
-        if obj.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.profile_image.url)
-            return obj.profile_image.url
-        return None
+        """Get full URL for the avatar thumbnail"""
+        return profile_image_url(obj, self.context.get('request'))
 
 
 
@@ -31,8 +27,14 @@ class MessageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Message
-        fields = ['id', 'sender', 'sender_details', 'message_type', 'content', 'audio', 'audio_url', 'timestamp', 'is_read']
-        read_only_fields = ['id', 'timestamp', 'sender', 'sender_details', 'message_type', 'audio_url']
+        fields = [
+            'id', 'sender', 'sender_details', 'message_type', 'content', 'audio', 'audio_url',
+            'audio_status', 'audio_duration', 'audio_waveform', 'timestamp', 'is_read'
+        ]
+        read_only_fields = [
+            'id', 'timestamp', 'sender', 'sender_details', 'message_type', 'audio_url',
+            'audio_status', 'audio_duration', 'audio_waveform'
+        ]
 
     def get_audio_url(self, obj):
         """Get full URL for audio file"""
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from case.models import Case
+from .access import invalidate_chat_access
+
+
+@receiver(post_init, sender=Case)
+def remember_case_participants(sender, instance, **kwargs):
+    """Record the loaded lawyer so a reassignment also invalidates the old pair."""
+    # Read from __dict__ so deferred-field loads never trigger a query
+    instance._chat_access_lawyer_id = instance.__dict__.get('lawyer_id')
+
+
+@receiver([post_save, post_delete], sender=Case)
+def invalidate_case_chat_access(sender, instance, **kwargs):
+    """Keep cached chat authorization in step with case status and assignment."""
+    invalidate_chat_access(instance.client_id, instance.lawyer_id)
+
+    previous_lawyer_id = getattr(instance, '_chat_access_lawyer_id', None)
+    if previous_lawyer_id != instance.lawyer_id:
+        invalidate_chat_access(instance.client_id, previous_lawyer_id)
+    instance._chat_access_lawyer_id = instance.lawyer_id
@@ -0,0 +1,119 @@
+"""
+Maintenance of the denormalized ConversationSummary inbox table.
+
+Every write path that creates a message or marks messages as read calls into
+this module inside the same transaction, so the per-pair summary row never
+drifts from the Message table. `rebuild_summaries` recomputes the table from
+scratch and backs the `rebuild_conversation_summaries` management command.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Conversation, ConversationSummary, Message
+
+
+# Maximum number of characters kept in last_message_preview
+PREVIEW_LENGTH = 255
+
+
+def message_preview(message):
+    """Return the inbox preview text for a message."""
+    if message.message_type == 'voice':
+        return ''
+    content = message.content or ''
+    if len(content) > PREVIEW_LENGTH:
+        return content[:PREVIEW_LENGTH - 3] + '...'
+    return content
+
+
+def _last_message_fields(message):
+    return {
+        'last_message': message,
+        'last_message_sender_id': message.sender_id,
+        'last_message_type': message.message_type,
+        'last_message_preview': message_preview(message),
+        'last_message_at': message.timestamp,
+    }
+
+
+def record_message(message, recipient):
+    """
+    Update the pair's summary row for a newly created message.
+
+    Bumps the recipient's unread counter and, unless a newer message has
+    already been recorded, replaces the last-message columns.
+    Must be called inside the transaction that created the message.
+    """
+    user_low_id, user_high_id = ConversationSummary.pair_key(message.sender_id, recipient.id)
+    unread_field = 'unread_for_low' if recipient.id == user_low_id else 'unread_for_high'
+
+    with transaction.atomic():
+        summary, created = ConversationSummary.objects.get_or_create(
+            user_low_id=user_low_id,
+            user_high_id=user_high_id,
+            defaults={**_last_message_fields(message), unread_field: 1},
+        )
+        if created:
+            return summary
+
+        ConversationSummary.objects.filter(pk=summary.pk).update(
+            **{unread_field: F(unread_field) + 1}
+        )
+        ConversationSummary.objects.filter(
+            Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.timestamp),
+            pk=summary.pk,
+        ).update(**_last_message_fields(message))
+
+    return summary
+
+
+def mark_pair_read(reader, other_user):
+    """Reset the reader's unread counter for their conversation with other_user."""
+    user_low_id, user_high_id = ConversationSummary.pair_key(reader.id, other_user.id)
+    unread_field = 'unread_for_low' if reader.id == user_low_id else 'unread_for_high'
+
+    ConversationSummary.objects.filter(
+        user_low_id=user_low_id,
+        user_high_id=user_high_id,
+    ).update(**{unread_field: 0})
+
+
+def rebuild_summaries():
+    """
+    Recompute every ConversationSummary row from the Message table.
+
+    Returns the number of summary rows written.
+    """
+    pairs = {}
+    conversations = Conversation.objects.exclude(
+        case__status='pending'
+    ).exclude(case__lawyer__isnull=True).values_list('id', 'case__client_id', 'case__lawyer_id')
+
+    for conversation_id, client_id, lawyer_id in conversations:
+        pairs.setdefault(ConversationSummary.pair_key(client_id, lawyer_id), []).append(conversation_id)
+
+    summaries = []
+    for (user_low_id, user_high_id), conversation_ids in pairs.items():
+        pair_messages = Message.objects.filter(conversation_id__in=conversation_ids)
+        last_message = pair_messages.order_by('-timestamp', '-id').first()
+        if last_message is None:
+            continue
+
+        unread = pair_messages.filter(is_read=False).aggregate(
+            for_low=Count('id', filter=Q(sender_id=user_high_id)),
+            for_high=Count('id', filter=Q(sender_id=user_low_id)),
+        )
+        summaries.append(ConversationSummary(
+            user_low_id=user_low_id,
+            user_high_id=user_high_id,
+            unread_for_low=unread['for_low'],
+            unread_for_high=unread['for_high'],
+            **_last_message_fields(last_message),
+        ))
+
+    with transaction.atomic():
+        ConversationSummary.objects.all().delete()
+        ConversationSummary.objects.bulk_create(summaries, batch_size=500)
+
+    return len(summaries)
@@ -1,3 +1,270 @@
-from django.test import TestCase
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import textwrap
+import time
+from array import array
+from unittest import mock
 
-# Create your tests here.
+import fakeredis
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from authentication.models import User
+from case.models import Case
+from .history import fetch_page, get_pair_messages
+from .media import process_voice_message, waveform
+from .models import Conversation, Message
+from .presence import InMemoryPresenceStore, RedisPresenceStore
+
+
+class HistoryPaginationTests(TestCase):
+    """fetch_page over five messages between a client and their lawyer."""
+
+    def setUp(self):
+        self.client_user = User.objects.create(email='client@example.com', name='Client')
+        self.lawyer = User.objects.create(email='lawyer@example.com', name='Lawyer', is_lawyer=True)
+        case = Case.objects.create(
+            client=self.client_user, lawyer=self.lawyer, case_title='Case', case_category='Civil Law',
+            case_description='-', status='accepted',
+        )
+        conversation, _ = Conversation.objects.get_or_create(case=case)
+        self.messages = [
+            Message.objects.create(conversation=conversation, sender=self.client_user, content=str(i))
+            for i in range(5)
+        ]
+
+    def page(self, queryset=None, **kwargs):
+        if queryset is None:
+            queryset = get_pair_messages(self.client_user, self.lawyer)
+        page = fetch_page(queryset, **kwargs)
+        page['messages'] = [message.content for message in page['messages']]
+        return page
+
+    def test_latest_page_then_scroll_back(self):
+        latest = self.page(limit=2)
+        self.assertEqual(latest['messages'], ['3', '4'])
+        self.assertTrue(latest['has_more_before'])
+        self.assertFalse(latest['has_more_after'])
+
+        older = self.page(before=latest['before_cursor'], limit=2)
+        self.assertEqual(older['messages'], ['1', '2'])
+        self.assertTrue(older['has_more_before'])
+        self.assertTrue(older['has_more_after'])
+
+        oldest = self.page(before=older['before_cursor'], limit=2)
+        self.assertEqual(oldest['messages'], ['0'])
+        self.assertFalse(oldest['has_more_before'])
+
+    def test_catch_up_after_a_cursor(self):
+        older = self.page(before=self.page(limit=3)['before_cursor'], limit=2)
+
+        newer = self.page(after=older['after_cursor'], limit=2)
+        self.assertEqual(newer['messages'], ['2', '3'])
+        self.assertTrue(newer['has_more_before'])
+        self.assertTrue(newer['has_more_after'])
+
+    def test_catch_up_reports_nothing_before_when_nothing_precedes_the_cursor(self):
+        first = self.messages[0]
+        after = fetch_page(Message.objects.filter(id=first.id))['after_cursor']
+
+        page = self.page(Message.objects.exclude(id=first.id), after=after, limit=10)
+        self.assertEqual(page['messages'], ['1', '2', '3', '4'])
+        self.assertFalse(page['has_more_before'])
+        self.assertFalse(page['has_more_after'])
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            self.page(before='not-a-cursor')
+
+
+class PresenceStoreContract:
+    """Behaviour every presence store must share; subclasses provide make_store()."""
+
+    group = 'chat_user_1_2'
+
+    def test_user_is_online_while_any_connection_is_open(self):
+        store = self.make_store()
+        store.add(1, 'Client', self.group, 'tab-1')
+        store.add(1, 'Client', self.group, 'tab-2')
+        store.add(2, 'Lawyer', self.group, 'tab-3')
+        self.assertEqual(store.online_users(self.group), {1: 'Client', 2: 'Lawyer'})
+
+        store.remove(1, 'tab-1')
+        self.assertTrue(store.is_online(1))
+
+        store.remove(1, 'tab-2')
+        self.assertFalse(store.is_online(1))
+        self.assertEqual(store.online_users(self.group), {2: 'Lawyer'})
+
+    def test_connections_expire_without_heartbeats(self):
+        store = self.make_store()
+        store.add(1, 'Client', self.group, 'tab-1')
+
+        with self.later(store.ttl + 1):
+            self.assertFalse(store.is_online(1))
+            self.assertEqual(store.online_users(self.group), {})
+
+    def test_heartbeat_extends_the_connection(self):
+        store = self.make_store()
+        store.add(1, 'Client', self.group, 'tab-1')
+
+        with self.later(store.ttl - 1):
+            store.add(1, 'Client', self.group, 'tab-1')
+        with self.later(store.ttl + 1):
+            self.assertTrue(store.is_online(1))
+
+    def test_clear(self):
+        store = self.make_store()
+        store.add(1, 'Client', self.group, 'tab-1')
+        store.clear()
+        self.assertFalse(store.is_online(1))
+
+
+class InMemoryPresenceStoreTests(PresenceStoreContract, SimpleTestCase):
+
+    def make_store(self):
+        return InMemoryPresenceStore(ttl=30)
+
+    def later(self, seconds):
+        now = time.monotonic()
+        return mock.patch('chat.presence.time.monotonic', return_value=now + seconds)
+
+
+class RedisPresenceStoreTests(PresenceStoreContract, SimpleTestCase):
+    """RedisPresenceStore against fakeredis; every store built here shares one server, like Daphne workers."""
+
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+
+    def make_store(self):
+        store = RedisPresenceStore(url='redis://localhost:6379/0', ttl=30)
+        store.client = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        return store
+
+    def later(self, seconds):
+        now = time.time()
+        return mock.patch('chat.presence.time.time', return_value=now + seconds)
+
+    def test_workers_share_presence(self):
+        worker_a, worker_b = self.make_store(), self.make_store()
+        worker_a.add(1, 'Client', self.group, 'tab-1')
+        worker_b.add(2, 'Lawyer', self.group, 'tab-2')
+
+        self.assertEqual(worker_b.online_users(self.group), {1: 'Client', 2: 'Lawyer'})
+
+        worker_b.remove(1, 'tab-1')
+        self.assertFalse(worker_a.is_online(1))
+
+    def test_keys_expire_with_the_connection(self):
+        store = self.make_store()
+        store.add(1, 'Client', self.group, 'tab-1')
+
+        for key in ('presence:conn:tab-1', f'presence:group:{self.group}', 'presence:user:1'):
+            self.assertTrue(0 < store.client.ttl(key) <= 30, key)
+
+
+class WaveformTests(SimpleTestCase):
+
+    def test_peak_of_each_slice_scaled_to_the_loudest(self):
+        self.assertEqual(waveform(array('h', [0, 100, -400, 50, 200, -100]), 3), [25, 100, 50])
+
+    def test_fewer_samples_than_bars(self):
+        self.assertEqual(waveform(array('h', [10, -20]), 64), [50, 100])
+
+    def test_silence_and_empty_audio(self):
+        self.assertEqual(waveform(array('h', [0] * 10), 5), [0] * 5)
+        self.assertEqual(waveform(array('h'), 64), [])
+
+
+# Stands in for ffmpeg: "transcodes" by copying the input and "decodes" to
+# 1.5 seconds of samples at 8 kHz; exits 1 when FAIL_FFMPEG is set
+STUB_FFMPEG = textwrap.dedent('''\
+    import os, shutil, sys
+    from array import array
+    if os.environ.get('FAIL_FFMPEG'):
+        sys.exit(1)
+    args = sys.argv[1:]
+    if args[-1] == '-':
+        sys.stdout.buffer.write(array('h', [0, 1000, -2000, 500] * 3000).tobytes())
+    else:
+        shutil.copyfile(args[args.index('-i') + 1], args[-1])
+''')
+
+
+class ProcessVoiceMessageTests(TestCase):
+    """process_voice_message against a stub FFMPEG_BINARY and a temporary storage."""
+
+    def setUp(self):
+        workdir = tempfile.mkdtemp(prefix='voice-test-')
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+
+        ffmpeg = os.path.join(workdir, 'ffmpeg')
+        with open(ffmpeg, 'w') as script:
+            script.write(f'#!{sys.executable}\n{STUB_FFMPEG}')
+        os.chmod(ffmpeg, os.stat(ffmpeg).st_mode | stat.S_IEXEC)
+        settings_override = override_settings(FFMPEG_BINARY=ffmpeg, VOICE_WAVEFORM_BARS=4)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.storage = FileSystemStorage(location=os.path.join(workdir, 'media'))
+        storage_patch = mock.patch.object(Message._meta.get_field('audio'), 'storage', self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+
+        client_user = User.objects.create(email='client@example.com', name='Client')
+        lawyer = User.objects.create(email='lawyer@example.com', name='Lawyer', is_lawyer=True)
+        case = Case.objects.create(
+            client=client_user, lawyer=lawyer, case_title='Case', case_category='Civil Law',
+            case_description='-', status='accepted',
+        )
+        conversation, _ = Conversation.objects.get_or_create(case=case)
+        self.message = Message.objects.create(
+            conversation=conversation, sender=client_user, message_type='voice',
+            audio=SimpleUploadedFile('note.webm', b'webm audio'), audio_status=Message.AUDIO_PENDING,
+        )
+
+    def test_stores_opus_file_and_previews(self):
+        original = self.message.audio.name
+
+        self.assertTrue(process_voice_message(self.message.id))
+
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.audio_status, Message.AUDIO_READY)
+        self.assertTrue(self.message.audio.name.endswith('.ogg'))
+        self.assertEqual(self.message.audio_duration, 1.5)
+        self.assertEqual(self.message.audio_waveform, [100, 100, 100, 100])
+        # The original stays for clients still holding its URL
+        self.assertTrue(self.storage.exists(original))
+
+    def test_processed_message_is_not_processed_again(self):
+        process_voice_message(self.message.id)
+
+        self.assertFalse(process_voice_message(self.message.id))
+
+    def test_ffmpeg_failure_keeps_the_original(self):
+        original = self.message.audio.name
+
+        with mock.patch.dict(os.environ, {'FAIL_FFMPEG': '1'}), self.assertLogs('chat.media', 'ERROR'):
+            self.assertFalse(process_voice_message(self.message.id))
+
+        self.message.refresh_from_db()
+        self.assertEqual((self.message.audio_status, self.message.audio.name), (Message.AUDIO_FAILED, original))
+
+    def test_message_changed_during_processing_keeps_the_new_audio(self):
+        def replace_audio(source, target):
+            shutil.copyfile(source, target)
+            Message.objects.filter(id=self.message.id).update(audio='chat_audio/replaced.webm')
+
+        with mock.patch('chat.media.transcode', side_effect=replace_audio), \
+                mock.patch('chat.media.decode_samples', return_value=array('h', [1])):
+            self.assertFalse(process_voice_message(self.message.id))
+
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.audio.name, 'chat_audio/replaced.webm')
+        # The transcoded file is removed again
+        stored = [name for _, _, files in os.walk(self.storage.location) for name in files]
+        self.assertEqual(stored, ['note.webm'])
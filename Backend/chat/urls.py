@@ -7,6 +7,9 @@ urlpatterns = [
 
     # GET: Get messages with user | POST: Send message to user
     path('conversations/<int:user_id>/messages/', views.messages, name='messages'),
+
+    # POST: Sign a direct upload for a voice note
+    path('conversations/<int:user_id>/voice-upload/', views.voice_upload, name='voice-upload'),
     
     # POST: Mark all messages from a user as read
     path('conversations/<int:user_id>/mark-read/', views.mark_messages_as_read, name='mark-read'),
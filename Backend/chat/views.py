@@ -3,90 +3,116 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, F, Func, Max, OuterRef, Q, Subquery, Sum
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 from case.models import Case
-from .models import Message, Conversation
+from meronaya.conditional import conditional_get
+from meronaya.direct_uploads import UploadTarget, confirm_upload, declared_file, issue_upload
+from meronaya.versions import PROFILES, get_version
+from .models import Message, Conversation, ConversationSummary
+from meronaya.pagination import parse_page_size
+from .history import fetch_page, get_pair_messages
+from .media import schedule_voice_processing
+from .summary import mark_pair_read, record_message
 from .serializers import MessageSerializer, UserMinimalSerializer
 from authentication.models import User
 from notification.utils import send_notification
 
 
+# Voice notes uploaded straight to storage (see voice_upload)
+VOICE_UPLOAD = UploadTarget(
+    name='voice_message',
+    model=Message,
+    field_name='audio',
+    extensions=frozenset({'webm', 'ogg', 'mp3', 'm4a', 'wav'}),
+    max_size=10 * 1024 * 1024,
+)
+
+
+def _conversation_list_etag_parts(request):
+    """
+    Validator for conversation_list: the user's summary rows (new messages
+    raise the last message id, reads lower the unread total), the cases
+    they share and the profiles shown for the other users.
+    """
+    user = request.user
+    summaries = ConversationSummary.objects.filter(Q(user_low=user) | Q(user_high=user)).aggregate(
+        total=Count('id'),
+        latest_message=Max('last_message_id'),
+        unread_low=Sum('unread_for_low', filter=Q(user_low=user)),
+        unread_high=Sum('unread_for_high', filter=Q(user_high=user)),
+        updated=Max('updated_at'),
+    )
+    cases = Case.objects.filter(Q(client=user) | Q(lawyer=user)).aggregate(
+        total=Count('id'),
+        updated=Max('updated_at'),
+    )
+    return [*summaries.values(), *cases.values(), get_version(PROFILES)]
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(_conversation_list_etag_parts)
 def conversation_list(request):
     """
     GET /api/chat/conversations/
     List all conversations grouped by the other user.
     Returns one entry per user (not per case).
     Both lawyer and client use this same endpoint.
+
+    Served from the denormalized ConversationSummary table in one query.
+    Answers If-None-Match with 304 when nothing shown has changed.
     """
     user = request.user
 
-    # Get all conversations where user is client or lawyer, excluding pending cases
-    conversations = Conversation.objects.filter(
-        Q(case__client=user) | Q(case__lawyer=user)
-    ).exclude(case__status='pending').select_related('case', 'case__client', 'case__lawyer')
-
-    # Group by the other user
-    grouped = {}
-    for conv in conversations:
-        other_user = conv.case.lawyer if conv.case.client == user else conv.case.client
-        if other_user.id not in grouped:
-            grouped[other_user.id] = {
-                'other_user': other_user,
-                'conversations': [],
-            }
-        grouped[other_user.id]['conversations'].append(conv)
+    # Count of non-pending cases shared by the pair, computed in the same query
+    shared_cases = Case.objects.filter(
+        Q(client=OuterRef('user_low'), lawyer=OuterRef('user_high')) |
+        Q(client=OuterRef('user_high'), lawyer=OuterRef('user_low'))
+    ).exclude(status='pending').order_by().annotate(
+        total=Func(F('id'), function='COUNT')
+    ).values('total')
+
+    summaries = ConversationSummary.objects.filter(
+        Q(user_low=user) | Q(user_high=user)
+    ).select_related('user_low', 'user_high', 'last_message').annotate(
+        case_count=Subquery(shared_cases)
+    ).order_by('-last_message_at')
 
-    # Build response
     result = []
-    for user_id, data in grouped.items():
-        other_user = data['other_user']
-        convs = data['conversations']
-
-        # Get last message across all conversations with this user
-        last_message = Message.objects.filter(
-            conversation__in=convs
-        ).order_by('-timestamp').first()
-
-        # Count unread messages across all conversations with this user
-        unread_count = Message.objects.filter(
-            conversation__in=convs,
-            is_read=False
-        ).exclude(sender=user).count()
+    for summary in summaries:
+        if not summary.case_count:
+            continue
+
+        is_low = summary.user_low_id == user.id
+        other_user = summary.user_high if is_low else summary.user_low
 
-        # Serialize last message properly (handles both text and voice)
         last_message_data = None
-        if last_message:
+        if summary.last_message_at:
             last_message_data = {
-                'id': last_message.id,
-                'message_type': last_message.message_type,
-                'content': last_message.content or '',
-                'timestamp': last_message.timestamp,
-                'sender_id': last_message.sender.id,
+                'id': summary.last_message_id,
+                'message_type': summary.last_message_type,
+                'content': summary.last_message_preview,
+                'timestamp': summary.last_message_at,
+                'sender_id': summary.last_message_sender_id,
             }
             # For voice messages, include audio URL
-            if last_message.message_type == 'voice' and last_message.audio:
-                request_obj = request
-                if request_obj:
-                    last_message_data['audio_url'] = request_obj.build_absolute_uri(last_message.audio.url)
-                else:
-                    last_message_data['audio_url'] = last_message.audio.url
+            last_message = summary.last_message
+            if summary.last_message_type == 'voice' and last_message and last_message.audio:
+                last_message_data['audio_url'] = request.build_absolute_uri(last_message.audio.url)
+                last_message_data['audio_duration'] = last_message.audio_duration
 
         result.append({
             'user': UserMinimalSerializer(other_user, context={'request': request}).data,
             'last_message': last_message_data,
-            'unread_count': unread_count,
-            'case_count': len(convs),
-            'updated_at': max(c.updated_at for c in convs),
+            'unread_count': summary.unread_for_low if is_low else summary.unread_for_high,
+            'case_count': summary.case_count,
+            'updated_at': summary.last_message_at or summary.updated_at,
         })
 
-    # Sort by most recent activity
-    result.sort(key=lambda x: x['updated_at'], reverse=True)
-
     return Response(result)
 
 
@@ -94,17 +120,12 @@ def conversation_list(request):
 @permission_classes([IsAuthenticated])
 def messages(request, user_id):
     """
-    GET  /api/chat/conversations/<user_id>/messages/ — Get all messages
+    GET  /api/chat/conversations/<user_id>/messages/ — Get messages (cursor paginated)
     POST /api/chat/conversations/<user_id>/messages/ — Send a message
     Both lawyer and client use this same endpoint.
     """
     other_user = get_object_or_404(User, id=user_id)
-
-    # Find all non-pending cases between the two users
-    cases = Case.objects.filter(
-        Q(client=request.user, lawyer=other_user) |
-        Q(lawyer=request.user, client=other_user)
-    ).exclude(status='pending')
+    cases = _chat_cases(request.user, other_user)
 
     if not cases.exists():
         return Response(
@@ -118,27 +139,87 @@ def messages(request, user_id):
         return _send_message(request, other_user, cases)
 
 
+def _chat_cases(user, other_user):
+    """All non-pending cases between the two users."""
+    return Case.objects.filter(
+        Q(client=user, lawyer=other_user) |
+        Q(lawyer=user, client=other_user)
+    ).exclude(status='pending')
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def voice_upload(request, user_id):
+    """
+    POST /api/chat/conversations/<user_id>/voice-upload/
+    Body: {file_name, file_size}
+    Issue a direct-to-storage upload for a voice note. Send the message with
+    the returned ticket as `audio_ticket` instead of an `audio` file.
+    """
+    other_user = get_object_or_404(User, id=user_id)
+
+    if not _chat_cases(request.user, other_user).exists():
+        return Response(
+            {'error': 'No active cases with this user. Chat is only available once a case is accepted.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    file_name, file_size = declared_file(request.data)
+    return Response(issue_upload(request, VOICE_UPLOAD, file_name, file_size, scope=f'chat:{other_user.id}'))
+
+
 def _get_messages(request, other_user, cases):
-    """Get all messages with a specific user across all shared cases."""
-    conversations = Conversation.objects.filter(case__in=cases)
+    """
+    Get messages with a specific user across all shared cases.
 
-    all_messages = Message.objects.filter(
-        conversation__in=conversations
-    ).order_by('timestamp')
+    Uses keyset pagination on (timestamp, id):
+    - no params   : the latest page of messages
+    - ?before=... : older messages, for scrolling back through history
+    - ?after=...  : newer messages, for catching up after a disconnect
+    - ?limit=...  : page size (default 50, max 200)
+    """
+    before = request.query_params.get('before')
+    after = request.query_params.get('after')
 
-    serializer = MessageSerializer(all_messages, many=True, context={'request': request})
+    if before and after:
+        return Response(
+            {'error': 'Use either "before" or "after", not both.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        page = fetch_page(
+            get_pair_messages(request.user, other_user, cases),
+            before=before,
+            after=after,
+            limit=parse_page_size(request.query_params.get('limit')),
+        )
+    except ValueError:
+        return Response(
+            {'error': 'Invalid cursor.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = MessageSerializer(page['messages'], many=True, context={'request': request})
 
     return Response({
         'user': UserMinimalSerializer(other_user, context={'request': request}).data,
         'messages': serializer.data,
         'case_ids': list(cases.values_list('id', flat=True)),
+        'has_more_before': page['has_more_before'],
+        'has_more_after': page['has_more_after'],
+        'before_cursor': page['before_cursor'],
+        'after_cursor': page['after_cursor'],
     })
 
 
 def _send_message(request, other_user, cases):
     """Send a message to a specific user (text or voice)."""
-    # Check if audio file is being sent
+    # Check if audio file is being sent, or was uploaded directly to storage
     audio_file = request.FILES.get('audio')
+    audio_ticket = request.data.get('audio_ticket')
+    if not audio_file and audio_ticket:
+        audio_file = confirm_upload(request, VOICE_UPLOAD, audio_ticket, scope=f'chat:{other_user.id}')['name']
     content = request.data.get('content', '').strip()
 
     if audio_file:
@@ -158,17 +239,22 @@ def _send_message(request, other_user, cases):
     # Use the most recently updated case
     case = cases.order_by('-updated_at').first()
 
-    # Create or get conversation for this case
-    conversation, _ = Conversation.objects.get_or_create(case=case)
-
-    # Create message
-    message = Message.objects.create(
-        conversation=conversation,
-        sender=request.user,
-        message_type=message_type,
-        content=content if message_type == 'text' else None,
-        audio=audio_file if message_type == 'voice' else None
-    )
+    with transaction.atomic():
+        # Create or get conversation for this case
+        conversation, _ = Conversation.objects.get_or_create(case=case)
+
+        # Create message and update the pair's inbox summary
+        message = Message.objects.create(
+            conversation=conversation,
+            sender=request.user,
+            message_type=message_type,
+            content=content if message_type == 'text' else None,
+            audio=audio_file if message_type == 'voice' else None,
+            audio_status=Message.AUDIO_PENDING if message_type == 'voice' else None
+        )
+        record_message(message, other_user)
+        if message_type == 'voice':
+            schedule_voice_processing(message.id)
 
     # Send notification to the other user
     sender_name = request.user.name or request.user.email
@@ -209,12 +295,7 @@ def mark_messages_as_read(request, user_id):
     Mark all messages from a specific user as read for the current user.
     """
     other_user = get_object_or_404(User, id=user_id)
-
-    # Find all non-pending cases between the two users
-    cases = Case.objects.filter(
-        Q(client=request.user, lawyer=other_user) |
-        Q(lawyer=request.user, client=other_user)
-    ).exclude(status='pending')
+    cases = _chat_cases(request.user, other_user)
 
     if not cases.exists():
         return Response(
@@ -225,12 +306,14 @@ def mark_messages_as_read(request, user_id):
     # Get all conversations for these cases
     conversations = Conversation.objects.filter(case__in=cases)
 
-    # Mark all unread messages from the other user as read
-    updated_count = Message.objects.filter(
-        conversation__in=conversations,
-        sender=other_user,
-        is_read=False
-    ).update(is_read=True)
+    with transaction.atomic():
+        # Mark all unread messages from the other user as read
+        updated_count = Message.objects.filter(
+            conversation__in=conversations,
+            sender=other_user,
+            is_read=False
+        ).update(is_read=True)
+        mark_pair_read(request.user, other_user)
 
     return Response({
         'success': True,
@@ -103,7 +103,11 @@ class ConsultationSerializer(serializers.ModelSerializer):
 		}
 
 	def get_payment_status(self, obj):
-		appointment = obj.appointments.order_by("-updated_at").first()
+		if "appointments" in getattr(obj, "_prefetched_objects_cache", {}):
+			# Prefetched by list views; pick the latest without another query
+			appointment = max(obj.appointments.all(), key=lambda a: a.updated_at, default=None)
+		else:
+			appointment = obj.appointments.order_by("-updated_at").first()
 		if appointment:
 			return appointment.payment_status
 
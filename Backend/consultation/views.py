@@ -3,12 +3,13 @@ from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.utils.dateparse import parse_date, parse_time
+from django.db import transaction
 from case.models import Case
 
 from .models import Consultation
 from .serializers import ConsultationSerializer
 from appointment.models import Appointment
+from appointment.scheduling import appointment_schedule
 from notification.utils import send_notification
 
 
@@ -182,31 +183,29 @@ class ConsultationAcceptView(APIView):
                 consultation.scheduled_time = parsed_time.strftime("%H:%M:%S")
                 updated_self_fields.append("scheduled_time")
 
-        consultation.status = Consultation.STATUS_ACCEPTED
-        consultation.save(update_fields=updated_self_fields)
-
-        appointment_defaults = {}
-        if consultation.scheduled_date:
-            appointment_defaults["scheduled_date"] = parse_date(consultation.scheduled_date)
-        if consultation.scheduled_time:
-            appointment_defaults["scheduled_time"] = parse_time(consultation.scheduled_time)
+        # Accepting creates the appointment; the schedule is parsed once, here
+        appointment_defaults = appointment_schedule(consultation)
 
         # Keep all consultation payments pending at accept.
         # For in-person mode, payment is marked paid only after completion.
         appointment_defaults["payment_status"] = Appointment.PAYMENT_PENDING
 
-        appointment, created = Appointment.objects.get_or_create(
-            consultation=consultation,
-            defaults=appointment_defaults,
-        )
+        with transaction.atomic():
+            consultation.status = Consultation.STATUS_ACCEPTED
+            consultation.save(update_fields=updated_self_fields)
+
+            appointment, created = Appointment.objects.get_or_create(
+                consultation=consultation,
+                defaults=appointment_defaults,
+            )
 
-        # Keep appointment in sync when it already exists.
-        if not created:
-            for key, value in appointment_defaults.items():
-                setattr(appointment, key, value)
+            # Keep appointment in sync when it already exists.
+            if not created:
+                for key, value in appointment_defaults.items():
+                    setattr(appointment, key, value)
 
-        appointment.status = Appointment.STATUS_CONFIRMED
-        appointment.save(update_fields=["scheduled_date", "scheduled_time", "payment_status", "status", "updated_at"])
+            appointment.status = Appointment.STATUS_CONFIRMED
+            appointment.save(update_fields=["scheduled_date", "scheduled_time", "payment_status", "status", "updated_at"])
 
         # Notify client that consultation was accepted
         send_notification(
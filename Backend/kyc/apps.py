@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class KycConfig(AppConfig):
     name = 'kyc'
+
+    def ready(self):
+        from . import signals  # noqa: F401
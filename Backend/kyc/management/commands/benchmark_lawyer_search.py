@@ -0,0 +1,162 @@
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from authentication.models import User
+from kyc.models import LawyerKYC
+from kyc.search import (
+    filter_lawyers, lawyer_facets, lawyer_page, parse_lawyer_filters, parse_lawyer_ordering, search_lawyers,
+)
+from kyc.serializers import LawyerDirectorySerializer
+from review.models import LawyerRatingStats
+
+
+SPECIALIZATIONS = [
+    "Criminal Law", "Civil Law", "Family Law", "Property Law", "Corporate Law",
+    "Labor Law", "Constitutional Law", "Environmental Law", "Tax Law", "Immigration Law",
+]
+CITIES = [
+    "Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Biratnagar", "Birgunj",
+    "Dharan", "Butwal", "Hetauda", "Nepalgunj", "Janakpur", "Itahari",
+]
+SURNAMES = ["Sharma", "Shrestha", "Adhikari", "Karki", "Thapa", "Gurung", "Rai", "Tamang", "Koirala", "Joshi"]
+
+SCENARIOS = [
+    ("specialization", "specialization=Family+Law"),
+    ("city", "city=pokh"),
+    ("name", "search=koirala"),
+    ("experience + fee", "min_experience=15&max_fee=1500"),
+    ("combined, by rating", "specialization=Tax+Law&city=kath&min_experience=5&ordering=rating"),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark lawyer directory search: create N synthetic lawyers with KYC "
+        "and rating stats inside a transaction, time the directory requests "
+        "(count, first and second serialized page, facets) and roll everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lawyers', type=int, default=100000,
+                            help="Number of synthetic lawyers to create")
+        parser.add_argument('--page-size', type=int, default=50,
+                            help="Lawyers per page, as the endpoint's limit parameter")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Runs per query; the best time is reported")
+        parser.add_argument('--explain', action='store_true',
+                            help="Print the PostgreSQL plan of each first-page query")
+        parser.add_argument('--keep', action='store_true',
+                            help="Commit the synthetic data instead of rolling it back")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options['lawyers'], random.Random(options['seed']))
+                self._run(options)
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            self.stdout.write("Synthetic lawyers rolled back.")
+
+    def _seed(self, count, rng):
+        started = time.perf_counter()
+        users = User.objects.bulk_create([
+            User(
+                email=f"bench-lawyer-{index}@example.invalid",
+                password="!",
+                name=f"{rng.choice(SURNAMES)} {index}",
+                city=rng.choice(CITIES),
+                is_lawyer=True,
+                role=User.UserRoles.LAWYER,
+            )
+            for index in range(count)
+        ], batch_size=2000)
+
+        kycs = []
+        for user in users:
+            years = rng.randint(0, 40)
+            kycs.append(LawyerKYC(
+                user=user,
+                full_name=user.name,
+                email=user.email,
+                phone="9800000000",
+                dob=date(1980, 1, 1),
+                permanent_address="-",
+                current_address="-",
+                bar_council_number=f"BENCH-{user.id}",
+                years_of_experience=f"{years} years",
+                experience_years=years,
+                consultation_fee=Decimal(rng.randrange(500, 5000, 50)),
+                specializations=rng.sample(SPECIALIZATIONS, rng.randint(1, 3)),
+                status=LawyerKYC.KYCStatus.APPROVED,
+            ))
+        LawyerKYC.objects.bulk_create(kycs, batch_size=2000)
+
+        stats = []
+        for user in users:
+            if rng.random() < 0.6:
+                reviews = rng.randint(1, 50)
+                rating_sum = sum(rng.randint(1, 5) for _ in range(reviews))
+                stats.append(LawyerRatingStats(
+                    lawyer=user, review_count=reviews, rating_sum=rating_sum,
+                    average_rating=rating_sum / reviews,
+                ))
+        LawyerRatingStats.objects.bulk_create(stats, batch_size=2000)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE authentication_user, kyc_lawyerkyc, review_lawyerratingstats")
+
+        self.stdout.write(f"Seeded {count} lawyers in {time.perf_counter() - started:.1f}s")
+
+    def _time(self, repeat, run):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _page(self, filters, ordering, page_size, cursor=None):
+        """What the directory endpoint does per request: one keyset page, serialized."""
+        rows, next_cursor = lawyer_page(filters, ordering, cursor=cursor, limit=page_size)
+        return LawyerDirectorySerializer(rows, many=True).data, next_cursor
+
+    def _run(self, options):
+        page_size = options['page_size']
+        for label, query in SCENARIOS:
+            params = QueryDict(query)
+            filters = parse_lawyer_filters(params)
+            ordering = parse_lawyer_ordering(params)
+
+            count_seconds, total = self._time(options['repeat'], filter_lawyers(filters).count)
+            page_seconds, (_, cursor) = self._time(
+                options['repeat'], lambda: self._page(filters, ordering, page_size),
+            )
+            next_seconds = None
+            if cursor:
+                next_seconds, _ = self._time(
+                    options['repeat'], lambda: self._page(filters, ordering, page_size, cursor),
+                )
+            facet_seconds, _ = self._time(options['repeat'], lambda: lawyer_facets(filters))
+
+            next_page = f"{next_seconds * 1000:7.1f} ms" if next_seconds is not None else "      -   "
+            self.stdout.write(
+                f"{label:<22} {total:>7} matches  count {count_seconds * 1000:7.1f} ms  "
+                f"page {page_seconds * 1000:7.1f} ms  next page {next_page}  "
+                f"facets {facet_seconds * 1000:7.1f} ms"
+            )
+            if options['explain']:
+                self.stdout.write(search_lawyers(filters, ordering)[:page_size + 1].explain(analyze=True))
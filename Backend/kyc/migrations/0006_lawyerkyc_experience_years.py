@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 00:01
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_experience_years(apps, schema_editor):
+    """Copy the leading number of years_of_experience into experience_years."""
+    LawyerKYC = apps.get_model('kyc', 'LawyerKYC')
+
+    updated = []
+    for kyc in LawyerKYC.objects.only('id', 'years_of_experience').iterator():
+        match = re.match(r'\s*(\d+)', kyc.years_of_experience or '')
+        if match:
+            kyc.experience_years = min(int(match.group(1)), 32767)
+            updated.append(kyc)
+
+    LawyerKYC.objects.bulk_update(updated, ['experience_years'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kyc', '0005_alter_lawyerkyc_citizenship_back_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lawyerkyc',
+            name='experience_years',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_experience_years, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='lawyerkyc',
+            index=models.Index(fields=['experience_years'], name='kyc_experience_years_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lawyerkyc',
+            index=models.Index(fields=['consultation_fee'], name='kyc_consultation_fee_idx'),
+        ),
+    ]
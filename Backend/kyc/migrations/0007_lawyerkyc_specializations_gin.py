@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 00:01
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kyc', '0006_lawyerkyc_experience_years'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lawyerkyc',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['specializations'], name='kyc_specializations_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
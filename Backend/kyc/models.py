@@ -1,3 +1,6 @@
+import re
+
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from authentication.models import User
@@ -39,6 +42,8 @@ class LawyerKYC(models.Model):
     bar_council_number = models.CharField(max_length=100, unique=True)
     law_firm_name = models.CharField(max_length=255, blank=True, null=True)
     years_of_experience = models.CharField(max_length=50)
+    # Numeric copy of years_of_experience for indexed filtering and sorting
+    experience_years = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
     consultation_fee = models.DecimalField(max_digits=10, decimal_places=2)
     specializations = models.JSONField(default=list, blank=True)
     availability_days = models.JSONField(default=list, blank=True)
@@ -70,9 +75,27 @@ class LawyerKYC(models.Model):
         verbose_name = _('Lawyer KYC')
         verbose_name_plural = _('Lawyer KYCs')
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['specializations'], opclasses=['jsonb_path_ops'], name='kyc_specializations_gin'),
+            models.Index(fields=['experience_years'], name='kyc_experience_years_idx'),
+            models.Index(fields=['consultation_fee'], name='kyc_consultation_fee_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.get_status_display()}"
+
+    @staticmethod
+    def parse_experience_years(value):
+        """Leading whole number of a free-text experience value ("5", "10+ years"), else None."""
+        match = re.match(r'\s*(\d+)', str(value or ''))
+        return min(int(match.group(1)), 32767) if match else None
+
+    def save(self, *args, **kwargs):
+        self.experience_years = self.parse_experience_years(self.years_of_experience)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'years_of_experience' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'experience_years'}
+        super().save(*args, **kwargs)
     
     @property
     def is_verified(self):
@@ -0,0 +1,222 @@
+"""
+Lawyer directory search, sorting and facet counts.
+
+Every filter is written so PostgreSQL can answer it from an index:
+specializations use JSONB containment (GIN, jsonb_path_ops), name and city
+use icontains over trigram indexes on UPPER(...), and experience and fee
+compare typed columns with B-tree indexes. Facet counts re-run the search
+without their own filter, so each dimension shows what selecting another
+value would return. Result pages are keyset-paginated on the ordering's sort
+keys, so a deep page costs the same as the first.
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Count, F, Q
+
+from authentication.models import User
+from meronaya.pagination import DEFAULT_PAGE_SIZE
+from .models import LawyerKYC
+
+
+FACET_LIMIT = 20
+
+# Sort keys per ordering as (field, descending), ending in the primary key so
+# every row has a unique position. Missing values (no rating stats or KYC)
+# sort last whatever the direction.
+LAWYER_ORDERINGS = {
+    'newest': (('date_joined', True), ('id', True)),
+    'rating': (('rating_stats__average_rating', True), ('rating_stats__review_count', True), ('id', True)),
+    'reviews': (('rating_stats__review_count', True), ('id', True)),
+    'experience': (('lawyer_kyc__experience_years', True), ('id', True)),
+    'fee_low': (('lawyer_kyc__consultation_fee', False), ('id', False)),
+    'fee_high': (('lawyer_kyc__consultation_fee', True), ('id', True)),
+}
+
+DEFAULT_ORDERING = 'newest'
+
+
+def parse_lawyer_filters(params):
+    """
+    Read the directory query parameters into {parameter: Q}.
+    Raises ValueError on malformed values.
+    """
+    filters = {}
+
+    search = params.get('search', '').strip()
+    if search:
+        filters['search'] = Q(name__icontains=search)
+
+    specialization = params.get('specialization', '').strip()
+    if specialization:
+        filters['specialization'] = Q(lawyer_kyc__specializations__contains=[specialization])
+
+    city = params.get('city', '').strip()
+    if city:
+        filters['city'] = Q(city__icontains=city)
+
+    min_experience = params.get('min_experience')
+    if min_experience:
+        if not min_experience.isdigit():
+            raise ValueError('min_experience must be a whole number of years.')
+        filters['min_experience'] = Q(lawyer_kyc__experience_years__gte=int(min_experience))
+
+    max_fee = params.get('max_fee')
+    if max_fee:
+        try:
+            fee = Decimal(max_fee)
+        except InvalidOperation:
+            raise ValueError('max_fee must be a number.')
+        if not fee.is_finite():
+            raise ValueError('max_fee must be a number.')
+        filters['max_fee'] = Q(lawyer_kyc__consultation_fee__lte=fee)
+
+    return filters
+
+
+def parse_lawyer_ordering(params):
+    ordering = params.get('ordering') or DEFAULT_ORDERING
+    if ordering not in LAWYER_ORDERINGS:
+        raise ValueError(f"ordering must be one of: {', '.join(LAWYER_ORDERINGS)}.")
+    return ordering
+
+
+def filter_lawyers(filters, exclude=None):
+    """Lawyers matching every filter except the `exclude` parameter."""
+    return User.objects.filter(
+        Q(is_lawyer=True),
+        *[condition for param, condition in filters.items() if param != exclude],
+    )
+
+
+def _sort_keys(ordering):
+    """(name, descending) per sort key; all but the primary key are annotations."""
+    keys = LAWYER_ORDERINGS[ordering]
+    return [(f'sort_key_{index}', descending) for index, (_, descending) in enumerate(keys[:-1])] + [
+        ('pk', keys[-1][1]),
+    ]
+
+
+def search_lawyers(filters, ordering=DEFAULT_ORDERING):
+    """Matching lawyers in the given order, with the sort keys annotated for paging."""
+    fields = LAWYER_ORDERINGS[ordering][:-1]
+    keys = _sort_keys(ordering)
+    return (
+        filter_lawyers(filters)
+        .select_related('lawyer_kyc', 'rating_stats')
+        .annotate(**{name: F(field) for (name, _), (field, _) in zip(keys, fields)})
+        .order_by(*[
+            F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+            for name, descending in keys
+        ])
+    )
+
+
+def _cursor_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_cursor(row, keys):
+    values = [_cursor_value(getattr(row, name)) for name, _ in keys]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _after_cursor(cursor, keys):
+    """Q matching rows that sort after the cursor's row."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != len(keys) or values[-1] is None:
+        raise ValueError("Invalid cursor")
+
+    # Lexicographic comparison key by key, missing values sorting last
+    *leading, (pk_name, pk_descending) = keys
+    after = Q(**{f"{pk_name}__{'lt' if pk_descending else 'gt'}": values[-1]})
+    for (name, descending), value in reversed(list(zip(leading, values))):
+        if value is None:
+            after = Q(**{f'{name}__isnull': True}) & after
+        else:
+            lookup = 'lt' if descending else 'gt'
+            after = (
+                Q(**{f'{name}__{lookup}': value})
+                | Q(**{f'{name}__isnull': True})
+                | (Q(**{name: value}) & after)
+            )
+    return after
+
+
+def lawyer_page(filters, ordering=DEFAULT_ORDERING, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of matching lawyers, keyset-paginated on the ordering's sort
+    keys. Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    Raises ValueError when the cursor is malformed.
+    """
+    keys = _sort_keys(ordering)
+    queryset = search_lawyers(filters, ordering)
+    if cursor:
+        try:
+            queryset = queryset.filter(_after_cursor(cursor, keys))
+        except (TypeError, ValidationError) as exc:
+            raise ValueError("Invalid cursor") from exc
+
+    rows = list(queryset[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, _encode_cursor(rows[-1], keys) if has_more else None
+
+
+def _specialization_counts(lawyers, limit):
+    specializations = (
+        LawyerKYC.objects.filter(user__in=lawyers.values('id'))
+        .order_by()
+        .values('specializations')
+    )
+    sql, params = specializations.query.sql_with_params()
+    # One row per (lawyer, specialization); values stored as anything other
+    # than a JSON array are skipped rather than failing the whole query
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT specialization, COUNT(*) AS count
+            FROM ({sql}) AS kyc
+            CROSS JOIN LATERAL jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(kyc.specializations) = 'array'
+                     THEN kyc.specializations ELSE '[]'::jsonb END
+            ) AS specialization
+            GROUP BY specialization
+            ORDER BY count DESC, specialization
+            LIMIT %s
+            """,
+            [*params, limit],
+        )
+        return [{'value': value, 'count': count} for value, count in cursor.fetchall()]
+
+
+def _city_counts(lawyers, limit):
+    rows = (
+        lawyers.exclude(city__isnull=True).exclude(city='')
+        .values('city')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'city')[:limit]
+    )
+    return [{'value': row['city'], 'count': row['count']} for row in rows]
+
+
+def lawyer_facets(filters, limit=FACET_LIMIT):
+    """Total matches plus per-specialization and per-city counts."""
+    return {
+        'total': filter_lawyers(filters).count(),
+        'specializations': _specialization_counts(filter_lawyers(filters, exclude='specialization'), limit),
+        'cities': _city_counts(filter_lawyers(filters, exclude='city'), limit),
+    }
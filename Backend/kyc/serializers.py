@@ -1,7 +1,27 @@
 from rest_framework import serializers
 from .models import LawyerKYC
 from django.db import transaction
+from authentication.avatars import profile_image_url
 from authentication.models import User
+from meronaya.direct_uploads import UploadTarget, confirm_upload
+
+
+KYC_DOCUMENT_FIELDS = [
+    'citizenship_front', 'citizenship_back', 'lawyer_license', 'passport_photo',
+    'law_degree', 'experience_certificate',
+]
+
+# Direct uploads of KYC documents, one target per file field
+KYC_DOCUMENT_UPLOADS = {
+    field: UploadTarget(
+        name=f'kyc_{field}',
+        model=LawyerKYC,
+        field_name=field,
+        extensions=frozenset({'jpg', 'jpeg', 'png', 'pdf'}),
+        max_size=5 * 1024 * 1024,
+    )
+    for field in KYC_DOCUMENT_FIELDS
+}
 
 
 class LawyerDirectorySerializer(serializers.ModelSerializer):
@@ -35,12 +55,7 @@ class LawyerDirectorySerializer(serializers.ModelSerializer):
         ]
 
     def get_profile_image(self, obj):
-        if obj.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.profile_image.url)
-            return obj.profile_image.url
-        return None
+        return profile_image_url(obj, self.context.get('request'), size=256)
 
     def _get_kyc(self, obj):
         return getattr(obj, 'lawyer_kyc', None)
@@ -90,22 +105,30 @@ class LawyerDirectorySerializer(serializers.ModelSerializer):
         return kyc.dob if kyc else None
 
     def get_average_rating(self, obj):
-        """Get average rating from reviews"""
-        from django.db.models import Avg
-        from review.models import Review
-        
-        avg = Review.objects.filter(lawyer=obj).aggregate(Avg('rating'))['rating__avg']
-        return round(avg, 2) if avg else 0.0
+        """Get average rating from the lawyer's rating stats"""
+        stats = getattr(obj, 'rating_stats', None)
+        return round(stats.average_rating, 2) if stats else 0.0
     
     def get_total_reviews(self, obj):
         """Get total review count"""
-        from review.models import Review
-        return Review.objects.filter(lawyer=obj).count()
+        stats = getattr(obj, 'rating_stats', None)
+        return stats.review_count if stats else 0
 
 
 class LawyerKYCSerializer(serializers.ModelSerializer):
+    """
+    Each document can be sent as a file or, when it was uploaded straight to
+    storage, as `<field>_ticket` (see /api/kyc/upload/sign/).
+    """
     user_email = serializers.EmailField(source='user.email', read_only=True)
     profile_image = serializers.SerializerMethodField()
+
+    citizenship_front_ticket = serializers.CharField(write_only=True, required=False)
+    citizenship_back_ticket = serializers.CharField(write_only=True, required=False)
+    lawyer_license_ticket = serializers.CharField(write_only=True, required=False)
+    passport_photo_ticket = serializers.CharField(write_only=True, required=False)
+    law_degree_ticket = serializers.CharField(write_only=True, required=False)
+    experience_certificate_ticket = serializers.CharField(write_only=True, required=False)
     
     MAX_FILE_SIZE_MB = 5
     ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.pdf'}
@@ -124,12 +147,17 @@ class LawyerKYCSerializer(serializers.ModelSerializer):
             # Identity Documents
             'citizenship_front', 'citizenship_back', 'lawyer_license', 'passport_photo',
             'law_degree', 'experience_certificate',
+            # Direct upload tickets
+            'citizenship_front_ticket', 'citizenship_back_ticket', 'lawyer_license_ticket',
+            'passport_photo_ticket', 'law_degree_ticket', 'experience_certificate_ticket',
             # Declaration
             'confirm_accuracy', 'authorize_verification', 'agree_terms',
             # Timestamps
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'user_email', 'profile_image', 'status', 'rejection_reason', 'verified_at', 'created_at', 'updated_at']
+        # Required on create as a file or a ticket, checked in validate()
+        extra_kwargs = {field: {'required': False} for field in KYC_DOCUMENT_FIELDS}
 
     def get_profile_image(self, obj):
         """Get full URL for profile image"""
@@ -164,9 +192,20 @@ class LawyerKYCSerializer(serializers.ModelSerializer):
         if not esewa and not khalti:
             raise serializers.ValidationError("At least one payment wallet number (eSewa or Khalti) is required.")
 
-        # Validate all document files
-        for field in ['citizenship_front', 'citizenship_back', 'lawyer_license', 'passport_photo', 'law_degree', 'experience_certificate']:
-            self._validate_file(attrs.get(field), field)
+        # Validate all document files; directly uploaded ones are checked on confirm
+        request = self.context.get('request')
+        for field in KYC_DOCUMENT_FIELDS:
+            ticket = attrs.pop(f'{field}_ticket', None)
+            if ticket:
+                try:
+                    upload = confirm_upload(request, KYC_DOCUMENT_UPLOADS[field], ticket, scope='kyc')
+                except serializers.ValidationError as e:
+                    raise serializers.ValidationError({f'{field}_ticket': e.detail['ticket']})
+                attrs[field] = upload['name']
+            else:
+                self._validate_file(attrs.get(field), field)
+            if self.instance is None and not attrs.get(field):
+                raise serializers.ValidationError({field: "This field is required."})
         
         # Only validate declarations on creation (POST), not on updates (PUT/PATCH)
         # On updates, keep existing values if not provided
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from meronaya.versions import LAWYER_DIRECTORY, bump_version, lawyer_profile
+from .models import LawyerKYC
+
+
+@receiver([post_save, post_delete], sender=LawyerKYC)
+def bump_directory_version(sender, instance, **kwargs):
+    """KYC details are part of every lawyer directory response."""
+    bump_version(LAWYER_DIRECTORY)
+    bump_version(lawyer_profile(instance.user_id))
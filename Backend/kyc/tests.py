@@ -1,3 +1,151 @@
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache, caches
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from review.models import LawyerRatingStats
+from .models import LawyerKYC
+from meronaya.versions import LAWYER_DIRECTORY, get_version
+from .search import LAWYER_ORDERINGS, lawyer_page, search_lawyers
+
+
+class VerifiedLawyersPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ties and missing KYC or rating stats, so every sort key decides some pages
+        profiles = [
+            (Decimal('1000'), 5, 4.5, 10),
+            (Decimal('1000'), 5, 4.5, 10),
+            (Decimal('2500'), 12, 3.0, 4),
+            (None, None, 4.5, 2),
+            (Decimal('500'), 1, None, None),
+            (None, None, None, None),
+            (Decimal('2500'), 20, 5.0, 1),
+        ]
+        for index, (fee, years, rating, reviews) in enumerate(profiles):
+            lawyer = User.objects.create_user(
+                email=f'lawyer{index}@example.com', name=f'Lawyer {index}', password='secret-pass', is_lawyer=True,
+            )
+            if fee is not None:
+                LawyerKYC.objects.create(
+                    user=lawyer, full_name=lawyer.name, email=lawyer.email, phone='9800000000',
+                    dob=date(1980, 1, 1), permanent_address='-', current_address='-',
+                    bar_council_number=f'BAR-{index}', years_of_experience=f'{years} years',
+                    experience_years=years, consultation_fee=fee, specializations=['Civil Law'],
+                    status=LawyerKYC.KYCStatus.APPROVED,
+                )
+            if rating is not None:
+                LawyerRatingStats.objects.create(
+                    lawyer=lawyer, review_count=reviews, rating_sum=int(rating * reviews), average_rating=rating,
+                )
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def test_pages_cover_every_ordering_in_order(self):
+        for ordering in LAWYER_ORDERINGS:
+            with self.subTest(ordering=ordering):
+                expected = [lawyer.id for lawyer in search_lawyers({}, ordering)]
+                seen, cursor = [], None
+                while True:
+                    rows, cursor = lawyer_page({}, ordering, cursor=cursor, limit=2)
+                    seen += [lawyer.id for lawyer in rows]
+                    if cursor is None:
+                        break
+                self.assertEqual(seen, expected)
+                self.assertEqual(len(seen), 7)
+
+    def test_endpoint_returns_one_page_with_cursor(self):
+        response = self.api.get('/api/kyc/verified-lawyers/', {'ordering': 'fee_low', 'limit': 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next_cursor'])
+
+        following = self.api.get(
+            '/api/kyc/verified-lawyers/',
+            {'ordering': 'fee_low', 'limit': 3, 'cursor': response.data['next_cursor']},
+        )
+        ids = [lawyer['id'] for lawyer in response.data['results'] + following.data['results']]
+        self.assertEqual(ids, [lawyer.id for lawyer in search_lawyers({}, 'fee_low')[:6]])
+
+    def test_page_is_one_query_with_related_rows(self):
+        cursor = lawyer_page({}, 'rating', limit=2)[1]
+
+        with self.assertNumQueries(1):
+            rows, _ = lawyer_page({}, 'rating', cursor=cursor, limit=5)
+            for lawyer in rows:
+                getattr(lawyer, 'lawyer_kyc', None)
+                getattr(lawyer, 'rating_stats', None)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.api.get('/api/kyc/verified-lawyers/', {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'Invalid cursor'})
+
+
+class LawyerResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['responses'].clear()
+        self.api = APIClient()
+        self.lawyer = User.objects.create_user(
+            email='lawyer@example.com', name='Ram', password='secret-pass', is_lawyer=True,
+        )
+        self.kyc = LawyerKYC.objects.create(
+            user=self.lawyer, full_name='Ram', email=self.lawyer.email, phone='9800000000',
+            dob=date(1980, 1, 1), permanent_address='-', current_address='-',
+            bar_council_number='BAR-1', years_of_experience='5 years', experience_years=5,
+            consultation_fee=Decimal('1000'), specializations=['Civil Law'],
+            status=LawyerKYC.KYCStatus.APPROVED,
+        )
+        self.detail_url = f'/api/kyc/lawyer/{self.lawyer.id}/'
+
+    def get(self, url):
+        response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.assertEqual(self.get(self.detail_url)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(self.detail_url)['X-Cache'], 'HIT')
+
+    def test_kyc_write_invalidates_directory_and_detail(self):
+        self.get(self.detail_url)
+        self.get('/api/kyc/verified-lawyers/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kyc.consultation_fee = Decimal('2500')
+            self.kyc.save()
+
+        detail = self.get(self.detail_url)
+        directory = self.get('/api/kyc/verified-lawyers/')
+        self.assertEqual((detail['X-Cache'], directory['X-Cache']), ('MISS', 'MISS'))
+        self.assertEqual(Decimal(str(detail.data['consultation_fee'])), Decimal('2500'))
+        self.assertEqual(Decimal(str(directory.data['results'][0]['consultation_fee'])), Decimal('2500'))
+
+    def test_profile_write_invalidates_directory_and_detail(self):
+        self.get(self.detail_url)
+        self.get('/api/kyc/verified-lawyers/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lawyer.name = 'Ram Sharma'
+            self.lawyer.save()
+
+        self.assertEqual(self.get(self.detail_url).data['name'], 'Ram Sharma')
+        self.assertEqual(self.get('/api/kyc/verified-lawyers/').data['results'][0]['name'], 'Ram Sharma')
+
+    def test_versions_live_where_every_worker_reads_them(self):
+        version = get_version(LAWYER_DIRECTORY)
 
-# Create your tests here.
+        self.assertEqual(caches[settings.VERSION_CACHE_ALIAS].get(f'version:{LAWYER_DIRECTORY}'), version)
+        if not settings.REDIS_URL:
+            self.assertEqual(settings.VERSION_CACHE_ALIAS, 'responses')
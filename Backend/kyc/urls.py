@@ -4,16 +4,20 @@ from .views import (
     MyKYCView,
     UpdateKYCView,
     KYCStatusView,
+    KYCUploadSignView,
     AdminKYCListView,
     AdminKYCDetailView,
     AdminKYCReviewView,
     VerifiedLawyersListView,
-    LawyerDetailView
+    LawyerFacetsView,
+    LawyerDetailView,
+    ResponseCacheStatsView,
 )
 
 urlpatterns = [
     # Public endpoints
     path('verified-lawyers/', VerifiedLawyersListView.as_view(), name='verified-lawyers'),
+    path('verified-lawyers/facets/', LawyerFacetsView.as_view(), name='verified-lawyers-facets'),
     path('lawyer/<int:id>/', LawyerDetailView.as_view(), name='lawyer-detail'),
     
     # Lawyer endpoints
@@ -21,9 +25,11 @@ urlpatterns = [
     path('my-kyc/', MyKYCView.as_view(), name='my-kyc'),
     path('update/', UpdateKYCView.as_view(), name='kyc-update'),
     path('status/', KYCStatusView.as_view(), name='kyc-status'),
+    path('upload/sign/', KYCUploadSignView.as_view(), name='kyc-upload-sign'),
     
     # Admin endpoints
     path('admin/list/', AdminKYCListView.as_view(), name='admin-kyc-list'),
     path('admin/detail/<int:id>/', AdminKYCDetailView.as_view(), name='admin-kyc-detail'),
     path('admin/review/<int:id>/', AdminKYCReviewView.as_view(), name='admin-kyc-review'),
+    path('admin/response-cache/', ResponseCacheStatsView.as_view(), name='admin-response-cache'),
 ]
@@ -8,14 +8,28 @@ from django.shortcuts import get_object_or_404
 from .models import LawyerKYC
 from authentication.models import User
 from .serializers import (
+    KYC_DOCUMENT_UPLOADS,
     LawyerKYCSerializer, 
     KYCStatusSerializer, 
     AdminKYCReviewSerializer,
     LawyerDirectorySerializer
 )
 from .permissions import IsLawyer, IsOwnerOrAdmin, IsAdminReviewer
+from .search import (
+    DEFAULT_ORDERING,
+    LAWYER_ORDERINGS,
+    lawyer_facets,
+    lawyer_page,
+    parse_lawyer_filters,
+    parse_lawyer_ordering,
+)
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from meronaya.conditional import ConditionalGetMixin
+from meronaya.direct_uploads import declared_file, issue_upload
+from meronaya.pagination import parse_page_size
+from meronaya.response_cache import CachedResponseMixin, cache_stats, reset_cache_stats
+from meronaya.versions import LAWYER_DIRECTORY, get_version, lawyer_profile
 from notification.utils import notify_admins, send_notification
 
 
@@ -105,6 +119,28 @@ class UpdateKYCView(generics.UpdateAPIView):
         )
 
 
+class KYCUploadSignView(APIView):
+    """
+    POST /api/kyc/upload/sign/
+    Body: {field, file_name, file_size}
+    Issue a direct-to-storage upload for one KYC document. Submit or update
+    the KYC with the returned ticket as `<field>_ticket`.
+    """
+    permission_classes = [IsAuthenticated, IsLawyer]
+    parser_classes = [JSONParser]
+
+    def post(self, request):
+        target = KYC_DOCUMENT_UPLOADS.get(request.data.get('field'))
+        if target is None:
+            return Response(
+                {'error': f"field must be one of: {', '.join(KYC_DOCUMENT_UPLOADS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_name, file_size = declared_file(request.data)
+        return Response(issue_upload(request, target, file_name, file_size, scope='kyc'))
+
+
 class KYCStatusView(APIView):
     """
     GET /api/kyc/status/
@@ -204,58 +240,127 @@ class AdminKYCReviewView(generics.UpdateAPIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class LawyerDetailView(generics.RetrieveAPIView):
+class LawyerDirectoryCacheMixin(ConditionalGetMixin, CachedResponseMixin):
+    """
+    Directory responses change only through lawyer profile, KYC or rating
+    writes, which bump the version counters named by get_cache_versions.
+    Those versions back both the ETag and the shared response cache; the
+    URL with its query string is already part of each.
+    """
+
+    def get_cache_versions(self, request, *args, **kwargs):
+        return [LAWYER_DIRECTORY]
+
+    def get_etag_parts(self, request, *args, **kwargs):
+        versions = self.get_cache_versions(request, *args, **kwargs)
+        return [get_version(name) for name in versions]
+
+
+class LawyerDetailView(LawyerDirectoryCacheMixin, generics.RetrieveAPIView):
     """
     GET /api/kyc/lawyer/<id>/
     Public endpoint to get a single lawyer's detailed profile
     """
     serializer_class = LawyerDirectorySerializer
     permission_classes = [AllowAny]
-    queryset = User.objects.filter(is_lawyer=True).select_related('lawyer_kyc')
+    queryset = User.objects.filter(is_lawyer=True).select_related('lawyer_kyc', 'rating_stats')
     lookup_field = 'id'
+    response_cache_name = 'lawyer_detail'
+
+    def get_cache_versions(self, request, *args, **kwargs):
+        return [lawyer_profile(kwargs['id'])]
+
 
+LAWYER_SEARCH_PARAMETERS = [
+    openapi.Parameter('search', openapi.IN_QUERY, description="Search by lawyer name", type=openapi.TYPE_STRING),
+    openapi.Parameter('specialization', openapi.IN_QUERY, description="Filter by specialization (exact value)", type=openapi.TYPE_STRING),
+    openapi.Parameter('city', openapi.IN_QUERY, description="Filter by city/location", type=openapi.TYPE_STRING),
+    openapi.Parameter('min_experience', openapi.IN_QUERY, description="Minimum years of experience", type=openapi.TYPE_INTEGER),
+    openapi.Parameter('max_fee', openapi.IN_QUERY, description="Maximum consultation fee", type=openapi.TYPE_NUMBER),
+]
 
-class VerifiedLawyersListView(generics.ListAPIView):
+
+class VerifiedLawyersListView(LawyerDirectoryCacheMixin, generics.ListAPIView):
     """
     GET /api/kyc/verified-lawyers/
-    Public endpoint to get all lawyers with profile + optional KYC details
+    Public endpoint to page through lawyers with profile + optional KYC details
     """
     serializer_class = LawyerDirectorySerializer
     permission_classes = [AllowAny]
-    queryset = User.objects.filter(is_lawyer=True).select_related('lawyer_kyc').order_by('-date_joined')
+    queryset = User.objects.filter(is_lawyer=True).select_related('lawyer_kyc', 'rating_stats')
+    response_cache_name = 'verified_lawyers'
     
     @swagger_auto_schema(
         operation_description="Get all verified lawyers for public view",
-        manual_parameters=[
-            openapi.Parameter('specialization', openapi.IN_QUERY, description="Filter by specialization", type=openapi.TYPE_STRING),
-            openapi.Parameter('city', openapi.IN_QUERY, description="Filter by city/location", type=openapi.TYPE_STRING),
-            openapi.Parameter('min_experience', openapi.IN_QUERY, description="Minimum years of experience", type=openapi.TYPE_INTEGER),
-            openapi.Parameter('max_fee', openapi.IN_QUERY, description="Maximum consultation fee", type=openapi.TYPE_NUMBER),
+        manual_parameters=LAWYER_SEARCH_PARAMETERS + [
+            openapi.Parameter(
+                'ordering', openapi.IN_QUERY,
+                description=f"Sort order: {', '.join(LAWYER_ORDERINGS)} (default {DEFAULT_ORDERING})",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="next_cursor from the previous page", type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Lawyers per page (default 50, max 200)", type=openapi.TYPE_INTEGER),
         ],
-        responses={200: LawyerDirectorySerializer(many=True)},
+        responses={200: "Page of lawyers with next_cursor", 400: "Invalid filter or cursor"},
     )
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
-        # Filter by specialization (KYC-based)
-        specialization = request.query_params.get('specialization', None)
-        if specialization:
-            queryset = queryset.filter(lawyer_kyc__specializations__icontains=specialization)
-        
-        # Filter by city
-        city = request.query_params.get('city', None)
-        if city:
-            queryset = queryset.filter(city__icontains=city)
-        
-        # Filter by minimum experience
-        min_experience = request.query_params.get('min_experience', None)
-        if min_experience:
-            queryset = queryset.filter(lawyer_kyc__years_of_experience__gte=int(min_experience))
-        
-        # Filter by maximum fee
-        max_fee = request.query_params.get('max_fee', None)
-        if max_fee:
-            queryset = queryset.filter(lawyer_kyc__consultation_fee__lte=float(max_fee))
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            filters = parse_lawyer_filters(request.query_params)
+            ordering = parse_lawyer_ordering(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows, next_cursor = lawyer_page(
+                filters, ordering,
+                cursor=request.query_params.get('cursor'),
+                limit=parse_page_size(request.query_params.get('limit')),
+            )
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(rows, many=True)
+        return Response({'results': serializer.data, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+
+
+class LawyerFacetsView(APIView):
+    """
+    GET /api/kyc/verified-lawyers/facets/
+    Public endpoint returning match counts per specialization and city for the directory filters
+    """
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Count matching lawyers for the given directory filters, broken down by "
+            "specialization and city. Each breakdown ignores its own filter."
+        ),
+        manual_parameters=LAWYER_SEARCH_PARAMETERS,
+        responses={200: "Facet counts", 400: "Invalid filter"},
+    )
+    def get(self, request):
+        try:
+            filters = parse_lawyer_filters(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(lawyer_facets(filters), status=status.HTTP_200_OK)
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    GET /api/kyc/admin/response-cache/
+    DELETE /api/kyc/admin/response-cache/
+    Admin endpoint reporting hits and misses of the public response cache per view; DELETE resets the counters
+    """
+    permission_classes = [IsAuthenticated, IsAdminReviewer]
+
+    def get(self, request):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        reset_cache_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
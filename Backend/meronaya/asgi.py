@@ -12,6 +12,7 @@ django_asgi_app = get_asgi_application()
 # Import routing modules AFTER Django is initialized
 from notification.routing import websocket_urlpatterns as notification_urlpatterns
 from chat.routing import websocket_urlpatterns as chat_urlpatterns
+from authentication.middleware import JWTAuthMiddleware
 
 # Combine WebSocket URL patterns from all apps
 all_websocket_urlpatterns = notification_urlpatterns + chat_urlpatterns
@@ -20,8 +21,10 @@ application = ProtocolTypeRouter({
     # Standard HTTP requests are handled by Django as usual
     'http': django_asgi_app,
 
-    # WebSocket connections are routed based on URL patterns
+    # WebSocket connections are authenticated once, then routed based on URL patterns
     'websocket': AllowedHostsOriginValidator(
-        URLRouter(all_websocket_urlpatterns)
+        JWTAuthMiddleware(
+            URLRouter(all_websocket_urlpatterns)
+        )
     ),
 })
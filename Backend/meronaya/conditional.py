@@ -0,0 +1,94 @@
+"""
+Conditional GET (ETag / If-None-Match) for DRF views.
+
+A view supplies cheap validator parts, such as MAX(updated_at) and COUNT(*)
+aggregates or counters from meronaya.versions, computed without serializing
+anything. If the client's If-None-Match matches the resulting ETag, a 304 is
+returned before the view body runs. Otherwise the normal response is sent
+with the ETag attached. Browsers revalidate such responses on their own, so
+polling clients need no changes.
+
+Class-based views use ConditionalGetMixin and implement get_etag_parts().
+Function views use the @conditional_get(parts_func) decorator below @api_view.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(request, parts):
+    """Quoted ETag for the validator parts, scoped to the user, URL and format."""
+    accepted = getattr(request, 'accepted_renderer', None)
+    scope = [
+        getattr(request.user, 'pk', None),
+        accepted.format if accepted else '',
+        request.get_full_path(),
+    ]
+    digest = hashlib.sha1('|'.join(str(part) for part in [*scope, *parts]).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    candidates = {tag.removeprefix('W/') for tag in parse_etags(header)}
+    return '*' in candidates or etag in candidates
+
+
+def respond_conditionally(request, parts, render):
+    """
+    Return a 304 when the validator matches, otherwise render().
+    `parts` of None disables the check, e.g. when the object does not exist.
+    """
+    if parts is None:
+        return render()
+
+    etag = make_etag(request, parts)
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = render()
+
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        # Always revalidate; responses are per user
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """Adds ETag / 304 handling to a view's GET; see module docstring."""
+
+    def get_etag_parts(self, request, *args, **kwargs):
+        """Return a list of cheap validator values, or None to skip the check."""
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        return respond_conditionally(
+            request,
+            self.get_etag_parts(request, *args, **kwargs),
+            lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs),
+        )
+
+
+def conditional_get(parts_func):
+    """Decorator form of ConditionalGetMixin for @api_view functions."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            return respond_conditionally(
+                request,
+                parts_func(request, *args, **kwargs),
+                lambda: view(request, *args, **kwargs),
+            )
+        return wrapped
+    return decorator
@@ -0,0 +1,211 @@
+"""
+Direct-to-storage uploads.
+
+Files skip the Daphne workers in three steps:
+
+1. The API issues an upload. `issue_upload` checks the declared name and
+   size, picks the stored name and returns the URL and form fields the
+   browser POSTs the file to (as multipart, file in `file`), plus a signed
+   ticket.
+2. The browser uploads straight to storage with a Cloudinary signed upload.
+   The signed `allowed_formats` lists the target's extensions, so storage
+   refuses a file of any other format, whatever name was declared.
+3. The client hands the ticket to a confirm endpoint, which calls
+   `confirm_upload`. The ticket must be fresh and issued to this user for
+   this target and scope. The stored object's real size is checked before
+   any row references it, and oversized objects are deleted.
+
+MEDIA_STORAGE=local replaces Cloudinary with LocalUploadView. It accepts
+the same signed form and writes into the local storage stand-in, so tests
+exercise the whole contract.
+"""
+
+import os
+import secrets
+import time
+from dataclasses import dataclass
+
+import cloudinary.utils
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from rest_framework import serializers, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+_TICKET_SALT = 'meronaya.direct_uploads'
+
+
+@dataclass(frozen=True)
+class UploadTarget:
+    """A model file field that accepts direct uploads, with its limits."""
+    name: str
+    model: type
+    field_name: str
+    extensions: frozenset
+    max_size: int
+
+    @property
+    def field(self):
+        return self.model._meta.get_field(self.field_name)
+
+
+def _extension(file_name):
+    return os.path.splitext(file_name)[1].lstrip('.').lower()
+
+
+def declared_file(data):
+    """The `file_name` and `file_size` a client declares before uploading."""
+    file_name = str(data.get('file_name') or '').strip()
+    if not file_name:
+        raise serializers.ValidationError({'file_name': "This field is required."})
+    try:
+        file_size = int(data.get('file_size'))
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({'file_size': "File size must be a positive number of bytes."})
+    return file_name, file_size
+
+
+def _check_declared(target, file_name, file_size):
+    if _extension(file_name) not in target.extensions:
+        allowed = ', '.join(sorted(target.extensions))
+        raise serializers.ValidationError({'file_name': f"Allowed file types: {allowed}"})
+    if file_size <= 0:
+        raise serializers.ValidationError({'file_size': "File size must be a positive number of bytes."})
+    if file_size > target.max_size:
+        raise serializers.ValidationError(
+            {'file_size': f"File must be under {target.max_size // (1024 * 1024)}MB"}
+        )
+
+
+def _stored_name(target, file_name):
+    """Unique storage name under the field's upload_to, shaped like the storage's own names."""
+    field = target.field
+    base, extension = os.path.splitext(field.generate_filename(None, file_name))
+    name = f"{base}_{secrets.token_hex(4)}"
+    # Cloudinary keeps the extension in public ids of raw files only
+    if getattr(field.storage, 'RESOURCE_TYPE', 'raw') == 'raw':
+        name += extension.lower()
+    return name
+
+
+def _sign(params):
+    if settings.MEDIA_STORAGE == 'local':
+        return cloudinary.utils.api_sign_request(params, settings.SECRET_KEY)
+    return cloudinary.utils.api_sign_request(params, settings.CLOUDINARY_API_SECRET)
+
+
+def issue_upload(request, target, file_name, file_size, scope=''):
+    """
+    Upload parameters for one file. `scope` binds the ticket to the object
+    the file is for, e.g. "case:12", and must match on confirm.
+    Raises ValidationError when the declared file is not acceptable.
+    """
+    _check_declared(target, file_name, file_size)
+
+    name = _stored_name(target, file_name)
+    params = {
+        'public_id': name,
+        'timestamp': int(time.time()),
+        'allowed_formats': ','.join(sorted(target.extensions)),
+    }
+
+    if settings.MEDIA_STORAGE == 'local':
+        upload_url = request.build_absolute_uri(reverse('direct-upload-local'))
+        fields = {**params, 'signature': _sign(params)}
+    else:
+        upload_url = cloudinary.utils.cloudinary_api_url(
+            'upload', resource_type=target.field.storage.RESOURCE_TYPE,
+        )
+        fields = {**params, 'api_key': settings.CLOUDINARY_API_KEY, 'signature': _sign(params)}
+
+    ticket = signing.dumps(
+        {'target': target.name, 'name': name, 'file_name': file_name, 'user': request.user.id, 'scope': scope},
+        salt=_TICKET_SALT,
+    )
+    return {
+        'upload_url': upload_url,
+        'fields': fields,
+        'ticket': ticket,
+        'expires_in': settings.DIRECT_UPLOAD_TTL,
+    }
+
+
+def confirm_upload(request, target, ticket, scope=''):
+    """
+    Check an uploaded file and return {'name', 'file_name', 'size'}.
+    Raises ValidationError for bad, expired or foreign tickets and for
+    files that are missing or too large.
+    """
+    try:
+        data = signing.loads(ticket, salt=_TICKET_SALT, max_age=settings.DIRECT_UPLOAD_TTL)
+    except signing.SignatureExpired:
+        raise serializers.ValidationError({'ticket': "Upload ticket has expired."})
+    except signing.BadSignature:
+        raise serializers.ValidationError({'ticket': "Invalid upload ticket."})
+
+    if data['target'] != target.name or data['user'] != request.user.id or data['scope'] != scope:
+        raise serializers.ValidationError({'ticket': "Upload ticket was issued for something else."})
+
+    name = data['name']
+    if target.model.objects.filter(**{target.field_name: name}).exists():
+        raise serializers.ValidationError({'ticket': "Upload was already confirmed."})
+
+    storage = target.field.storage
+    try:
+        size = storage.size(name)
+    except OSError:
+        size = None
+    if size is None:
+        raise serializers.ValidationError({'ticket': "File has not been uploaded."})
+
+    # Storage enforced the signed allowed_formats; the size is only known now
+    if size > target.max_size:
+        storage.delete(name)
+        raise serializers.ValidationError(
+            {'ticket': f"File must be under {target.max_size // (1024 * 1024)}MB"}
+        )
+
+    return {'name': name, 'file_name': data['file_name'], 'size': size}
+
+
+class LocalUploadView(APIView):
+    """
+    POST /api/uploads/local/
+    Stand-in for the storage's signed upload endpoint when MEDIA_STORAGE=local.
+    Accepts the fields from issue_upload plus `file`, like Cloudinary does,
+    and checks the file's extension against `allowed_formats`.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        file = request.FILES.get('file')
+        name = request.data.get('public_id', '')
+        timestamp = request.data.get('timestamp', '')
+        allowed_formats = request.data.get('allowed_formats', '')
+        signature = request.data.get('signature', '')
+
+        params = {'public_id': name, 'timestamp': timestamp, 'allowed_formats': allowed_formats}
+        if not file or not constant_time_compare(signature, _sign(params)):
+            return Response({'error': {'message': 'Invalid signature'}}, status=status.HTTP_401_UNAUTHORIZED)
+        if not timestamp.isdigit() or time.time() - int(timestamp) > settings.DIRECT_UPLOAD_TTL:
+            return Response({'error': {'message': 'Stale request'}}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = _extension(file.name)
+        if file_format not in allowed_formats.split(','):
+            return Response(
+                {'error': {'message': f'File format {file_format} not allowed'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if default_storage.exists(name):
+            return Response({'error': {'message': 'Already uploaded'}}, status=status.HTTP_409_CONFLICT)
+        default_storage.save(name, file)
+
+        return Response({'public_id': name, 'bytes': file.size}, status=status.HTTP_200_OK)
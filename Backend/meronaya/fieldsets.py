@@ -0,0 +1,62 @@
+"""
+Sparse fieldsets for list serializers.
+
+A serializer using SparseFieldsetMixin reads two optional query parameters:
+
+    ?fields=id,case_title,status   only these fields
+    ?expand=documents,timeline     add these expandable (nested) fields
+
+Fields listed in Meta.expandable_fields are expensive nested collections.
+They are always included when neither parameter is given, so existing
+clients keep the full representation. Once either parameter is present they
+are included only when named.
+"""
+
+from rest_framework.exceptions import ValidationError
+
+
+def _split(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def selected_fields(request, serializer_class):
+    """
+    Return the set of field names the request selects from serializer_class,
+    or None when it selects the full representation.
+    Raises ValidationError for unknown field names.
+    """
+    if request is None:
+        return None
+
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+
+    all_fields = set(serializer_class.Meta.fields)
+    expandable = set(getattr(serializer_class.Meta, 'expandable_fields', ()))
+
+    expand = _split(params.get('expand', ''))
+    unknown_expand = expand - expandable
+    if unknown_expand:
+        raise ValidationError({'expand': f"Unknown expandable fields: {', '.join(sorted(unknown_expand))}."})
+
+    if 'fields' in params:
+        fields = _split(params['fields'])
+        unknown = fields - all_fields
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}."})
+    else:
+        fields = all_fields - expandable
+
+    return fields | expand
+
+
+class SparseFieldsetMixin:
+    """Drop the fields the request did not select (see module docstring)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = selected_fields(self.context.get('request'), type(self))
+        if selected is not None:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
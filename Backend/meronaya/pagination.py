@@ -0,0 +1,89 @@
+"""
+Cursor (keyset) pagination shared by list endpoints.
+
+Rows are ordered by a timestamp column and the primary key. A cursor is an
+opaque token encoding one row's position, so deep pages cost the same as the
+first one instead of OFFSET-scanning every earlier row. Payment histories
+and the public case feed list rows newest first on (created_at, pk) with
+`fetch_page`; chat history pages both ways on (timestamp, id) with the
+cursor helpers (see chat/history.py).
+"""
+
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# Rows per page by default
+DEFAULT_PAGE_SIZE = 50
+
+# Upper bound on a client-requested page size
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(obj, field='created_at'):
+    """Encode a row's (field, pk) position as an opaque cursor."""
+    raw = f"{getattr(obj, field).isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, model):
+    """
+    Decode a cursor back into a (datetime, pk) tuple, with pk converted to
+    the model's primary key type.
+
+    Raises ValueError when the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value_str, pk = raw.rsplit('|', 1)
+        value = parse_datetime(value_str)
+        pk = model._meta.pk.to_python(pk)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if value is None or pk in (None, ''):
+        raise ValueError("Invalid cursor")
+
+    return value, pk
+
+
+def beyond_cursor(cursor, model, field='created_at', newer=False):
+    """
+    Q matching rows strictly older than the cursor's position, or strictly
+    newer with newer=True.
+
+    Raises ValueError when the cursor is malformed.
+    """
+    value, pk = decode_cursor(cursor, model)
+    lookup = 'gt' if newer else 'lt'
+    return Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk})
+
+
+def parse_page_size(value):
+    """Clamp a client-supplied page size to [1, MAX_PAGE_SIZE]."""
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def fetch_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of rows, newest first, using keyset pagination on
+    (created_at, pk). Returns (rows, next_cursor); next_cursor is None on
+    the last page.
+
+    Raises ValueError when the cursor is malformed.
+    """
+    if cursor:
+        queryset = queryset.filter(beyond_cursor(cursor, queryset.model))
+
+    rows = list(queryset.order_by('-created_at', '-pk')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]) if has_more else None
@@ -0,0 +1,146 @@
+"""
+Shared cache for public GET responses.
+
+Entries live in the 'responses' cache alias (RESPONSE_CACHE_BACKEND: locmem,
+file or redis). Each key is built from the view, the current values of the
+version counters the response depends on, the host, the path with its query
+string and the renderer format. Writers bump those versions (see
+meronaya.versions), so one change makes every dependent entry unreachable
+and the stale entries expire after RESPONSE_CACHE_TTL. Only 200 responses
+are stored. Hits and misses are counted per view (cache_stats) and each
+response carries an X-Cache: HIT or MISS header.
+
+Generic views use CachedResponseMixin, set response_cache_name and implement
+get_cache_versions(). Views that define get() themselves decorate it with
+@cache_get(name, versions_func) instead.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versions import get_version
+
+
+_STATS_KEY = 'response_cache:stats:{name}:{outcome}'
+
+# response_cache_name of every view using the cache
+_VIEW_NAMES = set()
+
+
+def _cache():
+    return caches['responses']
+
+
+def _count(name, outcome):
+    key = _STATS_KEY.format(name=name, outcome=outcome)
+    cache = _cache()
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def _key(request, name, versions):
+    accepted = getattr(request, 'accepted_renderer', None)
+    parts = [
+        name,
+        *(f"{version}={get_version(version)}" for version in versions),
+        request.get_host(),
+        request.get_full_path(),
+        accepted.format if accepted else '',
+    ]
+    return 'response:' + hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def cached_response(request, name, versions, render):
+    """
+    Serve the response from the cache, or render() and store it.
+    `versions` of None bypasses the cache, e.g. for malformed parameters.
+    """
+    if versions is None:
+        return render()
+
+    cache = _cache()
+    key = _key(request, name, versions)
+    data = cache.get(key)
+    if data is not None:
+        _count(name, 'hits')
+        response = Response(data, status=status.HTTP_200_OK)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count(name, 'misses')
+    response = render()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TTL)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_stats():
+    """{view name: {'hits', 'misses', 'hit_rate'}} since the last reset."""
+    keys = {
+        (name, outcome): _STATS_KEY.format(name=name, outcome=outcome)
+        for name in _VIEW_NAMES for outcome in ('hits', 'misses')
+    }
+    values = _cache().get_many(keys.values())
+    stats = {}
+    for name in sorted(_VIEW_NAMES):
+        hits = values.get(keys[name, 'hits'], 0)
+        misses = values.get(keys[name, 'misses'], 0)
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return stats
+
+
+def reset_cache_stats():
+    _cache().delete_many([
+        _STATS_KEY.format(name=name, outcome=outcome)
+        for name in _VIEW_NAMES for outcome in ('hits', 'misses')
+    ])
+
+
+class CachedResponseMixin:
+    """Serve GET from the shared response cache; see module docstring."""
+
+    response_cache_name = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get('response_cache_name'):
+            _VIEW_NAMES.add(cls.response_cache_name)
+
+    def get_cache_versions(self, request, *args, **kwargs):
+        """Return the version names the response depends on, or None to bypass the cache."""
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        return cached_response(
+            request,
+            self.response_cache_name,
+            self.get_cache_versions(request, *args, **kwargs),
+            lambda: super(CachedResponseMixin, self).get(request, *args, **kwargs),
+        )
+
+
+def cache_get(name, versions_func):
+    """Decorator form of CachedResponseMixin for a view's own get() method."""
+    _VIEW_NAMES.add(name)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapped(view, request, *args, **kwargs):
+            return cached_response(
+                request,
+                name,
+                versions_func(request, *args, **kwargs),
+                lambda: method(view, request, *args, **kwargs),
+            )
+        return wrapped
+    return decorator
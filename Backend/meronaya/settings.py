@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/6.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
+import sys
 from datetime import timedelta
 from decimal import Decimal
 from pathlib import Path
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
 
     # Third party apps
@@ -110,13 +112,103 @@ TEMPLATES = [
 WSGI_APPLICATION = 'meronaya.wsgi.application'
 ASGI_APPLICATION  = 'meronaya.asgi.application'
 
-# Channel layer — InMemoryChannelLayer is fine for development.
-# Switch to channels_redis for production.
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+# Channel layer — set REDIS_URL to share groups across multiple Daphne workers.
+# Without it, InMemoryChannelLayer is used (single process, development only).
+REDIS_URL = config('REDIS_URL', default='').strip()
+
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [REDIS_URL],
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
+
+# Cache — shared through Redis when REDIS_URL is set, otherwise per-process memory.
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Shared cache for public lawyer directory and review responses: locmem, file or redis
+RESPONSE_CACHE_BACKEND = config('RESPONSE_CACHE_BACKEND', default='redis' if REDIS_URL else 'locmem')
+_RESPONSE_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'responses'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/var/tmp/meronaya_responses'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', REDIS_URL),
+}
+CACHES['responses'] = {
+    'BACKEND': _RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE_BACKEND][0],
+    'LOCATION': config('RESPONSE_CACHE_LOCATION', default=_RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE_BACKEND][1]),
 }
+# Cache holding the version counters (meronaya/versions.py) that invalidate cached
+# responses and ETags. A bump must reach every worker serving those responses, so
+# without Redis the counters live in the response cache, shared by workers when it
+# is the file backend.
+VERSION_CACHE_ALIAS = 'default' if REDIS_URL else 'responses'
+# Seconds a cached response is kept; writes invalidate it sooner
+RESPONSE_CACHE_TTL = config('RESPONSE_CACHE_TTL', default=300, cast=int)
+
+# Seconds WebSocket auth caches (user rows, chat pair authorization) are kept
+WS_AUTH_CACHE_TTL = config('WS_AUTH_CACHE_TTL', default=60, cast=int)
+
+# Chat presence store — must be shared (Redis) when running more than one worker.
+PRESENCE_STORE = config(
+    'PRESENCE_STORE',
+    default='chat.presence.RedisPresenceStore' if REDIS_URL else 'chat.presence.InMemoryPresenceStore',
+)
+# Seconds a connection stays online without a heartbeat
+PRESENCE_TTL_SECONDS = config('PRESENCE_TTL_SECONDS', default=60, cast=int)
+# Seconds between heartbeats sent by each open chat connection
+PRESENCE_HEARTBEAT_SECONDS = config('PRESENCE_HEARTBEAT_SECONDS', default=20, cast=int)
+
+
+# Voice message processing (see chat/media.py) — 'async' transcodes in a
+# worker pool after commit; 'sync' runs inline after commit (tests).
+VOICE_PROCESSING_MODE = config('VOICE_PROCESSING_MODE', default='async')
+VOICE_WORKERS = config('VOICE_WORKERS', default=2, cast=int)
+FFMPEG_BINARY = config('FFMPEG_BINARY', default='ffmpeg')
+VOICE_OPUS_BITRATE = config('VOICE_OPUS_BITRATE', default='24k')
+# Peak levels kept per voice message for the waveform preview
+VOICE_WAVEFORM_BARS = config('VOICE_WAVEFORM_BARS', default=64, cast=int)
+# Seconds one ffmpeg run may take before the job fails
+VOICE_PROCESSING_TIMEOUT = config('VOICE_PROCESSING_TIMEOUT', default=120, cast=int)
+
+
+# Avatar thumbnails (see authentication/avatars.py) — 'async' renders them in a
+# worker pool after commit; 'sync' renders inline after commit (tests).
+AVATAR_PROCESSING_MODE = config('AVATAR_PROCESSING_MODE', default='async')
+AVATAR_WORKERS = config('AVATAR_WORKERS', default=1, cast=int)
+
+
+# Notification delivery — 'async' queues notifications for a background worker
+# that batches inserts and WebSocket pushes; 'sync' delivers inline (tests).
+# The worker pushes from its own thread, which needs the Redis channel layer.
+NOTIFICATION_DELIVERY_MODE = config(
+    'NOTIFICATION_DELIVERY_MODE',
+    default='async' if REDIS_URL else 'sync',
+)
+# Maximum notifications persisted by one bulk_create
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=200, cast=int)
+# Seconds the worker waits to fill a batch after the first queued notification
+NOTIFICATION_FLUSH_INTERVAL = config('NOTIFICATION_FLUSH_INTERVAL', default=0.05, cast=float)
 
 
 # Database
@@ -228,15 +320,34 @@ CLOUDINARY_STORAGE = {
     'SECURE': True,
 }
 
+# 'cloudinary' in production. 'local' keeps every media file under MEDIA_ROOT as a
+# stand-in for tests and offline development (see meronaya/storage_backends.py),
+# and is the default under `manage.py test` so upload tests never reach Cloudinary.
+MEDIA_STORAGE = config('MEDIA_STORAGE', default='local' if sys.argv[1:2] == ['test'] else 'cloudinary')
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+if MEDIA_STORAGE == 'local':
+    # Only for the stand-in: Cloudinary storage uses MEDIA_URL as its public_id prefix
+    MEDIA_URL = '/media/'
+
 STORAGES = {
     'default': {
-        'BACKEND': 'cloudinary_storage.storage.MediaCloudinaryStorage',
+        'BACKEND': (
+            'django.core.files.storage.FileSystemStorage' if MEDIA_STORAGE == 'local'
+            else 'cloudinary_storage.storage.MediaCloudinaryStorage'
+        ),
     },
     'staticfiles': {
         'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage',
     },
 }
 
+# Max keep-alive connections to Cloudinary held by the document download proxy
+DOCUMENT_PROXY_POOL_SIZE = config('DOCUMENT_PROXY_POOL_SIZE', default=16, cast=int)
+# Threads per process sending uploaded case documents to storage concurrently
+CASE_UPLOAD_WORKERS = config('CASE_UPLOAD_WORKERS', default=4, cast=int)
+# Seconds a direct-to-storage upload ticket stays valid (see meronaya/direct_uploads.py)
+DIRECT_UPLOAD_TTL = config('DIRECT_UPLOAD_TTL', default=900, cast=int)
+
 BACKEND_URL = config('BACKEND_URL', default='http://127.0.0.1:8000')
 
 # # external setups
@@ -307,4 +418,32 @@ ESEWA_VERIFY_URL = config('ESEWA_STATUS_URL', default='https://uat.esewa.com.np/
 KHALTI_SECRET_KEY = config('KHALTI_SECRET_KEY', default='')
 KHALTI_BASE_URL = config('KHALTI_BASE_URL', default='https://dev.khalti.com/api/v2')
 KHALTI_RETURN_URL = config('KHALTI_RETURN_URL', default='http://localhost:5173/payment/khalti-success')
-KHALTI_WEBSITE_URL = config('KHALTI_WEBSITE_URL', default='http://localhost:5173/payment/khalti-success')
\ No newline at end of file
+KHALTI_WEBSITE_URL = config('KHALTI_WEBSITE_URL', default='http://localhost:5173/payment/khalti-success')
+
+# Payment gateway HTTP clients — keep-alive pool, timeouts, retries and circuit breaker per gateway
+PAYMENT_GATEWAY_CLIENTS = {
+    'esewa': {
+        'connect_timeout': config('ESEWA_CONNECT_TIMEOUT', default=5, cast=float),
+        'read_timeout': config('ESEWA_READ_TIMEOUT', default=15, cast=float),
+        'max_retries': config('ESEWA_MAX_RETRIES', default=2, cast=int),
+        'failure_threshold': config('ESEWA_CIRCUIT_FAILURES', default=5, cast=int),
+        'reset_timeout': config('ESEWA_CIRCUIT_RESET', default=30, cast=float),
+    },
+    'khalti': {
+        'connect_timeout': config('KHALTI_CONNECT_TIMEOUT', default=5, cast=float),
+        'read_timeout': config('KHALTI_READ_TIMEOUT', default=30, cast=float),
+        'max_retries': config('KHALTI_MAX_RETRIES', default=2, cast=int),
+        'failure_threshold': config('KHALTI_CIRCUIT_FAILURES', default=5, cast=int),
+        'reset_timeout': config('KHALTI_CIRCUIT_RESET', default=30, cast=float),
+    },
+}
+
+# How long a final verification outcome is replayed to duplicate gateway callbacks (seconds)
+PAYMENT_VERIFICATION_CACHE_TTL = config('PAYMENT_VERIFICATION_CACHE_TTL', default=600, cast=int)
+
+# Seconds a cached page of the public case feed is kept; changes invalidate it sooner
+CASE_FEED_CACHE_TTL = config('CASE_FEED_CACHE_TTL', default=300, cast=int)
+# Days of case feed change events kept for ?since= polling
+CASE_FEED_EVENT_RETENTION_DAYS = config('CASE_FEED_EVENT_RETENTION_DAYS', default=7, cast=int)
+# Seconds a gap in feed event ids is waited on before it is taken as a rolled-back write
+CASE_FEED_SETTLE_SECONDS = config('CASE_FEED_SETTLE_SECONDS', default=30, cast=int)
@@ -1,14 +1,22 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from cloudinary_storage.storage import (
     MediaCloudinaryStorage,
     RawMediaCloudinaryStorage,
     VideoMediaCloudinaryStorage,
 )
 
-# Image-only assets (profile photos, etc.)
-profile_image_storage = MediaCloudinaryStorage()
+if settings.MEDIA_STORAGE == 'local':
+    # Stand-in for tests and offline development: plain files under MEDIA_ROOT.
+    # Model fields record their storage in migrations, so never run
+    # makemigrations with MEDIA_STORAGE=local.
+    profile_image_storage = raw_file_storage = voice_audio_storage = FileSystemStorage()
+else:
+    # Image-only assets (profile photos, etc.)
+    profile_image_storage = MediaCloudinaryStorage()
 
-# Generic files (pdf/docs/kyc/case docs)
-raw_file_storage = RawMediaCloudinaryStorage()
+    # Generic files (pdf/docs/kyc/case docs)
+    raw_file_storage = RawMediaCloudinaryStorage()
 
-# Voice messages (webm/audio) are handled as video resource type in Cloudinary
-voice_audio_storage = VideoMediaCloudinaryStorage()
+    # Voice messages (webm/audio) are handled as video resource type in Cloudinary
+    voice_audio_storage = VideoMediaCloudinaryStorage()
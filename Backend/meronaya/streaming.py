@@ -0,0 +1,43 @@
+"""
+StreamingHttpResponse that really streams under both WSGI and ASGI.
+
+Django buffers a synchronous iterator completely before sending it under
+ASGI (Daphne in production), and an asynchronous one under WSGI. Passing
+the response through stream_response() gives Django the kind of iterator
+the current server consumes natively. Under ASGI the synchronous source is
+advanced one chunk at a time in the request's sync thread, so ORM
+server-side cursors stay on the connection that opened them.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+_DONE = object()
+
+
+async def _iterate_async(iterator):
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await next_chunk(iterator, _DONE)
+            if chunk is _DONE:
+                break
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def stream_response(request, chunks, **kwargs):
+    """
+    Build a StreamingHttpResponse around a synchronous iterable of chunks.
+    Extra keyword arguments are passed to StreamingHttpResponse.
+    """
+    # DRF wraps the Django request
+    django_request = getattr(request, "_request", request)
+    if isinstance(django_request, ASGIRequest):
+        chunks = _iterate_async(iter(chunks))
+    return StreamingHttpResponse(chunks, **kwargs)
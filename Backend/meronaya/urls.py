@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -50,3 +52,11 @@ urlpatterns = [
     path("api/chat/", include("chat.urls")),
     
 ]
+
+if settings.MEDIA_STORAGE == 'local':
+    from meronaya.direct_uploads import LocalUploadView
+
+    # Stand-in for the storage's signed upload endpoint
+    urlpatterns += [path("api/uploads/local/", LocalUploadView.as_view(), name='direct-upload-local')]
+    # Serves the local media stand-in; static() is a no-op unless DEBUG is on
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,59 @@
+"""
+Version counters for cached and conditional responses.
+
+A version is an integer kept under a name in the VERSION_CACHE_ALIAS cache.
+Writers bump it once their transaction commits. Readers fold it into cache
+keys and ETags, so a single bump invalidates everything derived from that
+data. The counters must be visible to every worker that serves those
+responses: that is Redis when REDIS_URL is set, otherwise the response
+cache itself, which workers share with RESPONSE_CACHE_BACKEND=file.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+# Public profile fields of any user (name, picture) shown next to cases and chats
+PROFILES = 'profiles'
+
+# Everything the public lawyer directory renders: lawyer profiles, KYC, ratings
+LAWYER_DIRECTORY = 'lawyer_directory'
+
+
+def lawyer_profile(lawyer_id):
+    """Version name for everything shown about one lawyer: profile, KYC, ratings, reviews."""
+    return f"lawyer:{lawyer_id}"
+
+
+def _key(name):
+    return f"version:{name}"
+
+
+def _cache():
+    return caches[settings.VERSION_CACHE_ALIAS]
+
+
+def get_version(name):
+    cache = _cache()
+    key = _key(name)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so a lost key never reuses an old version
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(name):
+    try:
+        _cache().incr(_key(name))
+    except ValueError:
+        get_version(name)
+
+
+def bump_version(name):
+    """Invalidate everything derived from `name` once the current transaction commits."""
+    transaction.on_commit(lambda: _bump(name))
@@ -1,10 +1,7 @@
 import json
-import jwt
-from urllib.parse import parse_qs
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.conf import settings
 
 from .models import Notification
 from .serializers import NotificationSerializer
@@ -17,10 +14,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     """
 
     async def connect(self):
-        # Authenticate the user from the JWT token passed as query param
-        self.user = await self.get_user_from_token()
+        # User is resolved from the JWT query param by JWTAuthMiddleware
+        self.user = self.scope.get('user')
 
-        if self.user is None:
+        if self.user is None or not self.user.is_authenticated:
             # Reject unauthenticated connections
             await self.close()
             return
@@ -96,27 +93,6 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     # ── Database helpers ──────────────────────────────────────────────────────
 
-    @database_sync_to_async
-    def get_user_from_token(self):
-        """Decode the JWT from the query string and return the user"""
-        from authentication.models import User
-
-        query_string = self.scope.get('query_string', b'').decode()
-        token = parse_qs(query_string).get('token', [None])[0]
-
-        if not token:
-            return None
-
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            user_id = payload.get('user_id')
-            if user_id is None:
-                return None
-
-            return User.objects.get(id=user_id)
-        except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, User.DoesNotExist, TypeError, ValueError):
-            return None
-
     @database_sync_to_async
     def get_unread_notifications(self):
         """Return unread notifications for this user as a list of dicts"""
@@ -0,0 +1,210 @@
+"""
+Background delivery pipeline for notifications.
+
+Request handlers only enqueue delivery jobs. A single background worker per
+process drains the queue in batches, persists each batch with one
+bulk_create and pushes the WebSocket payloads concurrently.
+
+settings.NOTIFICATION_DELIVERY_MODE selects the behaviour:
+- 'async' : enqueue and return immediately (default when REDIS_URL is set)
+- 'sync'  : deliver inline in the caller's thread (tests, single-process dev)
+"""
+
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class NotificationJob:
+    """One notification waiting to be persisted and pushed."""
+    user_id: int
+    title: str
+    message: str
+    notif_type: str = 'system'
+    link: Optional[str] = None
+
+
+async def _push_all(channel_layer, payloads):
+    """Send every payload to its user's group concurrently."""
+    results = await asyncio.gather(
+        *(
+            channel_layer.group_send(
+                f"notifications_{payload['user_id']}",
+                {
+                    'type': 'send_notification',   # maps to NotificationConsumer.send_notification
+                    'notification': payload['notification'],
+                }
+            )
+            for payload in payloads
+        ),
+        return_exceptions=True,
+    )
+    for payload, result in zip(payloads, results):
+        if isinstance(result, Exception):
+            logger.error(
+                "Failed to push notification via channel layer for user_id=%s",
+                payload['user_id'],
+                exc_info=result,
+            )
+
+
+def deliver_batch(jobs):
+    """
+    Persist a batch of jobs with one INSERT and push them over the channel layer.
+    Returns the created Notification instances.
+    """
+    if not jobs:
+        return []
+
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user_id=job.user_id,
+            title=job.title,
+            message=job.message,
+            notif_type=job.notif_type,
+            link=job.link,
+        )
+        for job in jobs
+    ])
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        logger.warning("Channel layer is not configured; %s notifications saved without realtime push", len(jobs))
+        return notifications
+
+    payloads = [
+        {'user_id': notification.user_id, 'notification': data}
+        for notification, data in zip(
+            notifications,
+            NotificationSerializer(notifications, many=True).data,
+        )
+    ]
+    try:
+        async_to_sync(_push_all)(channel_layer, payloads)
+    except Exception:
+        # Persisting DB notifications is primary; websocket is best-effort.
+        logger.exception("Failed to push %s notifications via channel layer", len(payloads))
+
+    return notifications
+
+
+class NotificationDispatcher:
+    """
+    Process-wide queue plus a lazily started daemon worker thread.
+
+    The worker collects up to `batch_size` jobs, waiting at most
+    `flush_interval` seconds after the first one, then delivers them together.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.NOTIFICATION_FLUSH_INTERVAL
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='notification-dispatcher',
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def enqueue(self, jobs):
+        """Queue jobs for background delivery."""
+        self._ensure_worker()
+        for job in jobs:
+            self.queue.put(job)
+
+    def _collect_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                close_old_connections()
+                deliver_batch(batch)
+            except Exception:
+                # A failed batch must never kill the worker.
+                logger.exception("Failed to deliver %s queued notifications", len(batch))
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self):
+        """Block until every queued job has been delivered."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Return the process-wide dispatcher, creating it on first use."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher()
+    return _dispatcher
+
+
+def submit(jobs):
+    """
+    Deliver jobs according to NOTIFICATION_DELIVERY_MODE.
+
+    In async mode, jobs are queued once the surrounding transaction commits,
+    so a rolled-back action never notifies anyone. In sync mode the created
+    Notification instances are returned.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    if settings.NOTIFICATION_DELIVERY_MODE == 'sync':
+        return deliver_batch(jobs)
+
+    transaction.on_commit(lambda: get_dispatcher().enqueue(jobs))
+    return []
+
+
+@atexit.register
+def _drain_on_exit():
+    if _dispatcher is not None:
+        _dispatcher.flush()
@@ -0,0 +1,193 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from case.models import Case
+from .delivery import NotificationDispatcher, NotificationJob, deliver_batch, submit
+from .models import Notification
+from .utils import notify_admins, send_bulk_notification
+
+
+def jobs_for(*users, title='Hello'):
+    return [NotificationJob(user_id=user.id, title=title, message='-', notif_type='case', link='/x') for user in users]
+
+
+class DeliverBatchTests(TestCase):
+
+    def setUp(self):
+        self.users = [User.objects.create(email=f'user{i}@example.com', name=f'User {i}') for i in range(3)]
+
+    def test_persists_the_batch_with_one_insert(self):
+        with self.assertNumQueries(1):
+            notifications = deliver_batch(jobs_for(*self.users))
+
+        self.assertEqual([n.user_id for n in notifications], [user.id for user in self.users])
+        self.assertEqual(
+            list(Notification.objects.order_by('user_id').values_list('user_id', 'title', 'notif_type', 'link')),
+            [(user.id, 'Hello', 'case', '/x') for user in self.users],
+        )
+
+    def test_pushes_each_notification_to_its_user_group(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f'notifications_{self.users[1].id}', channel)
+
+        notifications = deliver_batch(jobs_for(*self.users))
+
+        event = async_to_sync(layer.receive)(channel)
+        self.assertEqual(event['type'], 'send_notification')
+        self.assertEqual(event['notification']['id'], notifications[1].id)
+
+    def test_failed_push_keeps_the_notifications(self):
+        layer = mock.Mock()
+        layer.group_send = mock.AsyncMock(side_effect=RuntimeError('redis down'))
+
+        with mock.patch('notification.delivery.get_channel_layer', return_value=layer), \
+                self.assertLogs('notification.delivery', 'ERROR'):
+            deliver_batch(jobs_for(*self.users))
+
+        self.assertEqual(layer.group_send.await_count, 3)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_empty_batch(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(deliver_batch([]), [])
+
+
+class SubmitTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(email='user@example.com', name='User')
+
+    @override_settings(NOTIFICATION_DELIVERY_MODE='sync')
+    def test_sync_mode_delivers_inline(self):
+        created = submit(jobs_for(self.user))
+
+        self.assertEqual([n.user_id for n in created], [self.user.id])
+
+    @override_settings(NOTIFICATION_DELIVERY_MODE='async')
+    def test_async_mode_enqueues_after_commit(self):
+        dispatcher = mock.Mock()
+        jobs = jobs_for(self.user)
+
+        with mock.patch('notification.delivery.get_dispatcher', return_value=dispatcher):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(submit(jobs), [])
+                dispatcher.enqueue.assert_not_called()
+
+        dispatcher.enqueue.assert_called_once_with(jobs)
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotificationDispatcherTests(SimpleTestCase):
+    """The worker thread, with deliver_batch replaced by a recorder."""
+
+    def setUp(self):
+        self.batches = []
+        self.lock = threading.Lock()
+        patcher = mock.patch('notification.delivery.deliver_batch', side_effect=self.record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, batch):
+        with self.lock:
+            self.batches.append([job.user_id for job in batch])
+
+    def jobs(self, count):
+        return [NotificationJob(user_id=i, title='-', message='-') for i in range(count)]
+
+    def test_delivers_every_job_in_batches(self):
+        dispatcher = NotificationDispatcher(batch_size=2, flush_interval=1)
+
+        dispatcher.enqueue(self.jobs(5))
+        dispatcher.flush()
+
+        self.assertEqual([user_id for batch in self.batches for user_id in batch], list(range(5)))
+        self.assertTrue(all(len(batch) <= 2 for batch in self.batches))
+
+    def test_failed_batch_does_not_stop_the_worker(self):
+        dispatcher = NotificationDispatcher(batch_size=10, flush_interval=0.01)
+        with mock.patch('notification.delivery.deliver_batch', side_effect=RuntimeError('db down')), \
+                self.assertLogs('notification.delivery', 'ERROR'):
+            dispatcher.enqueue(self.jobs(1))
+            dispatcher.flush()
+
+        dispatcher.enqueue(self.jobs(2))
+        dispatcher.flush()
+
+        self.assertEqual(self.batches, [[0, 1]])
+
+
+@override_settings(NOTIFICATION_DELIVERY_MODE='sync')
+class SendBulkNotificationTests(TestCase):
+
+    def setUp(self):
+        self.lawyers = [
+            User.objects.create(email=f'lawyer{i}@example.com', name=f'Lawyer {i}', is_lawyer=True) for i in range(5)
+        ]
+
+    def notified_ids(self):
+        return sorted(Notification.objects.values_list('user_id', flat=True))
+
+    def test_streams_recipients_in_chunks(self):
+        with mock.patch('notification.utils.submit') as submitted:
+            total = send_bulk_notification(User.objects.filter(role='Lawyer'), 'New case', '-', chunk_size=2)
+
+        self.assertEqual(total, 5)
+        self.assertEqual([len(call.args[0]) for call in submitted.call_args_list], [2, 2, 1])
+        self.assertEqual(
+            sorted(job.user_id for call in submitted.call_args_list for job in call.args[0]),
+            [lawyer.id for lawyer in self.lawyers],
+        )
+
+    def test_one_insert_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            send_bulk_notification(User.objects.filter(role='Lawyer'), 'New case', '-', notif_type='case', chunk_size=2)
+
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(self.notified_ids(), [lawyer.id for lawyer in self.lawyers])
+
+    def test_each_recipient_is_notified_once(self):
+        client = User.objects.create(email='client@example.com', name='Client')
+        for _ in range(2):
+            case = Case.objects.create(client=client, case_title='Case', case_category='Civil Law', case_description='-')
+            case.preferred_lawyers.add(self.lawyers[0])
+
+        total = send_bulk_notification(User.objects.filter(cases_preferred__client=client), 'Invited', '-')
+
+        self.assertEqual(total, 1)
+        self.assertEqual(self.notified_ids(), [self.lawyers[0].id])
+
+    def test_notify_admins_skips_inactive_and_excluded_admins(self):
+        superuser = User.objects.create(email='root@example.com', name='Root', is_superuser=True)
+        staff = User.objects.create(email='staff@example.com', name='Staff', is_staff=True)
+        excluded = User.objects.create(email='excluded@example.com', name='Excluded', is_staff=True)
+        User.objects.create(email='gone@example.com', name='Gone', is_staff=True, is_active=False)
+
+        notify_admins('Heads up', '-', exclude_user_ids=[excluded.id])
+
+        self.assertEqual(self.notified_ids(), sorted([superuser.id, staff.id]))
+
+    def test_public_case_notifies_every_lawyer(self):
+        client = User.objects.create(email='client@example.com', name='Client')
+        api = APIClient()
+        api.force_authenticate(client)
+
+        response = api.post('/api/cases/', {
+            'case_title': 'Boundary dispute', 'case_category': 'Civil Law', 'case_description': '-',
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(Notification.objects.filter(title='New Public Case Available').order_by('user_id')
+                 .values_list('user_id', flat=True)),
+            [lawyer.id for lawyer in self.lawyers],
+        )
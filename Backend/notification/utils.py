@@ -1,10 +1,8 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from django.conf import settings
 from django.db.models import Q
 import logging
 
-from .models import Notification
-from .serializers import NotificationSerializer
+from .delivery import NotificationJob, submit
 
 
 logger = logging.getLogger(__name__)
@@ -12,7 +10,8 @@ logger = logging.getLogger(__name__)
 
 def send_notification(user, title, message, notif_type='system', link=None):
     """
-    Create a Notification record and push it to the user's WebSocket group.
+    Queue a Notification for the user; the delivery worker persists it and
+    pushes it to the user's WebSocket group.
 
     Call this from any view or signal after a meaningful action happens.
 
@@ -22,36 +21,87 @@ def send_notification(user, title, message, notif_type='system', link=None):
         message     : Full message string
         notif_type  : One of 'case', 'appointment', 'message', 'payment', 'alert', 'system'
         link        : Frontend route to navigate to when clicked (e.g. '/client/case/5')
+
+    Returns the created Notification in sync delivery mode, otherwise None.
+    """
+    created = submit([
+        NotificationJob(
+            user_id=user.id,
+            title=title,
+            message=message,
+            notif_type=notif_type,
+            link=link,
+        )
+    ])
+    return created[0] if created else None
+
+
+def send_bulk_notification(users_queryset, title, message, notif_type='system', link=None, chunk_size=None):
+    """
+    Send the same notification to every user in a queryset.
+
+    Recipients are streamed in chunks of ids rather than loaded as model
+    instances; each chunk becomes one bulk_create and one set of concurrent
+    channel-layer sends in the delivery pipeline.
+
+    Args:
+        users_queryset : QuerySet of User rows to notify
+        title          : Short title string
+        message        : Full message string
+        notif_type     : One of Notification.TYPE_CHOICES values
+        link           : Frontend route to navigate to when clicked
+        chunk_size     : Recipients per batch (defaults to NOTIFICATION_BATCH_SIZE)
+
+    Returns the number of notifications submitted.
+    """
+    chunk_size = chunk_size or settings.NOTIFICATION_BATCH_SIZE
+    recipient_ids = users_queryset.order_by().values_list('id', flat=True).distinct()
+
+    total = 0
+    chunk = []
+    for user_id in recipient_ids.iterator(chunk_size=chunk_size):
+        chunk.append(NotificationJob(
+            user_id=user_id,
+            title=title,
+            message=message,
+            notif_type=notif_type,
+            link=link,
+        ))
+        if len(chunk) >= chunk_size:
+            submit(chunk)
+            total += len(chunk)
+            chunk = []
+
+    if chunk:
+        submit(chunk)
+        total += len(chunk)
+
+    return total
+
+
+def send_notifications(notifications, notif_type='system', link=None):
+    """
+    Queue a different notification for each user in one delivery submission.
+
+    Args:
+        notifications : Iterable of (user_id, title, message) tuples
+        notif_type    : One of Notification.TYPE_CHOICES values
+        link          : Frontend route to navigate to when clicked
+
+    Returns the number of notifications submitted.
     """
-    # Persist the notification in the database
-    notification = Notification.objects.create(
-        user=user,
-        title=title,
-        message=message,
-        notif_type=notif_type,
-        link=link,
-    )
-
-    # Push to the user's channel group so their open browser tab gets it instantly
-    channel_layer = get_channel_layer()
-    serialized = NotificationSerializer(notification).data
-
-    if channel_layer is not None:
-        try:
-            async_to_sync(channel_layer.group_send)(
-                f"notifications_{user.id}",
-                {
-                    'type': 'send_notification',   # maps to NotificationConsumer.send_notification
-                    'notification': serialized,
-                }
-            )
-        except Exception:
-            # Persisting DB notification is primary; websocket is best-effort.
-            logger.exception("Failed to push notification via channel layer for user_id=%s", user.id)
-    else:
-        logger.warning("Channel layer is not configured; notification saved without realtime push for user_id=%s", user.id)
-
-    return notification
+    jobs = [
+        NotificationJob(
+            user_id=user_id,
+            title=title,
+            message=message,
+            notif_type=notif_type,
+            link=link,
+        )
+        for user_id, title, message in notifications
+    ]
+    submit(jobs)
+    return len(jobs)
 
 
 def notify_admins(title, message, notif_type='system', link=None, exclude_user_ids=None):
@@ -76,18 +126,13 @@ def notify_admins(title, message, notif_type='system', link=None, exclude_user_i
         if exclude_user_ids:
             admin_users = admin_users.exclude(id__in=list(exclude_user_ids))
 
-        for admin_user in admin_users:
-            try:
-                send_notification(
-                    user=admin_user,
-                    title=title,
-                    message=message,
-                    notif_type=notif_type,
-                    link=link,
-                )
-            except Exception:
-                # Notification delivery should never break business endpoints.
-                logger.exception("Failed to send admin notification to user_id=%s", admin_user.id)
+        send_bulk_notification(
+            admin_users,
+            title=title,
+            message=message,
+            notif_type=notif_type,
+            link=link,
+        )
     except Exception:
         # Admin fan-out must not break business endpoints.
         logger.exception("Failed to fan out admin notifications")
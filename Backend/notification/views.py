@@ -2,19 +2,33 @@ from rest_framework.views import APIView
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count, Max, Q
 
+from meronaya.conditional import ConditionalGetMixin
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ConditionalGetMixin, generics.ListAPIView):
     """
     List all notifications for the authenticated user.
     GET /api/notifications/
+
+    Answers If-None-Match with 304 while no notification was added, removed
+    or marked read.
     """
     permission_classes = [IsAuthenticated]
     serializer_class = NotificationSerializer
 
+    def get_etag_parts(self, request, *args, **kwargs):
+        # Notifications are immutable apart from is_read, served by the (user, is_read) index
+        stats = Notification.objects.filter(user=request.user).aggregate(
+            total=Count('id'),
+            latest=Max('id'),
+            unread=Count('id', filter=Q(is_read=False)),
+        )
+        return [stats['total'], stats['latest'], stats['unread']]
+
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Notification.objects.none()
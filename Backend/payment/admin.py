@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment, Payout, CasePaymentRequest
+from .models import Payment, Payout, CasePaymentRequest, RevenueDaily, LawyerBalance, LawyerLedgerEntry
 
 
 @admin.register(Payment)
@@ -22,6 +22,47 @@ class PayoutAdmin(admin.ModelAdmin):
     readonly_fields = ["created_at"]
 
 
+@admin.register(RevenueDaily)
+class RevenueDailyAdmin(admin.ModelAdmin):
+    list_display = [
+        "date", "lawyer", "total_collected", "platform_fee", "lawyer_earning",
+        "transaction_count", "paid_out_amount", "paid_out_count",
+    ]
+    list_filter = ["date"]
+    search_fields = ["lawyer__name", "lawyer__email"]
+    readonly_fields = [
+        "date", "lawyer", "total_collected", "platform_fee", "lawyer_earning",
+        "transaction_count", "paid_out_amount", "paid_out_count", "updated_at",
+    ]
+
+
+@admin.register(LawyerBalance)
+class LawyerBalanceAdmin(admin.ModelAdmin):
+    list_display = [
+        "lawyer", "total_earned", "paid_out", "pending", "transaction_count",
+        "pending_count", "updated_at",
+    ]
+    search_fields = ["lawyer__name", "lawyer__email"]
+    readonly_fields = [
+        "lawyer", "total_earned", "total_platform_fee", "total_received", "transaction_count",
+        "paid_out", "paid_out_count", "pending", "pending_count", "updated_at",
+    ]
+
+
+@admin.register(LawyerLedgerEntry)
+class LawyerLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = [
+        "id", "lawyer", "entry_type", "amount", "earned_balance",
+        "paid_out_balance", "pending_balance", "created_at",
+    ]
+    list_filter = ["entry_type", "created_at"]
+    search_fields = ["lawyer__name", "lawyer__email"]
+    readonly_fields = [
+        "lawyer", "entry_type", "payment", "payout", "amount", "earned_balance",
+        "paid_out_balance", "pending_balance", "created_at",
+    ]
+
+
 @admin.register(CasePaymentRequest)
 class CasePaymentRequestAdmin(admin.ModelAdmin):
     list_display = [
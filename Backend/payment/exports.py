@@ -0,0 +1,157 @@
+"""
+Streaming CSV / NDJSON exports of payments, payouts and case payment requests.
+
+Rows are read with .values_list().iterator(chunk_size=...), which uses a
+server-side cursor on PostgreSQL, and are encoded and sent a batch at a
+time, so memory stays flat regardless of table size.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+
+from .models import Payment, Payout, CasePaymentRequest
+
+
+# Rows fetched from the database cursor per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows encoded into one response chunk
+ROWS_PER_CHUNK = 500
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# resource -> (model, [(column header, ORM field)], has a status column)
+EXPORT_RESOURCES = {
+    "payments": (Payment, [
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+        ("status", "status"),
+        ("payout_status", "payout_status"),
+        ("payment_method", "payment_method"),
+        ("amount", "amount"),
+        ("tax_amount", "tax_amount"),
+        ("total_amount", "total_amount"),
+        ("platform_fee", "platform_fee"),
+        ("lawyer_earning", "lawyer_earning"),
+        ("transaction_uuid", "transaction_uuid"),
+        ("gateway_ref", "esewa_ref_id"),
+        ("client_id", "user_id"),
+        ("client_email", "user__email"),
+        ("lawyer_id", "lawyer_id"),
+        ("lawyer_email", "lawyer__email"),
+        ("appointment_id", "appointment_id"),
+        ("case_payment_request_id", "case_payment_request_id"),
+    ], True),
+    "payouts": (Payout, [
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("lawyer_id", "lawyer_id"),
+        ("lawyer_email", "lawyer__email"),
+        ("amount", "amount"),
+        ("reference_number", "reference_number"),
+        ("payment_method", "payment_method"),
+        ("processed_by_id", "processed_by_id"),
+        ("notes", "notes"),
+    ], False),
+    "case-requests": (CasePaymentRequest, [
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("status", "status"),
+        ("case_id", "case_id"),
+        ("case_title", "case__case_title"),
+        ("client_id", "case__client_id"),
+        ("lawyer_id", "lawyer_id"),
+        ("lawyer_email", "lawyer__email"),
+        ("proposed_amount", "proposed_amount"),
+        ("current_agreed_amount", "current_agreed_amount"),
+        ("agreed_at", "agreed_at"),
+        ("paid_at", "paid_at"),
+    ], True),
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def parse_export_filters(params):
+    """
+    Read the date_from / date_to (YYYY-MM-DD, inclusive), lawyer and status
+    query parameters. Raises ValueError on malformed values.
+    """
+    filters = {}
+    for param, lookup in (("date_from", "created_at__date__gte"), ("date_to", "created_at__date__lte")):
+        value = params.get(param)
+        if value:
+            parsed = parse_date(value)
+            if parsed is None:
+                raise ValueError(f"Invalid {param}; expected YYYY-MM-DD.")
+            filters[lookup] = parsed
+
+    lawyer = params.get("lawyer")
+    if lawyer:
+        if not lawyer.isdigit():
+            raise ValueError("Invalid lawyer id.")
+        filters["lawyer_id"] = int(lawyer)
+
+    if params.get("status"):
+        filters["status"] = params["status"]
+
+    return filters
+
+
+def export_queryset(resource, filters):
+    """Return (headers, values_list queryset) for a resource and its filters."""
+    model, columns, has_status = EXPORT_RESOURCES[resource]
+    if "status" in filters and not has_status:
+        raise ValueError(f"{resource} cannot be filtered by status.")
+
+    headers = [header for header, _ in columns]
+    queryset = (
+        model.objects.filter(**filters)
+        .order_by("created_at", "pk")
+        .values_list(*[field for _, field in columns])
+    )
+    return headers, queryset
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= ROWS_PER_CHUNK:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(headers, queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for batch in _batched(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+        yield "".join(writer.writerow(row) for row in batch)
+
+
+def iter_ndjson(headers, queryset):
+    for batch in _batched(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+        yield "".join(
+            json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n"
+            for row in batch
+        )
+
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+}
@@ -0,0 +1,182 @@
+"""
+Per-lawyer earnings ledger.
+
+Every completed payment and every payout appends one LawyerLedgerEntry and
+moves the lawyer's LawyerBalance row in the same transaction. The balance
+row is locked while posting, so entries of one lawyer are strictly ordered
+and each carries correct running balances. `post_payouts` settles many
+lawyers at once with a fixed number of statements. `rebuild_ledger` replays the
+Payment and Payout tables from scratch and backs the `rebuild_lawyer_ledger`
+management command.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import LawyerBalance, LawyerLedgerEntry, Payment, Payout
+
+
+def _locked_balance(lawyer_id):
+    LawyerBalance.objects.get_or_create(lawyer_id=lawyer_id)
+    return LawyerBalance.objects.select_for_update().get(lawyer_id=lawyer_id)
+
+
+def _balances(balance):
+    return {
+        "earned_balance": balance.total_earned,
+        "paid_out_balance": balance.paid_out,
+        "pending_balance": balance.pending,
+    }
+
+
+def _apply_earning(balance, payment):
+    balance.total_earned += payment.lawyer_earning
+    balance.total_platform_fee += payment.platform_fee
+    balance.total_received += payment.total_amount
+    balance.transaction_count += 1
+    balance.pending += payment.lawyer_earning
+    balance.pending_count += 1
+
+
+def _apply_payout(balance, amount, count):
+    balance.paid_out += amount
+    balance.paid_out_count += count
+    balance.pending -= amount
+    balance.pending_count -= count
+
+
+def post_earning(payment):
+    """
+    Append the earning entry for a newly completed payment.
+    Payments without a lawyer are not part of any ledger.
+    """
+    if payment.lawyer_id is None:
+        return None
+
+    with transaction.atomic():
+        balance = _locked_balance(payment.lawyer_id)
+        _apply_earning(balance, payment)
+        balance.save()
+
+        return LawyerLedgerEntry.objects.create(
+            lawyer_id=payment.lawyer_id,
+            entry_type=LawyerLedgerEntry.ENTRY_EARNING,
+            payment=payment,
+            amount=payment.lawyer_earning,
+            **_balances(balance),
+        )
+
+
+def post_payouts(settlements):
+    """
+    Append the entries for many payouts, given as (payout, payments) pairs.
+    Every balance row involved is locked in one query, and rows, updates and
+    entries are written with one bulk statement each, however many lawyers
+    are paid. Returns the entries in the order of `settlements`.
+    """
+    lawyer_ids = sorted({payout.lawyer_id for payout, _ in settlements})
+
+    with transaction.atomic():
+        LawyerBalance.objects.bulk_create(
+            [LawyerBalance(lawyer_id=lawyer_id) for lawyer_id in lawyer_ids],
+            ignore_conflicts=True,
+        )
+        # Locked in lawyer order, like concurrent single postings would
+        balances = {
+            balance.lawyer_id: balance
+            for balance in LawyerBalance.objects.select_for_update().filter(lawyer_id__in=lawyer_ids).order_by("lawyer_id")
+        }
+
+        entries = []
+        for payout, payments in settlements:
+            amount = sum((payment.lawyer_earning for payment in payments), Decimal("0"))
+            balance = balances[payout.lawyer_id]
+            _apply_payout(balance, amount, len(payments))
+            entries.append(LawyerLedgerEntry(
+                lawyer_id=payout.lawyer_id,
+                entry_type=LawyerLedgerEntry.ENTRY_PAYOUT,
+                payout=payout,
+                amount=amount,
+                **_balances(balance),
+            ))
+
+        now = timezone.now()
+        for balance in balances.values():
+            balance.updated_at = now
+        LawyerBalance.objects.bulk_update(
+            balances.values(),
+            ["paid_out", "paid_out_count", "pending", "pending_count", "updated_at"],
+            batch_size=500,
+        )
+        return LawyerLedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+
+def post_payout(payout, payments):
+    """Append the entry for a payout settling the given payments."""
+    return post_payouts([(payout, payments)])[0]
+
+
+def get_balance(lawyer):
+    """Return the lawyer's balance row, or an unsaved all-zero one."""
+    try:
+        return LawyerBalance.objects.get(lawyer=lawyer)
+    except LawyerBalance.DoesNotExist:
+        return LawyerBalance(lawyer=lawyer)
+
+
+def _replay(lawyer_id, payments, payouts):
+    """Build the ledger entries and final balance for one lawyer's history."""
+    events = [(payment.created_at, 0, payment.id, payment) for payment in payments]
+    events += [(payout.created_at, 1, payout.id, payout) for payout in payouts]
+    events.sort(key=lambda event: event[:3])
+
+    balance = LawyerBalance(lawyer_id=lawyer_id)
+    entries = []
+    for created_at, _, _, event in events:
+        if isinstance(event, Payment):
+            _apply_earning(balance, event)
+            entry_type, amount = LawyerLedgerEntry.ENTRY_EARNING, event.lawyer_earning
+            links = {"payment": event}
+        else:
+            settled = [p for p in event.payments.all() if p.status == Payment.STATUS_COMPLETED]
+            amount = sum((p.lawyer_earning for p in settled), Decimal("0"))
+            _apply_payout(balance, amount, len(settled))
+            entry_type = LawyerLedgerEntry.ENTRY_PAYOUT
+            links = {"payout": event}
+
+        entries.append(LawyerLedgerEntry(
+            lawyer_id=lawyer_id,
+            entry_type=entry_type,
+            amount=amount,
+            created_at=created_at,
+            **links,
+            **_balances(balance),
+        ))
+    return balance, entries
+
+
+def rebuild_ledger():
+    """
+    Recompute every lawyer's ledger and balance from the Payment and Payout
+    tables. Returns the number of lawyers rebuilt.
+    """
+    completed = Payment.objects.filter(status=Payment.STATUS_COMPLETED, lawyer__isnull=False)
+    lawyer_ids = set(completed.values_list("lawyer_id", flat=True).distinct())
+    lawyer_ids |= set(Payout.objects.values_list("lawyer_id", flat=True).distinct())
+
+    with transaction.atomic():
+        LawyerLedgerEntry.objects.all().delete()
+        LawyerBalance.objects.all().delete()
+
+        for lawyer_id in sorted(lawyer_ids):
+            balance, entries = _replay(
+                lawyer_id,
+                completed.filter(lawyer_id=lawyer_id),
+                Payout.objects.filter(lawyer_id=lawyer_id).prefetch_related("payments"),
+            )
+            balance.save()
+            LawyerLedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+    return len(lawyer_ids)
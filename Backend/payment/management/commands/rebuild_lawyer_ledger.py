@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from payment.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild every lawyer's earnings ledger and balance from payments and payouts."
+
+    def handle(self, *args, **options):
+        count = rebuild_ledger()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt earnings ledgers for {count} lawyers."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from payment.revenue import rebuild_revenue_daily
+
+
+class Command(BaseCommand):
+    help = "Rebuild the RevenueDaily rollup table from completed payments."
+
+    def handle(self, *args, **options):
+        count = rebuild_revenue_daily()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily revenue rows."))
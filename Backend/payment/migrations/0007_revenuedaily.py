@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-17 23:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0003_alter_appointment_status'),
+        ('payment', '0006_remove_casepaymentrequest_client_counter_offer_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_collected', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('platform_fee', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('lawyer_earning', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('paid_out_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_out_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='payment_pay_status_0ac991_idx'),
+        ),
+        migrations.AddField(
+            model_name='revenuedaily',
+            name='lawyer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='revenue_days', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='revenuedaily',
+            index=models.Index(fields=['lawyer', 'date'], name='payment_rev_lawyer__a771f8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='revenuedaily',
+            constraint=models.UniqueConstraint(fields=('date', 'lawyer'), name='unique_revenue_day_per_lawyer'),
+        ),
+    ]
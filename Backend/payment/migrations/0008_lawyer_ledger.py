@@ -0,0 +1,89 @@
+# Generated by Django 6.0 on 2026-10-17 23:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0003_alter_appointment_status'),
+        ('case', '0013_casedocument_delivery_type'),
+        ('payment', '0007_revenuedaily'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LawyerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_earned', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_platform_fee', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_received', models.DecimalField(decimal_places=2, default=0, help_text='Total paid by clients, before the platform fee.', max_digits=12)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('paid_out', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_out_count', models.PositiveIntegerField(default=0)),
+                ('pending', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LawyerLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('earning', 'Earning'), ('payout', 'Payout')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Amount earned or paid out by this entry.', max_digits=12)),
+                ('earned_balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('paid_out_balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('pending_balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='casepaymentrequest',
+            index=models.Index(fields=['lawyer', '-created_at', '-id'], name='payment_cas_lawyer__6310b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['lawyer', '-created_at', '-id'], name='payment_pay_lawyer__463046_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payout',
+            index=models.Index(fields=['lawyer', '-created_at', '-id'], name='payment_pay_lawyer__64d147_idx'),
+        ),
+        migrations.AddField(
+            model_name='lawyerbalance',
+            name='lawyer',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_balance', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='lawyerledgerentry',
+            name='lawyer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='lawyerledgerentry',
+            name='payment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='payment.payment'),
+        ),
+        migrations.AddField(
+            model_name='lawyerledgerentry',
+            name='payout',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='payment.payout'),
+        ),
+        migrations.AddIndex(
+            model_name='lawyerledgerentry',
+            index=models.Index(fields=['lawyer', '-created_at', '-id'], name='payment_law_lawyer__88bd5e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='lawyerledgerentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('entry_type', 'earning')), fields=('payment',), name='unique_earning_entry_per_payment'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+
+def backfill_lawyer_ledger(apps, schema_editor):
+    """Seed balances and entries for payments and payouts made before the ledger existed."""
+    Payment = apps.get_model('payment', 'Payment')
+    Payout = apps.get_model('payment', 'Payout')
+    LawyerBalance = apps.get_model('payment', 'LawyerBalance')
+    LawyerLedgerEntry = apps.get_model('payment', 'LawyerLedgerEntry')
+
+    completed = Payment.objects.filter(status='completed', lawyer__isnull=False)
+    lawyer_ids = set(completed.values_list('lawyer_id', flat=True).distinct())
+    lawyer_ids |= set(Payout.objects.values_list('lawyer_id', flat=True).distinct())
+    if not lawyer_ids:
+        return
+
+    LawyerLedgerEntry.objects.all().delete()
+    LawyerBalance.objects.all().delete()
+
+    for lawyer_id in sorted(lawyer_ids):
+        # Earnings before payouts made at the same instant, as the live ledger posts them
+        events = [(payment.created_at, 0, payment.id, payment) for payment in completed.filter(lawyer_id=lawyer_id)]
+        events += [
+            (payout.created_at, 1, payout.id, payout)
+            for payout in Payout.objects.filter(lawyer_id=lawyer_id).prefetch_related('payments')
+        ]
+        events.sort(key=lambda event: event[:3])
+
+        balance = LawyerBalance(lawyer_id=lawyer_id)
+        entries = []
+        for created_at, kind, _, event in events:
+            if kind == 0:
+                amount = event.lawyer_earning
+                balance.total_earned += amount
+                balance.total_platform_fee += event.platform_fee
+                balance.total_received += event.total_amount
+                balance.transaction_count += 1
+                balance.pending += amount
+                balance.pending_count += 1
+                entry_type, links = 'earning', {'payment': event}
+            else:
+                settled = [p for p in event.payments.all() if p.status == 'completed']
+                amount = sum((p.lawyer_earning for p in settled), Decimal('0'))
+                balance.paid_out += amount
+                balance.paid_out_count += len(settled)
+                balance.pending -= amount
+                balance.pending_count -= len(settled)
+                entry_type, links = 'payout', {'payout': event}
+
+            entries.append(LawyerLedgerEntry(
+                lawyer_id=lawyer_id,
+                entry_type=entry_type,
+                amount=amount,
+                created_at=created_at,
+                earned_balance=balance.total_earned,
+                paid_out_balance=balance.paid_out,
+                pending_balance=balance.pending,
+                **links,
+            ))
+
+        balance.save()
+        LawyerLedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0008_lawyer_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lawyer_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_revenue_daily(apps, schema_editor):
+    """Roll up payments completed before the RevenueDaily table existed."""
+    Payment = apps.get_model('payment', 'Payment')
+    RevenueDaily = apps.get_model('payment', 'RevenueDaily')
+    if not Payment.objects.filter(status='completed').exists():
+        return
+
+    paid = Q(payout_status='paid')
+    days = (
+        Payment.objects.filter(status='completed')
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'lawyer_id')
+        .annotate(
+            collected=Sum('total_amount'),
+            fees=Sum('platform_fee'),
+            earnings=Sum('lawyer_earning'),
+            transactions=Count('id'),
+            paid_out=Sum('lawyer_earning', filter=paid),
+            paid_out_transactions=Count('id', filter=paid),
+        )
+    )
+
+    RevenueDaily.objects.all().delete()
+    RevenueDaily.objects.bulk_create(
+        [
+            RevenueDaily(
+                date=day['day'],
+                lawyer_id=day['lawyer_id'],
+                total_collected=day['collected'],
+                platform_fee=day['fees'],
+                lawyer_earning=day['earnings'],
+                transaction_count=day['transactions'],
+                paid_out_amount=day['paid_out'] or 0,
+                paid_out_count=day['paid_out_transactions'],
+            )
+            for day in days
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0009_backfill_lawyer_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_revenue_daily, migrations.RunPython.noop),
+    ]
@@ -92,6 +92,12 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset paging of the admin transaction table
+            models.Index(fields=["status", "-created_at", "-id"]),
+            # Keyset paging of a lawyer's earnings history
+            models.Index(fields=["lawyer", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"Payment #{self.id} | {self.transaction_uuid} | {self.status}"
@@ -141,11 +147,143 @@ class Payout(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["lawyer", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"Payout #{self.id} | {self.lawyer.name} | Rs. {self.amount}"
 
 
+class RevenueDaily(models.Model):
+    """
+    Revenue rollup per day and lawyer, updated incrementally when a payment
+    completes or a payout is made, so admin dashboards sum a few rollup rows
+    instead of re-aggregating every Payment. The day is the payment's
+    creation date. Rebuilt from scratch by `rebuild_revenue_daily`.
+    """
+    date = models.DateField()
+    lawyer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="revenue_days",
+        null=True,
+        blank=True,
+    )
+    total_collected = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    platform_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    lawyer_earning = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    # Share of lawyer_earning already settled through payouts
+    paid_out_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_out_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "lawyer"], name="unique_revenue_day_per_lawyer"),
+        ]
+        indexes = [
+            models.Index(fields=["lawyer", "date"]),
+        ]
+
+    def __str__(self):
+        return f"Revenue {self.date} | lawyer #{self.lawyer_id} | Rs. {self.total_collected}"
+
+
+class LawyerBalance(models.Model):
+    """
+    Running earnings totals for one lawyer, so the earnings summary is a
+    single-row read. Updated together with every LawyerLedgerEntry.
+    """
+    lawyer = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name="earnings_balance",
+    )
+    total_earned = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_platform_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_received = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Total paid by clients, before the platform fee.",
+    )
+    transaction_count = models.PositiveIntegerField(default=0)
+    paid_out = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_out_count = models.PositiveIntegerField(default=0)
+    pending = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Balance | {self.lawyer_id} | earned Rs. {self.total_earned} | pending Rs. {self.pending}"
+
+
+class LawyerLedgerEntry(models.Model):
+    """
+    Append-only earnings ledger. Each entry records one completed payment
+    (earning) or one payout and the lawyer's running balances after it.
+    """
+    ENTRY_EARNING = "earning"
+    ENTRY_PAYOUT = "payout"
+
+    ENTRY_CHOICES = [
+        (ENTRY_EARNING, "Earning"),
+        (ENTRY_PAYOUT, "Payout"),
+    ]
+
+    lawyer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="ledger_entries",
+    )
+    entry_type = models.CharField(max_length=20, choices=ENTRY_CHOICES)
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.SET_NULL,
+        related_name="ledger_entries",
+        null=True,
+        blank=True,
+    )
+    payout = models.ForeignKey(
+        Payout,
+        on_delete=models.SET_NULL,
+        related_name="ledger_entries",
+        null=True,
+        blank=True,
+    )
+    amount = models.DecimalField(
+        max_digits=12, decimal_places=2,
+        help_text="Amount earned or paid out by this entry.",
+    )
+
+    # Running balances after this entry
+    earned_balance = models.DecimalField(max_digits=12, decimal_places=2)
+    paid_out_balance = models.DecimalField(max_digits=12, decimal_places=2)
+    pending_balance = models.DecimalField(max_digits=12, decimal_places=2)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["payment"],
+                condition=models.Q(entry_type="earning"),
+                name="unique_earning_entry_per_payment",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["lawyer", "-created_at", "-id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entry_type_display()} | {self.lawyer_id} | Rs. {self.amount}"
+
+
 class CasePaymentRequest(models.Model):
     """
     Model for handling payment requests when a case is completed.
@@ -229,6 +367,7 @@ class CasePaymentRequest(models.Model):
         indexes = [
             models.Index(fields=["status", "-created_at"]),
             models.Index(fields=["lawyer", "status"]),
+            models.Index(fields=["lawyer", "-created_at", "-id"]),
             models.Index(fields=["expires_at"]),
         ]
     
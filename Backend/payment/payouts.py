@@ -0,0 +1,118 @@
+"""
+Batch payout runs: settle every lawyer's pending earnings up to a cutoff
+date in one operation.
+
+Eligible payments are read with one locking query, grouped per lawyer in
+Python, and settled with a fixed number of bulk statements regardless of
+how many lawyers are paid: one bulk_create for the Payout rows and one for
+their payment links, a locked read and a bulk UPDATE each for the revenue
+rollup rows and the ledger balances (see revenue.record_payout and
+ledger.post_payouts), one bulk_create for the ledger entries and one UPDATE
+for the payments. Lawyer notifications are submitted to the delivery
+pipeline as a single batch.
+"""
+
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import transaction
+
+from authentication.models import User
+from notification.utils import send_notifications
+
+from .ledger import post_payouts
+from .models import Payment, Payout
+from .revenue import record_payout
+
+
+def eligible_payments(cutoff_date, lawyer_ids=None):
+    """Completed, not yet paid-out payments created on or before cutoff_date."""
+    payments = Payment.objects.filter(
+        status=Payment.STATUS_COMPLETED,
+        payout_status=Payment.PAYOUT_PENDING,
+        lawyer__isnull=False,
+        created_at__date__lte=cutoff_date,
+    )
+    if lawyer_ids:
+        payments = payments.filter(lawyer_id__in=lawyer_ids)
+    return payments.only("id", "lawyer_id", "lawyer_earning", "created_at").order_by("lawyer_id", "created_at", "id")
+
+
+def _group_by_lawyer(payments):
+    return {
+        lawyer_id: list(lawyer_payments)
+        for lawyer_id, lawyer_payments in groupby(payments, key=lambda payment: payment.lawyer_id)
+    }
+
+
+def _summary(groups, payouts=None):
+    names = dict(User.objects.filter(id__in=groups).values_list("id", "name"))
+    payout_ids = {payout.lawyer_id: payout.id for payout in payouts or []}
+    return [
+        {
+            "lawyer_id": lawyer_id,
+            "lawyer_name": names.get(lawyer_id),
+            "payout_id": payout_ids.get(lawyer_id),
+            "payment_count": len(payments),
+            "amount": str(sum((payment.lawyer_earning for payment in payments), Decimal("0"))),
+        }
+        for lawyer_id, payments in groups.items()
+    ]
+
+
+def preview_payout_run(cutoff_date, lawyer_ids=None):
+    """Report what a payout run would settle, without writing anything."""
+    return _summary(_group_by_lawyer(eligible_payments(cutoff_date, lawyer_ids)))
+
+
+def run_payouts(cutoff_date, processed_by, lawyer_ids=None, reference_number="", payment_method="", notes=""):
+    """
+    Settle every eligible payment up to cutoff_date, one Payout per lawyer.
+    Returns the per-lawyer summary; empty when nothing was eligible.
+    """
+    with transaction.atomic():
+        # Locking the payments so a concurrent payout cannot settle them twice
+        payments = list(eligible_payments(cutoff_date, lawyer_ids).select_for_update())
+        if not payments:
+            return []
+
+        groups = _group_by_lawyer(payments)
+        payouts = Payout.objects.bulk_create([
+            Payout(
+                lawyer_id=lawyer_id,
+                processed_by=processed_by,
+                amount=sum((payment.lawyer_earning for payment in lawyer_payments), Decimal("0")),
+                reference_number=reference_number,
+                payment_method=payment_method,
+                notes=notes,
+            )
+            for lawyer_id, lawyer_payments in groups.items()
+        ])
+
+        Payout.payments.through.objects.bulk_create([
+            Payout.payments.through(payout_id=payout.id, payment_id=payment.id)
+            for payout in payouts
+            for payment in groups[payout.lawyer_id]
+        ], batch_size=1000)
+
+        record_payout(payments)
+        post_payouts([(payout, groups[payout.lawyer_id]) for payout in payouts])
+
+        Payment.objects.filter(id__in=[payment.id for payment in payments]).update(
+            payout_status=Payment.PAYOUT_PAID,
+        )
+
+        send_notifications(
+            (
+                (
+                    payout.lawyer_id,
+                    "Payout Received",
+                    f"Rs. {payout.amount} has been settled by the admin. Reference: {reference_number or 'N/A'}",
+                )
+                for payout in payouts
+            ),
+            notif_type="payment",
+            link="/lawyerearning",
+        )
+
+    return _summary(groups, payouts)
@@ -0,0 +1,171 @@
+"""
+Maintenance and reads of the RevenueDaily rollup table.
+
+Payment completion and payout creation call into this module inside their
+own transactions, so the per-day, per-lawyer totals never drift from the
+Payment table. `rebuild_revenue_daily` recomputes the table from scratch and
+backs the `rebuild_revenue_daily` management command.
+
+Every read aggregates rollup rows with Sum(), never reading a single row
+as the total.
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Payment, RevenueDaily
+
+
+def revenue_date(payment):
+    """The rollup day a payment belongs to."""
+    return timezone.localdate(payment.created_at)
+
+
+def _bump(date, lawyer_id, **deltas):
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    rows = RevenueDaily.objects.filter(date=date, lawyer_id=lawyer_id)
+    if rows.update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            RevenueDaily.objects.create(date=date, lawyer_id=lawyer_id, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first
+        rows.update(**updates)
+
+
+def record_completed_payment(payment):
+    """Add a newly completed payment to its day's rollup row."""
+    _bump(
+        revenue_date(payment),
+        payment.lawyer_id,
+        total_collected=payment.total_amount,
+        platform_fee=payment.platform_fee,
+        lawyer_earning=payment.lawyer_earning,
+        transaction_count=1,
+    )
+
+
+def record_payout(payments):
+    """
+    Move the given completed payments' earnings into the paid-out columns.
+    Must be called with the payments that are about to be marked PAYOUT_PAID.
+    """
+    grouped = {}
+    for payment in payments:
+        key = (revenue_date(payment), payment.lawyer_id)
+        amount, count = grouped.get(key, (Decimal("0"), 0))
+        grouped[key] = (amount + payment.lawyer_earning, count + 1)
+    if not grouped:
+        return
+
+    # Completing the payments created their rows; lock and move them in bulk
+    rows = {
+        (row.date, row.lawyer_id): row
+        for row in RevenueDaily.objects.select_for_update().filter(
+            date__in={date for date, _ in grouped},
+            lawyer_id__in={lawyer_id for _, lawyer_id in grouped},
+        )
+    }
+    changed = []
+    for (date, lawyer_id), (amount, count) in grouped.items():
+        row = rows.get((date, lawyer_id))
+        if row is None:
+            _bump(date, lawyer_id, paid_out_amount=amount, paid_out_count=count)
+            continue
+        row.paid_out_amount += amount
+        row.paid_out_count += count
+        changed.append(row)
+    RevenueDaily.objects.bulk_update(changed, ["paid_out_amount", "paid_out_count"], batch_size=500)
+
+
+def rebuild_revenue_daily():
+    """
+    Recompute every RevenueDaily row from the Payment table.
+
+    Returns the number of rollup rows written.
+    """
+    days = (
+        Payment.objects.filter(status=Payment.STATUS_COMPLETED)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "lawyer_id")
+        .annotate(
+            collected=Sum("total_amount"),
+            fees=Sum("platform_fee"),
+            earnings=Sum("lawyer_earning"),
+            transactions=Count("id"),
+            paid_out=Sum("lawyer_earning", filter=Q(payout_status=Payment.PAYOUT_PAID)),
+            paid_out_transactions=Count("id", filter=Q(payout_status=Payment.PAYOUT_PAID)),
+        )
+    )
+
+    rows = [
+        RevenueDaily(
+            date=day["day"],
+            lawyer_id=day["lawyer_id"],
+            total_collected=day["collected"],
+            platform_fee=day["fees"],
+            lawyer_earning=day["earnings"],
+            transaction_count=day["transactions"],
+            paid_out_amount=day["paid_out"] or 0,
+            paid_out_count=day["paid_out_transactions"],
+        )
+        for day in days
+    ]
+
+    with transaction.atomic():
+        RevenueDaily.objects.all().delete()
+        RevenueDaily.objects.bulk_create(rows, batch_size=500)
+
+    return len(rows)
+
+
+def revenue_totals(rollup=None):
+    """Platform-wide totals summed from rollup rows."""
+    if rollup is None:
+        rollup = RevenueDaily.objects.all()
+
+    totals = rollup.aggregate(
+        total_collected=Sum("total_collected"),
+        platform_fee=Sum("platform_fee"),
+        lawyer_earning=Sum("lawyer_earning"),
+        transaction_count=Sum("transaction_count"),
+        paid_out_amount=Sum("paid_out_amount"),
+        paid_out_count=Sum("paid_out_count"),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    totals["pending_amount"] = totals["lawyer_earning"] - totals["paid_out_amount"]
+    totals["pending_count"] = totals["transaction_count"] - totals["paid_out_count"]
+    return totals
+
+
+def lawyer_breakdown(rollup=None):
+    """Per-lawyer totals summed from rollup rows, highest earners first."""
+    if rollup is None:
+        rollup = RevenueDaily.objects.all()
+
+    rows = (
+        rollup.values("lawyer__id", "lawyer__name", "lawyer__email", "lawyer__phone", "lawyer__profile_image")
+        .annotate(
+            total_paid=Sum("total_collected"),
+            platform_fee=Sum("platform_fee"),
+            lawyer_earned=Sum("lawyer_earning"),
+            transaction_count=Sum("transaction_count"),
+            paid_out=Sum("paid_out_amount"),
+            paid_out_count=Sum("paid_out_count"),
+        )
+        .order_by("-lawyer_earned")
+    )
+
+    breakdown = []
+    for row in rows:
+        paid_out_count = row.pop("paid_out_count")
+        row["pending_payout"] = row["lawyer_earned"] - row["paid_out"]
+        row["pending_payment_ids"] = row["transaction_count"] - paid_out_count
+        breakdown.append(row)
+    return breakdown
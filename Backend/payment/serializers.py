@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Payment, Payout, CasePaymentRequest
+from .models import Payment, Payout, CasePaymentRequest, LawyerLedgerEntry
 from case.models import Case
 
 
@@ -112,7 +112,27 @@ class PayoutSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "processed_by", "processed_by_name", "created_at"]
 
     def get_payment_ids(self, obj):
-        return list(obj.payments.values_list("id", flat=True))
+        # Reads prefetched payments when the queryset used prefetch_related("payments")
+        return [payment.id for payment in obj.payments.all()]
+
+
+class LawyerLedgerEntrySerializer(serializers.ModelSerializer):
+    """Serializer for one entry of a lawyer's earnings ledger."""
+
+    class Meta:
+        model = LawyerLedgerEntry
+        fields = [
+            "id",
+            "entry_type",
+            "payment",
+            "payout",
+            "amount",
+            "earned_balance",
+            "paid_out_balance",
+            "pending_balance",
+            "created_at",
+        ]
+        read_only_fields = fields
 
 
 class CreatePayoutSerializer(serializers.Serializer):
@@ -136,6 +156,33 @@ class CreatePayoutSerializer(serializers.Serializer):
     )
 
 
+class PayoutRunSerializer(serializers.Serializer):
+    """Serializer for settling every lawyer's pending earnings up to a cutoff date."""
+    cutoff_date = serializers.DateField(
+        help_text="Settle completed payments created on or before this date.",
+    )
+    lawyer_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False,
+        help_text="Optional subset of lawyers to settle; defaults to all.",
+    )
+    reference_number = serializers.CharField(
+        max_length=255, required=False, allow_blank=True,
+        help_text="Batch transfer reference recorded on every payout.",
+    )
+    payment_method = serializers.CharField(
+        max_length=100, required=False, allow_blank=True,
+        help_text="Method used (bank_transfer, esewa, etc.).",
+    )
+    notes = serializers.CharField(
+        required=False, allow_blank=True,
+        help_text="Optional notes recorded on every payout.",
+    )
+    dry_run = serializers.BooleanField(
+        required=False, default=False,
+        help_text="Only report what would be paid out, without creating payouts.",
+    )
+
+
 class CasePaymentRequestSerializer(serializers.ModelSerializer):
     """Serializer for case payment requests."""
     
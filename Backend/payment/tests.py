@@ -1,3 +1,333 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from authentication.models import User
+from case.models import Case
+from . import utils
+from .models import CasePaymentRequest, LawyerBalance, LawyerLedgerEntry, Payment, Payout, RevenueDaily
+from .payouts import run_payouts
+from .utils import GatewayClient, GatewayUnavailable, verify_khalti_payment
+from .verification import GATEWAY_KHALTI, KIND_CASE, check_khalti, khalti_pidx_filter, transition, verify_payment
+
+
+class StubGateway:
+    """
+    Local HTTP server standing in for a payment gateway.
+
+    Each request pops the next (status, body, delay) from `responses`; once
+    they run out it answers 200 {}. Every request is recorded as
+    (method, path, json body, client port).
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _answer(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'null')
+                stub.requests.append((self.command, self.path, body, self.client_address[1]))
+
+                status, payload, delay = stub.responses.pop(0) if stub.responses else (200, {}, 0)
+                if delay:
+                    time.sleep(delay)
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            do_GET = do_POST = _answer
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+
+class GatewayStubTestCase(SimpleTestCase):
+    """Runs a StubGateway for the class; each test starts with fresh gateway clients."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = StubGateway()
+        cls.stub.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.reset()
+        utils._gateway_clients.clear()
+        self.addCleanup(utils._gateway_clients.clear)
+
+    def client_for_stub(self, **options):
+        options.setdefault('backoff_base', 0)
+        return GatewayClient('stub', **options)
+
+
+class GatewayClientTests(GatewayStubTestCase):
+
+    def test_keeps_connection_alive_between_calls(self):
+        client = self.client_for_stub()
+        for _ in range(3):
+            self.assertEqual(client.get(f'{self.stub.url}/status/').status_code, 200)
+
+        ports = {port for _, _, _, port in self.stub.requests}
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual(len(ports), 1)
+
+    def test_retries_transient_statuses(self):
+        self.stub.reset((503, {}, 0), (200, {'status': 'COMPLETE'}, 0))
+        client = self.client_for_stub(max_retries=2)
+
+        response = client.get(f'{self.stub.url}/status/')
+
+        self.assertEqual(response.json(), {'status': 'COMPLETE'})
+        self.assertEqual(len(self.stub.requests), 2)
+        metrics = client.snapshot()
+        self.assertEqual(metrics['retries'], 1)
+        self.assertEqual(metrics['failures'], 1)
+        self.assertEqual(metrics['successes'], 1)
+
+    def test_returns_last_response_when_retries_run_out(self):
+        self.stub.reset((503, {}, 0), (502, {}, 0))
+        client = self.client_for_stub(max_retries=1)
+
+        self.assertEqual(client.get(f'{self.stub.url}/status/').status_code, 502)
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_non_idempotent_calls_are_not_retried(self):
+        self.stub.reset((503, {}, 0))
+        client = self.client_for_stub(max_retries=2)
+
+        response = client.post(f'{self.stub.url}/initiate/', json={}, retry=False)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_read_timeout_raises_gateway_unavailable(self):
+        self.stub.reset((200, {}, 0.5), (200, {}, 0.5))
+        client = self.client_for_stub(read_timeout=0.1, max_retries=1)
+
+        with self.assertRaises(GatewayUnavailable):
+            client.get(f'{self.stub.url}/status/')
+        self.assertEqual(client.snapshot()['failures'], 2)
+
+    def test_circuit_opens_after_consecutive_failures_then_half_opens(self):
+        self.stub.reset((503, {}, 0), (503, {}, 0))
+        client = self.client_for_stub(max_retries=0, failure_threshold=2, reset_timeout=0.2)
+
+        client.get(f'{self.stub.url}/status/')
+        client.get(f'{self.stub.url}/status/')
+        self.assertTrue(client.is_open())
+
+        with self.assertRaises(GatewayUnavailable):
+            client.get(f'{self.stub.url}/status/')
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(client.snapshot()['rejected_open_circuit'], 1)
+
+        time.sleep(0.25)
+        self.assertEqual(client.get(f'{self.stub.url}/status/').status_code, 200)
+        self.assertFalse(client.is_open())
+
+    def test_latency_metrics_per_gateway(self):
+        self.stub.reset((200, {}, 0.05))
+        client = self.client_for_stub()
+
+        client.get(f'{self.stub.url}/status/')
+
+        metrics = client.snapshot()
+        self.assertEqual(metrics['requests'], 1)
+        self.assertGreaterEqual(metrics['latency_max_ms'], 50)
+        self.assertEqual(metrics['latency_avg_ms'], metrics['latency_max_ms'])
+
+
+class GatewayCallTests(GatewayStubTestCase):
+
+    def test_khalti_lookup_goes_through_the_pooled_client(self):
+        self.stub.reset((200, {'status': 'Completed', 'pidx': 'abc'}, 0))
+
+        with override_settings(KHALTI_BASE_URL=f'{self.stub.url}/api/v2/', KHALTI_SECRET_KEY='test-key'):
+            is_ok, data = verify_khalti_payment('abc')
+
+        self.assertTrue(is_ok)
+        self.assertEqual(data['status'], 'Completed')
+        method, path, body, _ = self.stub.requests[0]
+        self.assertEqual((method, path, body), ('POST', '/api/v2/epayment/lookup/', {'pidx': 'abc'}))
+        self.assertIn('khalti', utils.get_gateway_metrics())
+
+    def test_esewa_status_unreachable_returns_no_status(self):
+        self.stub.reset((503, {}, 0), (503, {}, 0), (503, {}, 0))
+
+        with override_settings(
+            ESEWA_VERIFY_URL=f'{self.stub.url}/status/',
+            PAYMENT_GATEWAY_CLIENTS={'esewa': {'max_retries': 2, 'backoff_base': 0}},
+        ):
+            self.assertEqual(utils.verify_esewa_payment_remote('100', 'uuid-1'), (None, None))
+
+        self.assertEqual(len(self.stub.requests), 3)
+
+
+class KhaltiVerificationTests(TestCase):
+    """verify_payment for a case payment, with Khalti answered by a StubGateway."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = StubGateway()
+        cls.stub.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.reset()
+        cache.clear()
+        utils._gateway_clients.clear()
+        self.addCleanup(utils._gateway_clients.clear)
+
+        client = User.objects.create(email='client@example.com', name='Client')
+        lawyer = User.objects.create(email='lawyer@example.com', name='Lawyer', is_lawyer=True)
+        case = Case.objects.create(
+            client=client, lawyer=lawyer, case_title='Case', case_category='Civil Law',
+            case_description='-', status='accepted',
+        )
+        request = CasePaymentRequest.objects.create(case=case, lawyer=lawyer, proposed_amount=Decimal('1000'))
+        self.payment = Payment.objects.create(
+            user=client, lawyer=lawyer, case_payment_request=request, payment_method='khalti',
+            amount=Decimal('1000'), total_amount=Decimal('1000'), esewa_ref_id='pidx-1',
+        )
+
+        settings_override = override_settings(
+            KHALTI_BASE_URL=f'{self.stub.url}/api/v2/',
+            PAYMENT_GATEWAY_CLIENTS={'khalti': {'max_retries': 0}},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def verify(self):
+        return verify_payment(
+            KIND_CASE, GATEWAY_KHALTI, 'pidx-1', khalti_pidx_filter('pidx-1'),
+            lambda payment: check_khalti(payment, 'pidx-1'),
+        )
+
+    def test_duplicate_callbacks_reuse_the_completed_outcome(self):
+        self.stub.reset((200, {'status': 'Completed', 'transaction_id': 'txn-1'}, 0))
+
+        first = self.verify()
+        second = self.verify()
+
+        self.assertTrue(first['is_success'])
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.stub.requests), 1)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.STATUS_COMPLETED)
+
+    def test_failed_check_is_not_cached(self):
+        self.stub.reset(
+            (200, {'status': 'Expired'}, 0),
+            (200, {'status': 'Completed', 'transaction_id': 'txn-1'}, 0),
+        )
+
+        failed = self.verify()
+        self.assertFalse(failed['is_success'])
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.STATUS_FAILED)
+
+        # The gateway settled later; the next callback must ask it again
+        completed = self.verify()
+        self.assertTrue(completed['is_success'])
+        self.assertEqual(len(self.stub.requests), 2)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.STATUS_COMPLETED)
+
+
+class PayoutRunTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@example.com', name='Admin', is_superuser=True)
+        self.client_user = User.objects.create(email='client@example.com', name='Client')
+        self.lawyers = []
+
+    def add_lawyers(self, count):
+        """Lawyers with two completed payments of 90 earnings each."""
+        for _ in range(count):
+            n = len(self.lawyers)
+            lawyer = User.objects.create(email=f'lawyer{n}@example.com', name=f'Lawyer {n}', is_lawyer=True)
+            self.lawyers.append(lawyer)
+            for _ in range(2):
+                payment = Payment.objects.create(
+                    user=self.client_user, lawyer=lawyer, payment_method='khalti', amount=Decimal('100'),
+                    total_amount=Decimal('100'), platform_fee=Decimal('10'), lawyer_earning=Decimal('90'),
+                )
+                transition(payment, Payment.STATUS_COMPLETED)
+
+    def run_payouts(self):
+        with CaptureQueriesContext(connection) as queries:
+            summary = run_payouts(timezone.localdate(), self.admin)
+        return summary, len(queries)
+
+    def test_statement_count_does_not_grow_with_lawyers(self):
+        self.add_lawyers(2)
+        _, few = self.run_payouts()
+
+        self.add_lawyers(6)
+        summary, many = self.run_payouts()
+
+        self.assertEqual(len(summary), 6)
+        self.assertEqual(many, few)
+
+    def test_settles_ledger_and_rollup(self):
+        self.add_lawyers(3)
+
+        summary = run_payouts(timezone.localdate(), self.admin)
+
+        self.assertEqual({row['amount'] for row in summary}, {'180.00'})
+        self.assertEqual(Payout.objects.count(), 3)
+        for balance in LawyerBalance.objects.all():
+            self.assertEqual((balance.pending, balance.pending_count), (Decimal('0'), 0))
+            self.assertEqual((balance.paid_out, balance.paid_out_count), (Decimal('180'), 2))
+        entries = LawyerLedgerEntry.objects.filter(entry_type=LawyerLedgerEntry.ENTRY_PAYOUT)
+        self.assertEqual(sorted(entry.paid_out_balance for entry in entries), [Decimal('180')] * 3)
+        self.assertEqual(
+            sorted(RevenueDaily.objects.values_list('paid_out_amount', 'paid_out_count')),
+            [(Decimal('180'), 2)] * 3,
+        )
+        self.assertFalse(Payment.objects.filter(payout_status=Payment.PAYOUT_PENDING).exists())
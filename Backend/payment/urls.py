@@ -7,9 +7,17 @@ from .views import (
     PaymentListView,
     PaymentDetailView,
     LawyerEarningsView,
+    LawyerEarningsPaymentsView,
+    LawyerEarningsPayoutsView,
+    LawyerEarningsCaseRequestsView,
+    LawyerEarningsLedgerView,
     AdminRevenueView,
+    AdminPaymentExportView,
+    LawyerEarningsExportView,
     AdminCreatePayoutView,
+    AdminPayoutRunView,
     AdminLawyerPendingPaymentsView,
+    AdminGatewayMetricsView,
     CreateCasePaymentRequestView,
     RespondToCasePaymentView,
     CasePaymentRequestDetailView,
@@ -28,9 +36,17 @@ urlpatterns = [
     path("khalti/verify/", KhaltiVerifyView.as_view(), name="khalti-verify"),
     path("khalti/verify-case/", KhaltiVerifyCasePaymentView.as_view(), name="khalti-verify-case"),
     path("earnings/", LawyerEarningsView.as_view(), name="lawyer-earnings"),
+    path("earnings/payments/", LawyerEarningsPaymentsView.as_view(), name="lawyer-earnings-payments"),
+    path("earnings/payouts/", LawyerEarningsPayoutsView.as_view(), name="lawyer-earnings-payouts"),
+    path("earnings/case-requests/", LawyerEarningsCaseRequestsView.as_view(), name="lawyer-earnings-case-requests"),
+    path("earnings/ledger/", LawyerEarningsLedgerView.as_view(), name="lawyer-earnings-ledger"),
+    path("earnings/export/<str:resource>.<str:export_format>", LawyerEarningsExportView.as_view(), name="lawyer-earnings-export"),
     path("admin/revenue/", AdminRevenueView.as_view(), name="admin-revenue"),
+    path("admin/export/<str:resource>.<str:export_format>", AdminPaymentExportView.as_view(), name="admin-payment-export"),
     path("admin/payout/", AdminCreatePayoutView.as_view(), name="admin-create-payout"),
+    path("admin/payout-run/", AdminPayoutRunView.as_view(), name="admin-payout-run"),
     path("admin/pending/<int:lawyer_id>/", AdminLawyerPendingPaymentsView.as_view(), name="admin-lawyer-pending"),
+    path("admin/gateway-metrics/", AdminGatewayMetricsView.as_view(), name="admin-gateway-metrics"),
     # Case payment request endpoints
     path("cases/request/", CreateCasePaymentRequestView.as_view(), name="create-case-payment-request"),
     path("cases/<uuid:payment_request_id>/", CasePaymentRequestDetailView.as_view(), name="case-payment-request-detail"),
@@ -1,10 +1,179 @@
 import hmac
 import hashlib
 import base64
+import random
+import threading
+import time
 import requests
 import json
 from decimal import Decimal
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class GatewayUnavailable(Exception):
+    """Raised when a gateway's circuit breaker is open or every attempt failed."""
+
+
+class GatewayClient:
+    """
+    Keep-alive HTTP client for one payment gateway.
+
+    - Pooled requests.Session, so callbacks reuse TCP+TLS connections
+    - Per-gateway (connect, read) timeouts
+    - Bounded retries with full-jitter exponential backoff for idempotent calls
+    - Circuit breaker: after `failure_threshold` consecutive failures, calls
+      fail fast for `reset_timeout` seconds, then one trial call is let through
+    - Latency / outcome metrics, exposed through snapshot()
+    """
+
+    # Statuses worth retrying: the gateway or a proxy in front of it hiccupped
+    RETRY_STATUSES = {502, 503, 504}
+
+    def __init__(self, name, connect_timeout=5, read_timeout=15, max_retries=2,
+                 backoff_base=0.2, failure_threshold=5, reset_timeout=30, pool_size=10):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._metrics = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rejected_open_circuit": 0,
+            "latency_total_ms": 0.0,
+            "latency_max_ms": 0.0,
+        }
+
+    # ── Circuit breaker ──────────────────────────────────────────────────
+
+    def _allow_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Half-open: let one trial request through
+                self._opened_at = time.monotonic()
+                return True
+            self._metrics["rejected_open_circuit"] += 1
+            return False
+
+    def _record(self, ok, elapsed_ms):
+        with self._lock:
+            self._metrics["requests"] += 1
+            self._metrics["latency_total_ms"] += elapsed_ms
+            self._metrics["latency_max_ms"] = max(self._metrics["latency_max_ms"], elapsed_ms)
+            if ok:
+                self._metrics["successes"] += 1
+                self._consecutive_failures = 0
+                self._opened_at = None
+            else:
+                self._metrics["failures"] += 1
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.failure_threshold:
+                    self._opened_at = time.monotonic()
+
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    # ── Requests ─────────────────────────────────────────────────────────
+
+    def request(self, method, url, retry=True, **kwargs):
+        """
+        Send a request through the pooled session.
+
+        Non-idempotent calls (e.g. payment initiation) must pass retry=False.
+        Returns the final requests.Response; raises GatewayUnavailable when
+        the circuit is open or every attempt failed at the transport level.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempts = 1 + (self.max_retries if retry else 0)
+        last_error = None
+
+        for attempt in range(attempts):
+            if attempt:
+                with self._lock:
+                    self._metrics["retries"] += 1
+                time.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+            if not self._allow_request():
+                raise GatewayUnavailable(f"{self.name} circuit is open")
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as exc:
+                self._record(False, (time.monotonic() - started) * 1000)
+                last_error = exc
+                continue
+
+            failed = response.status_code in self.RETRY_STATUSES
+            self._record(not failed, (time.monotonic() - started) * 1000)
+            if failed and attempt + 1 < attempts:
+                last_error = None
+                continue
+            return response
+
+        raise GatewayUnavailable(f"{self.name} request failed: {last_error}")
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def snapshot(self):
+        """Return a copy of this gateway's metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            circuit_open = self._opened_at is not None
+        attempts = metrics["successes"] + metrics["failures"]
+        metrics["latency_avg_ms"] = round(metrics["latency_total_ms"] / attempts, 2) if attempts else 0.0
+        metrics["latency_total_ms"] = round(metrics["latency_total_ms"], 2)
+        metrics["latency_max_ms"] = round(metrics["latency_max_ms"], 2)
+        metrics["circuit_open"] = circuit_open
+        return metrics
+
+
+_gateway_clients = {}
+_gateway_clients_lock = threading.Lock()
+
+
+def get_gateway_client(name):
+    """Return the process-wide client for a gateway configured in PAYMENT_GATEWAY_CLIENTS."""
+    client = _gateway_clients.get(name)
+    if client is None:
+        with _gateway_clients_lock:
+            client = _gateway_clients.get(name)
+            if client is None:
+                client = GatewayClient(name, **settings.PAYMENT_GATEWAY_CLIENTS.get(name, {}))
+                _gateway_clients[name] = client
+    return client
+
+
+def get_gateway_metrics():
+    """Return metrics for every gateway client used by this process."""
+    return {name: client.snapshot() for name, client in _gateway_clients.items()}
+
+
+def _khalti_headers():
+    return {
+        "Authorization": f"Key {settings.KHALTI_SECRET_KEY}",
+        "Content-Type": "application/json",
+    }
 
 def generate_esewa_signature(message: str) -> str:
     """
@@ -64,15 +233,16 @@ def verify_esewa_payment_remote(total_amount, transaction_uuid):
     Call eSewa's backend API to verify a transaction status.
     """
     try:
-        response = requests.get(
+        response = get_gateway_client("esewa").get(
             settings.ESEWA_VERIFY_URL,
             params={
                 "product_code": settings.ESEWA_PRODUCT_CODE,
                 "total_amount": str(total_amount),
                 "transaction_uuid": str(transaction_uuid),
             },
-            timeout=15,
         )
+        if response.status_code != 200:
+            return None, None
         data = response.json()
         return data.get("status"), data.get("ref_id")
     except Exception:
@@ -97,14 +267,12 @@ def initiate_khalti_payment(amount_in_paisa, purchase_order_id, purchase_order_n
     initiate_url = f"{base_url}/epayment/initiate/"
 
     try:
-        response = requests.post(
+        # Initiation creates a payment on Khalti's side, so it is never retried
+        response = get_gateway_client("khalti").post(
             initiate_url,
             json=khalti_payload,
-            headers={
-                "Authorization": f"Key {settings.KHALTI_SECRET_KEY}",
-                "Content-Type": "application/json",
-            },
-            timeout=30,
+            headers=_khalti_headers(),
+            retry=False,
         )
         
         if response.status_code == 200:
@@ -128,14 +296,10 @@ def verify_khalti_payment(pidx):
     lookup_url = f"{base_url}/epayment/lookup/"
 
     try:
-        response = requests.post(
+        response = get_gateway_client("khalti").post(
             lookup_url,
             json={"pidx": pidx},
-            headers={
-                "Authorization": f"Key {settings.KHALTI_SECRET_KEY}",
-                "Content-Type": "application/json",
-            },
-            timeout=15,
+            headers=_khalti_headers(),
         )
         if response.status_code == 200:
             return True, response.json()
@@ -0,0 +1,417 @@
+"""
+Payment verification state machine shared by every gateway callback view.
+
+A callback for the same payment can arrive several times at once (browser
+redirect, user refresh, a second tab). Verification is deduplicated on three
+levels so the gateway is asked at most once and side effects run exactly once:
+
+1. Idempotency key — `<kind>:<gateway>:<callback id>` (the eSewa
+   transaction_uuid or the Khalti pidx). Final outcomes (completed, or a
+   status no callback can change) are cached under it, so duplicate
+   callbacks are answered without calling the gateway. Failed checks are
+   not cached, since a failed payment may still complete.
+2. In-flight coalescing — callbacks with the same key in one process wait
+   for the first one and reuse its outcome.
+3. Row lock — across workers, the payment row is locked with
+   select_for_update() for the whole check-and-transition, so a second
+   worker blocks until the first commits and then sees the final status.
+
+Payment status transitions:
+    initiated -> completed | failed
+    failed    -> completed | failed   (a later callback may still succeed)
+    completed and refunded are final.
+"""
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from hmac import compare_digest
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+
+from appointment.models import Appointment
+from notification.utils import send_notification, notify_admins
+
+from .ledger import post_earning
+from .models import Payment
+from .revenue import record_completed_payment
+from .serializers import PaymentSerializer
+from .utils import generate_esewa_signature, verify_esewa_payment_remote, verify_khalti_payment
+
+
+KIND_APPOINTMENT = "appointment"
+KIND_CASE = "case"
+
+GATEWAY_ESEWA = "esewa"
+GATEWAY_KHALTI = "khalti"
+
+GATEWAY_LABELS = {
+    GATEWAY_ESEWA: "eSewa",
+    GATEWAY_KHALTI: "Khalti",
+}
+
+# What a gateway said about one payment
+CHECK_COMPLETED = "completed"
+CHECK_FAILED = "failed"
+CHECK_PENDING = "pending"
+CHECK_UNAVAILABLE = "unavailable"
+
+# Gateway statuses that mean the payment will never complete
+ESEWA_FAILED_STATUSES = {"NOT_FOUND", "CANCELED", "FULL_REFUND", "PARTIAL_REFUND"}
+KHALTI_FAILED_STATUSES = {"Expired", "User canceled"}
+
+TRANSITIONS = {
+    Payment.STATUS_INITIATED: {Payment.STATUS_COMPLETED, Payment.STATUS_FAILED},
+    Payment.STATUS_FAILED: {Payment.STATUS_COMPLETED, Payment.STATUS_FAILED},
+    Payment.STATUS_COMPLETED: set(),
+    Payment.STATUS_REFUNDED: set(),
+}
+
+# Relations each completion handler reads, fetched together with the locked row
+KIND_RELATED = {
+    KIND_APPOINTMENT: (
+        "user",
+        "lawyer",
+        "appointment",
+        "appointment__consultation",
+        "appointment__consultation__lawyer",
+    ),
+    KIND_CASE: (
+        "user",
+        "lawyer",
+        "case_payment_request",
+        "case_payment_request__case",
+        "case_payment_request__case__lawyer",
+        "case_payment_request__case__client",
+    ),
+}
+
+KIND_FILTERS = {
+    KIND_APPOINTMENT: Q(appointment__isnull=False),
+    KIND_CASE: Q(case_payment_request__isnull=False),
+}
+
+
+class InvalidTransition(ValueError):
+    """Raised when a payment is moved to a status its current status cannot reach."""
+
+
+@dataclass(frozen=True)
+class GatewayCheck:
+    """Result of asking a gateway about one payment."""
+    state: str
+    gateway_status: Optional[str] = None
+    reference: Optional[str] = None
+
+
+def transition(payment, new_status, reference=None):
+    """
+    Move a locked payment to new_status, enforcing TRANSITIONS.
+    Completed payments are added to the revenue rollup and the lawyer's
+    earnings ledger in the same transaction.
+    """
+    if new_status not in TRANSITIONS[payment.status]:
+        raise InvalidTransition(f"Payment #{payment.pk} cannot move from {payment.status} to {new_status}.")
+
+    payment.status = new_status
+    update_fields = ["status", "updated_at"]
+    if reference:
+        payment.esewa_ref_id = reference
+        update_fields.append("esewa_ref_id")
+    payment.save(update_fields=update_fields)
+
+    if new_status == Payment.STATUS_COMPLETED:
+        record_completed_payment(payment)
+        post_earning(payment)
+
+
+# ── Gateway checks ───────────────────────────────────────────────────────────
+
+def _esewa_callback_is_authentic(payment, callback_data):
+    """Check the HMAC signature eSewa put on the redirect data."""
+    signature = callback_data.get("signature")
+    signed_fields = (callback_data.get("signed_field_names") or "").split(",")
+    if not signature or not {"status", "transaction_uuid"} <= set(signed_fields):
+        return False
+
+    message = ",".join(f"{field}={callback_data.get(field, '')}" for field in signed_fields)
+    if not compare_digest(signature, generate_esewa_signature(message)):
+        return False
+
+    if str(callback_data.get("transaction_uuid")) != str(payment.transaction_uuid):
+        return False
+
+    if "total_amount" in signed_fields:
+        try:
+            amount = Decimal(str(callback_data.get("total_amount")).replace(",", ""))
+        except InvalidOperation:
+            return False
+        if amount != payment.total_amount:
+            return False
+
+    return True
+
+
+def check_esewa(payment, callback_data):
+    """
+    Ask eSewa's status API about a payment. If eSewa is unreachable, fall back
+    to the signed callback data, which is trusted only when its HMAC matches.
+    """
+    esewa_status, reference = verify_esewa_payment_remote(
+        total_amount=payment.total_amount,
+        transaction_uuid=payment.transaction_uuid,
+    )
+
+    if esewa_status is None:
+        if not _esewa_callback_is_authentic(payment, callback_data):
+            return GatewayCheck(CHECK_UNAVAILABLE)
+        esewa_status = callback_data.get("status")
+        reference = callback_data.get("transaction_code")
+
+    if esewa_status == "COMPLETE":
+        return GatewayCheck(CHECK_COMPLETED, esewa_status, reference)
+    if esewa_status in ESEWA_FAILED_STATUSES:
+        return GatewayCheck(CHECK_FAILED, esewa_status)
+    return GatewayCheck(CHECK_PENDING, esewa_status)
+
+
+def check_khalti(payment, pidx):
+    """Ask Khalti's lookup API about a payment."""
+    is_ok, lookup_data = verify_khalti_payment(pidx)
+    if not is_ok:
+        return GatewayCheck(CHECK_UNAVAILABLE)
+
+    khalti_status = lookup_data.get("status")
+    if khalti_status == "Completed":
+        reference = f"pidx:{pidx}|txn:{lookup_data.get('transaction_id', '')}"
+        return GatewayCheck(CHECK_COMPLETED, khalti_status, reference)
+    if khalti_status in KHALTI_FAILED_STATUSES:
+        return GatewayCheck(CHECK_FAILED, khalti_status)
+    return GatewayCheck(CHECK_PENDING, khalti_status)
+
+
+def khalti_pidx_filter(pidx):
+    """Match a Khalti payment by pidx, before or after completion rewrote esewa_ref_id."""
+    return Q(esewa_ref_id=pidx) | Q(esewa_ref_id__startswith=f"pidx:{pidx}|")
+
+
+# ── Completion side effects ──────────────────────────────────────────────────
+
+def _complete_appointment(payment, gateway_label):
+    appointment = payment.appointment
+    appointment.payment_status = Appointment.PAYMENT_PAID
+    appointment.status = Appointment.STATUS_CONFIRMED
+    appointment.save(update_fields=["payment_status", "status", "updated_at"])
+
+    lawyer = appointment.consultation.lawyer
+
+    # Sending notification to the lawyer about payment received
+    send_notification(
+        user=lawyer,
+        title="Payment Received",
+        message=f"{payment.user.name} has paid Rs. {payment.total_amount} for the consultation via {gateway_label}. Your earning: Rs. {payment.lawyer_earning}",
+        notif_type="payment",
+        link="/lawyerearning",
+    )
+
+    # Notify admin about payment received (admin pays lawyer manually)
+    notify_admins(
+        title="New Consultation Payment Received",
+        message=f"Client {payment.user.name} paid Rs. {payment.total_amount} via {gateway_label} for consultation with {lawyer.name}. Platform fee: Rs. {payment.platform_fee}. Lawyer payout pending: Rs. {payment.lawyer_earning}.",
+        notif_type="payment",
+        link="/admin/payments",
+    )
+
+
+def _complete_case(payment, gateway_label):
+    now = timezone.now()
+
+    case_payment = payment.case_payment_request
+    case_payment.status = 'paid'
+    case_payment.paid_at = now
+    case_payment.save(update_fields=["status", "paid_at"])
+
+    # Automatically mark Case as completed
+    case = case_payment.case
+    case.status = 'completed'
+    case.completed_at = now
+    case.save(update_fields=["status", "completed_at", "updated_at"])
+
+    # Notify lawyer
+    send_notification(
+        user=case.lawyer,
+        title="Case Payment Received",
+        message=f"Client paid Rs. {payment.amount} for case: {case.case_title}. The case is now marked as completed.",
+        notif_type="payment",
+        link=f"/lawyercase/{case.id}",
+    )
+
+    # Notify client
+    send_notification(
+        user=case.client,
+        title="Payment Successful",
+        message=f"Your payment of Rs. {payment.total_amount} for case '{case.case_title}' was successful. The case is now completed.",
+        notif_type="payment",
+        link=f"/client/case/{case.id}",
+    )
+
+    # Notify admin about case payment (admin pays lawyer manually)
+    notify_admins(
+        title="New Case Payment Received",
+        message=f"Client {case.client.name} paid Rs. {payment.total_amount} via {gateway_label} for case '{case.case_title}' (Lawyer: {case.lawyer.name}). Platform fee: Rs. {payment.platform_fee}. Lawyer payout pending: Rs. {payment.lawyer_earning}.",
+        notif_type="payment",
+        link="/admin/payments",
+    )
+
+
+COMPLETION_HANDLERS = {
+    KIND_APPOINTMENT: _complete_appointment,
+    KIND_CASE: _complete_case,
+}
+
+
+# ── Outcomes ─────────────────────────────────────────────────────────────────
+# Outcomes are plain dicts of api_response() keyword arguments, so they can be
+# cached as-is and replayed with `api_response(**outcome)`.
+
+def _success(message, payment):
+    return {
+        "is_success": True,
+        "status_code": status.HTTP_200_OK,
+        "result": {
+            "message": message,
+            "payment": dict(PaymentSerializer(payment).data),
+        },
+    }
+
+
+def _error(message, status_code):
+    return {
+        "is_success": False,
+        "status_code": status_code,
+        "error_message": {"error": message},
+    }
+
+
+# ── In-flight coalescing ─────────────────────────────────────────────────────
+
+class _InFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.callers = 0
+        self.outcome = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _join(key):
+    with _inflight_lock:
+        entry = _inflight.get(key)
+        if entry is None:
+            entry = _inflight[key] = _InFlight()
+        entry.callers += 1
+    return entry
+
+
+def _leave(key, entry):
+    with _inflight_lock:
+        entry.callers -= 1
+        if not entry.callers:
+            del _inflight[key]
+
+
+# ── Engine ───────────────────────────────────────────────────────────────────
+
+def idempotency_key(kind, gateway, callback_id):
+    return f"payment-verify:{kind}:{gateway}:{callback_id}"
+
+
+def _verify_locked(kind, gateway, lookup, check):
+    """
+    Lock the payment row, ask the gateway and apply the transition.
+    Returns (outcome, is_final); only final outcomes may be replayed.
+    """
+    gateway_label = GATEWAY_LABELS[gateway]
+
+    with transaction.atomic():
+        payment = (
+            Payment.objects
+            .select_for_update(of=("self",))
+            .select_related(*KIND_RELATED[kind])
+            .filter(KIND_FILTERS[kind], lookup, payment_method=gateway)
+            .first()
+        )
+        if payment is None:
+            return _error("Payment record not found.", status.HTTP_404_NOT_FOUND), False
+
+        # Another callback already finished this payment; never call the gateway again
+        if payment.status == Payment.STATUS_COMPLETED:
+            return _success("Payment already verified.", payment), True
+        if not TRANSITIONS[payment.status]:
+            return _error(f"Payment is {payment.get_status_display().lower()}.", status.HTTP_400_BAD_REQUEST), True
+
+        result = check(payment)
+
+        if result.state == CHECK_UNAVAILABLE:
+            return _error(f"{gateway_label} verification service is unavailable. Please try again.", status.HTTP_502_BAD_GATEWAY), False
+
+        if result.state == CHECK_PENDING:
+            return _error(
+                f"Payment is not complete yet. {gateway_label} status: {result.gateway_status or 'Unknown'}",
+                status.HTTP_400_BAD_REQUEST,
+            ), False
+
+        # Not final: a failed payment may still complete when the gateway settles
+        if result.state == CHECK_FAILED:
+            transition(payment, Payment.STATUS_FAILED)
+            return _error(
+                f"Payment verification failed. {gateway_label} status: {result.gateway_status}",
+                status.HTTP_400_BAD_REQUEST,
+            ), False
+
+        transition(payment, Payment.STATUS_COMPLETED, reference=result.reference)
+        COMPLETION_HANDLERS[kind](payment, gateway_label)
+        return _success("Payment verified successfully.", payment), True
+
+
+def verify_payment(kind, gateway, callback_id, lookup, check):
+    """
+    Verify one gateway callback and return an api_response() outcome dict.
+
+    kind        : KIND_APPOINTMENT or KIND_CASE
+    gateway     : GATEWAY_ESEWA or GATEWAY_KHALTI
+    callback_id : the gateway's id for this payment, used as idempotency key
+    lookup      : Q object selecting the payment row
+    check       : callable(payment) -> GatewayCheck, called with the row locked
+    """
+    key = idempotency_key(kind, gateway, callback_id)
+
+    outcome = cache.get(key)
+    if outcome is not None:
+        return outcome
+
+    entry = _join(key)
+    try:
+        with entry.lock:
+            # A concurrent caller with the same key finished while we waited
+            if entry.outcome is not None:
+                return entry.outcome
+            outcome = cache.get(key)
+            if outcome is not None:
+                return outcome
+
+            outcome, is_final = _verify_locked(kind, gateway, lookup, check)
+            if is_final:
+                cache.set(key, outcome, settings.PAYMENT_VERIFICATION_CACHE_TTL)
+            entry.outcome = outcome
+            return outcome
+    finally:
+        _leave(key, entry)
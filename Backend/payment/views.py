@@ -1,15 +1,17 @@
 import base64
 import json
-import requests
+import uuid
 
 from decimal import Decimal
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
+from django.db import transaction
+from django.db.models import Sum, Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import PermissionDenied
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -17,20 +19,49 @@ from drf_yasg import openapi
 from appointment.models import Appointment
 from consultation.models import Consultation
 from authentication.permissions import IsSuperUser
-from notification.utils import send_notification, notify_admins
+from notification.utils import send_notification
+from meronaya.pagination import fetch_page, parse_page_size
 from meronaya.resonses import api_response
+from meronaya.streaming import stream_response
 from case.models import Case
 
-from .models import Payment, Payout, CasePaymentRequest
-from .serializers import PaymentSerializer, EsewaInitiateSerializer, KhaltiInitiateSerializer, PayoutSerializer, CreatePayoutSerializer
-from hmac import compare_digest as hmac_compare
+from .models import Payment, Payout, CasePaymentRequest, LawyerLedgerEntry
+from .serializers import (
+    PaymentSerializer,
+    EsewaInitiateSerializer,
+    KhaltiInitiateSerializer,
+    PayoutSerializer,
+    CreatePayoutSerializer,
+    PayoutRunSerializer,
+    CasePaymentRequestSerializer,
+    LawyerLedgerEntrySerializer,
+)
 from .utils import (
     generate_esewa_signature,
     build_esewa_signature_message,
     get_esewa_payment_params,
     initiate_khalti_payment,
-    verify_khalti_payment,
-    verify_esewa_payment_remote,
+    get_gateway_metrics,
+)
+from .exports import (
+    EXPORT_FORMATS,
+    EXPORT_RESOURCES,
+    EXPORT_WRITERS,
+    export_queryset,
+    parse_export_filters,
+)
+from .ledger import get_balance, post_payout
+from .payouts import preview_payout_run, run_payouts
+from .revenue import lawyer_breakdown, record_payout, revenue_totals
+from .verification import (
+    KIND_APPOINTMENT,
+    KIND_CASE,
+    GATEWAY_ESEWA,
+    GATEWAY_KHALTI,
+    check_esewa,
+    check_khalti,
+    khalti_pidx_filter,
+    verify_payment,
 )
 
 
@@ -156,6 +187,33 @@ class EsewaInitiateView(APIView):
             )
 
 
+def _decode_esewa_callback(request):
+    """
+    Decode the Base64 `data` parameter eSewa appends to its redirect.
+    Returns (payment_data, None) or (None, error_response).
+    """
+    encoded_data = request.query_params.get("data")
+    if not encoded_data:
+        return None, api_response(
+            is_success=False,
+            error_message={"error": "Missing payment data."},
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        payment_data = json.loads(base64.b64decode(encoded_data).decode("utf-8"))
+        transaction_uuid = uuid.UUID(str(payment_data.get("transaction_uuid")))
+    except Exception:
+        return None, api_response(
+            is_success=False,
+            error_message={"error": "Invalid payment data."},
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    payment_data["transaction_uuid"] = str(transaction_uuid)
+    return payment_data, None
+
+
 # Creating API view for verifying eSewa payment after the user is redirected back from eSewa.
 class EsewaVerifyView(APIView):
     permission_classes = [AllowAny]
@@ -182,143 +240,18 @@ class EsewaVerifyView(APIView):
     # Creating get method to handle eSewa payment verification after redirect.
     def get(self, request):
         try:
-            encoded_data = request.query_params.get("data")
-
-            if not encoded_data:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Missing payment data."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Decoding the Base64 data from eSewa
-            try:
-                decoded_bytes = base64.b64decode(encoded_data)
-                payment_data = json.loads(decoded_bytes.decode("utf-8"))
-            except Exception:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Invalid payment data."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            transaction_uuid = payment_data.get("transaction_uuid")
-            esewa_ref_id = payment_data.get("transaction_code", "")
-
-            if not transaction_uuid:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Missing transaction UUID."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Finding the payment record in the database
-            try:
-                payment = Payment.objects.select_related(
-                    "appointment",
-                    "appointment__consultation",
-                    "appointment__consultation__lawyer",
-                    "appointment__consultation__client",
-                ).get(transaction_uuid=transaction_uuid)
-            except Payment.DoesNotExist:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Payment record not found."},
-                    status_code=status.HTTP_404_NOT_FOUND,
-                )
-
-            # If already completed, return success without re-verifying
-            if payment.status == Payment.STATUS_COMPLETED:
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment already verified.",
-                        "payment": PaymentSerializer(payment).data,
-                    },
-                )
-
-            # Verifying with eSewa's transaction status API using utility
-            esewa_transaction_status, esewa_ref = verify_esewa_payment_remote(
-                total_amount=payment.total_amount,
-                transaction_uuid=payment.transaction_uuid,
+            payment_data, error = _decode_esewa_callback(request)
+            if error:
+                return error
+
+            outcome = verify_payment(
+                kind=KIND_APPOINTMENT,
+                gateway=GATEWAY_ESEWA,
+                callback_id=payment_data["transaction_uuid"],
+                lookup=Q(transaction_uuid=payment_data["transaction_uuid"]),
+                check=lambda payment: check_esewa(payment, payment_data),
             )
-            
-            if esewa_transaction_status is None:
-                # Server-to-server call failed — fall back to HMAC signature verification
-                callback_status = payment_data.get("status")
-                callback_signature = payment_data.get("signature")
-                signed_field_names = payment_data.get("signed_field_names", "")
-
-                if callback_status == "COMPLETE" and callback_signature and signed_field_names:
-                    # Rebuilding the signed message from the callback fields
-                    signed_fields = signed_field_names.split(",")
-                    message_parts = [f"{field}={payment_data.get(field, '')}" for field in signed_fields]
-                    message = ",".join(message_parts)
-                    expected_signature = generate_esewa_signature(message)
-
-                    if hmac_compare.compare_digest(callback_signature, expected_signature):
-                        esewa_transaction_status = "COMPLETE"
-                    else:
-                        return api_response(
-                            is_success=False,
-                            error_message={"error": "eSewa signature verification failed."},
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                        )
-                else:
-                    return api_response(
-                        is_success=False,
-                        error_message={"error": "eSewa server unreachable and callback data insufficient for verification."},
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                    )
-
-            if esewa_transaction_status == "COMPLETE":
-                # Marking payment as completed
-                payment.status = Payment.STATUS_COMPLETED
-                payment.esewa_ref_id = esewa_ref
-                payment.save(update_fields=["status", "esewa_ref_id", "updated_at"])
-
-                # Updating appointment payment status
-                appointment = payment.appointment
-                appointment.payment_status = Appointment.PAYMENT_PAID
-                appointment.status = Appointment.STATUS_CONFIRMED
-                appointment.save(update_fields=["payment_status", "status", "updated_at"])
-
-                # Sending notification to the lawyer about payment received
-                send_notification(
-                    user=appointment.consultation.lawyer,
-                    title="Payment Received",
-                    message=f"{payment.user.name} has paid Rs. {payment.total_amount} for the consultation via eSewa. Your earning: Rs. {payment.lawyer_earning}",
-                    notif_type="payment",
-                    link="/lawyerearning",
-                )
-
-                # Notify admin about payment received (admin pays lawyer manually)
-                notify_admins(
-                    title="New Consultation Payment Received",
-                    message=f"Client {payment.user.name} paid Rs. {payment.total_amount} via eSewa for consultation with {appointment.consultation.lawyer.name}. Platform fee: Rs. {payment.platform_fee}. Lawyer payout pending: Rs. {payment.lawyer_earning}.",
-                    notif_type="payment",
-                    link="/admin/payments",
-                )
-
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment verified successfully.",
-                        "payment": PaymentSerializer(payment).data,
-                    },
-                )
-            else:
-                # Payment not complete on eSewa's side
-                payment.status = Payment.STATUS_FAILED
-                payment.save(update_fields=["status", "updated_at"])
-
-                return api_response(
-                    is_success=False,
-                    error_message={"error": f"Payment verification failed. eSewa status: {esewa_transaction_status}"},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
+            return api_response(**outcome)
 
         except Exception as e:
             return api_response(
@@ -519,7 +452,6 @@ class KhaltiVerifyView(APIView):
     def get(self, request):
         try:
             pidx = request.query_params.get("pidx")
-            purchase_order_id = request.query_params.get("purchase_order_id")
 
             if not pidx:
                 return api_response(
@@ -528,121 +460,16 @@ class KhaltiVerifyView(APIView):
                     status_code=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Finding the payment record — look up by transaction_uuid (purchase_order_id) or pidx stored in esewa_ref_id
-            payment = None
-            if purchase_order_id:
-                try:
-                    payment = Payment.objects.select_related(
-                        "appointment",
-                        "appointment__consultation",
-                        "appointment__consultation__lawyer",
-                        "appointment__consultation__client",
-                    ).get(
-                        transaction_uuid=purchase_order_id,
-                        payment_method="khalti",
-                        appointment__isnull=False,
-                    )
-                except Payment.DoesNotExist:
-                    pass
-
-            if not payment:
-                try:
-                    payment = Payment.objects.select_related(
-                        "appointment",
-                        "appointment__consultation",
-                        "appointment__consultation__lawyer",
-                        "appointment__consultation__client",
-                    ).get(
-                        esewa_ref_id=pidx,
-                        payment_method="khalti",
-                        appointment__isnull=False,
-                    )
-                except Payment.DoesNotExist:
-                    return api_response(
-                        is_success=False,
-                        error_message={"error": "Payment record not found."},
-                        status_code=status.HTTP_404_NOT_FOUND,
-                    )
-
-            if not payment.appointment:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Invalid appointment payment record."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # If already completed, return success without re-verifying
-            if payment.status == Payment.STATUS_COMPLETED:
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment already verified.",
-                        "payment": PaymentSerializer(payment).data,
-                    },
-                )
-
-            # Calling Khalti's lookup API using utility
-            is_ok, lookup_data = verify_khalti_payment(pidx)
-            
-            if not is_ok:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": f"Khalti verification failed: {lookup_data}"},
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                )
-
-            khalti_status = lookup_data.get("status")
-            khalti_transaction_id = lookup_data.get("transaction_id", "")
-
-            if khalti_status == "Completed":
-                # Marking payment as completed
-                payment.status = Payment.STATUS_COMPLETED
-                payment.esewa_ref_id = f"pidx:{pidx}|txn:{khalti_transaction_id}"
-                payment.save(update_fields=["status", "esewa_ref_id", "updated_at"])
-
-                # Updating appointment payment status
-                appointment = payment.appointment
-                appointment.payment_status = Appointment.PAYMENT_PAID
-                appointment.status = Appointment.STATUS_CONFIRMED
-                appointment.save(update_fields=["payment_status", "status", "updated_at"])
-
-                # Sending notification to the lawyer about payment received
-                send_notification(
-                    user=appointment.consultation.lawyer,
-                    title="Payment Received",
-                    message=f"{payment.user.name} has paid Rs. {payment.total_amount} for the consultation via Khalti. Your earning: Rs. {payment.lawyer_earning}",
-                    notif_type="payment",
-                    link="/lawyerearning",
-                )
-
-                # Notify admin about payment received (admin pays lawyer manually)
-                notify_admins(
-                    title="New Consultation Payment Received",
-                    message=f"Client {payment.user.name} paid Rs. {payment.total_amount} via Khalti for consultation with {appointment.consultation.lawyer.name}. Platform fee: Rs. {payment.platform_fee}. Lawyer payout pending: Rs. {payment.lawyer_earning}.",
-                    notif_type="payment",
-                    link="/admin/payments",
-                )
-
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment verified successfully.",
-                        "payment": PaymentSerializer(payment).data,
-                    },
-                )
-            else:
-                # Payment not complete on Khalti's side
-                if khalti_status in ("Expired", "User canceled"):
-                    payment.status = Payment.STATUS_FAILED
-                    payment.save(update_fields=["status", "updated_at"])
-
-                return api_response(
-                    is_success=False,
-                    error_message={"error": f"Payment verification failed. Khalti status: {khalti_status}"},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
+            # The payment is matched by the pidx stored at initiation, so a
+            # callback can only ever verify the payment that pidx belongs to
+            outcome = verify_payment(
+                kind=KIND_APPOINTMENT,
+                gateway=GATEWAY_KHALTI,
+                callback_id=pidx,
+                lookup=khalti_pidx_filter(pidx),
+                check=lambda payment: check_khalti(payment, pidx),
+            )
+            return api_response(**outcome)
 
         except Exception as e:
             return api_response(
@@ -735,12 +562,16 @@ class PaymentDetailView(APIView):
             )
 
 
-# Creating API view for lawyer to see their earnings summary and payment history.
+# Creating API view for lawyer to see their earnings summary.
 class LawyerEarningsView(APIView):
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Get earnings summary and payment history for the authenticated lawyer.",
+        operation_description=(
+            "Get the earnings summary for the authenticated lawyer. "
+            "History is served by the paginated earnings/payments/, earnings/payouts/, "
+            "earnings/case-requests/ and earnings/ledger/ endpoints."
+        ),
         responses={
             200: openapi.Response(description="Earnings retrieved successfully."),
             403: openapi.Response(description="Only lawyers can access this endpoint."),
@@ -759,65 +590,100 @@ class LawyerEarningsView(APIView):
                     status_code=status.HTTP_403_FORBIDDEN,
                 )
 
-            # Querying all completed payments for this lawyer
-            completed_payments = Payment.objects.filter(
-                lawyer=user,
-                status=Payment.STATUS_COMPLETED,
-            )
-
-            # Calculating totals
-            totals = completed_payments.aggregate(
-                total_earned=Sum("lawyer_earning"),
-                total_platform_fee=Sum("platform_fee"),
-                total_amount=Sum("total_amount"),
-                total_transactions=Count("id"),
-            )
+            # Running totals kept by the earnings ledger — a single-row read
+            balance = get_balance(user)
 
-            # Payout totals — how much has been paid out vs pending
-            paid_out = completed_payments.filter(payout_status=Payment.PAYOUT_PAID).aggregate(
-                paid_out_amount=Sum("lawyer_earning"),
-                paid_out_count=Count("id"),
+            return api_response(
+                is_success=True,
+                status_code=status.HTTP_200_OK,
+                result={
+                    "message": "Earnings retrieved successfully.",
+                    "summary": {
+                        "total_earned": str(balance.total_earned),
+                        "total_platform_fee": str(balance.total_platform_fee),
+                        "total_received_from_clients": str(balance.total_received),
+                        "total_transactions": balance.transaction_count,
+                        "commission_rate": str(settings.PLATFORM_COMMISSION_PERCENT),
+                        "paid_out": str(balance.paid_out),
+                        "paid_out_count": balance.paid_out_count,
+                        "pending_payout": str(balance.pending),
+                        "pending_count": balance.pending_count,
+                    },
+                },
             )
-            pending_payout = completed_payments.filter(payout_status=Payment.PAYOUT_PENDING).aggregate(
-                pending_amount=Sum("lawyer_earning"),
-                pending_count=Count("id"),
+        except Exception as e:
+            return api_response(
+                is_success=False,
+                error_message=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-            # All payments for this lawyer (any status) for the history table
-            all_payments = Payment.objects.filter(lawyer=user).select_related(
-                "user", "appointment", "appointment__consultation"
-            )
-            serializer = PaymentSerializer(all_payments, many=True)
 
-            # Get case payment requests for history
-            from .models import CasePaymentRequest
-            from .serializers import CasePaymentRequestSerializer
-            case_requests = CasePaymentRequest.objects.filter(lawyer=user)
-            case_request_serializer = CasePaymentRequestSerializer(case_requests, many=True)
+# Base view for the lawyer's paginated earnings history sub-resources.
+class LawyerEarningsHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = None
+    result_key = None
+
+    def get_queryset(self, user):
+        raise NotImplementedError
+
+    @swagger_auto_schema(
+        operation_description="Page through the authenticated lawyer's earnings history, newest first.",
+        manual_parameters=[
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="next_cursor from the previous page",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Rows per page (default 50, max 200)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+        ],
+        responses={
+            200: openapi.Response(description="History page retrieved successfully."),
+            400: openapi.Response(description="Invalid cursor."),
+            403: openapi.Response(description="Only lawyers can access this endpoint."),
+            500: openapi.Response(description="Internal server error."),
+        },
+        tags=["Payment"],
+    )
+    def get(self, request):
+        try:
+            user = request.user
+            if not user.is_lawyer:
+                return api_response(
+                    is_success=False,
+                    error_message={"error": "Only lawyers can access earnings."},
+                    status_code=status.HTTP_403_FORBIDDEN,
+                )
 
-            # Payout history for this lawyer
-            payouts = Payout.objects.filter(lawyer=user).select_related("processed_by")
-            payout_serializer = PayoutSerializer(payouts, many=True)
+            try:
+                rows, next_cursor = fetch_page(
+                    self.get_queryset(user),
+                    cursor=request.query_params.get("cursor"),
+                    limit=parse_page_size(request.query_params.get("limit")),
+                )
+            except ValueError:
+                return api_response(
+                    is_success=False,
+                    error_message={"error": "Invalid cursor."},
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
 
+            serializer = self.serializer_class(rows, many=True)
             return api_response(
                 is_success=True,
                 status_code=status.HTTP_200_OK,
                 result={
-                    "message": "Earnings and requests retrieved successfully.",
-                    "summary": {
-                        "total_earned": str(totals["total_earned"] or 0),
-                        "total_platform_fee": str(totals["total_platform_fee"] or 0),
-                        "total_received_from_clients": str(totals["total_amount"] or 0),
-                        "total_transactions": totals["total_transactions"] or 0,
-                        "commission_rate": str(settings.PLATFORM_COMMISSION_PERCENT),
-                        "paid_out": str(paid_out["paid_out_amount"] or 0),
-                        "paid_out_count": paid_out["paid_out_count"] or 0,
-                        "pending_payout": str(pending_payout["pending_amount"] or 0),
-                        "pending_count": pending_payout["pending_count"] or 0,
-                    },
-                    "payments": serializer.data,
-                    "case_payment_requests": case_request_serializer.data,
-                    "payouts": payout_serializer.data,
+                    self.result_key: serializer.data,
+                    "next_cursor": next_cursor,
                 },
             )
         except Exception as e:
@@ -828,14 +694,76 @@ class LawyerEarningsView(APIView):
             )
 
 
+# All payments for the lawyer (any status).
+class LawyerEarningsPaymentsView(LawyerEarningsHistoryView):
+    serializer_class = PaymentSerializer
+    result_key = "payments"
+
+    def get_queryset(self, user):
+        return Payment.objects.filter(lawyer=user).select_related(
+            "user", "lawyer", "appointment", "appointment__consultation"
+        )
+
+
+# Payouts the admin has made to the lawyer.
+class LawyerEarningsPayoutsView(LawyerEarningsHistoryView):
+    serializer_class = PayoutSerializer
+    result_key = "payouts"
+
+    def get_queryset(self, user):
+        return Payout.objects.filter(lawyer=user).select_related(
+            "lawyer", "processed_by"
+        ).prefetch_related("payments")
+
+
+# Case payment requests raised by the lawyer.
+class LawyerEarningsCaseRequestsView(LawyerEarningsHistoryView):
+    serializer_class = CasePaymentRequestSerializer
+    result_key = "case_payment_requests"
+
+    def get_queryset(self, user):
+        return CasePaymentRequest.objects.filter(lawyer=user).select_related(
+            "case", "case__client", "lawyer"
+        )
+
+
+# Earnings ledger entries with running balances.
+class LawyerEarningsLedgerView(LawyerEarningsHistoryView):
+    serializer_class = LawyerLedgerEntrySerializer
+    result_key = "entries"
+
+    def get_queryset(self, user):
+        return LawyerLedgerEntry.objects.filter(lawyer=user)
+
+
 # Creating API view for admin to see platform revenue summary and all transactions.
 class AdminRevenueView(APIView):
     permission_classes = [IsAuthenticated, IsSuperUser]
 
     @swagger_auto_schema(
-        operation_description="Get platform revenue summary and all completed transactions. Admin only.",
+        operation_description=(
+            "Get platform revenue summary and completed transactions. Admin only. "
+            "Totals come from the daily revenue rollup; the transaction table is cursor paginated."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="next_cursor from the previous page",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Transactions per page (default 50, max 200)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+        ],
         responses={
             200: openapi.Response(description="Revenue data retrieved successfully."),
+            400: openapi.Response(description="Invalid cursor."),
             403: openapi.Response(description="Admin access required."),
             500: openapi.Response(description="Internal server error."),
         },
@@ -844,61 +772,34 @@ class AdminRevenueView(APIView):
     # Creating get method to retrieve the platform revenue data for admin.
     def get(self, request):
         try:
-            completed_payments = Payment.objects.filter(status=Payment.STATUS_COMPLETED)
-
-            # Platform-wide totals
-            totals = completed_payments.aggregate(
-                total_platform_revenue=Sum("platform_fee"),
-                total_lawyer_payouts=Sum("lawyer_earning"),
-                total_collected=Sum("total_amount"),
-                total_transactions=Count("id"),
-            )
-
-            # Payout status totals
-            paid_out_total = completed_payments.filter(payout_status=Payment.PAYOUT_PAID).aggregate(
-                amount=Sum("lawyer_earning"),
-            )
-            pending_payout_total = completed_payments.filter(payout_status=Payment.PAYOUT_PENDING).aggregate(
-                amount=Sum("lawyer_earning"),
-            )
-
-            # Per-lawyer breakdown with payout status
-            lawyer_breakdown = (
-                completed_payments.values("lawyer__id", "lawyer__name", "lawyer__email", "lawyer__phone", "lawyer__profile_image")
-                .annotate(
-                    total_paid=Sum("total_amount"),
-                    platform_fee=Sum("platform_fee"),
-                    lawyer_earned=Sum("lawyer_earning"),
-                    transaction_count=Count("id"),
-                    pending_payout=Sum(
-                        "lawyer_earning",
-                        filter=Q(payout_status=Payment.PAYOUT_PENDING),
-                    ),
-                    paid_out=Sum(
-                        "lawyer_earning",
-                        filter=Q(payout_status=Payment.PAYOUT_PAID),
-                    ),
-                    pending_payment_ids=Count(
-                        "id",
-                        filter=Q(payout_status=Payment.PAYOUT_PENDING),
-                    ),
-                )
-                .order_by("-lawyer_earned")
-            )
-
-            # All completed payments for the transaction table
-            all_payments = Payment.objects.filter(
+            # Transaction table page, newest first
+            completed_payments = Payment.objects.filter(
                 status=Payment.STATUS_COMPLETED
             ).select_related(
                 "user", "lawyer", "appointment", "appointment__consultation"
             )
-            serializer = PaymentSerializer(all_payments, many=True)
+            try:
+                page, next_cursor = fetch_page(
+                    completed_payments,
+                    cursor=request.query_params.get("cursor"),
+                    limit=parse_page_size(request.query_params.get("limit")),
+                )
+            except ValueError:
+                return api_response(
+                    is_success=False,
+                    error_message={"error": "Invalid cursor."},
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+            serializer = PaymentSerializer(page, many=True)
+
+            # Platform-wide and per-lawyer totals from the rollup
+            totals = revenue_totals()
+            lawyer_breakdown_list = lawyer_breakdown()
 
             # Recent payouts
-            recent_payouts = Payout.objects.all().select_related("lawyer", "processed_by")[:20]
+            recent_payouts = Payout.objects.all().select_related("lawyer", "processed_by").prefetch_related("payments")[:20]
             payout_serializer = PayoutSerializer(recent_payouts, many=True)
 
-            lawyer_breakdown_list = list(lawyer_breakdown)
             for lb in lawyer_breakdown_list:
                 if lb.get("lawyer__profile_image"):
                     image_path = str(lb["lawyer__profile_image"])
@@ -913,16 +814,17 @@ class AdminRevenueView(APIView):
                 result={
                     "message": "Revenue data retrieved successfully.",
                     "summary": {
-                        "total_platform_revenue": str(totals["total_platform_revenue"] or 0),
-                        "total_lawyer_payouts": str(totals["total_lawyer_payouts"] or 0),
-                        "total_collected": str(totals["total_collected"] or 0),
-                        "total_transactions": totals["total_transactions"] or 0,
+                        "total_platform_revenue": str(totals["platform_fee"]),
+                        "total_lawyer_payouts": str(totals["lawyer_earning"]),
+                        "total_collected": str(totals["total_collected"]),
+                        "total_transactions": totals["transaction_count"],
                         "commission_rate": str(settings.PLATFORM_COMMISSION_PERCENT),
-                        "total_paid_out": str(paid_out_total["amount"] or 0),
-                        "total_pending_payout": str(pending_payout_total["amount"] or 0),
+                        "total_paid_out": str(totals["paid_out_amount"]),
+                        "total_pending_payout": str(totals["pending_amount"]),
                     },
                     "lawyer_breakdown": lawyer_breakdown_list,
                     "payments": serializer.data,
+                    "next_cursor": next_cursor,
                     "payouts": payout_serializer.data,
                 },
             )
@@ -934,6 +836,74 @@ class AdminRevenueView(APIView):
             )
 
 
+# Base view streaming a payment-related table as CSV or NDJSON.
+class PaymentExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def scope_filters(self, request, filters):
+        """Restrict the export to what the requesting user may see."""
+        return filters
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Stream payments, payouts or case-requests as CSV or NDJSON, "
+            "e.g. .../export/payments.csv. Rows are sent as they are read, oldest first."
+        ),
+        manual_parameters=[
+            openapi.Parameter("date_from", openapi.IN_QUERY, description="First creation date (YYYY-MM-DD, inclusive)", type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter("date_to", openapi.IN_QUERY, description="Last creation date (YYYY-MM-DD, inclusive)", type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter("lawyer", openapi.IN_QUERY, description="Lawyer user ID", type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter("status", openapi.IN_QUERY, description="Row status (payments and case-requests)", type=openapi.TYPE_STRING, required=False),
+        ],
+        responses={
+            200: openapi.Response(description="Export stream."),
+            400: openapi.Response(description="Invalid filter."),
+            404: openapi.Response(description="Unknown export resource or format."),
+        },
+        tags=["Payment"],
+    )
+    def get(self, request, resource, export_format):
+        if resource not in EXPORT_RESOURCES or export_format not in EXPORT_FORMATS:
+            return api_response(
+                is_success=False,
+                error_message={"error": "Unknown export. Use payments, payouts or case-requests with .csv or .ndjson."},
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
+        try:
+            filters = self.scope_filters(request, parse_export_filters(request.query_params))
+            headers, queryset = export_queryset(resource, filters)
+        except ValueError as e:
+            return api_response(
+                is_success=False,
+                error_message={"error": str(e)},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        response = stream_response(
+            request,
+            EXPORT_WRITERS[export_format](headers, queryset),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        file_name = f"{resource}-{timezone.localdate().isoformat()}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        return response
+
+
+# Admin export across all lawyers.
+class AdminPaymentExportView(PaymentExportView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
+
+
+# Lawyer export of their own earnings history.
+class LawyerEarningsExportView(PaymentExportView):
+
+    def scope_filters(self, request, filters):
+        if not request.user.is_lawyer:
+            raise PermissionDenied("Only lawyers can export earnings.")
+        return {**filters, "lawyer_id": request.user.id}
+
+
 # Creating API view for admin to create a payout record when paying a lawyer.
 class AdminCreatePayoutView(APIView):
     permission_classes = [IsAuthenticated, IsSuperUser]
@@ -999,22 +969,36 @@ class AdminCreatePayoutView(APIView):
                     status_code=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Calculating total payout amount
-            payout_amount = payments.aggregate(total=Sum("lawyer_earning"))["total"]
+            with transaction.atomic():
+                # Locking the payments so a concurrent payout cannot settle them twice
+                payments = list(payments.select_for_update())
+                if len(payments) != len(payment_ids):
+                    return api_response(
+                        is_success=False,
+                        error_message={"error": "Some payment IDs are invalid, already paid out, or don't belong to this lawyer."},
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                    )
 
-            # Creating the payout record
-            payout = Payout.objects.create(
-                lawyer=lawyer,
-                processed_by=request.user,
-                amount=payout_amount,
-                reference_number=reference_number,
-                payment_method=payout_method,
-                notes=notes,
-            )
-            payout.payments.set(payments)
+                # Calculating total payout amount
+                payout_amount = sum((payment.lawyer_earning for payment in payments), Decimal("0"))
+
+                # Creating the payout record
+                payout = Payout.objects.create(
+                    lawyer=lawyer,
+                    processed_by=request.user,
+                    amount=payout_amount,
+                    reference_number=reference_number,
+                    payment_method=payout_method,
+                    notes=notes,
+                )
+                payout.payments.set(payments)
 
-            # Marking all included payments as paid out
-            payments.update(payout_status=Payment.PAYOUT_PAID)
+                # Marking all included payments as paid out
+                record_payout(payments)
+                post_payout(payout, payments)
+                Payment.objects.filter(id__in=[payment.id for payment in payments]).update(
+                    payout_status=Payment.PAYOUT_PAID,
+                )
 
             # Sending notification to the lawyer about the payout
             send_notification(
@@ -1043,6 +1027,86 @@ class AdminCreatePayoutView(APIView):
             )
 
 
+# Creating API view for admin to settle all lawyers' pending earnings up to a cutoff date in one run.
+class AdminPayoutRunView(APIView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Create one payout per lawyer for every completed, pending payment created on or before "
+            "cutoff_date. Use dry_run to preview the run. Admin only."
+        ),
+        request_body=PayoutRunSerializer,
+        responses={
+            200: openapi.Response(description="Dry-run preview."),
+            201: openapi.Response(description="Payouts created successfully."),
+            400: openapi.Response(description="Bad request or nothing to pay out."),
+            403: openapi.Response(description="Admin access required."),
+            500: openapi.Response(description="Internal server error."),
+        },
+        tags=["Payment"],
+    )
+    def post(self, request):
+        try:
+            serializer = PayoutRunSerializer(data=request.data)
+            if not serializer.is_valid():
+                return api_response(
+                    is_success=False,
+                    error_message=serializer.errors,
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+
+            data = serializer.validated_data
+            cutoff_date = data["cutoff_date"]
+            lawyer_ids = data.get("lawyer_ids")
+
+            if data["dry_run"]:
+                lawyers = preview_payout_run(cutoff_date, lawyer_ids)
+                return api_response(
+                    is_success=True,
+                    status_code=status.HTTP_200_OK,
+                    result={
+                        "message": f"{len(lawyers)} lawyers would be paid out.",
+                        "cutoff_date": cutoff_date,
+                        "total_amount": str(sum((Decimal(lawyer["amount"]) for lawyer in lawyers), Decimal("0"))),
+                        "lawyers": lawyers,
+                    },
+                )
+
+            lawyers = run_payouts(
+                cutoff_date,
+                processed_by=request.user,
+                lawyer_ids=lawyer_ids,
+                reference_number=data.get("reference_number", ""),
+                payment_method=data.get("payment_method", ""),
+                notes=data.get("notes", ""),
+            )
+            if not lawyers:
+                return api_response(
+                    is_success=False,
+                    error_message={"error": "No eligible pending payments found up to the cutoff date."},
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+
+            return api_response(
+                is_success=True,
+                status_code=status.HTTP_201_CREATED,
+                result={
+                    "message": f"Created {len(lawyers)} payouts.",
+                    "cutoff_date": cutoff_date,
+                    "total_amount": str(sum((Decimal(lawyer["amount"]) for lawyer in lawyers), Decimal("0"))),
+                    "lawyers": lawyers,
+                },
+            )
+
+        except Exception as e:
+            return api_response(
+                is_success=False,
+                error_message=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
 # Creating API view for admin to get pending payments for a specific lawyer (for the payout modal).
 class AdminLawyerPendingPaymentsView(APIView):
     permission_classes = [IsAuthenticated, IsSuperUser]
@@ -1110,6 +1174,26 @@ class AdminLawyerPendingPaymentsView(APIView):
             )
 
 
+# Creating API view for admin to inspect payment gateway client health.
+class AdminGatewayMetricsView(APIView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
+
+    @swagger_auto_schema(
+        operation_description="Get per-gateway request, retry, circuit breaker and latency metrics for this worker. Admin only.",
+        responses={
+            200: openapi.Response(description="Gateway metrics retrieved successfully."),
+            403: openapi.Response(description="Admin access required."),
+        },
+        tags=["Payment"],
+    )
+    def get(self, request):
+        return api_response(
+            is_success=True,
+            status_code=status.HTTP_200_OK,
+            result={"gateways": get_gateway_metrics()},
+        )
+
+
 # Creating API views for case payment requests
 class CreateCasePaymentRequestView(APIView):
     """
@@ -1634,149 +1718,19 @@ class EsewaVerifyCasePaymentView(APIView):
     )
     def get(self, request):
         try:
-            from .models import CasePaymentRequest
-
-            encoded_data = request.query_params.get("data")
-            if not encoded_data:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Missing payment data."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            try:
-                decoded_data = base64.b64decode(encoded_data).decode("utf-8")
-                payment_data = json.loads(decoded_data)
-            except Exception as e:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": f"Invalid payment data: {str(e)}"},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            transaction_uuid = payment_data.get("transaction_uuid")
-            if not transaction_uuid:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Missing transaction_uuid in payment data."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Get the payment record
-            try:
-                payment = Payment.objects.select_related(
-                    'case_payment_request', 'case_payment_request__case',
-                    'case_payment_request__case__lawyer', 'case_payment_request__case__client'
-                ).get(transaction_uuid=transaction_uuid)
-            except Payment.DoesNotExist:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Payment record not found."},
-                    status_code=status.HTTP_404_NOT_FOUND,
-                )
-
-            # If already completed
-            if payment.status == Payment.STATUS_COMPLETED:
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment already verified.",
-                        "payment": PaymentSerializer(payment).data,
-                    },
-                )
-
-            # Verifying with eSewa's transaction status API (v2)
-            esewa_transaction_status = None
-            esewa_ref = None
-
-            try:
-                verify_response = requests.get(
-                    settings.ESEWA_VERIFY_URL,
-                    params={
-                        "product_code": settings.ESEWA_PRODUCT_CODE,
-                        "total_amount": str(payment.total_amount),
-                        "transaction_uuid": str(payment.transaction_uuid),
-                    },
-                    timeout=15,
-                )
-                
-                if verify_response.status_code == 200:
-                    verify_data = verify_response.json()
-                    esewa_transaction_status = verify_data.get("status")
-                    esewa_ref = verify_data.get("ref_id")
-            except Exception:
-                # Fallback to signature verification if server-to-server call fails
-                callback_status = payment_data.get("status")
-                if callback_status == "COMPLETE":
-                    esewa_transaction_status = "COMPLETE"
-                    esewa_ref = payment_data.get("transaction_code")
-
-            if esewa_transaction_status == "COMPLETE":
-                # Mark as paid
-                case_payment = payment.case_payment_request
-                case_payment.status = 'paid'
-                case_payment.paid_at = timezone.now()
-                case_payment.save()
-
-                # Automatically mark Case as completed
-                case = case_payment.case
-                case.status = 'completed'
-                case.completed_at = timezone.now()
-                case.save(update_fields=["status", "completed_at", "updated_at"])
-
-                # Mark Payment record completed
-                payment.status = Payment.STATUS_COMPLETED
-                payment.esewa_ref_id = esewa_ref
-                payment.save()
-
-                # Notify lawyer
-                send_notification(
-                    user=case.lawyer,
-                    title="Case Payment Received",
-                    message=f"Client paid Rs. {payment.amount} for case: {case.case_title}. The case is now marked as completed.",
-                    notif_type="payment",
-                    link=f"/lawyercase/{case.id}",
-                )
-                
-                # Notify client
-                send_notification(
-                    user=case.client,
-                    title="Payment Successful",
-                    message=f"Your payment of Rs. {payment.total_amount} for case '{case.case_title}' was successful. The case is now completed.",
-                    notif_type="payment",
-                    link=f"/client/case/{case.id}",
-                )
-
-                # Notify admin about case payment (admin pays lawyer manually)
-                notify_admins(
-                    title="New Case Payment Received",
-                    message=f"Client {case.client.name} paid Rs. {payment.total_amount} via eSewa for case '{case.case_title}' (Lawyer: {case.lawyer.name}). Platform fee: Rs. {payment.platform_fee}. Lawyer payout pending: Rs. {payment.lawyer_earning}.",
-                    notif_type="payment",
-                    link="/admin/payments",
-                )
-
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment verified successfully",
-                        "transaction_id": esewa_ref,
-                    },
-                )
-            else:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": f"Payment verification failed. Status: {esewa_transaction_status or 'Unknown'}"},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-        except requests.exceptions.RequestException as e:
-            return api_response(
-                is_success=False,
-                error_message={"error": f"eSewa service error: {str(e)}"},
-                status_code=status.HTTP_502_BAD_GATEWAY,
+            payment_data, error = _decode_esewa_callback(request)
+            if error:
+                return error
+
+            outcome = verify_payment(
+                kind=KIND_CASE,
+                gateway=GATEWAY_ESEWA,
+                callback_id=payment_data["transaction_uuid"],
+                lookup=Q(transaction_uuid=payment_data["transaction_uuid"]),
+                check=lambda payment: check_esewa(payment, payment_data),
             )
+            return api_response(**outcome)
+
         except Exception as e:
             return api_response(
                 is_success=False,
@@ -1972,10 +1926,7 @@ class KhaltiVerifyCasePaymentView(APIView):
     )
     def get(self, request):
         try:
-            from .models import CasePaymentRequest, Payment
-
             pidx = request.query_params.get("pidx")
-            purchase_order_id = request.query_params.get("purchase_order_id")
 
             if not pidx:
                 return api_response(
@@ -1984,141 +1935,17 @@ class KhaltiVerifyCasePaymentView(APIView):
                     status_code=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Find payment record
-            payment = None
-            if purchase_order_id:
-                try:
-                    payment = Payment.objects.select_related(
-                        'case_payment_request', 'case_payment_request__case'
-                    ).get(
-                        transaction_uuid=purchase_order_id,
-                        payment_method="khalti",
-                        case_payment_request__isnull=False,
-                    )
-                except Payment.DoesNotExist:
-                    pass
-
-            if not payment:
-                try:
-                    payment = Payment.objects.select_related(
-                        'case_payment_request', 'case_payment_request__case'
-                    ).get(
-                        esewa_ref_id=pidx,
-                        payment_method="khalti",
-                        case_payment_request__isnull=False,
-                    )
-                except Payment.DoesNotExist:
-                    return api_response(
-                        is_success=False,
-                        error_message={"error": "Payment record not found."},
-                        status_code=status.HTTP_404_NOT_FOUND,
-                    )
-
-            if not payment.case_payment_request:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Invalid case payment record."},
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # If already completed
-            if payment.status == Payment.STATUS_COMPLETED:
-                return api_response(
-                    is_success=True,
-                    status_code=status.HTTP_200_OK,
-                    result={
-                        "message": "Payment already verified.",
-                        "payment": PaymentSerializer(payment).data,
-                    },
-                )
-
-            # Verify with Khalti
-            headers = {
-                "Authorization": f"Key {settings.KHALTI_SECRET_KEY}",
-                "Content-Type": "application/json",
-            }
-            verification_response = requests.post(
-                f"{settings.KHALTI_BASE_URL}/epayment/lookup/",
-                json={"pidx": pidx},
-                headers=headers,
-                timeout=15,
+            # The payment is matched by the pidx stored at initiation, so a
+            # callback can only ever verify the payment that pidx belongs to
+            outcome = verify_payment(
+                kind=KIND_CASE,
+                gateway=GATEWAY_KHALTI,
+                callback_id=pidx,
+                lookup=khalti_pidx_filter(pidx),
+                check=lambda payment: check_khalti(payment, pidx),
             )
+            return api_response(**outcome)
 
-            if verification_response.status_code == 200:
-                response_data = verification_response.json()
-                
-                if response_data.get("status") == "Completed":
-                    # Payment successful
-                    case_payment = payment.case_payment_request
-                    
-                    # Mark as paid
-                    case_payment.status = 'paid'
-                    case_payment.paid_at = timezone.now()
-                    case_payment.save()
-                    
-                    # Mark case completed
-                    case = case_payment.case
-                    case.status = 'completed'
-                    case.completed_at = timezone.now()
-                    case.save(update_fields=["status", "completed_at", "updated_at"])
-
-                    # Mark Payment record completed
-                    payment.status = Payment.STATUS_COMPLETED
-                    payment.save()
-
-                    # Notify lawyer
-                    send_notification(
-                        user=case.lawyer,
-                        title="Case Payment Received",
-                        message=f"Client paid Rs. {payment.amount} for case: {case.case_title}. The case is now completed.",
-                        notif_type="payment",
-                        link=f"/lawyercase/{case.id}",
-                    )
-                    
-                    # Notify client
-                    send_notification(
-                        user=case.client,
-                        title="Payment Successful",
-                        message=f"Your payment for case '{case.case_title}' was successful. The case is now completed.",
-                        notif_type="payment",
-                        link=f"/client/case/{case.id}",
-                    )
-
-                    # Notify admin about case payment (admin pays lawyer manually)
-                    notify_admins(
-                        title="New Case Payment Received",
-                        message=f"Client {case.client.name} paid Rs. {payment.total_amount} via Khalti for case '{case.case_title}' (Lawyer: {case.lawyer.name}). Platform fee: Rs. {payment.platform_fee}. Lawyer payout pending: Rs. {payment.lawyer_earning}.",
-                        notif_type="payment",
-                        link="/admin/payments",
-                    )
-
-                    return api_response(
-                        is_success=True,
-                        status_code=status.HTTP_200_OK,
-                        result={
-                            "message": "Payment verified successfully",
-                            "payment": PaymentSerializer(payment).data,
-                        },
-                    )
-                else:
-                    return api_response(
-                        is_success=False,
-                        error_message={"error": f"Payment status: {response_data.get('status')}"},
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                    )
-            else:
-                return api_response(
-                    is_success=False,
-                    error_message={"error": "Khalti verification failed."},
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                )
-
-        except requests.Timeout:
-            return api_response(
-                is_success=False,
-                error_message={"error": "Khalti service timeout."},
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            )
         except Exception as e:
             return api_response(
                 is_success=False,
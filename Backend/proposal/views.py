@@ -8,8 +8,9 @@ from django.utils import timezone
 
 from .models import Proposal
 from case.models import Case
+from authentication.models import User
 from .serializers import ProposalSerializer, ProposalListSerializer
-from notification.utils import send_notification
+from notification.utils import send_notification, send_bulk_notification
 
 
 class ProposalListCreateView(generics.ListCreateAPIView):
@@ -188,15 +189,14 @@ class ProposalAcceptView(APIView):
         # Notify rejected lawyers
         rejected_proposals = Proposal.objects.filter(
             case=proposal.case, status='rejected'
-        ).exclude(id=proposal.id).select_related('lawyer')
-        for p in rejected_proposals:
-            send_notification(
-                user=p.lawyer,
-                title='Proposal Not Selected',
-                message=f'Your proposal for case "{proposal.case.case_title}" was not selected',
-                notif_type='case',
-                link='/lawyerfindcases'
-            )
+        ).exclude(id=proposal.id)
+        send_bulk_notification(
+            User.objects.filter(id__in=rejected_proposals.values('lawyer_id')),
+            title='Proposal Not Selected',
+            message=f'Your proposal for case "{proposal.case.case_title}" was not selected',
+            notif_type='case',
+            link='/lawyerfindcases'
+        )
 
         return Response(serializer.data)
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Review
+from .models import Review, LawyerRatingStats
 
 
 @admin.register(Review)
@@ -20,3 +20,13 @@ class ReviewAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(LawyerRatingStats)
+class LawyerRatingStatsAdmin(admin.ModelAdmin):
+    list_display = ('lawyer', 'average_rating', 'review_count', 'updated_at')
+    search_fields = ('lawyer__name', 'lawyer__email')
+    readonly_fields = (
+        'lawyer', 'review_count', 'rating_sum', 'average_rating',
+        'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5', 'updated_at',
+    )
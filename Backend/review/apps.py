@@ -5,3 +5,6 @@ class ReviewConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'review'
     verbose_name = 'Review Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from review.ratings import rebuild_rating_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild every lawyer's rating aggregates from the Review table."
+
+    def handle(self, *args, **options):
+        count = rebuild_rating_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating stats for {count} lawyers."))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0003_alter_review_unique_together'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LawyerRatingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('lawyer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lawyer Rating Stats',
+                'verbose_name_plural': 'Lawyer Rating Stats',
+                'indexes': [models.Index(fields=['-average_rating', '-review_count'], name='rating_stats_top_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_stats(apps, schema_editor):
+    """Aggregate reviews written before the LawyerRatingStats table existed."""
+    Review = apps.get_model('review', 'Review')
+    LawyerRatingStats = apps.get_model('review', 'LawyerRatingStats')
+    if not Review.objects.exists():
+        return
+
+    histogram = {f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    rows = (
+        Review.objects.values('lawyer_id')
+        .order_by('lawyer_id')
+        .annotate(reviews=Count('id'), ratings=Sum('rating'), **histogram)
+    )
+
+    LawyerRatingStats.objects.all().delete()
+    LawyerRatingStats.objects.bulk_create(
+        [
+            LawyerRatingStats(
+                lawyer_id=row['lawyer_id'],
+                review_count=row['reviews'],
+                rating_sum=row['ratings'],
+                average_rating=row['ratings'] / row['reviews'],
+                **{f'rating_{star}': row[f'rating_{star}'] for star in range(1, 6)},
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0004_lawyer_rating_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -49,11 +49,48 @@ class Review(models.Model):
     @property
     def average_rating(self):
         """Get average rating for this lawyer"""
-        from django.db.models import Avg
-        avg = Review.objects.filter(lawyer=self.lawyer).aggregate(Avg('rating'))['rating__avg']
-        return round(avg, 2) if avg else 0
+        stats = getattr(self.lawyer, 'rating_stats', None)
+        return round(stats.average_rating, 2) if stats else 0
     
     @property
     def review_count(self):
         """Get total review count for this lawyer"""
-        return Review.objects.filter(lawyer=self.lawyer).count()
+        stats = getattr(self.lawyer, 'rating_stats', None)
+        return stats.review_count if stats else 0
+
+
+class LawyerRatingStats(models.Model):
+    """
+    Denormalized rating aggregates for one lawyer.
+    Kept in sync with F() updates whenever a review is created, changed or
+    deleted (see review/ratings.py), so directory and summary endpoints
+    never aggregate the Review table.
+    """
+    lawyer = models.OneToOneField(User, on_delete=models.CASCADE, related_name='rating_stats')
+
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+
+    # Histogram of star values
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Lawyer Rating Stats')
+        verbose_name_plural = _('Lawyer Rating Stats')
+        indexes = [
+            models.Index(fields=['-average_rating', '-review_count'], name='rating_stats_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.lawyer.name} - {self.average_rating:.2f} ({self.review_count} reviews)"
+
+    @property
+    def rating_distribution(self):
+        return {star: getattr(self, f'rating_{star}') for star in range(1, 6)}
@@ -0,0 +1,99 @@
+"""
+Per-lawyer rating aggregates.
+
+LawyerRatingStats holds each lawyer's review count, rating sum, average and
+star histogram. The review signals call `add_rating` / `remove_rating`, which
+adjust the row with a single F() UPDATE so concurrent reviews never lose an
+increment. `rebuild_rating_stats` recomputes every row from the Review table
+and backs the `rebuild_rating_stats` management command.
+
+Queryset updates send no model signals, so every write here bumps the
+lawyer directory and per-lawyer versions itself.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.lookups import GreaterThan
+
+from meronaya.versions import LAWYER_DIRECTORY, bump_version, lawyer_profile
+from .models import LawyerRatingStats, Review
+
+
+def _apply(lawyer_id, rating, sign):
+    count = F('review_count') + sign
+    total = F('rating_sum') + sign * rating
+    updates = {
+        'review_count': count,
+        'rating_sum': total,
+        f'rating_{rating}': F(f'rating_{rating}') + sign,
+        # Right-hand sides read the pre-update values, so the average is
+        # computed from the new count and sum in the same statement
+        'average_rating': Case(
+            When(GreaterThan(count, 0), then=total * 1.0 / count),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+    bump_version(LAWYER_DIRECTORY)
+    bump_version(lawyer_profile(lawyer_id))
+    rows = LawyerRatingStats.objects.filter(lawyer_id=lawyer_id)
+    if rows.update(**updates) or sign < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            LawyerRatingStats.objects.create(
+                lawyer_id=lawyer_id,
+                review_count=1,
+                rating_sum=rating,
+                average_rating=rating,
+                **{f'rating_{rating}': 1},
+            )
+    except IntegrityError:
+        # Another transaction created the row first
+        rows.update(**updates)
+
+
+def add_rating(lawyer_id, rating):
+    """Count a new rating towards the lawyer's aggregates."""
+    _apply(lawyer_id, rating, 1)
+
+
+def remove_rating(lawyer_id, rating):
+    """Take a deleted or replaced rating out of the lawyer's aggregates."""
+    _apply(lawyer_id, rating, -1)
+
+
+def rebuild_rating_stats():
+    """
+    Recompute every lawyer's rating aggregates from the Review table.
+    Returns the number of lawyers with reviews.
+    """
+    histogram = {f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    rows = (
+        Review.objects.values('lawyer_id')
+        .order_by('lawyer_id')
+        .annotate(reviews=Count('id'), ratings=Sum('rating'), **histogram)
+    )
+
+    stats = [
+        LawyerRatingStats(
+            lawyer_id=row['lawyer_id'],
+            review_count=row['reviews'],
+            rating_sum=row['ratings'],
+            average_rating=row['ratings'] / row['reviews'],
+            **{f'rating_{star}': row[f'rating_{star}'] for star in range(1, 6)},
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        affected = set(LawyerRatingStats.objects.values_list('lawyer_id', flat=True))
+        affected.update(row.lawyer_id for row in stats)
+        LawyerRatingStats.objects.all().delete()
+        LawyerRatingStats.objects.bulk_create(stats, batch_size=500)
+        bump_version(LAWYER_DIRECTORY)
+        for lawyer_id in affected:
+            bump_version(lawyer_profile(lawyer_id))
+
+    return len(stats)
@@ -14,7 +14,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     
     def get_is_verified_consultation(self, obj):
         """Auto-calculated: true if linked to appointment or case"""
-        return bool(obj.appointment or obj.case)
+        return bool(obj.appointment_id or obj.case_id)
     
     def get_client_profile_image(self, obj):
         if obj.client and obj.client.profile_image:
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from authentication.models import User
+from meronaya.versions import bump_version, lawyer_profile
+from .models import Review
+from .ratings import add_rating, remove_rating
+
+
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    """Record the loaded lawyer and rating so an edit can move the old value out."""
+    # Read from __dict__ so deferred-field loads never trigger a query
+    instance._stats_lawyer_id = instance.__dict__.get('lawyer_id')
+    instance._stats_rating = instance.__dict__.get('rating')
+
+
+@receiver(post_save, sender=Review)
+def update_rating_stats_on_save(sender, instance, created, **kwargs):
+    """Keep the lawyer's rating aggregates in step with new and edited reviews."""
+    previous = (instance._stats_lawyer_id, instance._stats_rating)
+    current = (instance.lawyer_id, instance.rating)
+
+    if created:
+        add_rating(*current)
+    elif previous != current:
+        with transaction.atomic():
+            if None not in previous:
+                remove_rating(*previous)
+            add_rating(*current)
+
+    instance._stats_lawyer_id, instance._stats_rating = current
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_stats_on_delete(sender, instance, **kwargs):
+    remove_rating(instance._stats_lawyer_id, instance._stats_rating)
+
+
+@receiver(post_save, sender=Review)
+def bump_lawyer_version(sender, instance, **kwargs):
+    """Edits that leave the rating alone still change the lawyer's review summary."""
+    bump_version(lawyer_profile(instance.lawyer_id))
+
+
+@receiver(post_save, sender=User)
+def bump_reviewed_lawyer_versions(sender, instance, created, update_fields=None, **kwargs):
+    """A reviewer's name and picture appear in the summaries of lawyers they reviewed."""
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    lawyer_ids = Review.objects.filter(client=instance).values_list('lawyer_id', flat=True).distinct()
+    for lawyer_id in lawyer_ids:
+        bump_version(lawyer_profile(lawyer_id))
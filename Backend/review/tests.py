@@ -1,3 +1,144 @@
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from authentication.models import User
+from .models import LawyerRatingStats, Review
+from .ratings import add_rating, rebuild_rating_stats
+
+
+class ReviewResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['responses'].clear()
+        self.api = APIClient()
+        self.client_user = User.objects.create_user(email='client@example.com', name='Sita', password='secret-pass')
+        self.lawyer = User.objects.create_user(
+            email='lawyer@example.com', name='Ram', password='secret-pass', is_lawyer=True,
+        )
+
+    def summary(self):
+        response = self.api.get('/api/reviews/lawyer_summary/', {'lawyer_id': self.lawyer.id})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_review_write_invalidates_summary_and_top_lawyers(self):
+        self.assertEqual(self.summary().data['total_reviews'], 0)
+        self.assertEqual(self.summary()['X-Cache'], 'HIT')
+        self.assertEqual(self.api.get('/api/reviews/top_lawyers/').data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(client=self.client_user, lawyer=self.lawyer, rating=4, comment='Helpful')
+
+        summary = self.summary()
+        self.assertEqual(summary['X-Cache'], 'MISS')
+        self.assertEqual((summary.data['total_reviews'], summary.data['average_rating']), (1, 4.0))
+        self.assertEqual([row['id'] for row in self.api.get('/api/reviews/top_lawyers/').data], [self.lawyer.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review.comment = 'Very helpful'
+            review.save()
+
+        self.assertEqual(self.summary().data['recent_reviews'][0]['comment'], 'Very helpful')
+
+    def test_reviewer_profile_write_invalidates_summary(self):
+        Review.objects.create(client=self.client_user, lawyer=self.lawyer, rating=5, comment='Great')
+        self.summary()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_user.name = 'Sita Thapa'
+            self.client_user.save()
+
+        self.assertEqual(self.summary().data['recent_reviews'][0]['client_name'], 'Sita Thapa')
+
+
+class RatingStatsTests(TestCase):
+    """LawyerRatingStats follows reviews as they are written, edited, moved and deleted."""
+
+    def setUp(self):
+        self.lawyer = User.objects.create(email='lawyer@example.com', name='Ram', is_lawyer=True)
+        self.other_lawyer = User.objects.create(email='other@example.com', name='Hari', is_lawyer=True)
+        self.clients = [User.objects.create(email=f'client{i}@example.com', name=f'Client {i}') for i in range(3)]
+
+    def review(self, client, rating, lawyer=None):
+        return Review.objects.create(client=client, lawyer=lawyer or self.lawyer, rating=rating, comment='-')
+
+    def stats(self, lawyer=None):
+        row = LawyerRatingStats.objects.filter(lawyer=lawyer or self.lawyer).first()
+        if row is None:
+            return None
+        histogram = [getattr(row, f'rating_{star}') for star in range(1, 6)]
+        return row.review_count, row.rating_sum, row.average_rating, histogram
+
+    def test_new_reviews_are_counted(self):
+        self.review(self.clients[0], 5)
+        self.review(self.clients[1], 2)
+
+        self.assertEqual(self.stats(), (2, 7, 3.5, [0, 1, 0, 0, 1]))
+        self.assertIsNone(self.stats(self.other_lawyer))
+
+    def test_rating_edit_moves_the_star(self):
+        review = self.review(self.clients[0], 5)
+        self.review(self.clients[1], 3)
+
+        review.rating = 1
+        review.save()
+
+        self.assertEqual(self.stats(), (2, 4, 2.0, [1, 0, 1, 0, 0]))
+
+    def test_comment_edit_leaves_the_stats(self):
+        review = self.review(self.clients[0], 4)
+
+        review.comment = 'Edited'
+        with self.assertNumQueries(1):
+            review.save()
+
+        self.assertEqual(self.stats(), (1, 4, 4.0, [0, 0, 0, 1, 0]))
+
+    def test_lawyer_change_moves_the_rating(self):
+        review = self.review(self.clients[0], 4)
+        self.review(self.clients[1], 2)
+
+        review.lawyer = self.other_lawyer
+        review.save()
+
+        self.assertEqual(self.stats(), (1, 2, 2.0, [0, 1, 0, 0, 0]))
+        self.assertEqual(self.stats(self.other_lawyer), (1, 4, 4.0, [0, 0, 0, 1, 0]))
+
+    def test_delete_removes_the_rating(self):
+        first = self.review(self.clients[0], 5)
+        second = self.review(self.clients[1], 1)
+
+        first.delete()
+        self.assertEqual(self.stats(), (1, 1, 1.0, [1, 0, 0, 0, 0]))
+
+        second.delete()
+        self.assertEqual(self.stats(), (0, 0, 0.0, [0, 0, 0, 0, 0]))
+
+    def test_existing_row_moves_with_one_update(self):
+        self.review(self.clients[0], 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            add_rating(self.lawyer.id, 3)
+
+        # One relative UPDATE, with no read of the current values
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('UPDATE'))
+        self.assertIn('"review_count" + 1', queries[0]['sql'])
+        self.assertEqual(self.stats(), (2, 8, 4.0, [0, 0, 1, 0, 1]))
+
+    def test_incremental_stats_match_a_rebuild(self):
+        reviews = [self.review(client, rating) for client, rating in zip(self.clients, (5, 4, 2))]
+        reviews[0].rating = 3
+        reviews[0].save()
+        reviews[1].lawyer = self.other_lawyer
+        reviews[1].save()
+        reviews[2].delete()
+        incremental = [self.stats(), self.stats(self.other_lawyer)]
+
+        rebuild_rating_stats()
+
+        self.assertEqual([self.stats(), self.stats(self.other_lawyer)], incremental)
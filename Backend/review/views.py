@@ -2,8 +2,9 @@ from rest_framework.views import APIView
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Avg, Count
-from .models import Review
+from meronaya.response_cache import cache_get
+from meronaya.versions import LAWYER_DIRECTORY, lawyer_profile
+from .models import Review, LawyerRatingStats
 from .serializers import ReviewSerializer, LawyerReviewSummarySerializer
 from authentication.models import User
 from consultation.models import Consultation
@@ -133,21 +134,33 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Review.objects.all()
 
 
+def _lawyer_summary_cache_versions(request):
+    lawyer_id = request.query_params.get('lawyer_id', '')
+    return [lawyer_profile(lawyer_id)] if lawyer_id.isdigit() else None
+
+
+def _top_lawyers_cache_versions(request):
+    return [LAWYER_DIRECTORY]
+
+
 class LawyerReviewSummaryView(APIView):
     """
     Get dynamic review summary for a specific lawyer.
     GET /api/reviews/lawyer_summary/?lawyer_id=1
     
     Returns:
-    - average_rating: Dynamic calculation from all reviews
-    - total_reviews: Dynamic count of reviews
-    - rating_distribution: Dynamic breakdown of ratings
+    - average_rating: From the lawyer's rating stats
+    - total_reviews: From the lawyer's rating stats
+    - rating_distribution: Breakdown of ratings from the stats histogram
     - recent_reviews: Dynamic list of recent reviews
     - has_reviews: Boolean flag indicating if reviews exist
     - message: Helpful message when no reviews exist
+
+    Served from the shared response cache until the lawyer's data changes.
     """
     permission_classes = [AllowAny]
 
+    @cache_get('lawyer_review_summary', _lawyer_summary_cache_versions)
     def get(self, request):
         lawyer_id = request.query_params.get('lawyer_id')
 
@@ -158,34 +171,25 @@ class LawyerReviewSummaryView(APIView):
             )
 
         try:
-            lawyer = User.objects.get(id=lawyer_id, is_lawyer=True)
+            lawyer = User.objects.select_related('rating_stats').get(id=lawyer_id, is_lawyer=True)
         except User.DoesNotExist:
             return Response(
                 {'error': 'Lawyer not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        reviews = Review.objects.filter(lawyer=lawyer)
-
-        # Calculate statistics dynamically
-        avg_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
-        total_reviews = reviews.count()
-        has_reviews = total_reviews > 0
-
-        # Rating distribution
-        rating_dist = {}
-        for i in range(1, 6):
-            rating_dist[i] = reviews.filter(rating=i).count()
+        stats = getattr(lawyer, 'rating_stats', None) or LawyerRatingStats(lawyer=lawyer)
+        has_reviews = stats.review_count > 0
 
         # Recent reviews
-        recent = reviews[:5]
+        recent = Review.objects.filter(lawyer=lawyer).select_related('client', 'lawyer')[:5]
 
         summary = {
             'lawyer_id': lawyer.id,
             'lawyer_name': lawyer.name,
-            'average_rating': round(avg_rating, 2),
-            'total_reviews': total_reviews,
-            'rating_distribution': rating_dist,
+            'average_rating': round(stats.average_rating, 2),
+            'total_reviews': stats.review_count,
+            'rating_distribution': stats.rating_distribution,
             'recent_reviews': ReviewSerializer(recent, many=True, context={'request': request}).data,
             'has_reviews': has_reviews,
             'message': 'No reviews yet. Be the first to share your feedback!' if not has_reviews else None
@@ -199,31 +203,34 @@ class TopLawyersView(APIView):
     Get top-rated lawyers sorted by average rating.
     GET /api/reviews/top_lawyers/?limit=10
     
-    Returns dynamically calculated ratings for each lawyer
+    Reads the per-lawyer rating stats, ordered by average rating.
+    Served from the shared response cache until any lawyer's data changes.
     """
     permission_classes = [AllowAny]
 
+    @cache_get('top_lawyers', _top_lawyers_cache_versions)
     def get(self, request):
         try:
             limit = int(request.query_params.get('limit', 10))
         except ValueError:
             limit = 10
 
-        top_lawyers = User.objects.filter(is_lawyer=True).annotate(
-            avg_rating=Avg('reviews_received__rating'),
-            review_count=Count('reviews_received')
-        ).filter(review_count__gt=0).order_by('-avg_rating')[:limit]
+        top_stats = (
+            LawyerRatingStats.objects.filter(review_count__gt=0, lawyer__is_lawyer=True)
+            .select_related('lawyer', 'lawyer__lawyer_kyc')
+            .order_by('-average_rating', '-review_count')[:limit]
+        )
 
         data = [
             {
-                'id': lawyer.id,
-                'name': lawyer.name,
-                'specialization': lawyer.lawyer_kyc.specializations if hasattr(lawyer, 'lawyer_kyc') and lawyer.lawyer_kyc else [],
-                'average_rating': round(lawyer.avg_rating or 0, 2),
-                'total_reviews': lawyer.review_count,
-                'profile_image': lawyer.profile_image.url if lawyer.profile_image else None,
+                'id': stats.lawyer.id,
+                'name': stats.lawyer.name,
+                'specialization': stats.lawyer.lawyer_kyc.specializations if hasattr(stats.lawyer, 'lawyer_kyc') and stats.lawyer.lawyer_kyc else [],
+                'average_rating': round(stats.average_rating, 2),
+                'total_reviews': stats.review_count,
+                'profile_image': stats.lawyer.profile_image.url if stats.lawyer.profile_image else None,
             }
-            for lawyer in top_lawyers
+            for stats in top_stats
         ]
 
         return Response(data, status=status.HTTP_200_OK)
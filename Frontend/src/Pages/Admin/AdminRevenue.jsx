@@ -24,6 +24,7 @@ import {
   fetchAdminRevenue,
   fetchLawyerPendingPayments,
   createPayout,
+  loadMoreAdminRevenuePayments,
 } from '../slices/paymentSlice';
 
 const AdminRevenue = () => {
@@ -31,6 +32,7 @@ const AdminRevenue = () => {
   const {
     revenue,
     revenueLoading,
+    revenueLoadingMore,
     revenueError,
     pendingPayments,
     pendingPaymentsLoading,
@@ -490,6 +492,18 @@ const AdminRevenue = () => {
                         itemsPerPage={itemsPerPage}
                         totalItems={payments.length}
                       />
+                      {revenue?.next_cursor && (
+                        <div className="flex justify-center mt-4">
+                          <button
+                            type="button"
+                            onClick={() => dispatch(loadMoreAdminRevenuePayments())}
+                            disabled={revenueLoadingMore}
+                            className="px-4 py-2 text-sm font-semibold text-gray-700 bg-gray-50 border border-gray-200 rounded-xl hover:border-gray-300 transition-all disabled:opacity-60"
+                          >
+                            {revenueLoadingMore ? 'Loading...' : 'Load older transactions'}
+                          </button>
+                        </div>
+                      )}
                     </>
                   )}
                 </div>
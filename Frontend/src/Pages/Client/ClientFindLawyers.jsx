@@ -5,10 +5,10 @@ import { useTranslation } from "react-i18next";
 import Sidebar from "./sidebar";
 import ClientDashHeader from "./ClientDashHeader";
 import { Search, MapPin, Star, Briefcase, Shield, ChevronDown, Loader, CheckCircle2, MessageSquare, Video } from "lucide-react";
-import { fetchVerifiedLawyers } from "../slices/lawyerSlice";
+import { fetchLawyerFacets, fetchVerifiedLawyers, loadMoreVerifiedLawyers } from "../slices/lawyerSlice";
 import { LAW_CATEGORIES } from "../../utils/lawCategories";
+import { useDebouncedValue } from "../../hooks/useDebouncedValue";
 import LawyerProfileModal from "./LawyerProfileModal";
-import Pagination from "../../components/Pagination";
 
 const specializations = [
   "All Specializations",
@@ -24,6 +24,9 @@ const FindLawyers = () => {
   // Redux selectors
   const lawyersData = useSelector((state) => state.lawyer.verifiedLawyers);
   const loading = useSelector((state) => state.lawyer.verifiedLawyersLoading);
+  const loadingMore = useSelector((state) => state.lawyer.verifiedLawyersLoadingMore);
+  const nextCursor = useSelector((state) => state.lawyer.verifiedLawyersNextCursor);
+  const facets = useSelector((state) => state.lawyer.lawyerFacets);
   const error = useSelector((state) => state.lawyer.verifiedLawyersError);
 
   // Local component state
@@ -31,15 +34,24 @@ const FindLawyers = () => {
   const [selectedSpecialization, setSelectedSpecialization] = useState(t('lawyers.allSpecializations'));
   const [selectedLawyer, setSelectedLawyer] = useState(null);
   const [isProfileOpen, setIsProfileOpen] = useState(false);
-  
-  // Pagination state
-  const [pageByFilter, setPageByFilter] = useState({});
-  const itemsPerPage = 5;
+  const debouncedSearch = useDebouncedValue(searchQuery.trim());
+
+  // Filtering and sorting happen on the server, a page at a time
+  const filters = useMemo(() => {
+    const specialization = LAW_CATEGORIES.includes(selectedSpecialization) ? selectedSpecialization : "";
+    return { search: debouncedSearch, specialization, ordering: "rating" };
+  }, [debouncedSearch, selectedSpecialization]);
 
-  // Fetch verified lawyers on component mount
   useEffect(() => {
-    dispatch(fetchVerifiedLawyers());
-  }, [dispatch]);
+    dispatch(fetchVerifiedLawyers(filters));
+    dispatch(fetchLawyerFacets(filters));
+  }, [dispatch, filters]);
+
+  // Matching lawyers per specialization, from the facet counts
+  const specializationCounts = useMemo(
+    () => Object.fromEntries((facets?.specializations || []).map(({ value, count }) => [value, count])),
+    [facets]
+  );
 
   // Transform backend data to frontend format using useMemo for performance optimization
   const lawyers = useMemo(() => {
@@ -83,69 +95,6 @@ const FindLawyers = () => {
       });
   }, [lawyersData]);
 
-  // Helper function to extract city from address
-  // (Removed unused extractCity function)
-
-  // Filter lawyers based on search and specialization
-  const filteredLawyers = useMemo(() => {
-    
-    const filtered = lawyers.filter((lawyer) => {
-      if (!lawyer) return false;
-
-      // If no specialization filter is selected, match all
-      const matchesSpec =
-        selectedSpecialization === t('lawyers.allSpecializations') ||
-        !selectedSpecialization ||
-        (lawyer.specialization && 
-         String(lawyer.specialization).toLowerCase().includes(String(selectedSpecialization).toLowerCase()));
-      
-      // If search is empty, show all matching specialization
-      // If search has text, match against name, specialization, or location
-      const matchesSearch =
-        !searchQuery ||
-        searchQuery.trim() === "" ||
-        (lawyer.name && String(lawyer.name).toLowerCase().includes(String(searchQuery).toLowerCase())) ||
-        (lawyer.specialization && String(lawyer.specialization).toLowerCase().includes(String(searchQuery).toLowerCase())) ||
-        (lawyer.location && String(lawyer.location).toLowerCase().includes(String(searchQuery).toLowerCase()));
-
-      return matchesSpec && matchesSearch;
-    });
-    
-    
-    return filtered;
-  }, [searchQuery, selectedSpecialization, lawyers, t]);
-
-  // Sort filtered lawyers
-  const sortedLawyers = useMemo(() => {
-    // Default: sort by rating (Top Rated)
-    return [...filteredLawyers].sort((a, b) => b.rating - a.rating);
-  }, [filteredLawyers]);
-
-  const filterKey = useMemo(
-    () => `${searchQuery.trim().toLowerCase()}|${selectedSpecialization}`,
-    [searchQuery, selectedSpecialization]
-  );
-
-  const currentPage = pageByFilter[filterKey] || 1;
-
-  // Paginate sorted lawyers
-  const totalPages = Math.max(1, Math.ceil(sortedLawyers.length / itemsPerPage));
-  const effectiveCurrentPage = Math.min(currentPage, totalPages);
-  const paginatedLawyers = useMemo(() => {
-    const startIndex = (effectiveCurrentPage - 1) * itemsPerPage;
-    return sortedLawyers.slice(startIndex, startIndex + itemsPerPage);
-  }, [sortedLawyers, effectiveCurrentPage, itemsPerPage]);
-
-  const handlePageChange = (newPage) => {
-    if (newPage >= 1 && newPage <= totalPages) {
-      setPageByFilter((prev) => ({
-        ...prev,
-        [filterKey]: newPage,
-      }));
-      window.scrollTo({ top: 0, behavior: 'smooth' });
-    }
-  };
-
   const handleOpenProfile = (lawyer) => {
     setSelectedLawyer(lawyer);
     setIsProfileOpen(true);
@@ -175,7 +124,7 @@ const FindLawyers = () => {
                 <Search className="absolute left-4 top-1/2 transform -translate-y-1/2 text-gray-400" size={20} />
                 <input
                   type="text"
-                  placeholder="Search by name, specialization, or location..."
+                  placeholder="Search by name..."
                   value={searchQuery}
                   onChange={(e) => setSearchQuery(e.target.value)}
                   className="w-full pl-12 pr-4 py-2 bg-gray-50 border border-gray-100 rounded-lg focus:outline-none focus:ring-1 focus:ring-[#0F1A3D] text-sm"
@@ -192,6 +141,7 @@ const FindLawyers = () => {
                   {specializations.map((spec) => (
                     <option key={spec} value={spec}>
                       {spec}
+                      {specializationCounts[spec] !== undefined ? ` (${specializationCounts[spec]})` : ""}
                     </option>
                   ))}
                 </select>
@@ -217,16 +167,16 @@ const FindLawyers = () => {
           )}
 
           {/* Results Count */}
-          {!loading && !error && sortedLawyers.length === 0 && lawyers.length > 0 && (
-            <div className="bg-yellow-50 border border-yellow-200 rounded-lg p-4 mb-6">
-              <p className="text-yellow-800">No lawyers match current filters. Total lawyers available: {lawyers.length}</p>
-            </div>
+          {!loading && !error && lawyers.length > 0 && facets && (
+            <p className="text-sm text-gray-600 mb-4">
+              {t('lawyers.showingCount', { shown: lawyers.length, total: facets.total })}
+            </p>
           )}
 
           {/* Lawyers Grid */}
           {!loading && !error && (
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {paginatedLawyers.map((lawyer) => (
+            {lawyers.map((lawyer) => (
               <div
                 key={lawyer.id}
                 className="bg-white rounded-2xl shadow-sm hover:shadow-md transition-shadow p-6 border border-gray-100 flex flex-col"
@@ -324,19 +274,23 @@ const FindLawyers = () => {
           </div>
           )}
 
-          {/* Pagination Controls */}
-          {!loading && !error && sortedLawyers.length > 0 && (
-            <Pagination 
-              currentPage={effectiveCurrentPage}
-              totalPages={totalPages}
-              onPageChange={handlePageChange}
-              itemsPerPage={itemsPerPage}
-              totalItems={sortedLawyers.length}
-            />
+          {/* Load More */}
+          {!loading && !error && nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button
+                type="button"
+                onClick={() => dispatch(loadMoreVerifiedLawyers())}
+                disabled={loadingMore}
+                className="inline-flex items-center gap-2 py-2.5 px-6 border border-[#0F1A3D] text-[#0F1A3D] rounded-lg font-semibold text-sm hover:bg-[#0F1A3D] hover:text-white transition disabled:opacity-60"
+              >
+                {loadingMore && <Loader className="animate-spin" size={16} />}
+                {t('lawyers.loadMore')}
+              </button>
+            </div>
           )}
 
           {/* No Results Message */}
-          {!loading && !error && sortedLawyers.length === 0 && (
+          {!loading && !error && lawyers.length === 0 && (
             <div className="text-center py-12">
               <p className="text-gray-500 text-lg">No lawyers found matching your criteria</p>
               <p className="text-gray-400 text-sm mt-2">Try adjusting your filters or search terms</p>
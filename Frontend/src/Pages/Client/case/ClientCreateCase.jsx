@@ -10,7 +10,7 @@ import { FileText, Users, Upload, AlertCircle, Info } from 'lucide-react';
 import { CreateCaseInitialValues, CreateCaseValidationSchema } from '../../Utils/CreateCaseValidation';
 import { LAW_CATEGORIES } from '../../../utils/lawCategories';
 import { createCase, updateCase, fetchCaseById } from '../../slices/caseSlice';
-import { fetchVerifiedLawyers } from '../../slices/lawyerSlice';
+import { fetchVerifiedLawyers, loadMoreVerifiedLawyers } from '../../slices/lawyerSlice';
 
 const caseCategories = LAW_CATEGORIES;
 
@@ -26,6 +26,8 @@ const ClientCreateCase = () => {
   const {
     verifiedLawyers,
     verifiedLawyersLoading,
+    verifiedLawyersLoadingMore,
+    verifiedLawyersNextCursor,
     verifiedLawyersError,
   } = useSelector((state) => state.lawyer || {});
   const [uploadedFiles, setUploadedFiles] = useState([]);
@@ -406,6 +408,16 @@ const ClientCreateCase = () => {
                       ))}
                     </select>
                     <p className="text-xs text-gray-500">Select up to 3 lawyers</p>
+                    {verifiedLawyersNextCursor && !verifiedLawyersLoading && (
+                      <button
+                        type="button"
+                        onClick={() => dispatch(loadMoreVerifiedLawyers())}
+                        disabled={verifiedLawyersLoadingMore}
+                        className="text-xs font-medium text-[#0F1A3D] hover:underline disabled:opacity-60"
+                      >
+                        {verifiedLawyersLoadingMore ? 'Loading more lawyers...' : 'Show more lawyers'}
+                      </button>
+                    )}
                     {!verifiedLawyersLoading && !verifiedLawyersError && availableLawyers.length === 0 && (
                       <p className="text-xs text-gray-500">No lawyers available right now.</p>
                     )}
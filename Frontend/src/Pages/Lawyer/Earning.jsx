@@ -22,21 +22,27 @@ import Sidebar from './Sidebar';
 import DashHeader from './LawyerDashHeader';
 import StatCard from './Statcard';
 import { getImageUrl } from '../../utils/imageUrl';
-import { fetchLawyerEarnings } from '../slices/paymentSlice';
+import { fetchEarningsHistory, fetchLawyerEarnings, loadMoreEarningsHistory } from '../slices/paymentSlice';
+
+// History tables loaded a page at a time, and the type each one shows as in the merged table
+const HISTORY_TABLES = ['payments', 'case_payment_requests', 'payouts'];
+const TABLE_BY_TYPE = { appointment: 'payments', case: 'case_payment_requests' };
 
 const Earning = () => {
   const { t } = useTranslation();
   const dispatch = useDispatch();
-  const { earnings, earningsLoading, earningsError } = useSelector((state) => state.payment);
+  const { earnings, earningsLoading, earningsError, earningsHistory } = useSelector((state) => state.payment);
   const [historyTypeFilter, setHistoryTypeFilter] = useState('all');
 
   useEffect(() => {
     dispatch(fetchLawyerEarnings());
+    HISTORY_TABLES.forEach((table) => dispatch(fetchEarningsHistory(table)));
   }, [dispatch]);
 
   const summary = earnings?.summary;
-  const payments = earnings?.payments || [];
-  const caseRequests = earnings?.case_payment_requests || [];
+  const payments = earningsHistory.payments.items;
+  const caseRequests = earningsHistory.case_payment_requests.items;
+  const payouts = earningsHistory.payouts;
 
   const allHistory = useMemo(() => {
     const historicalPayments = payments.map(p => ({
@@ -70,10 +76,36 @@ const Earning = () => {
     );
   }, [payments, caseRequests]);
 
+  // Tables in the merged view that still have older pages on the server
+  const pagedTables = useMemo(() => {
+    const tables = historyTypeFilter === 'all' ? Object.values(TABLE_BY_TYPE) : [TABLE_BY_TYPE[historyTypeFilter]];
+    return tables.filter((table) => earningsHistory[table].nextCursor);
+  }, [historyTypeFilter, earningsHistory]);
+
   const filteredHistory = useMemo(() => {
-    if (historyTypeFilter === 'all') return allHistory;
-    return allHistory.filter((item) => item.type === historyTypeFilter);
-  }, [allHistory, historyTypeFilter]);
+    // Each table is paged newest first, so a row older than the oldest loaded row of a
+    // table with more pages could have unloaded rows above it; hold it back until loaded
+    const frontier = Math.max(
+      ...pagedTables.map((table) => {
+        const items = earningsHistory[table].items;
+        return items.length ? new Date(items[items.length - 1].created_at).getTime() : -Infinity;
+      })
+    );
+    return allHistory.filter(
+      (item) =>
+        (historyTypeFilter === 'all' || item.type === historyTypeFilter) &&
+        new Date(item.date).getTime() >= frontier
+    );
+  }, [allHistory, historyTypeFilter, pagedTables, earningsHistory]);
+
+  const historyLoading = Object.values(TABLE_BY_TYPE).some((table) => earningsHistory[table].loading);
+  const historyError = Object.values(TABLE_BY_TYPE)
+    .map((table) => earningsHistory[table].error)
+    .find(Boolean);
+
+  const loadMoreHistory = () => {
+    pagedTables.forEach((table) => dispatch(loadMoreEarningsHistory(table)));
+  };
 
   const formatDate = (dateString) => {
     if (!dateString) return 'N/A';
@@ -230,7 +262,14 @@ const Earning = () => {
                   </div>
                 </div>
 
-                {payments.length === 0 ? (
+                {historyError && (
+                  <div className="flex items-center gap-3 bg-red-50 border-b border-red-200 px-6 py-3">
+                    <AlertCircle size={16} className="text-red-500 shrink-0" />
+                    <p className="text-sm text-red-700">{historyError}</p>
+                  </div>
+                )}
+
+                {filteredHistory.length === 0 && !historyLoading && pagedTables.length === 0 ? (
                   <div className="px-6 py-20 text-center">
                     <div className="mx-auto w-16 h-16 bg-gray-100 rounded-full flex items-center justify-center mb-4">
                       <DollarSign size={28} className="text-gray-300" />
@@ -309,6 +348,87 @@ const Earning = () => {
                     </table>
                   </div>
                 )}
+
+                {(pagedTables.length > 0 || historyLoading) && (
+                  <div className="px-6 py-4 border-t border-gray-100 flex justify-center">
+                    <button
+                      type="button"
+                      onClick={loadMoreHistory}
+                      disabled={historyLoading}
+                      className="inline-flex items-center gap-2 px-4 py-2 text-sm font-semibold text-slate-700 bg-slate-50 border border-slate-200 rounded-xl hover:border-slate-300 transition-all disabled:opacity-60"
+                    >
+                      {historyLoading && <Loader2 size={14} className="animate-spin" />}
+                      Load more transactions
+                    </button>
+                  </div>
+                )}
+              </div>
+
+              {/* Payouts */}
+              <div className="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-hidden mt-8">
+                <div className="px-6 py-5 border-b border-gray-100">
+                  <h2 className="text-lg font-bold text-gray-900">Payouts</h2>
+                  <p className="text-sm text-gray-400 mt-0.5">Transfers of your earnings by the platform</p>
+                </div>
+
+                {payouts.error && (
+                  <div className="flex items-center gap-3 bg-red-50 border-b border-red-200 px-6 py-3">
+                    <AlertCircle size={16} className="text-red-500 shrink-0" />
+                    <p className="text-sm text-red-700">{payouts.error}</p>
+                  </div>
+                )}
+
+                {payouts.items.length === 0 && !payouts.loading ? (
+                  <div className="px-6 py-12 text-center">
+                    <p className="text-gray-500 font-semibold">No payouts yet</p>
+                  </div>
+                ) : (
+                  <div className="overflow-x-auto">
+                    <table className="w-full">
+                      <thead>
+                        <tr className="bg-gray-50/80">
+                          <th className="text-left py-3.5 px-5 text-xs font-semibold text-gray-500 uppercase tracking-wider">Date</th>
+                          <th className="text-left py-3.5 px-5 text-xs font-semibold text-gray-500 uppercase tracking-wider">Reference</th>
+                          <th className="text-left py-3.5 px-5 text-xs font-semibold text-gray-500 uppercase tracking-wider">Method</th>
+                          <th className="text-right py-3.5 px-5 text-xs font-semibold text-gray-500 uppercase tracking-wider">Payments</th>
+                          <th className="text-right py-3.5 px-5 text-xs font-semibold text-gray-500 uppercase tracking-wider">Amount</th>
+                        </tr>
+                      </thead>
+                      <tbody>
+                        {payouts.items.map((payout) => (
+                          <tr key={payout.id} className="border-b border-gray-100 last:border-b-0">
+                            <td className="py-4 px-5">
+                              <span className="flex items-center gap-1.5 text-sm text-gray-500">
+                                <Calendar size={13} className="text-gray-400" />
+                                {formatDate(payout.created_at)}
+                              </span>
+                            </td>
+                            <td className="py-4 px-5 text-sm text-gray-700">{payout.reference_number || '—'}</td>
+                            <td className="py-4 px-5 text-sm text-gray-700">{payout.payment_method || '—'}</td>
+                            <td className="py-4 px-5 text-right text-sm text-gray-700">{payout.payment_ids?.length || 0}</td>
+                            <td className="py-4 px-5 text-right text-sm font-bold text-emerald-600">
+                              Rs. {parseFloat(payout.amount).toLocaleString()}
+                            </td>
+                          </tr>
+                        ))}
+                      </tbody>
+                    </table>
+                  </div>
+                )}
+
+                {(payouts.nextCursor || payouts.loading) && (
+                  <div className="px-6 py-4 border-t border-gray-100 flex justify-center">
+                    <button
+                      type="button"
+                      onClick={() => dispatch(loadMoreEarningsHistory('payouts'))}
+                      disabled={payouts.loading}
+                      className="inline-flex items-center gap-2 px-4 py-2 text-sm font-semibold text-slate-700 bg-slate-50 border border-slate-200 rounded-xl hover:border-slate-300 transition-all disabled:opacity-60"
+                    >
+                      {payouts.loading && <Loader2 size={14} className="animate-spin" />}
+                      Load more payouts
+                    </button>
+                  </div>
+                )}
               </div>
             </>
           )}
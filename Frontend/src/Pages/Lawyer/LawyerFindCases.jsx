@@ -2,7 +2,7 @@ import React, { useState, useMemo, useEffect } from "react";
 import { useDispatch, useSelector } from "react-redux";
 import { useNavigate } from "react-router-dom";
 import { useTranslation } from "react-i18next";
-import { fetchPublicCases } from "../slices/caseSlice";
+import { fetchPublicCases, fetchPublicCaseChanges, loadMorePublicCases } from "../slices/caseSlice";
 import { fetchProposals, submitProposal, clearSubmitProposalStatus } from "../slices/proposalSlice";
 import Sidebar from "./Sidebar";
 import DashHeader from "./LawyerDashHeader";
@@ -27,7 +27,13 @@ const LawyerFindCases = () => {
   const { t } = useTranslation();
   const dispatch = useDispatch();
   const navigate = useNavigate();
-  const { publicCases, publicCasesLoading, publicCasesError } = useSelector((state) => state.case);
+  const {
+    publicCases,
+    publicCasesLoading,
+    publicCasesError,
+    publicCasesNextCursor,
+    publicCasesLoadingMore,
+  } = useSelector((state) => state.case);
   const { proposals, submitProposalLoading, submitProposalSuccess, submitProposalError } = useSelector((state) => state.proposal);
   
   // Debug: Check authentication
@@ -77,10 +83,19 @@ const LawyerFindCases = () => {
     dispatch(fetchProposals());
   }, [dispatch]);
 
+  // Poll the feed every 30 seconds for cases that changed, instead of reloading every page
+  useEffect(() => {
+    const interval = setInterval(() => {
+      dispatch(fetchPublicCaseChanges());
+    }, 30000);
+
+    return () => clearInterval(interval);
+  }, [dispatch]);
+
   // Handle successful proposal submission
   useEffect(() => {
     if (submitProposalSuccess) {
-      dispatch(fetchPublicCases());
+      dispatch(fetchPublicCaseChanges());
       dispatch(fetchProposals());
       dispatch(clearSubmitProposalStatus());
       setShowProposalModal(false);
@@ -478,6 +493,18 @@ const LawyerFindCases = () => {
                 />
               </div>
             )}
+            {activeTab === "public" && !publicCasesLoading && !publicCasesError && publicCasesNextCursor && (
+              <div className="flex justify-center pt-2">
+                <button
+                  type="button"
+                  onClick={() => dispatch(loadMorePublicCases())}
+                  disabled={publicCasesLoadingMore}
+                  className="py-2.5 px-6 border border-[#0F1A3D] text-[#0F1A3D] rounded-lg font-semibold text-sm hover:bg-[#0F1A3D] hover:text-white transition disabled:opacity-60"
+                >
+                  {t('lawyerFindCases.loadOlderCases')}
+                </button>
+              </div>
+            )}
           </div>
         </main>
       </div>
@@ -4,8 +4,9 @@ import { useDispatch, useSelector } from "react-redux";
 import { useNavigate } from "react-router-dom";
 import Header from "../../components/Header.jsx";
 import Footer from "../../components/Footer.jsx";
-import { fetchVerifiedLawyers } from "../slices/lawyerSlice";
+import { fetchLawyerFacets, fetchVerifiedLawyers, loadMoreVerifiedLawyers } from "../slices/lawyerSlice";
 import { LAW_CATEGORIES } from "../../utils/lawCategories";
+import { useDebouncedValue } from "../../hooks/useDebouncedValue";
 import { getImageUrl } from '../../utils/imageUrl';
 
 const specializations = [
@@ -13,22 +14,35 @@ const specializations = [
 	...LAW_CATEGORIES,
 ];
 
-const sortOptions = [
-	"Top Rated",
-	"Price: Low to High",
-	"Price: High to Low",
-	"Experience",
-];
+// Sort labels and the directory ordering each one requests
+const sortOptions = {
+	"Top Rated": "rating",
+	"Price: Low to High": "fee_low",
+	"Price: High to Low": "fee_high",
+	"Experience": "experience",
+};
+
+// Top of the fee slider; at the top no fee limit is sent
+const MAX_FEE_FILTER = 10000;
 
 const FindLawyers = () => {
 	const dispatch = useDispatch();
 	const navigate = useNavigate();
-	const { verifiedLawyers = [] } = useSelector((state) => state.lawyer || {});
+	const {
+		verifiedLawyers = [],
+		verifiedLawyersLoading,
+		verifiedLawyersLoadingMore,
+		verifiedLawyersNextCursor,
+		lawyerFacets,
+	} = useSelector((state) => state.lawyer || {});
 	
 	const [searchTerm, setSearchTerm] = useState("");
 	const [selectedSpec, setSelectedSpec] = useState("All Specializations");
-	const [feeCap, setFeeCap] = useState(null);
+	const [selectedCity, setSelectedCity] = useState("");
+	const [feeCap, setFeeCap] = useState(MAX_FEE_FILTER);
 	const [sortBy, setSortBy] = useState("Top Rated");
+	const debouncedSearch = useDebouncedValue(searchTerm.trim());
+	const debouncedFeeCap = useDebouncedValue(feeCap);
 
 	const getSpecializationText = (lawyer) => {
 		if (!lawyer) return "General Practice";
@@ -44,9 +58,27 @@ const FindLawyers = () => {
 		return value.toFixed(2).replace(/\.0+$/, "").replace(/(\.\d*[1-9])0+$/, "$1");
 	};
 
+	// Filtering and sorting happen on the server, a page at a time
+	const facetFilters = useMemo(() => ({
+		search: debouncedSearch,
+		specialization: selectedSpec === "All Specializations" ? "" : selectedSpec,
+		city: selectedCity,
+		max_fee: debouncedFeeCap < MAX_FEE_FILTER ? debouncedFeeCap : "",
+	}), [debouncedSearch, selectedSpec, selectedCity, debouncedFeeCap]);
+
 	useEffect(() => {
-		dispatch(fetchVerifiedLawyers());
-	}, [dispatch]);
+		dispatch(fetchVerifiedLawyers({ ...facetFilters, ordering: sortOptions[sortBy] }));
+	}, [dispatch, facetFilters, sortBy]);
+
+	// Counts do not depend on the sort order
+	useEffect(() => {
+		dispatch(fetchLawyerFacets(facetFilters));
+	}, [dispatch, facetFilters]);
+
+	const specializationCounts = useMemo(
+		() => Object.fromEntries((lawyerFacets?.specializations || []).map(({ value, count }) => [value, count])),
+		[lawyerFacets]
+	);
 
 	const normalizedLawyers = useMemo(() => {
 		return verifiedLawyers.map((lawyer) => {
@@ -59,57 +91,6 @@ const FindLawyers = () => {
 		});
 	}, [verifiedLawyers]);
 
-	const maxFee = useMemo(() => {
-		const fees = normalizedLawyers
-			.map((lawyer) => Number(lawyer.consultation_fee || 0))
-			.filter((fee) => !Number.isNaN(fee));
-		return fees.length ? Math.max(...fees) : 5000;
-	}, [normalizedLawyers]);
-
-	const maxSelectableFee = useMemo(
-		() => Math.max(5000, Math.ceil(maxFee / 100) * 100),
-		[maxFee]
-	);
-
-	const effectiveFeeCap = useMemo(() => {
-		if (feeCap === null) return maxSelectableFee;
-		return Math.min(feeCap, maxSelectableFee);
-	}, [feeCap, maxSelectableFee]);
-
-	const filteredLawyers = useMemo(() => {
-		const loweredSearch = searchTerm.toLowerCase();
-		const loweredSpec = selectedSpec.toLowerCase();
-
-		return normalizedLawyers.filter((lawyer) => {
-			const specializationText = lawyer.specializationText || "";
-			const matchesSpec =
-				selectedSpec === "All Specializations" ||
-				specializationText.toLowerCase().includes(loweredSpec);
-			const matchesFee = (Number(lawyer.consultation_fee || 0) || 0) <= effectiveFeeCap;
-			const matchesSearch =
-				(lawyer.name || "").toLowerCase().includes(loweredSearch) ||
-				specializationText.toLowerCase().includes(loweredSearch) ||
-				(lawyer.city || lawyer.district || "").toLowerCase().includes(loweredSearch);
-
-			return matchesSpec && matchesFee && matchesSearch;
-		});
-	}, [searchTerm, selectedSpec, effectiveFeeCap, normalizedLawyers]);
-
-	const sortedLawyers = useMemo(() => {
-		const clone = [...filteredLawyers];
-
-		switch (sortBy) {
-			case "Price: Low to High":
-				return clone.sort((a, b) => (a.consultation_fee || 0) - (b.consultation_fee || 0));
-			case "Price: High to Low":
-				return clone.sort((a, b) => (b.consultation_fee || 0) - (a.consultation_fee || 0));
-			case "Experience":
-				return clone.sort((a, b) => (b.years_of_experience || 0) - (a.years_of_experience || 0));
-			default:
-				return clone.sort((a, b) => (b.average_rating || 0) - (a.average_rating || 0));
-		}
-	}, [filteredLawyers, sortBy]);
-
 	return (
 		<div className="bg-[#F7F8FB] min-h-screen text-slate-900">
 			<Header />
@@ -131,7 +112,7 @@ const FindLawyers = () => {
 							<input
 								value={searchTerm}
 								onChange={(e) => setSearchTerm(e.target.value)}
-								placeholder="Search by name or specialization..."
+								placeholder="Search by name..."
 								className="w-full bg-transparent outline-none"
 							/>
 						</div>
@@ -159,37 +140,78 @@ const FindLawyers = () => {
 														: "hover:bg-slate-50 border-transparent"
 												}`}
 											>
-												{item}
+												<span className="flex items-center justify-between gap-2">
+													<span>{item}</span>
+													{specializationCounts[item] !== undefined && (
+														<span className={`text-xs ${isActive ? "text-white/80" : "text-slate-400"}`}>
+															{specializationCounts[item]}
+														</span>
+													)}
+												</span>
 											</button>
 										);
 									})}
 								</div>
 							</div>
 
+							{lawyerFacets?.cities?.length > 0 && (
+								<div className="space-y-4">
+									<h3 className="text-sm font-semibold text-[#0F1A3D]">City</h3>
+									<div className="space-y-2 text-sm text-slate-600">
+										{[{ value: "", count: null }, ...lawyerFacets.cities].map(({ value, count }) => {
+											const isActive = selectedCity === value;
+											return (
+												<button
+													key={value || "all"}
+													onClick={() => setSelectedCity(value)}
+													className={`w-full text-left px-3 py-2 rounded-lg transition border ${
+														isActive
+															? "bg-[#0F1A3D] text-white border-[#0F1A3D] shadow-sm"
+															: "hover:bg-slate-50 border-transparent"
+													}`}
+												>
+													<span className="flex items-center justify-between gap-2">
+														<span>{value || "All Cities"}</span>
+														{count !== null && (
+															<span className={`text-xs ${isActive ? "text-white/80" : "text-slate-400"}`}>{count}</span>
+														)}
+													</span>
+												</button>
+											);
+										})}
+									</div>
+								</div>
+							)}
+
 							<div className="space-y-4">
 								<div className="flex items-center justify-between text-sm font-semibold text-[#0F1A3D]">
 									<span>Consultation Fee</span>
-									<span className="text-xs font-medium text-slate-500">Rs. {effectiveFeeCap}</span>
+									<span className="text-xs font-medium text-slate-500">
+										{feeCap < MAX_FEE_FILTER ? `Rs. ${feeCap}` : "Any"}
+									</span>
 								</div>
 								<input
 									type="range"
 									min="0"
-									max={maxSelectableFee}
+									max={MAX_FEE_FILTER}
 									step="100"
-									value={effectiveFeeCap}
+									value={feeCap}
 									onChange={(e) => setFeeCap(Number(e.target.value))}
 									className="w-full accent-[#0F1A3D]"
 								/>
 								<div className="flex justify-between text-xs text-slate-500">
 									<span>Rs. 0</span>
-									<span>Rs. {maxSelectableFee.toLocaleString()}</span>
+									<span>Rs. {MAX_FEE_FILTER.toLocaleString()}+</span>
 								</div>
 							</div>
 						</aside>
 
 						<div className="md:col-span-8 lg:col-span-9 space-y-4">
 							<div className="flex flex-col sm:flex-row sm:items-center justify-between gap-3">
-								<div className="text-sm text-slate-600">Showing {sortedLawyers.length} lawyers</div>
+								<div className="text-sm text-slate-600">
+									Showing {normalizedLawyers.length}
+									{lawyerFacets ? ` of ${lawyerFacets.total}` : ""} lawyers
+								</div>
 								<div className="flex items-center gap-2 text-sm text-slate-600">
 									<span>Sort by</span>
 									<select
@@ -197,7 +219,7 @@ const FindLawyers = () => {
 										onChange={(e) => setSortBy(e.target.value)}
 										className="border border-slate-200 rounded-lg px-3 py-2 text-sm text-slate-800 bg-white shadow-sm"
 									>
-										{sortOptions.map((option) => (
+										{Object.keys(sortOptions).map((option) => (
 											<option key={option} value={option}>
 												{option}
 											</option>
@@ -207,7 +229,7 @@ const FindLawyers = () => {
 							</div>
 
 							<div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-								{sortedLawyers.map((lawyer) => (
+								{normalizedLawyers.map((lawyer) => (
 									<div
 										key={lawyer.id}
 										className="bg-white rounded-2xl shadow-sm hover:shadow-md transition-shadow p-6 border border-gray-100 flex flex-col"
@@ -300,6 +322,23 @@ const FindLawyers = () => {
 									</div>
 								))}
 							</div>
+
+							{!verifiedLawyersLoading && normalizedLawyers.length === 0 && (
+								<p className="text-center text-slate-500 py-12">No lawyers match these filters</p>
+							)}
+
+							{verifiedLawyersNextCursor && !verifiedLawyersLoading && (
+								<div className="flex justify-center pt-4">
+									<button
+										type="button"
+										onClick={() => dispatch(loadMoreVerifiedLawyers())}
+										disabled={verifiedLawyersLoadingMore}
+										className="py-2.5 px-6 border border-[#0F1A3D] text-[#0F1A3D] rounded-lg font-semibold text-sm hover:bg-[#0F1A3D] hover:text-white transition disabled:opacity-60"
+									>
+										{verifiedLawyersLoadingMore ? "Loading..." : "Load more lawyers"}
+									</button>
+								</div>
+							)}
 						</div>
 					</div>
 				</section>
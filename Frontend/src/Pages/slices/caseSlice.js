@@ -27,6 +27,8 @@ export const fetchCases = createAsyncThunk(
 			if (filters.urgency_level) params.append('urgency_level', filters.urgency_level);
 			if (filters.search) params.append('search', filters.search);
 			if (filters.ordering) params.append('ordering', filters.ordering);
+			if (filters.fields) params.append('fields', filters.fields);
+			if (filters.expand !== undefined) params.append('expand', filters.expand);
 
 			const query = params.toString();
 			const response = await axiosInstance.get(`/cases/${query ? `?${query}` : ''}`);
@@ -92,19 +94,78 @@ export const deleteCase = createAsyncThunk(
 	}
 );
 
+// First page of the public feed plus the cases the lawyer was invited to;
+// loadMorePublicCases follows next_cursor for older cases
+const loadPublicFeed = async () => {
+	const { data } = await axiosInstance.get('/cases/public_cases/');
+	return {
+		cases: [...(data.invited || []), ...(data.results || [])],
+		nextCursor: data.next_cursor || null,
+		// The feed position to poll for changes from
+		since: data.since,
+	};
+};
+
 // Async thunk to fetch public cases
 export const fetchPublicCases = createAsyncThunk(
 	'cases/fetchPublicCases',
 	async (_, { rejectWithValue }) => {
 		try {
-			const response = await axiosInstance.get('/cases/public_cases/');
-			return response.data;
+			return await loadPublicFeed();
 		} catch (error) {
 			return rejectWithValue(error.response?.data?.message || 'Failed to load public cases');
 		}
 	}
 );
 
+// Async thunk to append the next page of the public feed
+export const loadMorePublicCases = createAsyncThunk(
+	'cases/loadMorePublicCases',
+	async (_, { getState, rejectWithValue }) => {
+		const cursor = getState().case.publicCasesNextCursor;
+		try {
+			const { data } = await axiosInstance.get('/cases/public_cases/', { params: { cursor } });
+			return { cursor, results: data.results || [], nextCursor: data.next_cursor || null };
+		} catch (error) {
+			return rejectWithValue(error.response?.data?.message || 'Failed to load public cases');
+		}
+	},
+	{
+		condition: (_, { getState }) => {
+			const { publicCasesNextCursor, publicCasesLoading, publicCasesLoadingMore } = getState().case;
+			return Boolean(publicCasesNextCursor) && !publicCasesLoading && !publicCasesLoadingMore;
+		},
+	}
+);
+
+// Async thunk to poll the public feed for cases that changed or left it since the last load
+export const fetchPublicCaseChanges = createAsyncThunk(
+	'cases/fetchPublicCaseChanges',
+	async (_, { getState, rejectWithValue }) => {
+		try {
+			let since = getState().case.publicCasesSince;
+			if (since === null) {
+				return { reset: true, ...(await loadPublicFeed()) };
+			}
+			const changes = [];
+			let hasMore = true;
+			while (hasMore) {
+				const { data } = await axiosInstance.get('/cases/public_cases/', { params: { since } });
+				// The server no longer has the events after `since`; start again from the first page
+				if (data.reset) {
+					return { reset: true, ...(await loadPublicFeed()) };
+				}
+				changes.push({ upserted: data.upserted, removed: data.removed });
+				since = data.since;
+				hasMore = data.has_more;
+			}
+			return { reset: false, changes, since };
+		} catch (error) {
+			return rejectWithValue(error.response?.data?.message || 'Failed to refresh public cases');
+		}
+	}
+);
+
 // Async thunk to fetch case appointments
 export const fetchCaseAppointments = createAsyncThunk(
 	'cases/fetchCaseAppointments',
@@ -129,7 +190,7 @@ export const uploadCaseDocuments = createAsyncThunk(
 			const response = await axiosInstance.post(`/cases/${caseId}/upload_documents/`, formData, {
 				headers: { 'Content-Type': 'multipart/form-data' },
 			});
-			return { caseId, documents: response.data };
+			return { caseId, documents: response.data.documents };
 		} catch (error) {
 			return rejectWithValue(error.response?.data?.message || 'Failed to upload documents');
 		}
@@ -216,7 +277,10 @@ const initialState = {
 	caseDetailsError: null,
 
 	publicCases: [],
+	publicCasesSince: null,
+	publicCasesNextCursor: null,
 	publicCasesLoading: false,
+	publicCasesLoadingMore: false,
 	publicCasesError: null,
 
 	caseAppointments: [],
@@ -268,6 +332,8 @@ const caseSlice = createSlice({
 		// Action to clear public cases
 		clearPublicCases: (state) => {
 			state.publicCases = [];
+			state.publicCasesSince = null;
+			state.publicCasesNextCursor = null;
 			state.publicCasesError = null;
 		},
 		// Action to clear all case-related errors
@@ -366,14 +432,56 @@ const caseSlice = createSlice({
 			})
 			.addCase(fetchPublicCases.fulfilled, (state, action) => {
 				state.publicCasesLoading = false;
-				state.publicCases = Array.isArray(action.payload)
-					? action.payload
-					: action.payload.results || [];
+				state.publicCases = action.payload.cases;
+				state.publicCasesNextCursor = action.payload.nextCursor;
+				state.publicCasesSince = action.payload.since;
 			})
 			.addCase(fetchPublicCases.rejected, (state, action) => {
 				state.publicCasesLoading = false;
 				state.publicCasesError = action.payload;
 			})
+			.addCase(loadMorePublicCases.pending, (state) => {
+				state.publicCasesLoadingMore = true;
+			})
+			.addCase(loadMorePublicCases.fulfilled, (state, action) => {
+				state.publicCasesLoadingMore = false;
+				const { cursor, results, nextCursor } = action.payload;
+				// The feed was reloaded while this page was loading
+				if (cursor !== state.publicCasesNextCursor) return;
+				// Changes polled in the meantime may already have added some of these
+				const loaded = new Set(state.publicCases.map((item) => item.id));
+				state.publicCases.push(...results.filter((item) => !loaded.has(item.id)));
+				state.publicCasesNextCursor = nextCursor;
+			})
+			.addCase(loadMorePublicCases.rejected, (state, action) => {
+				state.publicCasesLoadingMore = false;
+				state.publicCasesError = action.payload;
+			})
+			.addCase(fetchPublicCaseChanges.fulfilled, (state, action) => {
+				const { reset, cases, nextCursor, changes, since } = action.payload;
+				state.publicCasesSince = since;
+				if (reset) {
+					state.publicCases = cases;
+					state.publicCasesNextCursor = nextCursor;
+					return;
+				}
+				changes.forEach(({ upserted, removed }) => {
+					const replaced = new Set([...removed, ...upserted.map((item) => item.id)]);
+					const loaded = new Set(state.publicCases.map((item) => item.id));
+					// Cases older than the loaded pages arrive with loadMorePublicCases instead
+					const oldest = state.publicCases.length
+						? Math.min(...state.publicCases.map((item) => new Date(item.created_at)))
+						: -Infinity;
+					const inView = (item) => loaded.has(item.id) || !state.publicCasesNextCursor
+						|| new Date(item.created_at) >= oldest;
+					state.publicCases = [
+						...upserted.filter(inView),
+						...state.publicCases.filter((item) => !replaced.has(item.id)),
+					];
+				});
+				// Keep the feed newest first, as the server lists it
+				state.publicCases.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
+			})
 			.addCase(fetchCaseAppointments.pending, (state) => {
 				state.caseAppointmentsLoading = true;
 				state.caseAppointmentsError = null;
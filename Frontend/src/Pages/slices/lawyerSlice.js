@@ -17,18 +17,28 @@ export const fetchLawyerDetails = createAsyncThunk(
 );
 
 /* ================= FETCH VERIFIED LAWYERS LIST ================= */
+// Directory filters the server understands, sent as query parameters
+const DIRECTORY_FILTERS = ['search', 'specialization', 'city', 'min_experience', 'max_fee'];
+
+const directoryParams = (filters = {}, extra = {}) => {
+  const params = new URLSearchParams();
+  DIRECTORY_FILTERS.forEach((name) => {
+    if (filters[name]) params.append(name, filters[name]);
+  });
+  Object.entries(extra).forEach(([name, value]) => {
+    if (value) params.append(name, value);
+  });
+  return params;
+};
+
+// First page of lawyers matching the filters; loadMoreVerifiedLawyers appends the next ones
 export const fetchVerifiedLawyers = createAsyncThunk(
   'lawyer/fetchVerifiedLawyers',
   async (filters = {}, { rejectWithValue }) => {
     try {
-      const params = new URLSearchParams();
-      if (filters.specialization) params.append('specialization', filters.specialization);
-      if (filters.city) params.append('city', filters.city);
-      if (filters.min_experience) params.append('min_experience', filters.min_experience);
-      if (filters.max_fee) params.append('max_fee', filters.max_fee);
-
+      const params = directoryParams(filters, { ordering: filters.ordering });
       const response = await axiosInstance.get(`/kyc/verified-lawyers/?${params}`);
-      return response.data;
+      return { ...response.data, filters };
     } catch (error) {
       console.error('Fetch verified lawyers error:', error.response?.data || error.message);
       return rejectWithValue(error.response?.data?.message || 'Failed to load lawyers');
@@ -36,6 +46,46 @@ export const fetchVerifiedLawyers = createAsyncThunk(
   }
 );
 
+export const loadMoreVerifiedLawyers = createAsyncThunk(
+  'lawyer/loadMoreVerifiedLawyers',
+  async (_, { getState, rejectWithValue }) => {
+    const {
+      verifiedLawyersFilters: filters,
+      verifiedLawyersNextCursor: cursor,
+      verifiedLawyersRequestId: listRequestId,
+    } = getState().lawyer;
+    try {
+      const params = directoryParams(filters, { ordering: filters.ordering, cursor });
+      const response = await axiosInstance.get(`/kyc/verified-lawyers/?${params}`);
+      return { ...response.data, listRequestId };
+    } catch (error) {
+      console.error('Load more lawyers error:', error.response?.data || error.message);
+      return rejectWithValue(error.response?.data?.message || 'Failed to load lawyers');
+    }
+  },
+  {
+    condition: (_, { getState }) => {
+      const { verifiedLawyersNextCursor, verifiedLawyersLoading, verifiedLawyersLoadingMore } = getState().lawyer;
+      return Boolean(verifiedLawyersNextCursor) && !verifiedLawyersLoading && !verifiedLawyersLoadingMore;
+    },
+  }
+);
+
+/* ================= FETCH DIRECTORY FACETS ================= */
+// Match counts per specialization and city for the current filters
+export const fetchLawyerFacets = createAsyncThunk(
+  'lawyer/fetchLawyerFacets',
+  async (filters = {}, { rejectWithValue }) => {
+    try {
+      const response = await axiosInstance.get(`/kyc/verified-lawyers/facets/?${directoryParams(filters)}`);
+      return response.data;
+    } catch (error) {
+      console.error('Fetch lawyer facets error:', error.response?.data || error.message);
+      return rejectWithValue(error.response?.data?.message || 'Failed to load filters');
+    }
+  }
+);
+
 const initialState = {
   // Single lawyer details
   lawyerDetails: null,
@@ -46,6 +96,14 @@ const initialState = {
   verifiedLawyers: [],
   verifiedLawyersLoading: false,
   verifiedLawyersError: null,
+  verifiedLawyersFilters: {},
+  verifiedLawyersNextCursor: null,
+  verifiedLawyersLoadingMore: false,
+  // Request id of the latest first-page fetch; older responses are dropped
+  verifiedLawyersRequestId: null,
+
+  // Directory facet counts: { total, specializations, cities }
+  lawyerFacets: null,
 };
 
 const lawyerSlice = createSlice({
@@ -59,6 +117,7 @@ const lawyerSlice = createSlice({
     clearVerifiedLawyers: (state) => {
       state.verifiedLawyers = [];
       state.verifiedLawyersError = null;
+      state.verifiedLawyersNextCursor = null;
     },
   },
   extraReducers: (builder) => {
@@ -80,21 +139,46 @@ const lawyerSlice = createSlice({
 
     // Fetch Verified Lawyers
     builder
-      .addCase(fetchVerifiedLawyers.pending, (state) => {
+      .addCase(fetchVerifiedLawyers.pending, (state, action) => {
         state.verifiedLawyersLoading = true;
         state.verifiedLawyersError = null;
+        state.verifiedLawyersRequestId = action.meta.requestId;
       })
       .addCase(fetchVerifiedLawyers.fulfilled, (state, action) => {
+        if (action.meta.requestId !== state.verifiedLawyersRequestId) return;
         state.verifiedLawyersLoading = false;
-        state.verifiedLawyers = Array.isArray(action.payload)
-          ? action.payload
-          : action.payload.results || [];
+        state.verifiedLawyers = action.payload.results || [];
+        state.verifiedLawyersNextCursor = action.payload.next_cursor || null;
+        state.verifiedLawyersFilters = action.payload.filters;
         state.verifiedLawyersError = null;
       })
       .addCase(fetchVerifiedLawyers.rejected, (state, action) => {
+        if (action.meta.requestId !== state.verifiedLawyersRequestId) return;
         state.verifiedLawyersLoading = false;
         state.verifiedLawyersError = action.payload;
       });
+
+    // Load More Verified Lawyers
+    builder
+      .addCase(loadMoreVerifiedLawyers.pending, (state) => {
+        state.verifiedLawyersLoadingMore = true;
+      })
+      .addCase(loadMoreVerifiedLawyers.fulfilled, (state, action) => {
+        state.verifiedLawyersLoadingMore = false;
+        // The filters changed while this page was loading
+        if (action.payload.listRequestId !== state.verifiedLawyersRequestId) return;
+        state.verifiedLawyers.push(...(action.payload.results || []));
+        state.verifiedLawyersNextCursor = action.payload.next_cursor || null;
+      })
+      .addCase(loadMoreVerifiedLawyers.rejected, (state, action) => {
+        state.verifiedLawyersLoadingMore = false;
+        state.verifiedLawyersError = action.payload;
+      });
+
+    // Fetch Lawyer Facets
+    builder.addCase(fetchLawyerFacets.fulfilled, (state, action) => {
+      state.lawyerFacets = action.payload;
+    });
   },
 });
 
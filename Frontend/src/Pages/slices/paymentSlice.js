@@ -71,7 +71,7 @@ export const fetchPaymentHistory = createAsyncThunk(
   }
 );
 
-// Fetch lawyer earnings summary and payment history
+// Fetch lawyer earnings summary
 export const fetchLawyerEarnings = createAsyncThunk(
   'payment/fetchLawyerEarnings',
   async (_, { rejectWithValue }) => {
@@ -84,6 +84,45 @@ export const fetchLawyerEarnings = createAsyncThunk(
   }
 );
 
+// Cursor-paginated earnings history tables: state key -> endpoint
+const EARNINGS_HISTORY = {
+  payments: '/payment/earnings/payments/',
+  case_payment_requests: '/payment/earnings/case-requests/',
+  payouts: '/payment/earnings/payouts/',
+};
+
+// First page of one earnings history table; loadMoreEarningsHistory appends the next ones
+export const fetchEarningsHistory = createAsyncThunk(
+  'payment/fetchEarningsHistory',
+  async (table, { rejectWithValue }) => {
+    try {
+      const response = await axiosInstance.get(EARNINGS_HISTORY[table]);
+      return response.data.Result;
+    } catch (error) {
+      return rejectWithValue(extractErrorMessage(error, 'Failed to load earnings history'));
+    }
+  }
+);
+
+export const loadMoreEarningsHistory = createAsyncThunk(
+  'payment/loadMoreEarningsHistory',
+  async (table, { getState, rejectWithValue }) => {
+    try {
+      const cursor = getState().payment.earningsHistory[table].nextCursor;
+      const response = await axiosInstance.get(EARNINGS_HISTORY[table], { params: { cursor } });
+      return response.data.Result;
+    } catch (error) {
+      return rejectWithValue(extractErrorMessage(error, 'Failed to load earnings history'));
+    }
+  },
+  {
+    condition: (table, { getState }) => {
+      const { nextCursor, loading } = getState().payment.earningsHistory[table];
+      return Boolean(nextCursor) && !loading;
+    },
+  }
+);
+
 // Fetch admin platform revenue summary (SuperAdmin only)
 export const fetchAdminRevenue = createAsyncThunk(
   'payment/fetchAdminRevenue',
@@ -97,6 +136,26 @@ export const fetchAdminRevenue = createAsyncThunk(
   }
 );
 
+// Append the next page of the admin revenue transaction table
+export const loadMoreAdminRevenuePayments = createAsyncThunk(
+  'payment/loadMoreAdminRevenuePayments',
+  async (_, { getState, rejectWithValue }) => {
+    try {
+      const cursor = getState().payment.revenue.next_cursor;
+      const response = await axiosInstance.get('/payment/admin/revenue/', { params: { cursor } });
+      return response.data.Result;
+    } catch (error) {
+      return rejectWithValue(extractErrorMessage(error, 'Failed to load transactions'));
+    }
+  },
+  {
+    condition: (_, { getState }) => {
+      const { revenue, revenueLoadingMore } = getState().payment;
+      return Boolean(revenue?.next_cursor) && !revenueLoadingMore;
+    },
+  }
+);
+
 // Fetch pending payments for a specific lawyer (admin only)
 export const fetchLawyerPendingPayments = createAsyncThunk(
   'payment/fetchLawyerPendingPayments',
@@ -198,10 +257,17 @@ const initialState = {
   earnings: null,
   earningsLoading: false,
   earningsError: null,
+  earningsHistory: Object.fromEntries(
+    Object.keys(EARNINGS_HISTORY).map((table) => [
+      table,
+      { items: [], nextCursor: null, loading: false, error: null },
+    ])
+  ),
 
   // Admin Revenue
   revenue: null,
   revenueLoading: false,
+  revenueLoadingMore: false,
   revenueError: null,
 
   // Admin Payout
@@ -359,6 +425,38 @@ const paymentSlice = createSlice({
         state.earningsError = action.payload;
       })
 
+      // Lawyer Earnings History
+      .addCase(fetchEarningsHistory.pending, (state, action) => {
+        const history = state.earningsHistory[action.meta.arg];
+        history.loading = true;
+        history.error = null;
+      })
+      .addCase(fetchEarningsHistory.fulfilled, (state, action) => {
+        const history = state.earningsHistory[action.meta.arg];
+        history.loading = false;
+        history.items = action.payload[action.meta.arg] || [];
+        history.nextCursor = action.payload.next_cursor || null;
+      })
+      .addCase(fetchEarningsHistory.rejected, (state, action) => {
+        const history = state.earningsHistory[action.meta.arg];
+        history.loading = false;
+        history.error = action.payload;
+      })
+      .addCase(loadMoreEarningsHistory.pending, (state, action) => {
+        state.earningsHistory[action.meta.arg].loading = true;
+      })
+      .addCase(loadMoreEarningsHistory.fulfilled, (state, action) => {
+        const history = state.earningsHistory[action.meta.arg];
+        history.loading = false;
+        history.items.push(...(action.payload[action.meta.arg] || []));
+        history.nextCursor = action.payload.next_cursor || null;
+      })
+      .addCase(loadMoreEarningsHistory.rejected, (state, action) => {
+        const history = state.earningsHistory[action.meta.arg];
+        history.loading = false;
+        history.error = action.payload;
+      })
+
       // Admin Revenue
       .addCase(fetchAdminRevenue.pending, (state) => {
         state.revenueLoading = true;
@@ -372,6 +470,18 @@ const paymentSlice = createSlice({
         state.revenueLoading = false;
         state.revenueError = action.payload;
       })
+      .addCase(loadMoreAdminRevenuePayments.pending, (state) => {
+        state.revenueLoadingMore = true;
+      })
+      .addCase(loadMoreAdminRevenuePayments.fulfilled, (state, action) => {
+        state.revenueLoadingMore = false;
+        state.revenue.payments.push(...(action.payload.payments || []));
+        state.revenue.next_cursor = action.payload.next_cursor || null;
+      })
+      .addCase(loadMoreAdminRevenuePayments.rejected, (state, action) => {
+        state.revenueLoadingMore = false;
+        state.revenueError = action.payload;
+      })
 
       // Fetch Lawyer Pending Payments
       .addCase(fetchLawyerPendingPayments.pending, (state) => {
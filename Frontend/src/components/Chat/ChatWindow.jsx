@@ -108,10 +108,24 @@ const VoiceMessage = ({ audioUrl }) => {
  */
 const ChatWindow = ({ userId, currentUser, token, otherUser }) => {
   const { t } = useTranslation();
-  const { messages, isConnected, error, isLoading, sendMessage, otherUserOnline } = useChat(userId, token);
+  const {
+    messages,
+    isConnected,
+    error,
+    isLoading,
+    sendMessage,
+    otherUserOnline,
+    hasMoreBefore,
+    loadingOlder,
+    loadOlderMessages,
+  } = useChat(userId, token);
   const [messageInput, setMessageInput] = useState('');
   const [isSending, setIsSending] = useState(false);
   const messagesEndRef = useRef(null);
+  const messagesContainerRef = useRef(null);
+  const lastMessageIdRef = useRef(null);
+  // Scroll height before older messages were prepended, to keep the view in place
+  const prependScrollHeightRef = useRef(null);
   
   // Voice recording states
   const [isRecording, setIsRecording] = useState(false);
@@ -121,12 +135,34 @@ const ChatWindow = ({ userId, currentUser, token, otherUser }) => {
   const timerIntervalRef = useRef(null);
 
   /**
-   * Auto-scroll to bottom when new messages arrive
+   * Auto-scroll to bottom when new messages arrive; keep the position when
+   * older messages are prepended
    */
   useEffect(() => {
-    messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
+    const container = messagesContainerRef.current;
+    if (container && prependScrollHeightRef.current !== null) {
+      container.scrollTop += container.scrollHeight - prependScrollHeightRef.current;
+      prependScrollHeightRef.current = null;
+    }
+
+    const lastMessageId = messages[messages.length - 1]?.id ?? null;
+    if (lastMessageId !== lastMessageIdRef.current) {
+      lastMessageIdRef.current = lastMessageId;
+      messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
+    }
   }, [messages]);
 
+  /**
+   * Load older messages when scrolled near the top
+   */
+  const handleMessagesScroll = (e) => {
+    if (e.currentTarget.scrollTop > 40 || !hasMoreBefore || loadingOlder) {
+      return;
+    }
+    prependScrollHeightRef.current = e.currentTarget.scrollHeight;
+    loadOlderMessages();
+  };
+
   /**
    * Handle sending a message
    */
@@ -318,7 +354,12 @@ const ChatWindow = ({ userId, currentUser, token, otherUser }) => {
       </div>
 
       {/* Messages Container */}
-      <div className="messages-container">
+      <div className="messages-container" ref={messagesContainerRef} onScroll={handleMessagesScroll}>
+        {loadingOlder && (
+          <div className="no-messages">
+            <p>{t('messages.loadingOlder')}</p>
+          </div>
+        )}
         {messages.length === 0 ? (
           <div className="no-messages">
             <p>{t('messages.chooseConversation')}</p>
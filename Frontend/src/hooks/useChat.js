@@ -15,10 +15,15 @@ export const useChat = (userId, token) => {
   const [error, setError] = useState(null);
   const [connectionLoading, setConnectionLoading] = useState(true);
   const [otherUserOnline, setOtherUserOnline] = useState(false);
+  const [hasMoreBefore, setHasMoreBefore] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const wsRef = useRef(null);
   const reconnectAttemptsRef = useRef(0);
   const reconnectTimeoutRef = useRef(null);
   const messageIdsRef = useRef(new Set());
+  // Cursor of the oldest loaded message, for requesting the page before it
+  const beforeCursorRef = useRef(null);
+  const loadingOlderRef = useRef(false);
   const maxReconnectAttempts = 5;
   const reconnectDelay = 3000;
 
@@ -53,6 +58,24 @@ export const useChat = (userId, token) => {
               messageIdsRef.current.clear();
               msgs.forEach((msg) => messageIdsRef.current.add(msg.id));
               setMessages(msgs);
+              beforeCursorRef.current = data.before_cursor || null;
+              setHasMoreBefore(Boolean(data.has_more_before));
+              loadingOlderRef.current = false;
+              setLoadingOlder(false);
+            } else if (data.type === 'older_messages') {
+              loadingOlderRef.current = false;
+              setLoadingOlder(false);
+              if (data.error) {
+                setError(data.error);
+                return;
+              }
+              const older = (data.messages || []).filter(
+                (msg) => !messageIdsRef.current.has(msg.id)
+              );
+              older.forEach((msg) => messageIdsRef.current.add(msg.id));
+              setMessages((prev) => [...older, ...prev]);
+              beforeCursorRef.current = data.before_cursor || beforeCursorRef.current;
+              setHasMoreBefore(Boolean(data.has_more_before));
             } else if (data.type === 'new_message') {
               const messageId = data.message?.id;
               if (messageId && !messageIdsRef.current.has(messageId)) {
@@ -162,6 +185,28 @@ export const useChat = (userId, token) => {
     }
   }, []);
 
+  /**
+   * Request the page of messages before the oldest loaded one
+   */
+  const loadOlderMessages = useCallback(() => {
+    if (!hasMoreBefore || loadingOlderRef.current || !beforeCursorRef.current) {
+      return;
+    }
+
+    if (!wsRef.current || wsRef.current.readyState !== WebSocket.OPEN) {
+      return;
+    }
+
+    loadingOlderRef.current = true;
+    setLoadingOlder(true);
+    wsRef.current.send(
+      JSON.stringify({
+        action: 'load_before',
+        before: beforeCursorRef.current,
+      })
+    );
+  }, [hasMoreBefore]);
+
   return {
     messages,
     isConnected,
@@ -169,5 +214,8 @@ export const useChat = (userId, token) => {
     isLoading,
     sendMessage,
     otherUserOnline,
+    hasMoreBefore,
+    loadingOlder,
+    loadOlderMessages,
   };
 };
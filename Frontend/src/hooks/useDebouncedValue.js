@@ -0,0 +1,20 @@
+import { useEffect, useState } from 'react';
+
+/**
+ * Value that follows `value` once it has stopped changing for `delay` ms,
+ * so typing in a search box sends one request rather than one per key.
+ *
+ * @param {*} value - The changing value
+ * @param {number} delay - Quiet period in milliseconds
+ * @returns {*} The settled value
+ */
+export const useDebouncedValue = (value, delay = 300) => {
+  const [settled, setSettled] = useState(value);
+
+  useEffect(() => {
+    const timeout = setTimeout(() => setSettled(value), delay);
+    return () => clearTimeout(timeout);
+  }, [value, delay]);
+
+  return settled;
+};